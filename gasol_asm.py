@@ -2,21 +2,22 @@
 import json
 import os
 import shutil
+import stat
 import sys
-from typing import Tuple, Optional, List, Dict, Set
-from copy import deepcopy
+import tempfile
+from typing import Tuple, Optional, List, Dict, Set, Iterator, Iterable
+from copy import copy, deepcopy
+from contextlib import nullcontext, contextmanager
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from timeit import default_timer as dtimer
-from argparse import ArgumentParser, Namespace
-
-import pandas as pd
+from argparse import ArgumentParser, Namespace, ArgumentTypeError
 
 sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/gasol_ml")
 
 import global_params.constants as constants
 import global_params.paths as paths
-import sfs_generator.ir_block as ir_block
-from sfs_generator.gasol_optimization import get_sfs_dict
-from sfs_generator.parser_asm import (parse_asm, parse_json_asm,
+from sfs_generator.parser_asm import (parse_asm, parse_json_asm, StreamedAsm, contract_from_json, asm_json_length,
                                       generate_block_from_plain_instructions,
                                       parse_blocks_from_plain_instructions)
 from sfs_generator.utils import process_blocks_split
@@ -24,13 +25,45 @@ from verification.sfs_verify import verify_block_from_list_of_sfs, are_equals
 from solution_generation.optimize_from_sub_blocks import rebuild_optimized_asm_block
 from sfs_generator.asm_block import AsmBlock, AsmBytecode
 from sfs_generator.asm_contract import AsmContract
+from sfs_generator.asm_json import AsmJSON
+from sfs_generator.asm_json_writer import AsmJSONWriter, write_asm_contract
 from smt_encoding.block_optimizer import BlockOptimizer, OptimizeOutcome
+from smt_encoding.portfolio_optimizer import PortfolioOptimizer
+from smt_encoding.budget_scheduler import BudgetScheduler, sequence_cost, sub_block_priority
+from smt_encoding.optimization_cache import get_optimization_cache, optimization_key, template_key, SearchResult_T, \
+    pushed_constants_preserved
 from solution_generation.ids2asm import asm_from_ids
-from verification.forves_verification import compare_forves
+from verification.forves_verification import compare_forves_batch
 from statistics.statistics_from_asm_block import csv_from_asm_block
 from global_params.options import OptimizationParams
 from greedy.block_generation import greedy_from_json, greedy_standalone
-from smt_encoding.json_with_dependencies import generate_dot_graph_from_sms
+
+
+@contextmanager
+def replaced_on_completion(file_name: str):
+    """
+    Opens a temporary file in the same directory as file_name that replaces it once the block exits
+    without errors. Hence, an interrupted execution keeps the previous content of file_name (for instance,
+    the best result so far of the anytime mode). The file keeps the mode of the replaced one, or the mode
+    given by the umask if it is new, as mkstemp always creates files readable only by the owner
+    """
+    directory, base_name = os.path.split(os.path.abspath(file_name))
+    fd, tmp_file = tempfile.mkstemp(prefix="." + base_name + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            yield f
+        if os.path.exists(file_name):
+            mode = stat.S_IMODE(os.stat(file_name).st_mode)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_file, mode)
+        os.replace(tmp_file, file_name)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
 
 
 def init():
@@ -52,6 +85,15 @@ def init():
     global prev_n_instrs
     prev_n_instrs = 0
 
+    # Results from optimizing each template of SFS, with the sub-block that has been searched. Only filled in the
+    # main process (see optimize_templates)
+    global optimized_templates
+    optimized_templates = dict()
+
+    # Best results updated in the current round of the anytime mode (see search_optimal_anytime)
+    global updated_results
+    updated_results = dict()
+
 
 def select_model_and_config(model: str, criteria: str, i: int) -> Tuple[str, int]:
     configurations = {"bound_size": ("bound_size.pyt", 4), "bound_gas": ("bound_gas.pyt", 4),
@@ -86,6 +128,9 @@ def create_ml_models(params: OptimizationParams) -> None:
 
 
 def compute_original_sfs_with_simplifications(block: AsmBlock, params: OptimizationParams):
+    # The SFS generation (and its dependencies) is only loaded when some block has to be analyzed
+    import sfs_generator.ir_block as ir_block
+
     stack_size = block.source_stack
     block_name = block.block_name
     block_id = block.block_id
@@ -99,14 +144,12 @@ def compute_original_sfs_with_simplifications(block: AsmBlock, params: Optimizat
 
     fname = params.input_file.split("/")[-1].split(".")[0]
 
-    exit_code, subblocks_list = \
+    exit_code, subblocks_list, sfs_dict = \
         ir_block.evm2rbr_compiler(file_name=fname, block=block_data, block_name=block_name, block_id=block_id,
                                   simplification=params.rules_enabled, storage=params.split_storage,
                                   size=params.size_rules_enabled, part=params.split_partition,
                                   pop=params.pop_uninterpreted, push=not params.push_basic, revert=revert_flag,
-                                  debug_info=params.verbose)
-
-    sfs_dict = get_sfs_dict()
+                                  debug_info=params.verbose, keep_files=params.keep_files)
 
     return sfs_dict, subblocks_list
 
@@ -137,11 +180,11 @@ def compare_best_block(original_seq: List[AsmBytecode], optimized_superopt: List
 
 
 def search_optimal(sfs_block: Dict, params: OptimizationParams, tout: int,
-                   block_name: str) -> Tuple[OptimizeOutcome, float, List[str], Optional[List[str]]]:
+                   block_name: str) -> Tuple[OptimizeOutcome, float, List[str], Optional[List[str]], Dict]:
     """
     Decides which superoptimization algorithm (or greedy standalone) is applied, using the bound by the greedy if
     the corresponding option is enabled. Returns the optimization outcome, the time spent in the search, the ids
-    from the optimized sequence and from the greedy algorithm
+    from the optimized sequence and from the greedy algorithm, and the statistics from the portfolio (if enabled)
     """
     # Must come before extended json with instr dep and bounds to apply the new ub to the bounds generation
     if params.ub_greedy and not params.greedy:
@@ -161,17 +204,133 @@ def search_optimal(sfs_block: Dict, params: OptimizationParams, tout: int,
             greedy_ids = None
     else:
         greedy_ids = None
-    # Greedy standalone configuration
-    if params.greedy:
+    solver_statistics = {}
+
+    # Greedy standalone configuration. Also used for the blocks that have been assigned no solver time
+    # from the budget (see BudgetScheduler)
+    if params.greedy or (params.budget is not None and tout == 0):
         optimization_outcome_str, solver_time, optimized_ids = greedy_standalone(sfs_block)
         optimization_outcome = OptimizeOutcome.non_optimal if optimization_outcome_str == "non_optimal" else OptimizeOutcome.error
 
+    # SMT superoptimization with several configurations at the same time
+    elif params.portfolio:
+        optimizer = PortfolioOptimizer(block_name, sfs_block, params, tout)
+        optimization_outcome, solver_time, optimized_ids = optimizer.optimize_block()
+        solver_statistics = optimizer.portfolio_statistics()
+
     # Otherwise, SMT superoptimization
     else:
         optimizer = BlockOptimizer(block_name, sfs_block, params, tout)
         optimization_outcome, solver_time, optimized_ids = optimizer.optimize_block()
 
-    return optimization_outcome, solver_time, optimized_ids, greedy_ids
+    return optimization_outcome, solver_time, optimized_ids, greedy_ids, solver_statistics
+
+
+def search_optimal_with_cache(sfs_block: Dict, params: OptimizationParams, tout: int,
+                              block_name: str) -> Tuple[OptimizeOutcome, float, List[str], Optional[List[str]], Dict]:
+    """
+    Same as search_optimal, but the result is retrieved from the optimization cache if it has already been
+    computed for an equivalent SFS with the same parameters. Otherwise, the result is stored in the cache
+    """
+    if params.cache_path is None:
+        return search_optimal(sfs_block, params, tout, block_name)
+
+    cache = get_optimization_cache(params.cache_path)
+    # The key must be computed before searching, as the search can modify the SFS
+    key = optimization_key(sfs_block, params, tout)
+    cached_result = cache.lookup(key)
+
+    if cached_result is not None:
+        optimization_outcome, _, optimized_ids, greedy_ids, solver_statistics = cached_result
+        if params.verbose:
+            print(f"Result for {block_name} retrieved from the cache")
+        return optimization_outcome, 0, optimized_ids, greedy_ids, {**solver_statistics, "cache_hit": True}
+
+    search_result = search_optimal(sfs_block, params, tout, block_name)
+    cache.store(key, search_result)
+    optimization_outcome, solver_time, optimized_ids, greedy_ids, solver_statistics = search_result
+    return optimization_outcome, solver_time, optimized_ids, greedy_ids, {**solver_statistics, "cache_hit": False}
+
+
+def search_optimal_with_templates(sfs_block: Dict, params: OptimizationParams, tout: int, block_name: str,
+                                  template_result: Optional[Tuple[SearchResult_T, bool]] = None) \
+        -> Tuple[OptimizeOutcome, float, List[str], Optional[List[str]], Dict]:
+    """
+    Same as search_optimal_with_cache, but the sub-blocks with a template result (see optimize_templates) are not
+    searched: the sequence of ids from the sub-block that has been optimized for the template is reused, as the SFS
+    of the sub-blocks with the same template share the instruction ids. The template result comes with whether
+    the sub-block is the one that has been optimized, so that the solver time is only counted once
+    """
+    if template_result is None:
+        return search_optimal_with_cache(sfs_block, params, tout, block_name)
+
+    (optimization_outcome, solver_time, optimized_ids, greedy_ids, solver_statistics), optimized_here = template_result
+    if optimized_here:
+        return optimization_outcome, solver_time, optimized_ids, greedy_ids, \
+            {**solver_statistics, "template_hit": False}
+
+    if params.verbose:
+        print(f"Result for {block_name} reused from a block with the same template")
+    return optimization_outcome, 0, optimized_ids, greedy_ids, {**solver_statistics, "template_hit": True}
+
+
+# Best result found so far for each sub-block in the anytime mode, indexed by the full name of its contract and the
+# name of the sub-block, as the names of the blocks only include the last part of the contract name. They are kept
+# among rounds
+best_results: Dict[Tuple[str, str], SearchResult_T] = dict()
+
+
+def improves_result(sfs_block: Dict, params: OptimizationParams, previous_result: SearchResult_T,
+                    new_result: SearchResult_T) -> bool:
+    """
+    Whether the new result from a sub-block must replace the previous one: it is shown optimal, or it has found
+    a sequence that is cheaper than the previous one (if any)
+    """
+    new_outcome, _, new_ids, _, _ = new_result
+    previous_outcome, _, previous_ids, _, _ = previous_result
+    if new_outcome == OptimizeOutcome.optimal:
+        return True
+    elif new_outcome != OptimizeOutcome.non_optimal:
+        return False
+    elif previous_outcome != OptimizeOutcome.non_optimal:
+        return True
+    return sequence_cost(asm_from_ids(sfs_block, new_ids), params.criteria) < \
+        sequence_cost(asm_from_ids(sfs_block, previous_ids), params.criteria)
+
+
+def search_optimal_anytime(sfs_block: Dict, params: OptimizationParams, tout: int, block_name: str,
+                           contract_name: str = "", template_result: Optional[Tuple[SearchResult_T, bool]] = None) \
+        -> Tuple[OptimizeOutcome, float, List[str], Optional[List[str]], Dict]:
+    """
+    Same as search_optimal_with_templates, but the result of each round of the anytime mode is combined with the
+    best one from the previous rounds of the sub-block with the same name in the same contract. The first round
+    applies the greedy algorithm, and the following ones only search sub-blocks that have not been shown optimal yet
+    """
+    if params.rounds is None:
+        return search_optimal_with_templates(sfs_block, params, tout, block_name, template_result)
+
+    result_key = contract_name, block_name
+    previous_result = best_results.get(result_key, None)
+    if previous_result is not None and previous_result[0] == OptimizeOutcome.optimal:
+        optimization_outcome, _, optimized_ids, greedy_ids, solver_statistics = previous_result
+        return optimization_outcome, 0, optimized_ids, greedy_ids, solver_statistics
+
+    if params.current_round == 0:
+        greedy_params = copy(params)
+        greedy_params.greedy = True
+        new_result = search_optimal(sfs_block, greedy_params, tout, block_name)
+    else:
+        new_result = search_optimal_with_templates(sfs_block, params, tout, block_name, template_result)
+
+    optimization_outcome, solver_time, optimized_ids, greedy_ids, solver_statistics = new_result
+    if previous_result is None or improves_result(sfs_block, params, previous_result, new_result):
+        best_results[result_key] = optimization_outcome, solver_time, optimized_ids, greedy_ids, \
+            {**solver_statistics, "anytime_round": params.current_round}
+        updated_results[result_key] = best_results[result_key]
+
+    # The time is the one spent in the current round, regardless of the chosen result
+    optimization_outcome, _, optimized_ids, greedy_ids, solver_statistics = best_results[result_key]
+    return optimization_outcome, solver_time, optimized_ids, greedy_ids, solver_statistics
 
 
 def choose_best_solution(original_asm: List[AsmBytecode], optimized_asm: List[AsmBytecode],
@@ -205,45 +364,81 @@ def choose_best_solution(original_asm: List[AsmBytecode], optimized_asm: List[As
     return optimized_asm, chosen_solution_tag
 
 
+def block_timeout(sfs_block: Dict, params: OptimizationParams) -> int:
+    # To match previous results, multiply timeout by number of storage instructions
+    # TODO devise better heuristics to deal with timeouts
+    if params.direct_timeout:
+        tout = params.timeout
+    else:
+        tout = params.timeout * (1 + len([True for instr in sfs_block['user_instrs'] if instr["storage"]]))
+
+    # In the anytime mode, the timeout is doubled in each SMT round
+    if params.rounds is not None and params.current_round > 1:
+        tout *= 2 ** (params.current_round - 1)
+    return tout
+
+
+def apply_bound_model(sfs_block: Dict, params: OptimizationParams) -> None:
+    """
+    Replaces the bound of the SFS with the one inferred by the bound model (if enabled), in case it is lower
+    """
+    if params.bound_model is None:
+        return
+
+    previous_bound = sfs_block['init_progr_len']
+    inferred_bound = params.bound_model.eval(sfs_block)
+    if inferred_bound == 0:
+        new_bound = previous_bound
+    else:
+        new_bound = min(previous_bound, inferred_bound)
+    sfs_block['init_progr_len'] = new_bound
+
+    if params.verbose:
+        print(f"Previous bound: {previous_bound} Inferred bound: {inferred_bound} Final bound: {new_bound}")
+
+
 # Given the sequence of bytecodes, the initial stack size, the contract name and the
 # block id, returns the output given by the solver, the name given to that block and current gas associated
-# to that sequence.
-def optimize_block(sfs_dict, params: OptimizationParams) -> List[Tuple[AsmBlock, OptimizeOutcome, float, \
-        List[AsmBytecode], Optional[str], int, int, List[str], List[str]]]:
+# to that sequence. The full name of the contract distinguishes sub-blocks with the same name from different
+# contracts. The sub-blocks with a template result reuse it (see optimize_templates), and the templates are
+# optimized here if they are not given
+def optimize_block(sfs_dict, params: OptimizationParams, contract_name: str = "",
+                   template_results: Optional[Dict[str, Tuple[SearchResult_T, bool]]] = None) \
+        -> List[Tuple[AsmBlock, OptimizeOutcome, float, List[AsmBytecode], Optional[str], int, int, List[str],
+                      List[str], Dict]]:
+    if template_results is None:
+        template_results = {block_name: template_result for (_, block_name), template_result in
+                            optimize_templates([(contract_name, block_name, sfs_block)
+                                                for block_name, sfs_block in sfs_dict.items()], params).items()}
+
     block_solutions = []
     # SFS dict of syrup contract contains all sub-blocks derived from a block after splitting
     for block_name in sfs_dict:
         sfs_block = sfs_dict[block_name]
         initial_solver_bound = sfs_block['init_progr_len']
         original_instr = sfs_block['original_instrs']
-        previous_bound = sfs_block['init_progr_len']
         original_block = generate_block_from_plain_instructions(original_instr, block_name)
 
-        if params.bound_model is not None:
-            inferred_bound = params.bound_model.eval(sfs_block)
-            if inferred_bound == 0:
-                new_bound = previous_bound
-            else:
-                new_bound = min(previous_bound, inferred_bound)
-            sfs_block['init_progr_len'] = new_bound
-
-            if params.verbose:
-                print(f"Previous bound: {previous_bound} Inferred bound: {inferred_bound} Final bound: {new_bound}")
+        apply_bound_model(sfs_block, params)
 
-        # To match previous results, multiply timeout by number of storage instructions
-        # TODO devise better heuristics to deal with timeouts
-        if params.direct_timeout:
-            tout = params.timeout
-        else:
-            tout = params.timeout * (1 + len([True for instr in sfs_block['user_instrs'] if instr["storage"]]))
+        tout = block_timeout(sfs_block, params)
+        template_result = template_results.get(block_name, None)
+        # The solver time of the templates has already been assigned when they were optimized
+        if budget_scheduler is not None and params.optimization_enabled and template_result is None:
+            tout = budget_scheduler.allot((contract_name, block_name), tout)
 
         print(f"Optimizing {block_name}... Timeout:{str(tout)}")
 
         # We have enabled the optimization process (otherwise, we just generate the intermediate SMT files)
         if params.dot_generation:
+            # networkx is only needed for the dot graphs
+            from smt_encoding.json_with_dependencies import generate_dot_graph_from_sms
             generate_dot_graph_from_sms(sfs_block, block_name)
         elif params.optimization_enabled:
-            optimization_outcome, solver_time, optimized_ids, greedy_ids = search_optimal(sfs_block, params, tout, block_name)
+            optimization_outcome, solver_time, optimized_ids, greedy_ids, solver_statistics = \
+                search_optimal_anytime(sfs_block, params, tout, block_name, contract_name, template_result)
+            if budget_scheduler is not None and template_result is None:
+                budget_scheduler.release(tout)
             optimized_asm = asm_from_ids(sfs_block, optimized_ids) if optimized_ids is not None else []
             greedy_asm = asm_from_ids(sfs_block, greedy_ids) if greedy_ids is not None else None
 
@@ -253,7 +448,8 @@ def optimize_block(sfs_dict, params: OptimizationParams) -> List[Tuple[AsmBlock,
             else:
                 chosen_seq, chosen_tag = optimized_asm, "greedy_not_enabled"
             block_solutions.append((original_block, optimization_outcome, solver_time,
-                                    chosen_seq, chosen_tag, tout, initial_solver_bound, sfs_block['rules'], optimized_ids))
+                                    chosen_seq, chosen_tag, tout, initial_solver_bound, sfs_block['rules'], optimized_ids,
+                                    solver_statistics))
         else:
             optimizer = BlockOptimizer(block_name, sfs_block, params, tout)
             optimizer.generate_intermediate_files()
@@ -264,8 +460,7 @@ def optimize_block(sfs_dict, params: OptimizationParams) -> List[Tuple[AsmBlock,
 # contains the sfs from each block, the second one contains the sequence of instructions and
 # the third one is a set that contains all block ids.
 def generate_sfs_dicts_from_log(block, json_log, params: OptimizationParams):
-    contracts_dict, sub_block_list = compute_original_sfs_with_simplifications(block, params)
-    syrup_contracts = contracts_dict["syrup_contract"]
+    syrup_contracts, sub_block_list = compute_original_sfs_with_simplifications(block, params)
 
     # Contains sfs blocks considered to check the SMT problem. Therefore, a block is added from
     # sfs_original iff solver could not find an optimized solution, and from sfs_dict otherwise.
@@ -325,7 +520,7 @@ def optimize_asm_from_log(params: OptimizationParams, json_log: Dict):
 
     for c in asm.contracts:
 
-        new_contract = deepcopy(c)
+        new_contract = copy(c)
 
         # If it does not have the asm field, then we skip it, as there are no instructions to optimize
         if not c.has_asm_field:
@@ -341,7 +536,7 @@ def optimize_asm_from_log(params: OptimizationParams, json_log: Dict):
         for block in init_code:
 
             if block.instructions_to_optimize_plain() == []:
-                init_code_blocks.append(deepcopy(block))
+                init_code_blocks.append(copy(block))
                 continue
 
             sfs_all, sfs_optimized, sub_block_list, instr_sequence_dict_block, block_ids = \
@@ -367,7 +562,7 @@ def optimize_asm_from_log(params: OptimizationParams, json_log: Dict):
             for block in blocks:
 
                 if block.instructions_to_optimize_plain() == []:
-                    run_code_blocks.append(deepcopy(block))
+                    run_code_blocks.append(copy(block))
                     continue
 
                 sfs_all, sfs_optimized, sub_block_list, instr_sequence_dict_block, block_ids = \
@@ -386,7 +581,7 @@ def optimize_asm_from_log(params: OptimizationParams, json_log: Dict):
         contracts.append(new_contract)
 
     print("Solution generated from log file has been verified correctly")
-    new_asm = deepcopy(asm)
+    new_asm = AsmJSON(asm.version)
     new_asm.contracts = contracts
 
     with open(params.optimized_file, 'w') as f:
@@ -407,10 +602,14 @@ def optimize_isolated_asm_block(params: OptimizationParams):
     asm_blocks = []
 
     for old_block in blocks:
-        asm_block, _, statistics_csv = optimize_asm_block_asm_format(old_block, params)
+        asm_block, _, statistics_csv, old_sfs_dict = optimize_asm_block_asm_format(old_block, params)
         seqs_rows.extend(statistics_csv)
 
-        eq, reason = compare_asm_block_asm_format(old_block, asm_block, params)
+        # Blocks that have not been modified are trivially equivalent, so they are not verified
+        if asm_block.to_plain() == old_block.to_plain():
+            eq, reason = True, ""
+        else:
+            eq, reason = compare_asm_block_asm_format(old_block, asm_block, params, old_sfs_dict)
 
         if not eq:
             print("Comparison failed, so initial block is kept")
@@ -425,6 +624,8 @@ def optimize_isolated_asm_block(params: OptimizationParams):
         update_size_count(old_block, asm_block)
         asm_blocks.append(asm_block)
 
+    check_rows_with_forves(seqs_rows, blocks_rows, params)
+
     if params.optimization_enabled:
         print("")
         print("Initial sequence (basic block per line):")
@@ -432,9 +633,11 @@ def optimize_isolated_asm_block(params: OptimizationParams):
         print("")
         print("Optimized sequence (basic block per line):")
         print('\n'.join([asm_block.to_plain_with_byte_number() for asm_block in asm_blocks]))
-        with open(params.optimized_file, 'w') as f:
+        with replaced_on_completion(params.optimized_file) as f:
             f.write('\n'.join([asm_block.to_plain_with_byte_number() for asm_block in asm_blocks]))
 
+        # pandas takes a large part of the start-up time, so it is only loaded to write the statistics
+        import pandas as pd
         pd.DataFrame(blocks_rows).to_csv(params.blocks_file)
         pd.DataFrame(seqs_rows).to_csv(params.seqs_file)
 
@@ -460,12 +663,13 @@ def update_length_count(old_block: AsmBlock, new_block: AsmBlock):
     global prev_n_instrs
     global new_n_instrs
 
-    prev_n_instrs += len([True for instruction in old_block.instructions if instruction.disasm != 'tag'])
-    new_n_instrs += len([True for instruction in new_block.instructions if instruction.disasm != 'tag'])
+    prev_n_instrs += old_block.length
+    new_n_instrs += new_block.length
 
 
 def generate_statistics_info(original_block: AsmBlock, outcome: Optional[OptimizeOutcome], solver_time: float,
-                             optimized_block: AsmBlock, chosen_tag: Optional[str], initial_bound: int, tout: int, rules: List[str]) -> Dict:
+                             optimized_block: AsmBlock, chosen_tag: Optional[str], initial_bound: int, tout: int, rules: List[str],
+                             solver_statistics: Optional[Dict] = None) -> Dict:
     block_name = original_block.block_name
     original_instr = ' '.join(original_block.instructions_to_optimize_plain())
 
@@ -505,6 +709,10 @@ def generate_statistics_info(original_block: AsmBlock, outcome: Optional[Optimiz
                                'optimized_estimated_size': optimized_size, 'optimized_estimated_gas': optimized_gas,
                                'outcome': 'model', 'saved_length': initial_length - optimized_length})
 
+    # Additional information from the solver, such as the configuration that won in the portfolio
+    if solver_statistics is not None:
+        statistics_row.update(solver_statistics)
+
     return statistics_row
 
 
@@ -534,10 +742,16 @@ def block_has_been_optimized(original_block: AsmBlock, optimized_block: AsmBlock
         (criteria == "gas" and improves_criterion(saved_gas, saved_size))
 
 
-# Given an asm_block and its contract name, returns the asm block after the optimization
-def optimize_asm_block_asm_format(block: AsmBlock, params: OptimizationParams) -> Tuple[AsmBlock, Dict, List[Dict]]:
+# Given an asm_block and the full name of its contract, returns the asm block after the optimization, the log
+# information, the statistics of each sub-block and the SFS of the original block (if it has been computed), so that
+# it can be reused for verifying the optimized block. The SFS and the sub-blocks of the block are only computed if
+# they are not given (see compute_block_sfs), and the template results are passed to optimize_block
+def optimize_asm_block_asm_format(block: AsmBlock, params: OptimizationParams, contract_name: str = "",
+                                  block_sfs: Optional[Tuple[Dict, List]] = None,
+                                  template_results: Optional[Dict[str, Tuple[SearchResult_T, bool]]] = None) \
+        -> Tuple[AsmBlock, Dict, List[Dict], Optional[Dict]]:
     csv_statistics = []
-    new_block = deepcopy(block)
+    new_block = copy(block)
 
     # Optimized blocks. When a block is not optimized, None is pushed to the list.
     optimized_blocks = {}
@@ -549,7 +763,7 @@ def optimize_asm_block_asm_format(block: AsmBlock, params: OptimizationParams) -
     sfs_dict = {}
     # No instructions to optimize
     if instructions == []:
-        return new_block, {}, []
+        return new_block, {}, [], None
 
     if params.optimized_predictor_model is not None and params.optimization_enabled:
 
@@ -557,6 +771,7 @@ def optimize_asm_block_asm_format(block: AsmBlock, params: OptimizationParams) -
 
         instructions_to_optimize = block.instructions_to_optimize_plain()
         block_data = {"instructions": instructions_to_optimize, "input": stack_size}
+        import sfs_generator.ir_block as ir_block
         sub_block_list = ir_block.get_subblocks(block_data, storage=params.split_storage, part=params.split_partition)
         subblocks2analyze = [instructions for instructions in process_blocks_split(sub_block_list)]
 
@@ -583,43 +798,44 @@ def optimize_asm_block_asm_format(block: AsmBlock, params: OptimizationParams) -
 
             else:
                 try:
-                    contracts_dict, _ = compute_original_sfs_with_simplifications(new_block, params)
+                    sub_block_sfs_dict, _ = compute_original_sfs_with_simplifications(new_block, params)
                 except Exception as e:
                     failed_row = {'instructions': instructions, 'exception': str(e)}
-                    return new_block, {}, []
+                    return new_block, {}, [], None
 
-                old_name = list(contracts_dict["syrup_contract"].keys())[0]
-                sfs_dict[sub_block_name] = contracts_dict["syrup_contract"][old_name]
+                old_name = list(sub_block_sfs_dict.keys())[0]
+                sfs_dict[sub_block_name] = sub_block_sfs_dict[old_name]
 
+    elif block_sfs is not None:
+        sfs_dict, sub_block_list = block_sfs
     else:
         try:
-            contracts_dict, sub_block_list = compute_original_sfs_with_simplifications(block, params)
+            sfs_dict, sub_block_list = compute_original_sfs_with_simplifications(block, params)
         except Exception as e:
             failed_row = {'instructions': instructions, 'exception': str(e)}
-            return new_block, {}, []
-
-        sfs_dict = contracts_dict["syrup_contract"]
+            return new_block, {}, [], None
 
     if not params.optimization_enabled:
-        optimize_block(sfs_dict, params)
-        return new_block, {}, []
+        optimize_block(sfs_dict, params, contract_name, template_results)
+        return new_block, {}, [], None
 
-    for sub_block, optimization_outcome, solver_time, optimized_asm, chosen_tag, tout, initial_solver_bound, rules, optimized_log_rep in optimize_block(
-            sfs_dict, params):
+    # The SFS is kept to verify the optimized block. The optimization process can modify the SFS (for instance,
+    # the greedy algorithm), so we store a copy. The sub-blocks from the predictor are renamed, so the SFS
+    # cannot be reused in that case
+    original_sfs_dict = deepcopy(sfs_dict) if params.optimized_predictor_model is None else None
+
+    for sub_block, optimization_outcome, solver_time, optimized_asm, chosen_tag, tout, initial_solver_bound, rules, \
+            optimized_log_rep, solver_statistics in optimize_block(sfs_dict, params, contract_name, template_results):
 
         optimal_block = AsmBlock('optimized', sub_block.block_id, sub_block.block_name, sub_block.is_init_block)
         optimal_block.instructions = optimized_asm
 
         statistics_info = generate_statistics_info(sub_block, optimization_outcome, solver_time, optimal_block, chosen_tag,
-                                                   initial_solver_bound, tout, rules)
+                                                   initial_solver_bound, tout, rules, solver_statistics)
 
-        if "solution_found" in statistics_info:
-            statistics_info["forves_checker"] = compare_forves(statistics_info["previous_solution"],
-                                                               statistics_info["solution_found"],
-                                                               "size" if params.criteria == "size" else "gas",
-                                                               params.forves_enabled)
-        else:
-            statistics_info["forves_checker"] = "true"
+        # The solutions found are checked with forves once all the blocks have been optimized (see
+        # check_rows_with_forves)
+        statistics_info["forves_checker"] = None if "solution_found" in statistics_info else "true"
 
         csv_statistics.append(statistics_info)
 
@@ -634,21 +850,20 @@ def optimize_asm_block_asm_format(block: AsmBlock, params: OptimizationParams) -
 
     new_block = rebuild_optimized_asm_block(block, sub_block_list, optimized_blocks)
 
-    return new_block, log_dicts, csv_statistics
+    return new_block, log_dicts, csv_statistics, original_sfs_dict
 
 
-def compare_asm_block_asm_format(old_block: AsmBlock, new_block: AsmBlock, params: OptimizationParams) -> Tuple[bool, str]:
+def compare_asm_block_asm_format(old_block: AsmBlock, new_block: AsmBlock, params: OptimizationParams,
+                                 old_sfs_dict: Optional[Dict] = None) -> Tuple[bool, str]:
     # Change new block name to store the corresponding sfs with the new change
     original_block_name = new_block.get_block_name()
     new_block.set_block_name("alreadyOptimized_"+ original_block_name)
-    new_sfs_information, _ = compute_original_sfs_with_simplifications(new_block, params)
+    new_sfs_dict, _ = compute_original_sfs_with_simplifications(new_block, params)
     new_block.set_block_name(original_block_name)
 
-    new_sfs_dict = new_sfs_information["syrup_contract"]
-
-    old_sfs_information, _ = compute_original_sfs_with_simplifications(old_block, params)
-
-    old_sfs_dict = old_sfs_information["syrup_contract"]
+    # The SFS of the old block is only computed if it has not been computed previously for the optimization
+    if old_sfs_dict is None:
+        old_sfs_dict, _ = compute_original_sfs_with_simplifications(old_block, params)
 
     final_comparison, reason = verify_block_from_list_of_sfs(old_sfs_dict, new_sfs_dict)
 
@@ -663,92 +878,423 @@ def compare_asm_block_asm_format(old_block: AsmBlock, new_block: AsmBlock, param
            final_instructions_new == final_instructions_old, reason
 
 
-def csv_from_asm_blocks(old_contract_blocks: List[AsmBlock], new_contract_blocks: List[AsmBlock],
-                        params: OptimizationParams) -> List[Dict]:
-    return [csv_from_asm_block(old_contract_block, new_contract_block,
-                               *compare_asm_block_asm_format(old_contract_block, new_contract_block, params),
-                               compare_forves(old_contract_block.to_plain(), new_contract_block.to_plain(),
-                                              "size" if params.criteria == "size" else "gas",
-                                              params.forves_enabled))
-            for old_contract_block, new_contract_block in zip(old_contract_blocks, new_contract_blocks)]
+def check_rows_with_forves(seq_rows: List[Dict], blocks_rows: List[Dict], params: OptimizationParams) -> None:
+    """
+    Fills the verdicts from the forves checker in the rows of the sub-blocks and blocks that have not been
+    checked yet. All of them are checked in the same batch, with a shard per job
+    """
+    rows_to_check = [row for row in seq_rows + blocks_rows if row.get("forves_checker", None) is None]
+    pairs = [(row["previous_solution"], row["solution_found"]) if "solution_found" in row
+             else (row["old_instrs"], row["new_instrs"]) for row in rows_to_check]
+
+    # The checker cannot run beyond the deadline of the budget, so that the output is written in time
+    timeout = max(0.0, budget_scheduler.remaining_time()) if budget_scheduler is not None else None
+    verdicts = compare_forves_batch(pairs, "size" if params.criteria == "size" else "gas", params.forves_enabled,
+                                    params.jobs, timeout)
+    for row, verdict in zip(rows_to_check, verdicts):
+        row["forves_checker"] = verdict
+
+
+def optimize_and_verify_asm_block(old_block: AsmBlock, params: OptimizationParams, contract_name: str = "",
+                                  block_sfs: Optional[Tuple[Dict, List]] = None,
+                                  template_results: Optional[Dict[str, Tuple[SearchResult_T, bool]]] = None) \
+        -> Tuple[AsmBlock, Dict, List[Dict], Dict]:
+    """
+    Optimizes a block from the contract with the given full name and checks the optimized version is equivalent
+    to the original one. If the comparison fails, the original block is kept. Returns the chosen block, the log
+    information, the statistics of each sub-block and the statistics of the whole block. The SFS of the block and
+    the template results are given if they have been computed before (see analyze_blocks)
+    """
+    # Once the budget is exhausted, the original block is kept without computing its SFS, applying the greedy
+    # algorithm or verifying it
+    if budget_scheduler is not None and params.optimization_enabled and budget_scheduler.exhausted():
+        return old_block, {}, [], csv_from_asm_block(old_block, old_block, True, "", None)
+
+    optimized_block, log_element, csv_statistics, old_sfs_dict = \
+        optimize_asm_block_asm_format(old_block, params, contract_name, block_sfs, template_results)
+
+    # Blocks that have not been modified are trivially equivalent, so they are not verified. Once the budget is
+    # exhausted, the optimized block is discarded instead of verifying it
+    if optimized_block.to_plain() == old_block.to_plain():
+        eq, reason = True, ""
+    elif budget_scheduler is not None and params.optimization_enabled and budget_scheduler.exhausted():
+        optimized_block, log_element = old_block, {}
+        eq, reason = True, ""
+    else:
+        eq, reason = compare_asm_block_asm_format(old_block, optimized_block, params, old_sfs_dict)
 
+    if not eq:
+        print("Comparison failed, so initial block is kept")
+        print("\t[REASON]: " + reason)
+        print(old_block.to_plain())
+        print(optimized_block.to_plain())
+        print("")
+        optimized_block = old_block
+        log_element = {}
+        # The original block is kept, so the verdict for the chosen block is trivially true
+        eq, reason = True, ""
 
-def optimize_asm_contract(c: AsmContract, params: OptimizationParams) -> Tuple[AsmContract, List[Dict], Dict, List[Dict]]:
-    seq_rows, log_dicts, blocks_rows = [], {}, []
-    new_contract = deepcopy(c)
+    block_row = csv_from_asm_block(old_block, optimized_block, eq, reason, None)
+
+    return optimized_block, log_element, csv_statistics, block_row
+
+
+# Parameters of the worker processes from the block pool. Set once per worker in init_block_worker
+worker_params = None
+
+# Scheduler of the solver time when a global budget is given. The workers receive a copy when the pool starts,
+# so only its committed time is shared with the main process (see BudgetScheduler)
+budget_scheduler: Optional[BudgetScheduler] = None
+
+
+def set_global_constants(params: OptimizationParams) -> None:
+    # If storage or partition flag are activated, the blocks are split using store instructions
+    if params.split_storage:
+        constants.append_store_instructions_to_split()
+
+    # Set push0 global variable to the corresponding flag
+    constants._set_push0(params.push0)
+
+
+def init_block_worker(params: OptimizationParams, parent_gasol_path: str,
+                      parent_budget_scheduler: Optional[BudgetScheduler] = None,
+                      parent_best_results: Optional[Dict[Tuple[str, str], SearchResult_T]] = None) -> None:
+    """
+    Initializes a worker process from the block pool. Each worker stores its intermediate files in its own
+    directory inside the gasol path of the main process, so that they are removed (or kept) together
+    """
+    global worker_params
+    global budget_scheduler
+    global best_results
+    worker_params = params
+    budget_scheduler = parent_budget_scheduler
+    best_results = parent_best_results if parent_best_results is not None else dict()
+
+    init()
+    set_global_constants(params)
+    paths.set_gasol_path(parent_gasol_path, f"worker_{os.getpid()}")
+    os.makedirs(paths.gasol_path, exist_ok=True)
+
+
+def optimize_and_verify_asm_block_in_worker(old_block: AsmBlock, contract_name: str = "",
+                                            block_sfs: Optional[Tuple[Dict, List]] = None,
+                                            template_results: Optional[Dict[str, Tuple[SearchResult_T, bool]]] = None,
+                                            reservations: Optional[Dict[Tuple[str, str], int]] = None) \
+        -> Tuple[Tuple[AsmBlock, Dict, List[Dict], Dict], Dict[Tuple[str, str], SearchResult_T]]:
+    """
+    Optimizes the block in a worker. The best results of the anytime mode that have been updated are sent back,
+    so that they are available in the following rounds. The solver time reserved for its sub-blocks is received
+    from the main process, as the workers do not plan the budget
+    """
+    if reservations is not None:
+        budget_scheduler.add_reservations(reservations)
+    updated_results.clear()
+    return optimize_and_verify_asm_block(old_block, worker_params, contract_name, block_sfs, template_results), \
+        dict(updated_results)
+
+
+def compute_block_sfs_in_worker(block: AsmBlock) -> Optional[Tuple[Dict, List]]:
+    return compute_block_sfs(block, worker_params)
+
+
+def search_template_in_worker(sfs_block: Dict, block_name: str, contract_name: str,
+                              reservations: Optional[Dict[Tuple[str, str], int]] = None) -> SearchResult_T:
+    if reservations is not None:
+        budget_scheduler.add_reservations(reservations)
+    return search_template(sfs_block, worker_params, block_name, contract_name)
+
+
+def sub_block_reservations(block_sfs: Optional[Tuple[Dict, List]], contract_name: str) \
+        -> Optional[Dict[Tuple[str, str], int]]:
+    """
+    Solver time reserved for the sub-blocks of the block with the given SFS, to be sent to the worker that
+    optimizes them. None if the budget has not been planned for the block
+    """
+    if budget_scheduler is None or block_sfs is None:
+        return None
+    return budget_scheduler.reservations((contract_name, block_name) for block_name in block_sfs[0])
+
+
+def collect_worker_result(worker_result: Tuple[Tuple[AsmBlock, Dict, List[Dict], Dict],
+                                               Dict[Tuple[str, str], SearchResult_T]]) \
+        -> Tuple[AsmBlock, Dict, List[Dict], Dict]:
+    block_result, block_best_results = worker_result
+    best_results.update(block_best_results)
+    return block_result
+
+
+def create_block_pool(params: OptimizationParams):
+    """
+    Returns a context manager with the process pool used to optimize the blocks if several jobs are
+    specified, or with None otherwise (sequential optimization)
+    """
+    if params.jobs <= 1:
+        return nullcontext()
+    return ProcessPoolExecutor(max_workers=params.jobs, initializer=init_block_worker,
+                               initargs=(params, paths.gasol_path, budget_scheduler, best_results))
+
+
+def optimize_asm_blocks(blocks: List[AsmBlock], params: OptimizationParams, pool: Optional[ProcessPoolExecutor],
+                        contract_name: str = "") -> Iterator[Tuple[AsmBlock, Dict, List[Dict], Dict]]:
+    """
+    Yields the result of optimize_and_verify_asm_block for each block from the contract with the given full name,
+    in the same order as they appear in blocks.
+    Without a pool, blocks are optimized lazily in the current process. Otherwise, all the blocks are submitted at
+    once and idle workers take the next pending block, so that long blocks do not delay the rest. The templates
+    are optimized before (see analyze_blocks)
+    """
+    blocks_sfs, blocks_templates = analyze_blocks(blocks, params, pool, contract_name)
+    if budget_scheduler is not None:
+        return optimize_asm_blocks_by_priority(blocks, params, pool, contract_name, blocks_sfs, blocks_templates)
+    if pool is None:
+        return (optimize_and_verify_asm_block(block, params, contract_name, block_sfs, template_results)
+                for block, block_sfs, template_results in zip(blocks, blocks_sfs, blocks_templates))
+    return map(collect_worker_result, pool.map(optimize_and_verify_asm_block_in_worker, blocks,
+                                               repeat(contract_name), blocks_sfs, blocks_templates))
+
+
+def optimize_asm_blocks_by_priority(blocks: List[AsmBlock], params: OptimizationParams,
+                                    pool: Optional[ProcessPoolExecutor], contract_name: str,
+                                    blocks_sfs: List[Optional[Tuple[Dict, List]]],
+                                    blocks_templates: List[Optional[Dict[str, Tuple[SearchResult_T, bool]]]]) \
+        -> Iterator[Tuple[AsmBlock, Dict, List[Dict], Dict]]:
+    """
+    Same as optimize_asm_blocks, but the blocks are optimized in the priority order from the budget scheduler,
+    so that the blocks with lower priority can use the time the previous ones have not needed. Only used with a
+    budget, as the results are still yielded in the order of blocks: without a pool, the blocks are optimized
+    lazily, but the results of the blocks optimized ahead of their position are kept until they are yielded
+    """
+    order = sorted(range(len(blocks)), key=lambda i: -budget_scheduler.priority((contract_name, blocks[i].block_name)))
+    if pool is None:
+        return results_in_block_order((i, optimize_and_verify_asm_block(blocks[i], params, contract_name,
+                                                                        blocks_sfs[i], blocks_templates[i]))
+                                      for i in order)
+
+    futures = {i: pool.submit(optimize_and_verify_asm_block_in_worker, blocks[i], contract_name, blocks_sfs[i],
+                              blocks_templates[i], sub_block_reservations(blocks_sfs[i], contract_name))
+               for i in order}
+    return (collect_worker_result(futures[i].result()) for i in range(len(blocks)))
+
+
+def templates_enabled(params: OptimizationParams) -> bool:
+    """
+    Whether the sub-blocks with the same template are optimized once. The first round of the anytime mode only
+    applies the greedy algorithm, and the sub-blocks from the predictor are renamed once their SFS is computed,
+    so the templates are not used in those cases
+    """
+    return params.dedup_templates and params.optimization_enabled and not params.dot_generation and \
+        params.optimized_predictor_model is None and (params.rounds is None or params.current_round > 0)
+
+
+def compute_block_sfs(block: AsmBlock, params: OptimizationParams) -> Optional[Tuple[Dict, List]]:
+    """
+    SFS and sub-blocks of the block, as computed in optimize_asm_block_asm_format, or None if the block has no
+    instructions to optimize or its SFS cannot be computed
+    """
+    if block.instructions_to_optimize_plain() == []:
+        return None
+    try:
+        return compute_original_sfs_with_simplifications(block, params)
+    except Exception:
+        return None
+
+
+def search_template(sfs_block: Dict, params: OptimizationParams, block_name: str,
+                    contract_name: str = "") -> SearchResult_T:
+    """
+    Searches the sub-block chosen for a template as optimize_block does. The SFS is copied, as the search can
+    modify it and the sub-block is optimized again with the template result
+    """
+    sfs_block = deepcopy(sfs_block)
+    apply_bound_model(sfs_block, params)
+    tout = block_timeout(sfs_block, params)
+    if budget_scheduler is not None:
+        tout = budget_scheduler.allot((contract_name, block_name), tout)
+
+    search_result = search_optimal_with_cache(sfs_block, params, tout, block_name)
+    if budget_scheduler is not None:
+        budget_scheduler.release(tout)
+    return search_result
+
+
+def optimize_templates(sub_blocks: List[Tuple[str, str, Dict]], params: OptimizationParams,
+                       pool: Optional[ProcessPoolExecutor] = None) \
+        -> Dict[Tuple[str, str], Tuple[SearchResult_T, bool]]:
+    """
+    Groups the sub-blocks, given with the full name of their contract, their name and their SFS, by their template
+    key and searches the first sub-block of each template that has not been optimized yet (in the pool, if given).
+    Returns the template result of each sub-block whose pushed constants have not been folded, with whether it
+    is the sub-block that has been searched. The results are only kept in the main process, so the same template
+    gets the same result regardless of the worker that optimizes each block. The sub-blocks that have been shown
+    optimal in a previous round of the anytime mode are not searched again, so they are skipped
+    """
+    if not templates_enabled(params):
+        return dict()
+
+    sub_block_keys = dict()
+    representatives = dict()
+    for contract_name, block_name, sfs_block in sub_blocks:
+        previous_result = best_results.get((contract_name, block_name), None)
+        if not pushed_constants_preserved(sfs_block) or \
+                (previous_result is not None and previous_result[0] == OptimizeOutcome.optimal):
+            continue
+        # The timeout is the one without a budget, so the sub-blocks with the same template share the key
+        key = template_key(sfs_block, params, block_timeout(sfs_block, params))
+        sub_block_keys[contract_name, block_name] = key
+        if key not in optimized_templates and key not in representatives:
+            representatives[key] = contract_name, block_name, sfs_block
+
+    if pool is None:
+        search_results = [search_template(sfs_block, params, block_name, contract_name)
+                          for contract_name, block_name, sfs_block in representatives.values()]
+    else:
+        search_results = pool.map(search_template_in_worker,
+                                  [sfs_block for _, _, sfs_block in representatives.values()],
+                                  [block_name for _, block_name, _ in representatives.values()],
+                                  [contract_name for contract_name, _, _ in representatives.values()],
+                                  [budget_scheduler.reservations([(contract_name, block_name)])
+                                   if budget_scheduler is not None else None
+                                   for contract_name, block_name, _ in representatives.values()])
 
-    # If it does not have the asm field, then we skip it, as there are no instructions to optimize. Same if a
-    # contract has been specified and current name does not match.
+    for (key, (contract_name, block_name, _)), search_result in zip(representatives.items(), search_results):
+        optimized_templates[key] = search_result, (contract_name, block_name)
+
+    return {sub_block_key: (optimized_templates[key][0], optimized_templates[key][1] == sub_block_key)
+            for sub_block_key, key in sub_block_keys.items()}
+
+
+def budget_planned(params: OptimizationParams) -> bool:
+    """
+    Whether the solver time of the sub-blocks is planned before optimizing the blocks of each contract. As with
+    the templates, the sub-blocks from the predictor are not planned
+    """
+    return budget_scheduler is not None and params.optimization_enabled and not params.greedy and \
+        not params.dot_generation and params.optimized_predictor_model is None
+
+
+def analyze_blocks(blocks: List[AsmBlock], params: OptimizationParams, pool: Optional[ProcessPoolExecutor],
+                   contract_name: str = "") -> Tuple[List[Optional[Tuple[Dict, List]]],
+                                                     List[Optional[Dict[str, Tuple[SearchResult_T, bool]]]]]:
+    """
+    Computes the SFS of the blocks from the contract with the given full name (in the pool, if given), plans the
+    solver time of their sub-blocks and optimizes their templates before the blocks are dispatched. Returns the
+    SFS of each block and the template results of its sub-blocks, so that they are not computed again when the
+    block is optimized. Both are None if neither the budget is planned nor the templates are used, or the
+    budget is exhausted
+    """
+    exhausted = budget_scheduler is not None and budget_scheduler.exhausted()
+    if exhausted or not (templates_enabled(params) or budget_planned(params)):
+        return [None] * len(blocks), [None] * len(blocks)
+
+    if pool is None:
+        blocks_sfs = [compute_block_sfs(block, params) for block in blocks]
+    else:
+        blocks_sfs = list(pool.map(compute_block_sfs_in_worker, blocks))
+
+    if budget_planned(params):
+        plan_solver_budget(blocks, blocks_sfs, params, contract_name)
+
+    template_results = optimize_templates([(contract_name, block_name, sfs_block) for block_sfs in blocks_sfs
+                                           if block_sfs is not None for block_name, sfs_block in block_sfs[0].items()],
+                                          params, pool)
+    blocks_templates = [{block_name: template_results[contract_name, block_name] for block_name in block_sfs[0]
+                         if (contract_name, block_name) in template_results} if block_sfs is not None else dict()
+                        for block_sfs in blocks_sfs]
+    return blocks_sfs, blocks_templates
+
+
+def plan_solver_budget(blocks: List[AsmBlock], blocks_sfs: List[Optional[Tuple[Dict, List]]],
+                       params: OptimizationParams, contract_name: str = "") -> None:
+    """
+    Reserves the solver time for the sub-blocks of the blocks from the contract with the given full name, given
+    the SFS of each block (see analyze_blocks). The priority of each sub-block only depends on the size of its
+    SFS, so the sub-blocks are not searched to plan them
+    """
+    budget_scheduler.plan([((contract_name, block.block_name),
+                            [((contract_name, block_name), sub_block_priority(sfs_block, params.criteria),
+                              block_timeout(sfs_block, params)) for block_name, sfs_block in block_sfs[0].items()])
+                           for block, block_sfs in zip(blocks, blocks_sfs) if block_sfs is not None],
+                          sum(len(block.instructions) for block in blocks))
+
+
+def results_in_block_order(indexed_results: Iterable[Tuple[int, Tuple[AsmBlock, Dict, List[Dict], Dict]]]) \
+        -> Iterator[Tuple[AsmBlock, Dict, List[Dict], Dict]]:
+    """
+    Yields the results given with the position of their block as soon as the results of all the previous
+    blocks have been yielded
+    """
+    pending = dict()
+    next_idx = 0
+    for i, result in indexed_results:
+        pending[i] = result
+        while next_idx in pending:
+            yield pending.pop(next_idx)
+            next_idx += 1
+
+
+def optimized_contract_blocks(c: AsmContract, params: OptimizationParams, seq_rows: List[Dict], log_dicts: Dict,
+                              blocks_rows: List[Dict], pool: Optional[ProcessPoolExecutor] = None) -> Iterator[AsmBlock]:
+    """
+    Optimizes the blocks of the init code and the run codes of a contract, yielding the chosen blocks in the same
+    order as they appear in the contract (see AsmContract.get_data_ids_with_code). The statistics and the log
+    information are added to the given collections. The forves checker runs once all the blocks have been yielded
+    """
     contract_name = c.shortened_name
     init_code = c.init_code
+    run_code = {identifier: c.get_run_code(identifier) for identifier in c.get_data_ids_with_code()}
+
+    # Blocks from the init code and all the runtime codes are optimized together. Results are retrieved in order,
+    # and the counters are only updated from the current process
+    optimized_results = optimize_asm_blocks(init_code + [block for blocks in run_code.values() for block in blocks],
+                                            params, pool, c.contract_name)
 
     print("\nAnalyzing Init Code of: " + contract_name)
     print("-----------------------------------------\n")
 
-    init_code_blocks = []
-
     for old_block in init_code:
-        optimized_block, log_element, csv_statistics = optimize_asm_block_asm_format(old_block, params)
+        optimized_block, log_element, csv_statistics, block_row = next(optimized_results)
         seq_rows.extend(csv_statistics)
 
-        eq, reason = compare_asm_block_asm_format(old_block, optimized_block, params)
-
-        if not eq:
-            print("Comparison failed, so initial block is kept")
-            print("\t[REASON]: " + reason)
-            print(old_block.to_plain())
-            print(optimized_block.to_plain())
-            print("")
-            optimized_block = old_block
-            log_element = {}
-
         log_dicts.update(log_element)
-        init_code_blocks.append(optimized_block)
+        blocks_rows.append(block_row)
 
         # Deployment size is not considered when measuring it
         update_gas_count(old_block, optimized_block)
         update_length_count(old_block, optimized_block)
-
-    new_contract.init_code = init_code_blocks
-    if params.forves_enabled:
-        print("Checking optimized basic blocks in init_code with forves...")
-
-    blocks_rows.extend(csv_from_asm_blocks(init_code, init_code_blocks, params))
+        yield optimized_block
 
     print("\nAnalyzing Runtime Code of: " + contract_name)
     print("-----------------------------------------\n")
-    for identifier in c.get_data_ids_with_code():
-        blocks = c.get_run_code(identifier)
-
-        run_code_blocks = []
+    for identifier, blocks in run_code.items():
         for old_block in blocks:
-            optimized_block, log_element, csv_statistics = optimize_asm_block_asm_format(old_block, params)
+            optimized_block, log_element, csv_statistics, block_row = next(optimized_results)
             seq_rows.extend(csv_statistics)
 
-            eq, reason = compare_asm_block_asm_format(old_block, optimized_block, params)
-            print("EQ", eq, reason)
-
-            if not eq:
-                print("Comparison failed, so initial block is kept")
-                print("\t[REASON]: " + reason)
-                print(old_block.to_plain())
-                print(optimized_block.to_plain())
-                print("")
-                optimized_block = old_block
-                log_element = {}
-
             log_dicts.update(log_element)
-            run_code_blocks.append(optimized_block)
+            blocks_rows.append(block_row)
 
             update_gas_count(old_block, optimized_block)
             update_length_count(old_block, optimized_block)
             update_size_count(old_block, optimized_block)
+            yield optimized_block
+
+    if params.forves_enabled:
+        print("Checking optimized basic blocks with forves...")
+    check_rows_with_forves(seq_rows, blocks_rows, params)
+
 
-        if params.forves_enabled:
-            print("Checking optimized basic blocks in init_code with forves...")
+def optimize_asm_contract(c: AsmContract, params: OptimizationParams,
+                          pool: Optional[ProcessPoolExecutor] = None) -> Tuple[AsmContract, List[Dict], Dict, List[Dict]]:
+    seq_rows, log_dicts, blocks_rows = [], {}, []
+    new_contract = copy(c)
+
+    optimized_blocks = optimized_contract_blocks(c, params, seq_rows, log_dicts, blocks_rows, pool)
+    new_contract.init_code = [next(optimized_blocks) for _ in c.init_code]
+    for identifier in c.get_data_ids_with_code():
+        new_contract.set_run_code(identifier, [next(optimized_blocks) for _ in c.get_run_code(identifier)])
 
-        blocks_rows.extend(csv_from_asm_blocks(blocks, run_code_blocks, params))
-        new_contract.set_run_code(identifier, run_code_blocks)
+    # Resumes the generator once more, so that the forves checker runs
+    next(optimized_blocks, None)
     return new_contract, seq_rows, log_dicts, blocks_rows
 
 
@@ -756,57 +1302,97 @@ def optimize_asm_in_asm_format(params: OptimizationParams):
     seqs_rows = []
     blocks_rows = []
 
-    asm = parse_asm(params.input_file)
+    # Contracts are built one at a time from the file. If a contract is specified, the rest are skipped
+    streamed_asm = StreamedAsm(params.input_file, params.contract)
     log_dicts = {}
-    contracts = []
-    new_contract = None
+    found_contract = False
+
+    # The instructions are counted in a first pass over the file that does not build the contracts, so that each
+    # contract only reserves its share of the budget. Once the budget is exhausted, the rest of contracts are
+    # written as they have been read, which takes about as long as the first pass, so its time is kept for the output
+    if budget_scheduler is not None and params.optimization_enabled:
+        start = dtimer()
+        budget_scheduler.expect_instructions(sum(asm_json_length(contract_json)
+                                                 for _, contract_json in streamed_asm.entries()))
+        budget_scheduler.reserve_output_time(dtimer() - start)
+
+    # The optimized blocks are written as soon as they are chosen, so neither the original nor the optimized
+    # contracts are kept once they have been written. They are streamed into a temporary file that only replaces
+    # the optimized file once it is complete
+    with create_block_pool(params) as pool, \
+            (replaced_on_completion(params.optimized_file) if params.optimization_enabled else nullcontext()) as f:
+        asm_writer = AsmJSONWriter(f) if f is not None and params.contract is None else None
+
+        for cname, contract_json in streamed_asm.entries():
+            # The contracts that are not built are only counted as found, as their blocks are neither optimized
+            # nor included in the statistics
+            if budget_scheduler is not None and params.optimization_enabled and budget_scheduler.exhausted():
+                found_contract = found_contract or contract_json.get("asm", None) is not None
+                if asm_writer is not None:
+                    asm_writer.write_contract_json(cname, contract_json)
+                elif f is not None and contract_json.get("asm", None) is not None:
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(contract_json["asm"], f)
+                continue
 
-    for c in asm.contracts:
-        if not c.has_asm_field or (params.contract is not None and c.shortened_name != params.contract):
-            contracts.append(c)
-        else:
-            new_contract, contract_seq_rows, contract_log_dicts, contract_block_rows = optimize_asm_contract(c, params)
-            contracts.append(new_contract)
+            c = contract_from_json(cname, contract_json)
+            if not c.has_asm_field:
+                if asm_writer is not None:
+                    asm_writer.write_contract(c)
+                continue
 
-            # Update the corresponding information
-            log_dicts.update(contract_log_dicts)
-            seqs_rows.extend(contract_seq_rows)
-            blocks_rows.extend(contract_block_rows)
+            found_contract = True
+            optimized_blocks = optimized_contract_blocks(c, params, seqs_rows, log_dicts, blocks_rows, pool)
+            if asm_writer is not None:
+                asm_writer.write_contract(c, optimized_blocks)
+            elif f is not None:
+                # Only the last contract with the specified name is kept, as in the asm json there is a single one
+                f.seek(0)
+                f.truncate()
+                write_asm_contract(f, c, optimized_blocks)
+            else:
+                # Resumes the generator until all the blocks are optimized and the forves checker has run
+                for _ in optimized_blocks:
+                    pass
 
-    new_asm = deepcopy(asm)
-    new_asm.contracts = contracts
+        if asm_writer is not None:
+            asm_writer.close(streamed_asm.version)
 
     if params.generate_log:
         with open(params.log_file, "w") as log_f:
             json.dump(log_dicts, log_f)
 
-    if params.optimization_enabled:
-        with open(params.optimized_file, 'w') as f:
-            if params.contract is not None:
-                if new_contract is None or new_contract.shortened_name != params.contract:
-                    raise ValueError("Specified contract cannot be found")
-                else:
-                    f.write(json.dumps(new_contract.to_asm_json()))
-
-            else:
-                f.write(json.dumps(new_asm.to_json()))
+    if params.contract is not None and not found_contract and params.optimization_enabled:
+        raise ValueError("Specified contract cannot be found")
 
+    if params.optimization_enabled:
+        import pandas as pd
         pd.DataFrame(seqs_rows).to_csv(params.seqs_file)
         pd.DataFrame(blocks_rows).to_csv(params.blocks_file)
 
 
 def optimize_asm_from_asm_json(params: OptimizationParams):
+    start = dtimer()
     c = parse_json_asm(params.input_file)
-    new_contract, contract_seq_rows, contract_log_dicts, contract_block_rows = optimize_asm_contract(c, params)
+    # The output is written from the contract, which takes about as long as reading it
+    if budget_scheduler is not None and params.optimization_enabled:
+        budget_scheduler.expect_instructions(sum(len(block.instructions) for block in c.init_code) +
+                                             sum(len(block.instructions) for identifier in c.get_data_ids_with_code()
+                                                 for block in c.get_run_code(identifier)))
+        budget_scheduler.reserve_output_time(dtimer() - start)
+    with create_block_pool(params) as pool:
+        new_contract, contract_seq_rows, contract_log_dicts, contract_block_rows = optimize_asm_contract(c, params, pool)
 
     if params.generate_log:
         with open(params.log_file, "w") as log_f:
             json.dump(contract_log_dicts, log_f)
 
     if params.optimization_enabled:
-        with open(params.optimized_file, 'w') as f:
+        with replaced_on_completion(params.optimized_file) as f:
             f.write(json.dumps(c.to_asm_json()))
 
+        import pandas as pd
         pd.DataFrame(contract_seq_rows).to_csv(params.seqs_file)
         pd.DataFrame(contract_block_rows).to_csv(params.blocks_file)
 
@@ -818,20 +1404,21 @@ def optimize_from_sfs(params: OptimizationParams):
         sfs_dict = json.load(f)
 
     csv_statistics = []
-    for original_block, optimization_outcome, solver_time, optimized_asm, chosen_tag, tout, initial_solver_bound, rules, optimized_log_rep \
-            in optimize_block(sfs_dict, params):
+    for original_block, optimization_outcome, solver_time, optimized_asm, chosen_tag, tout, initial_solver_bound, rules, \
+            optimized_log_rep, solver_statistics in optimize_block(sfs_dict, params):
 
         optimal_block = AsmBlock('optimized', original_block.block_id, original_block.block_name,
                                  original_block.is_init_block)
         optimal_block.instructions = optimized_asm
 
         statistics_info = generate_statistics_info(original_block, optimization_outcome, solver_time, optimal_block, chosen_tag,
-                                                   initial_solver_bound, tout, rules)
+                                                   initial_solver_bound, tout, rules, solver_statistics)
 
         csv_statistics.append(statistics_info)
     # print(json.dumps(sfs_dict, indent=4))
 
     if params.optimization_enabled:
+        import pandas as pd
         pd.DataFrame(csv_statistics).to_csv(params.seqs_file)
         print("")
         print("Initial sequence (basic block per line):")
@@ -868,6 +1455,24 @@ def modify_file_names(params: OptimizationParams) -> None:
         params.log_file = input_file_name + ".log"
 
 
+def portfolio_config(config: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Parses a configuration from the portfolio with the form solver[:term-encoding[:memory-encoding]]
+    """
+    components = config.split(":")
+    if len(components) > 3:
+        raise ArgumentTypeError(f"Invalid portfolio configuration {config}")
+    solver, term_encoding, memory_encoding = components + [None] * (3 - len(components))
+
+    if solver not in ["z3", "oms"]:
+        raise ArgumentTypeError(f"Invalid solver {solver} in portfolio configuration {config}")
+    if term_encoding is not None and term_encoding not in ['int', 'stack_vars', 'uninterpreted_uf', 'uninterpreted_int']:
+        raise ArgumentTypeError(f"Invalid term encoding {term_encoding} in portfolio configuration {config}")
+    if memory_encoding is not None and memory_encoding not in ["l_vars", "direct"]:
+        raise ArgumentTypeError(f"Invalid memory encoding {memory_encoding} in portfolio configuration {config}")
+    return solver, term_encoding, memory_encoding
+
+
 def options_gasol(ap: ArgumentParser) -> None:
     # Unused options
     # ap.add_argument("-last-constants", "--last-constants", help="It removes the last instructions of a block when they generate a constant value", dest="last_constants", action = "store_true")
@@ -929,6 +1534,45 @@ def options_gasol(ap: ArgumentParser) -> None:
     basic.add_argument("-direct-tout", dest='direct_timeout', action='store_true',
                        help="Sets the Max-SMT timeout to -tout directly, "
                             "without considering the structure of the block")
+    basic.add_argument("-j", "--jobs", dest='jobs', metavar='N', action='store', type=int, default=1,
+                       help="Number of worker processes used to optimize the blocks of each contract in parallel. "
+                            "The results are identical to the sequential run. By default, set to 1 (sequential)")
+    basic.add_argument("-solver-session", "--solver-session", dest='solver_session', action='store_true',
+                       help="Keeps a persistent solver process per worker that solves all its blocks, "
+                            "instead of starting a new solver process per block")
+    basic.add_argument("-portfolio", "--portfolio", dest='portfolio', metavar='CONFIG', nargs='+',
+                       type=portfolio_config, default=None,
+                       help="Runs several configurations at the same time for each block, keeping the solution from "
+                            "the first one that proves optimality or the best one at the timeout. Each configuration "
+                            "has the form solver[:term-encoding[:memory-encoding]] (e.g. oms:uninterpreted_uf z3:int). "
+                            "Missing encodings take the values from -term-encoding and -memory-encoding")
+    basic.add_argument("-cache", "--cache", dest='cache_path', metavar='PATH', action='store', default=None,
+                       help="SQLite database that stores the results of optimizing each block, so that equivalent "
+                            "blocks optimized with the same options are retrieved instead of optimized again. "
+                            "It can be shared by several processes")
+    basic.add_argument("-dedup-templates", "--dedup-templates", dest='dedup_templates', action='store_true',
+                       help="Optimizes only once the blocks that differ in the values they push, reusing the optimized "
+                            "sequence with the values of each block. Blocks whose constants are folded by the "
+                            "simplification rules are always optimized")
+    basic.add_argument("-budget", "--budget", dest='budget', metavar='SECONDS', action='store', type=float,
+                       default=None,
+                       help="Global time budget for the whole execution. The solver time is assigned to the blocks "
+                            "in order of expected savings w.r.t. their difficulty, and the time a block does not use "
+                            "is given to the following ones. Each block gets at most its timeout, and blocks with "
+                            "no solver time left keep the original or the greedy solution. Once the budget is "
+                            "exhausted, the remaining blocks are kept as they are, without computing their SFS or "
+                            "verifying them, and the remaining contracts are copied without parsing them. The time "
+                            "to write the output is kept from the budget, and the -forves check stops at the "
+                            "deadline. Only the contract being parsed when the budget is exhausted can exceed it")
+    basic.add_argument("-rounds", "--rounds", dest='rounds', metavar='N', action='store', type=int, default=None,
+                       help="Anytime mode: the greedy algorithm is applied to every block first, followed by N "
+                            "rounds of the SMT superoptimizer that double the timeout each time and skip the blocks "
+                            "shown optimal. The output files are rewritten with the best results after each round")
+    basic.add_argument("-deepening", "--deepening", dest='iterative_deepening', action='store_true',
+                       help="Searches for the shortest sequence first, checking increasing lengths from the minimum "
+                            "length of the block in the same solver process. The shortest sequence is optimal when "
+                            "-length is set. Otherwise, the solver looks for the optimal sequence with the "
+                            "remaining time, keeping the shortest one if it finds nothing better")
     basic.add_argument("-push0", "--push0", dest='push0_enabled', action='store_false',
                        help="Assumes PUSH0 opcode cannot be used in the optimizations.")
     basic.add_argument('-no-simplification', "--no-simplification", action='store_true', dest='no_simp',
@@ -1007,16 +1651,14 @@ def execute_gasol(params: OptimizationParams):
     global new_size
     global prev_n_instrs
     global new_n_instrs
+    global budget_scheduler
 
-    create_ml_models(params)
-
-    # If storage or partition flag are activated, the blocks are split using store instructions
-    if params.split_storage:
-        constants.append_store_instructions_to_split()
-
-    # Set push0 global variable to the corresponding flag
-    constants._set_push0(params.push0)
+    # The budget includes the whole execution, so the deadline is set before anything else
+    if params.budget is not None:
+        budget_scheduler = BudgetScheduler(params.budget, params.jobs)
 
+    create_ml_models(params)
+    set_global_constants(params)
     modify_file_names(params)
 
     x = dtimer()
@@ -1028,14 +1670,21 @@ def execute_gasol(params: OptimizationParams):
                 shutil.rmtree(paths.gasol_path, ignore_errors=True)
             exit(0)
 
-    if params.input_format == "plain":
-        optimize_isolated_asm_block(params)
-    elif params.input_format == "sfs":
-        optimize_from_sfs(params)
-    elif params.input_format == "single-asm":
-        optimize_asm_from_asm_json(params)
-    else:
-        optimize_asm_in_asm_format(params)
+    # In the anytime mode, the output is generated after each round
+    for optimization_round in range(params.rounds + 1 if params.rounds is not None else 1):
+        if params.rounds is not None:
+            init()
+            params.current_round = optimization_round
+            print(f"\nRound {optimization_round}: " + ("greedy" if optimization_round == 0 else "SMT"))
+
+        if params.input_format == "plain":
+            optimize_isolated_asm_block(params)
+        elif params.input_format == "sfs":
+            optimize_from_sfs(params)
+        elif params.input_format == "single-asm":
+            optimize_asm_from_asm_json(params)
+        else:
+            optimize_asm_in_asm_format(params)
 
     y = dtimer()
 
@@ -127,6 +127,42 @@ class OptimizationParams:
         self.no_simp = True
         self.debug_flag = False
 
+        # Number of worker processes that optimize the blocks of a contract
+        # in parallel. With 1, blocks are optimized sequentially
+        self.jobs = 1
+
+        # Whether each worker keeps a persistent solver process that solves all
+        # its blocks, instead of starting a new one per block
+        self.solver_session = False
+
+        # Configurations (solver, term encoding, memory encoding) that are run
+        # concurrently for each block. If empty, only the configuration given
+        # by smt_solver, encode_terms and memory_encoding is used
+        self.portfolio = []
+
+        # SQLite database with the results of previous optimizations. If None,
+        # no cache is used
+        self.cache_path = None
+
+        # Whether blocks that only differ in their pushed values are optimized
+        # once in each run
+        self.dedup_templates = False
+
+        # Global time budget (in seconds) that is distributed among the blocks.
+        # None if each block is optimized with its own timeout
+        self.budget = None
+
+        # Number of SMT rounds in the anytime mode, after a first round with
+        # the greedy algorithm. None if the anytime mode is disabled
+        self.rounds = None
+
+        # Round of the anytime mode that is being executed
+        self.current_round = 0
+
+        # Whether the SMT solver searches for the shortest sequence first, checking
+        # increasing lengths in the same solver process (see BlockOptimizer)
+        self.iterative_deepening = False
+
     def parse_args(self, parsed_args: Namespace):
         self.input_file = parsed_args.input_path
 
@@ -222,4 +258,31 @@ class OptimizationParams:
             self.no_simp = parsed_args.no_simp
 
         if "debug_flag" in parsed_args:
-            self.debug_flag = parsed_args.debug_flag
\ No newline at end of file
+            self.debug_flag = parsed_args.debug_flag
+
+        if "jobs" in parsed_args:
+            self.jobs = parsed_args.jobs
+
+        if "solver_session" in parsed_args:
+            self.solver_session = parsed_args.solver_session
+
+        if "portfolio" in parsed_args and parsed_args.portfolio is not None:
+            # Components that are not specified take the values from the corresponding options
+            self.portfolio = [(solver, term_encoding if term_encoding is not None else self.encode_terms,
+                               memory_encoding if memory_encoding is not None else self.memory_encoding)
+                              for solver, term_encoding, memory_encoding in parsed_args.portfolio]
+
+        if "cache_path" in parsed_args:
+            self.cache_path = parsed_args.cache_path
+
+        if "dedup_templates" in parsed_args:
+            self.dedup_templates = parsed_args.dedup_templates
+
+        if "budget" in parsed_args:
+            self.budget = parsed_args.budget
+
+        if "rounds" in parsed_args:
+            self.rounds = parsed_args.rounds
+
+        if "iterative_deepening" in parsed_args:
+            self.iterative_deepening = parsed_args.iterative_deepening
\ No newline at end of file
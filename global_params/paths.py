@@ -19,4 +19,20 @@ bclt_exec = project_path + "/bin/barcelogic"
 
 oms_exec = project_path + "/bin/optimathsat"
 
-csv_file = gasol_path + "solutions/statistics.csv"
\ No newline at end of file
+csv_file = gasol_path + "solutions/statistics.csv"
+
+def set_gasol_path(new_tmp_path: str, new_gasol_folder: str) -> None:
+    """
+    Relocates the scratch directory in which intermediate files are stored, i.e. gasol_path and
+    the subdirectories derived from it. Used to give each worker process its own directory
+    """
+    global tmp_path, gasol_folder, gasol_path, json_path, smt_encoding_path, solutions_path, dot_path, csv_file
+
+    tmp_path = new_tmp_path
+    gasol_folder = new_gasol_folder
+    gasol_path = tmp_path + gasol_folder + "/"
+    json_path = gasol_path + "jsons"
+    smt_encoding_path = gasol_path + "smt_encoding/"
+    solutions_path = gasol_path + "solutions/"
+    dot_path = gasol_path + "dot/"
+    csv_file = gasol_path + "solutions/statistics.csv"
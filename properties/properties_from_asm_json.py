@@ -1,6 +1,7 @@
 # Module that contains methods for determining different properties from an AsmJSON object
 
-from sfs_generator.utils import get_ins_size, isYulInstruction
+from sfs_generator.utils import isYulInstruction
+from sfs_generator.opcode_tables import EncodedBlocks, opcode_tables
 
 
 def asm_instruction_to_plain(asm_bytecode):
@@ -45,19 +46,16 @@ def preprocess_instructions(bytecodes):
     return instructions
 
 
+def contract_run_blocks(c):
+    return [block for identifier in c.get_data_ids_with_code() for block in c.get_run_code(identifier)]
+
+
 # Computes the number of bytecodes given an ASM json object
 def compute_number_of_instructions_in_asm_json_per_contract(asm_json):
     contract_counter_dict = {}
     for c in asm_json.contracts:
-        number_instrs = 0
         contract_name = (c.contract_name.split("/")[-1]).split(":")[-1]
-
-        for identifier in c.get_data_ids_with_code():
-            blocks = c.get_run_code(identifier)
-            for block in blocks:
-                number_instrs += len(list(filter(lambda x: x.disasm != "tag", block.instructions)))
-
-        contract_counter_dict[contract_name] = number_instrs
+        contract_counter_dict[contract_name] = int(EncodedBlocks(contract_run_blocks(c)).length().sum())
     return contract_counter_dict
 
 
@@ -68,32 +66,20 @@ def compute_number_of_instructions_in_asm_json_per_file(asm_json):
 
 
 def bytes_required_asm(asm_bytecode, address_length = 4):
-    plain_representation = asm_instruction_to_plain(asm_bytecode)
-    operands = list(filter(lambda x: x != '', plain_representation.split(' ')))
-    if len(operands) == 1:
-        return get_ins_size(operands[0], None, address_length)
-    elif len(operands) == 2:
-        return get_ins_size(operands[0], int(operands[1], 16), address_length)
-    else:
-        raise ValueError("Opcodes have only 1 or 2 operands")
+    return opcode_tables(address_length).instruction_size(asm_bytecode.disasm, asm_bytecode.value)
 
 
 def compute_bytecode_size_in_asm_json_per_block(asm_block):
-    return sum([bytes_required_asm(asm_bytecode) for asm_bytecode in asm_block.getInstructions()])
+    return int(EncodedBlocks([asm_block], opcode_tables(4)).bytes_required()[0])
 
 
 # Computes the size of the bytecode given an ASM json object
 def compute_bytecode_size_in_asm_json_per_contract(asm_json):
     contract_counter_dict = {}
-    for c in asm_json.getContracts():
-        bytecode_size = 0
+    for c in asm_json.contracts:
         contract_name = (c.contract_name.split("/")[-1]).split(":")[-1]
-
-        for identifier in c.get_data_ids_with_code():
-            blocks = c.get_run_code(identifier)
-            for block in blocks:
-                bytecode_size += compute_bytecode_size_in_asm_json_per_block(block)
-        contract_counter_dict[contract_name] = bytecode_size
+        contract_counter_dict[contract_name] = int(EncodedBlocks(contract_run_blocks(c),
+                                                                 opcode_tables(4)).bytes_required().sum())
     return contract_counter_dict
 
 
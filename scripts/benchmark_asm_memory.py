@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Measures the memory needed to represent the assembly of a set of json_solc files. All the files are parsed and
+kept in memory, so the peak RSS of the process reflects the size of the AsmContract, AsmBlock and AsmBytecode
+objects. For each file, it reports the number of blocks and instructions, the time to parse it, the growth of the
+peak RSS and the time to copy all its blocks (as done for each block during the optimization).
+
+Usage: benchmark_asm_memory.py [directory with json_solc files] [output csv]
+"""
+import os
+import sys
+# Inserted first, as the statistics package of the project would be shadowed by the standard library
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import glob
+import pathlib
+import resource
+from copy import copy
+from timeit import default_timer as dtimer
+
+import pandas as pd
+
+from global_params.paths import project_path
+from sfs_generator.parser_asm import parse_asm
+
+parent_directory = project_path + "/examples/jsons-solc"
+final_directory = project_path + "/results/"
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is given in KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def contract_blocks(contract):
+    blocks = list(contract.init_code)
+    for identifier in contract.get_data_ids_with_code():
+        blocks.extend(contract.get_run_code(identifier))
+    return blocks
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        parent_directory = sys.argv[1]
+    csv_file = sys.argv[2] if len(sys.argv) > 2 else final_directory + "asm_memory_benchmark.csv"
+    pathlib.Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+
+    initial_rss = peak_rss_mb()
+    # Parsed files are kept alive until the end, so that the peak RSS accumulates all of them
+    parsed_files = []
+    row_list = []
+    for asm_json in sorted(glob.glob(parent_directory + "/*.json_solc")):
+        file_name = asm_json.split("/")[-1]
+        previous_rss = peak_rss_mb()
+
+        start = dtimer()
+        asm = parse_asm(asm_json)
+        parse_time = dtimer() - start
+        parsed_files.append(asm)
+        rss_growth = peak_rss_mb() - previous_rss
+
+        blocks = [block for contract in asm.contracts for block in contract_blocks(contract)]
+        start = dtimer()
+        [copy(block) for block in blocks]
+        copy_time = dtimer() - start
+
+        row_list.append({'file': file_name, 'blocks': len(blocks),
+                         'instructions': sum(len(block.instructions) for block in blocks),
+                         'parse_time': round(parse_time, 3), 'rss_growth_mb': round(rss_growth, 2),
+                         'copy_time': round(copy_time, 3)})
+
+    df = pd.DataFrame(row_list, columns=['file', 'blocks', 'instructions', 'parse_time', 'rss_growth_mb',
+                                         'copy_time'])
+    df.to_csv(csv_file)
+
+    print(df.to_string())
+    print("")
+    print(f"Total: {df['instructions'].sum()} instructions in {df['blocks'].sum()} blocks, parsed in "
+          f"{round(df['parse_time'].sum(), 3)} s and copied in {round(df['copy_time'].sum(), 3)} s")
+    print(f"Peak RSS: {round(peak_rss_mb(), 2)} MB ({round(peak_rss_mb() - initial_rss, 2)} MB after the imports)")
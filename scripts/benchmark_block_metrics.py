@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compares two ways of computing the gas, size and length of every block in a set of json_solc files: accessing
+the properties of each AsmBlock, and encoding the blocks of each file as arrays of opcode ids and reducing them
+with the opcode tables (see sfs_generator.opcode_tables). Each file is parsed once per method, so the metrics
+are not cached in the blocks beforehand. Both methods must produce the same values.
+
+Usage: benchmark_block_metrics.py [directory with json_solc files] [output csv]
+"""
+import os
+import sys
+# Inserted first, as the statistics package of the project would be shadowed by the standard library
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import glob
+import pathlib
+from timeit import default_timer as dtimer
+
+import pandas as pd
+
+from global_params.paths import project_path
+from sfs_generator.opcode_tables import EncodedBlocks
+from sfs_generator.parser_asm import parse_asm
+
+parent_directory = project_path + "/examples/jsons-solc"
+final_directory = project_path + "/results/"
+
+
+def file_blocks(asm_json):
+    return [block for contract in parse_asm(asm_json).contracts
+            for block in [*contract.init_code, *(block for identifier in contract.get_data_ids_with_code()
+                                                 for block in contract.get_run_code(identifier))]]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        parent_directory = sys.argv[1]
+    csv_file = sys.argv[2] if len(sys.argv) > 2 else final_directory + "block_metrics_benchmark.csv"
+    pathlib.Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+
+    row_list = []
+    for asm_json in sorted(glob.glob(parent_directory + "/*.json_solc")):
+        file_name = asm_json.split("/")[-1]
+
+        blocks = file_blocks(asm_json)
+        start = dtimer()
+        per_block = [(block.gas_spent, block.bytes_required, block.length) for block in blocks]
+        per_block_time = dtimer() - start
+
+        blocks = file_blocks(asm_json)
+        start = dtimer()
+        encoded_blocks = EncodedBlocks(blocks)
+        encoding_time = dtimer() - start
+        start = dtimer()
+        vectorized = list(zip(encoded_blocks.gas_spent().tolist(), encoded_blocks.bytes_required().tolist(),
+                              encoded_blocks.length().tolist()))
+        reduction_time = dtimer() - start
+
+        if per_block != vectorized:
+            raise ValueError(f"The metrics of the blocks in {file_name} do not match")
+
+        row_list.append({'file': file_name, 'blocks': len(blocks), 'instructions': len(encoded_blocks.opcode_ids),
+                         'gas': sum(metrics[0] for metrics in per_block),
+                         'size': sum(metrics[1] for metrics in per_block),
+                         'length': sum(metrics[2] for metrics in per_block),
+                         'per_block_time': round(per_block_time, 4), 'encoding_time': round(encoding_time, 4),
+                         'reduction_time': round(reduction_time, 4)})
+
+    df = pd.DataFrame(row_list, columns=['file', 'blocks', 'instructions', 'gas', 'size', 'length', 'per_block_time',
+                                         'encoding_time', 'reduction_time'])
+    df.to_csv(csv_file)
+
+    print(df.to_string())
+    print("")
+    print(f"Total: {df['blocks'].sum()} blocks and {df['instructions'].sum()} instructions. "
+          f"Per block: {round(df['per_block_time'].sum(), 3)} s. Vectorized: {round(df['encoding_time'].sum(), 3)} s "
+          f"encoding and {round(df['reduction_time'].sum(), 3)} s reducing")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Measures the memory needed to read a large combined json. The contracts of a set of json_solc files are merged into
+a single combined json, which is then read in three ways: loading the whole file with json.load and building every
+contract (as parse_asm did before), streaming the contracts one at a time without keeping them (see
+parser_asm.StreamedAsm), and streaming only the largest contract, as done with -c. For each method, it reports the
+time and the peak of the memory allocated while reading (measured with tracemalloc in a second run).
+
+Usage: benchmark_combined_json_streaming.py [directory with json_solc files] [output csv]
+"""
+import os
+import sys
+# Inserted first, as the statistics package of the project would be shadowed by the standard library
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import glob
+import json
+import pathlib
+import tempfile
+import tracemalloc
+from timeit import default_timer as dtimer
+
+import pandas as pd
+
+from global_params.paths import project_path
+from sfs_generator.parser_asm import StreamedAsm, contract_from_json
+
+parent_directory = project_path + "/examples/jsons-solc"
+final_directory = project_path + "/results/"
+
+
+def merge_combined_jsons(asm_jsons, merged_file) -> str:
+    """
+    Writes the contracts of all the files into merged_file and returns the shortened name of the largest contract
+    """
+    contracts = {}
+    for asm_json in asm_jsons:
+        with open(asm_json) as f:
+            contracts.update(json.load(f)["contracts"])
+    json.dump({"contracts": contracts, "version": "merged"}, merged_file)
+    largest = max(contracts, key=lambda cname: len(json.dumps(contracts[cname])))
+    return (largest.split("/")[-1]).split(":")[-1]
+
+
+def load_all(file_name):
+    with open(file_name) as f:
+        data = json.load(f)
+    return [contract_from_json(cname, contract_json) for cname, contract_json in data["contracts"].items()]
+
+
+def stream_all(file_name):
+    contracts = 0
+    for _ in StreamedAsm(file_name).contracts():
+        contracts += 1
+    return contracts
+
+
+def stream_selected(file_name, contract_name):
+    return list(StreamedAsm(file_name, contract_name).contracts())
+
+
+def measure(method, *args):
+    # The time is measured without tracing the allocations, as tracemalloc slows down the parsing considerably
+    start = dtimer()
+    method(*args)
+    elapsed = dtimer() - start
+
+    tracemalloc.start()
+    method(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        parent_directory = sys.argv[1]
+    csv_file = sys.argv[2] if len(sys.argv) > 2 else final_directory + "combined_json_streaming_benchmark.csv"
+    pathlib.Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json_solc") as merged_file:
+        largest_contract = merge_combined_jsons(sorted(glob.glob(parent_directory + "/*.json_solc")), merged_file)
+        merged_file.flush()
+        file_size = os.path.getsize(merged_file.name) / (1024 * 1024)
+
+        row_list = []
+        for method_name, method, args in [("json.load", load_all, (merged_file.name,)),
+                                          ("streaming", stream_all, (merged_file.name,)),
+                                          ("streaming -c", stream_selected, (merged_file.name, largest_contract))]:
+            elapsed, peak = measure(method, *args)
+            row_list.append({'method': method_name, 'time': round(elapsed, 3), 'peak_mb': round(peak, 2)})
+
+    df = pd.DataFrame(row_list, columns=['method', 'time', 'peak_mb'])
+    df.to_csv(csv_file)
+
+    print(df.to_string())
+    print("")
+    print(f"Total: combined json of {round(file_size, 2)} MB. Largest contract: {largest_contract}")
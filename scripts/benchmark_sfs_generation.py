@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Measures the SFS generation of every block in a set of json_solc files, storing the intermediate
+files (.rbr, .disasm and the SFS jsons) as with -intermediate and keeping them in memory (default).
+For each contract, it reports the wall time and the number of file system operations (open, listdir
+and mkdir calls, obtained from the audit events) in both modes.
+
+Usage: benchmark_sfs_generation.py [directory with json_solc files] [output csv]
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import glob
+import pathlib
+import shutil
+from collections import Counter
+from timeit import default_timer as dtimer
+
+import pandas as pd
+
+import global_params.constants as constants
+import global_params.paths as paths
+import sfs_generator.ir_block as ir_block
+from global_params.paths import project_path
+from sfs_generator.parser_asm import parse_asm
+
+parent_directory = project_path + "/examples/jsons-solc"
+final_directory = project_path + "/results/"
+
+file_system_events = {"open", "os.listdir", "os.mkdir", "os.scandir"}
+file_system_calls = Counter()
+
+
+def count_file_system_events(event, args):
+    if event in file_system_events:
+        file_system_calls[event] += 1
+
+
+def contract_blocks(contract):
+    blocks = list(contract.init_code)
+    for identifier in contract.get_data_ids_with_code():
+        blocks.extend(contract.get_run_code(identifier))
+    return [block for block in blocks if block.instructions_to_optimize_plain() != []]
+
+
+def generate_sfs_blocks(blocks, keep_files: bool):
+    file_system_calls.clear()
+    start = dtimer()
+    for block in blocks:
+        block_data = {"instructions": block.instructions_to_optimize_plain(), "input": block.source_stack}
+        try:
+            ir_block.evm2rbr_compiler(file_name="benchmark", block=block_data, block_name=block.block_name,
+                                      block_id=block.block_id, storage=True, push=True, keep_files=keep_files)
+        except Exception:
+            pass
+    end = dtimer()
+    return end - start, sum(file_system_calls.values())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        parent_directory = sys.argv[1]
+    csv_file = sys.argv[2] if len(sys.argv) > 2 else final_directory + "sfs_generation_benchmark.csv"
+    pathlib.Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+
+    constants.append_store_instructions_to_split()
+    sys.addaudithook(count_file_system_events)
+
+    row_list = []
+    for asm_json in sorted(glob.glob(parent_directory + "/*.json_solc")):
+        file_name = asm_json.split("/")[-1]
+        for contract in parse_asm(asm_json).contracts:
+            if not contract.has_asm_field:
+                continue
+
+            blocks = contract_blocks(contract)
+            memory_time, memory_calls = generate_sfs_blocks(blocks, False)
+            files_time, files_calls = generate_sfs_blocks(blocks, True)
+            shutil.rmtree(paths.gasol_path, ignore_errors=True)
+
+            row_list.append({'file': file_name, 'contract': contract.shortened_name, 'blocks': len(blocks),
+                             'files_time': round(files_time, 3), 'memory_time': round(memory_time, 3),
+                             'files_fs_calls': files_calls, 'memory_fs_calls': memory_calls})
+
+    df = pd.DataFrame(row_list, columns=['file', 'contract', 'blocks', 'files_time', 'memory_time',
+                                         'files_fs_calls', 'memory_fs_calls'])
+    df.to_csv(csv_file)
+
+    print(df.to_string())
+    print("")
+    print(f"Total time storing intermediate files: {round(df['files_time'].sum(), 3)} s, "
+          f"{df['files_fs_calls'].sum()} file system calls")
+    print(f"Total time in memory: {round(df['memory_time'].sum(), 3)} s, "
+          f"{df['memory_fs_calls'].sum()} file system calls")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Measures the serialization of the SMT-LIB encodings of every block in a set of json_solc files. The constraints
+are generated beforehand, so only the translation into SMT-LIB is measured. For each contract, it reports the
+number of constraints and bytes written and the throughput in constraints/s and bytes/s.
+
+Usage: benchmark_smt2_serialization.py [directory with json_solc files] [output csv]
+"""
+import os
+import sys
+# Inserted first, as the statistics package of the project would be shadowed by the standard library
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import glob
+import pathlib
+from argparse import ArgumentParser
+from timeit import default_timer as dtimer
+
+import pandas as pd
+
+import global_params.constants as constants
+import sfs_generator.ir_block as ir_block
+from global_params.options import OptimizationParams
+from global_params.paths import project_path
+from sfs_generator.parser_asm import parse_asm
+from smt_encoding.block_optimizer import BlockOptimizer
+
+parent_directory = project_path + "/tests/files"
+final_directory = project_path + "/results/"
+
+# Times each encoding is serialized
+repetitions = 3
+
+
+def contract_blocks(contract):
+    blocks = list(contract.init_code)
+    for identifier in contract.get_data_ids_with_code():
+        blocks.extend(contract.get_run_code(identifier))
+    return [block for block in blocks if block.instructions_to_optimize_plain() != []]
+
+
+def sub_block_sfs(block):
+    block_data = {"instructions": block.instructions_to_optimize_plain(), "input": block.source_stack}
+    try:
+        _, _, sfs_dict = ir_block.evm2rbr_compiler(file_name="benchmark", block=block_data,
+                                                   block_name=block.block_name, block_id=block.block_id,
+                                                   storage=True, push=True)
+    except Exception:
+        return []
+    return list(sfs_dict.items())
+
+
+def serialize_encodings(optimizers):
+    constraints, written = 0, 0
+    start = dtimer()
+    for _ in range(repetitions):
+        for optimizer in optimizers:
+            written += sum(len(sentence) for sentence in optimizer._solver.to_smt2())
+            constraints += len(optimizer._solver._hard) + len(optimizer._solver._soft)
+    return constraints, written, dtimer() - start
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        parent_directory = sys.argv[1]
+    csv_file = sys.argv[2] if len(sys.argv) > 2 else final_directory + "smt2_serialization_benchmark.csv"
+    pathlib.Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+
+    constants.append_store_instructions_to_split()
+
+    # Default options of gasol_asm with z3 as the solver
+    from gasol_asm import options_gasol
+    ap = ArgumentParser()
+    options_gasol(ap)
+    params = OptimizationParams()
+    params.parse_args(ap.parse_args(["benchmark.json_solc", "-solver", "z3"]))
+
+    row_list = []
+    for asm_json in sorted(glob.glob(parent_directory + "/**/*.json_solc", recursive=True)):
+        file_name = asm_json.split("/")[-1]
+        for contract in parse_asm(asm_json).contracts:
+            if not contract.has_asm_field:
+                continue
+
+            optimizers = []
+            for block in contract_blocks(contract):
+                for sub_block_name, sfs in sub_block_sfs(block):
+                    optimizer = BlockOptimizer(sub_block_name, sfs, params, 1)
+                    # The constraints are generated the first time the encoding is serialized
+                    list(optimizer._solver.to_smt2())
+                    optimizers.append(optimizer)
+
+            constraints, written, serialization_time = serialize_encodings(optimizers)
+            row_list.append({'file': file_name, 'contract': contract.shortened_name, 'blocks': len(optimizers),
+                             'constraints': constraints, 'bytes': written, 'time': round(serialization_time, 3),
+                             'constraints_per_s': round(constraints / serialization_time),
+                             'bytes_per_s': round(written / serialization_time)})
+
+    df = pd.DataFrame(row_list, columns=['file', 'contract', 'blocks', 'constraints', 'bytes', 'time',
+                                         'constraints_per_s', 'bytes_per_s'])
+    df.to_csv(csv_file)
+
+    print(df.to_string())
+    print("")
+    print(f"Total: {df['constraints'].sum()} constraints and {df['bytes'].sum()} bytes in "
+          f"{round(df['time'].sum(), 3)} s ({round(df['constraints'].sum() / df['time'].sum())} constraints/s, "
+          f"{round(df['bytes'].sum() / df['time'].sum())} bytes/s)")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Compares the SMT-LIB encodings of every block in a set of json_solc files when the repeated subformulas are
+written inline and when they are declared once with define-fun. For each block, it reports the size of both
+encodings, the time to generate them and the time z3 needs to parse them (the encoding is passed without the
+check-sat command, so the problem is not solved).
+
+Usage: benchmark_smt2_sharing.py [directory with json_solc files] [output csv]
+"""
+import os
+import sys
+# Inserted first, as the statistics package of the project would be shadowed by the standard library
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import glob
+import pathlib
+import subprocess
+from argparse import ArgumentParser
+from timeit import default_timer as dtimer
+
+import pandas as pd
+
+import global_params.constants as constants
+import sfs_generator.ir_block as ir_block
+from global_params.options import OptimizationParams
+from global_params.paths import project_path, z3_exec
+from sfs_generator.parser_asm import parse_asm
+from smt_encoding.block_optimizer import BlockOptimizer
+
+parent_directory = project_path + "/examples/jsons-solc"
+final_directory = project_path + "/results/"
+
+
+def contract_blocks(contract):
+    blocks = list(contract.init_code)
+    for identifier in contract.get_data_ids_with_code():
+        blocks.extend(contract.get_run_code(identifier))
+    return [block for block in blocks if block.instructions_to_optimize_plain() != []]
+
+
+def sub_block_sfs(block):
+    block_data = {"instructions": block.instructions_to_optimize_plain(), "input": block.source_stack}
+    try:
+        _, _, sfs_dict = ir_block.evm2rbr_compiler(file_name="benchmark", block=block_data,
+                                                   block_name=block.block_name, block_id=block.block_id,
+                                                   storage=True, push=True)
+    except Exception:
+        return []
+    return list(sfs_dict.items())
+
+
+def measure_encoding(optimizer: BlockOptimizer, share: bool):
+    optimizer._solver.share_subformulas = share
+    start = dtimer()
+    encoding = "\n".join(sentence for sentence in optimizer._solver.to_smt2() if sentence != "(check-sat)")
+    generation_time = dtimer() - start
+
+    start = dtimer()
+    subprocess.run([z3_exec, "-smt2", "-in"], input=encoding, text=True, capture_output=True)
+    parse_time = dtimer() - start
+    return len(encoding), generation_time, parse_time
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        parent_directory = sys.argv[1]
+    csv_file = sys.argv[2] if len(sys.argv) > 2 else final_directory + "smt2_sharing_benchmark.csv"
+    pathlib.Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+
+    constants.append_store_instructions_to_split()
+
+    # Default options of gasol_asm with z3 as the solver
+    from gasol_asm import options_gasol
+    ap = ArgumentParser()
+    options_gasol(ap)
+    params = OptimizationParams()
+    params.parse_args(ap.parse_args(["benchmark.json_solc", "-solver", "z3"]))
+
+    row_list = []
+    for asm_json in sorted(glob.glob(parent_directory + "/*.json_solc")):
+        file_name = asm_json.split("/")[-1]
+        for contract in parse_asm(asm_json).contracts:
+            if not contract.has_asm_field:
+                continue
+
+            for block in contract_blocks(contract):
+                for sub_block_name, sfs in sub_block_sfs(block):
+                    # The constraints are only generated once, so both versions write the same constraints
+                    # and the generation times only include the translation into SMT-LIB
+                    optimizer = BlockOptimizer(sub_block_name, sfs, params, 1)
+                    list(optimizer._solver.to_smt2())
+                    inline_size, inline_time, inline_parse = measure_encoding(optimizer, False)
+                    shared_size, shared_time, shared_parse = measure_encoding(optimizer, True)
+                    row_list.append({'file': file_name, 'contract': contract.shortened_name,
+                                     'block': sub_block_name, 'inline_size': inline_size,
+                                     'shared_size': shared_size, 'inline_time': round(inline_time, 3),
+                                     'shared_time': round(shared_time, 3), 'inline_parse': round(inline_parse, 3),
+                                     'shared_parse': round(shared_parse, 3)})
+
+    df = pd.DataFrame(row_list, columns=['file', 'contract', 'block', 'inline_size', 'shared_size', 'inline_time',
+                                         'shared_time', 'inline_parse', 'shared_parse'])
+    df.to_csv(csv_file)
+
+    print(df.to_string())
+    print("")
+    print(f"Inline subformulas: {df['inline_size'].sum()} characters, {round(df['inline_time'].sum(), 3)} s "
+          f"generating and {round(df['inline_parse'].sum(), 3)} s parsing")
+    print(f"Shared subformulas: {df['shared_size'].sum()} characters, {round(df['shared_time'].sum(), 3)} s "
+          f"generating and {round(df['shared_parse'].sum(), 3)} s parsing")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Measures the latency of short invocations of gasol_asm.py, which is dominated by the start-up time (importing the
+modules): printing the help, optimizing a single block (-bl) and optimizing a single SFS (-sfs). Both blocks are
+optimized with the greedy algorithm, so that the solver does not take part in the measurement. Each command is
+executed several times in a fresh process, and the minimum and the median wall times are reported.
+
+Usage: benchmark_startup.py [block file] [output csv] [runs]
+"""
+import os
+import sys
+# Inserted first, as the statistics package of the project would be shadowed by the standard library
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import json
+import pathlib
+import subprocess
+import tempfile
+from timeit import default_timer as dtimer
+
+import pandas as pd
+
+from global_params.paths import project_path
+from sfs_generator.ir_block import evm2rbr_compiler
+from sfs_generator.parser_asm import parse_blocks_from_plain_instructions
+
+block_file = project_path + "/examples/blocks/order_load_instructions.txt"
+final_directory = project_path + "/results/"
+gasol_asm = project_path + "/gasol_asm.py"
+
+
+def sfs_from_block(block_file: str, sfs_file: str) -> None:
+    """
+    Stores the SFS of the sub-blocks of the block, which is the input of the -sfs mode
+    """
+    with open(block_file) as f:
+        block = parse_blocks_from_plain_instructions(f.read())[0]
+    block_data = {"instructions": block.instructions_to_optimize_plain(), "input": block.source_stack}
+    _, _, sfs_dict = evm2rbr_compiler(file_name="startup", block=block_data, block_name="block", storage=True,
+                                      part=False, push=True)
+    with open(sfs_file, "w") as f:
+        json.dump(sfs_dict, f)
+
+
+def wall_times(command, runs, working_directory):
+    times = []
+    for _ in range(runs):
+        start = dtimer()
+        subprocess.run(command, cwd=working_directory, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        times.append(dtimer() - start)
+    return times
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        block_file = os.path.abspath(sys.argv[1])
+    csv_file = sys.argv[2] if len(sys.argv) > 2 else final_directory + "startup_benchmark.csv"
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    pathlib.Path(csv_file).parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as working_directory:
+        sfs_file = os.path.join(working_directory, "block.json")
+        sfs_from_block(block_file, sfs_file)
+
+        commands = {"--help": [sys.executable, gasol_asm, "--help"],
+                    "-bl": [sys.executable, gasol_asm, block_file, "-bl", "-greedy"],
+                    "-sfs": [sys.executable, gasol_asm, sfs_file, "-sfs", "-greedy"]}
+
+        row_list = []
+        for mode, command in commands.items():
+            times = wall_times(command, runs, working_directory)
+            row_list.append({'mode': mode, 'runs': runs, 'min_time': round(min(times), 3),
+                             'median_time': round(sorted(times)[len(times) // 2], 3)})
+
+    df = pd.DataFrame(row_list, columns=['mode', 'runs', 'min_time', 'median_time'])
+    df.to_csv(csv_file)
+
+    print(df.to_string())
+    print("")
+    print(f"Total: {round(df['median_time'].sum(), 3)} s (median) for the {len(df)} invocations")
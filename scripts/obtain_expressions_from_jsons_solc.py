@@ -29,7 +29,6 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))+"/s
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))+"/solution_generation")
 import ir_block
 from disasm_generation import generate_disasm_sol
-from gasol_optimization import get_sfs_dict
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 from gasol_asm import preprocess_instructions_plain_text
@@ -2,6 +2,7 @@ import global_params.constants as constants
 import sfs_generator.opcodes as opcodes
 import sfs_generator.utils as utils
 from sfs_generator.asm_bytecode import AsmBytecode, ASM_Json_T
+from sfs_generator.opcode_tables import opcode_tables
 from typing import List, Union
 
 # Blocks are identified using an int
@@ -45,14 +46,20 @@ def execute_asm(current_stack: List[str], asm_bytecode: AsmBytecode) -> List[str
 
 class AsmBlock:
     """
-    Class for representing an Assembly block
+    Class for representing an Assembly block. Copies of a block share the list of instructions until one of
+    them modifies it (see __copy__), so copying a block does not copy its instructions
     """
-    
+    __slots__ = ("contract_name", "block_id", "block_name", "_instructions", "_shared_instructions", "source_stack",
+                 "is_init_block", "_jump_type", "_jump_to", "_falls_to", "_tag", "_idx2real_value", "_gas_spent",
+                 "_bytes_required", "_length")
+
     def __init__(self, cname : str, identifier : Block_id_T, name : str, is_init_block : bool):
         self.contract_name = cname
         self.block_id = identifier
         self.block_name = name
         self._instructions = []
+        # Whether the list of instructions is shared with a copy of the block, and hence it cannot be modified
+        self._shared_instructions = False
         # minimum size of the source stack
         self.source_stack = 0
         self.is_init_block = is_init_block
@@ -60,6 +67,25 @@ class AsmBlock:
         self._jump_to = None
         self._falls_to = None
         self._tag = -1
+        # PUSHLIB values in the block and the index assigned to each of them (set by the parser)
+        self._idx2real_value = {}
+        # Metrics of the instructions, computed the first time they are accessed (see _invalidate_metrics)
+        self._gas_spent = None
+        self._bytes_required = None
+        self._length = None
+
+    def __copy__(self) -> 'AsmBlock':
+        # Instructions are immutable, so the copy shares them (and the cached metrics) with the original block. The
+        # list is only copied if one of the blocks adds an instruction (see add_instruction)
+        copied = AsmBlock.__new__(AsmBlock)
+        for field in AsmBlock.__slots__:
+            setattr(copied, field, getattr(self, field))
+        self._shared_instructions = True
+        copied._shared_instructions = True
+        return copied
+
+    def __deepcopy__(self, memo) -> 'AsmBlock':
+        return self.__copy__()
 
     @property
     def instructions(self) -> List[AsmBytecode]:
@@ -69,16 +95,31 @@ class AsmBlock:
     def instructions(self, new_instructions : List[AsmBytecode]) -> None:
         # First, we update the new set of instructions
         self._instructions = new_instructions
+        self._shared_instructions = False
+        self._invalidate_metrics()
 
         # Then we update the source stack size
         self.source_stack = utils.compute_stack_size(map(lambda x: x.disasm, self.instructions_to_optimize_bytecode()))
 
     def add_instruction(self, bytecode : AsmBytecode) -> None:
+        if self._shared_instructions:
+            self._instructions = list(self._instructions)
+            self._shared_instructions = False
         self._instructions.append(bytecode)
+        self._invalidate_metrics()
 
         # If an instruction is added, we need to update the source stack counter
         self.source_stack = utils.compute_stack_size(map(lambda x: x.disasm, self.instructions_to_optimize_bytecode()))
 
+    def _invalidate_metrics(self) -> None:
+        """
+        The gas, size and length are cached, so they must be invalidated whenever the instructions change. The
+        list of instructions must only be modified through the instructions setter and add_instruction
+        """
+        self._gas_spent = None
+        self._bytes_required = None
+        self._length = None
+
     @property
     def jump_type(self) -> Jump_Type_T:
         return self._jump_type
@@ -225,10 +266,23 @@ class AsmBlock:
 
     @property
     def bytes_required(self) -> int:
-        return sum([instruction.bytes_required for instruction in self.instructions])
+        if self._bytes_required is None:
+            self._bytes_required = sum([instruction.bytes_required for instruction in self.instructions])
+        return self._bytes_required
 
     @property
     def gas_spent(self) -> int:
+        if self._gas_spent is None:
+            self._gas_spent = self._compute_gas_spent()
+        return self._gas_spent
+
+    def _compute_gas_spent(self) -> int:
+        tables = opcode_tables()
+        opcode_ids, _ = tables.encode(self.instructions)
+        # The symbolic execution is only needed if the gas of some instruction depends on the previous accesses
+        if not any(tables.access_dependent[opcode_id] for opcode_id in opcode_ids):
+            return sum(tables.gas[opcode_id] for opcode_id in opcode_ids)
+
         stack_size = utils.compute_stack_size(map(lambda x: x.disasm, self.instructions))
         current_stack = [f's({i})' for i in range(stack_size)]
         total_gas = 0
@@ -301,7 +355,9 @@ class AsmBlock:
 
     @property
     def length(self) -> int:
-        return len([True for instruction in self.instructions if instruction.disasm != 'tag'])
+        if self._length is None:
+            self._length = len([True for instruction in self.instructions if instruction.disasm != 'tag'])
+        return self._length
 
     def get_contract_name(self):
         return self.contract_name
@@ -1,6 +1,8 @@
+import sys
 from typing import Dict, Optional, Union
 import sfs_generator.opcodes as opcodes
-from sfs_generator.utils import get_ins_size, get_push_number_hex
+from sfs_generator.utils import get_push_number_hex
+from sfs_generator.opcode_tables import opcode_tables
 import global_params.constants as constants
 
 # Assuming the value of asm is hexadecimal base. This way, we ensure the same format is respected
@@ -20,22 +22,37 @@ def is_push0(disasm: str, value: str) -> bool:
     return constants.push0_enabled and disasm == "PUSH" and value == "0"
 
 
+def _intern(field: Optional[str]) -> Optional[str]:
+    return sys.intern(field) if type(field) == str else field
+
+
 class AsmBytecode:
     """
-    Class that represents the assembly format of the bytecode, following the same convention as the Solidity compiler
+    Class that represents the assembly format of the bytecode, following the same convention as the Solidity compiler.
+    A contract contains tens of thousands of them, so their fields are stored in slots and the opcode names are
+    interned. They are immutable records: the fields must not be modified once created, so that blocks can share
+    them
     """
+    __slots__ = ("begin", "end", "source", "disasm", "value", "jump_type", "modifier_depth", "real_value")
 
     def __init__(self, begin: int, end: int, source: int, disasm: str, value: ASM_Value_T,
                  jump_type: ASM_Jump_T = None, modifier_depth: Optional[int] = None, real_value: ASM_Value_T = None):
         self.begin = begin
         self.end = end
         self.source = source
-        self.disasm = disasm
+        self.disasm = _intern(disasm)
         self.value = value
-        self.jump_type = jump_type
+        self.jump_type = _intern(jump_type)
         self.modifier_depth = modifier_depth
         self.real_value = real_value if real_value is not None else value
 
+    def __copy__(self) -> 'AsmBytecode':
+        # Instructions are never modified once created, so they are shared instead of copied
+        return self
+
+    def __deepcopy__(self, memo) -> 'AsmBytecode':
+        return self
+
     def to_json(self)-> ASM_Json_T :
         """
         Assembly item conversion to json form
@@ -90,20 +107,12 @@ class AsmBytecode:
 
     @property
     def bytes_required(self) -> int:
-        if is_push0(self.disasm, self.value):
-            return 1
-        elif self.disasm == "PUSH":
-            decimal_value = int(self.value, 16)
-        else:
-            decimal_value = None
-        return get_ins_size(self.disasm, decimal_value)
+        return opcode_tables().instruction_size(self.disasm, self.value)
 
     @property
     def gas_spent(self) -> int:
-        # Special case: if PUSH0 opcode is allowed, we need to measure the gas spent for PUSH 0 as PUSH0
-        if is_push0(self.disasm, self.value):
-            return 2
-        return opcodes.get_ins_cost(self.disasm, self.value)
+        # PUSH 0 is measured as PUSH0 if the opcode is allowed (see opcode_tables.instruction_name)
+        return opcode_tables().instruction_gas(self.disasm, self.value)
 
     def gas_spent_accesses(self, warm_access: bool, store_changed_original_value: bool) -> int:
         if is_push0(self.disasm, self.value):
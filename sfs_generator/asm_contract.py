@@ -5,8 +5,9 @@ from typing import List, Dict, Optional, Union, Any
 
 class AsmContract:
     """
-    Class that represents an assembly contract
+    Class that represents an assembly contract. Copies of a contract share its blocks (see __copy__)
     """
+    __slots__ = ("contract_name", "_code", "data", "data_addresses", "has_asm_field", "_source_list", "shortened_name")
 
     def __init__(self,cname : str, contains_asm_field : bool = True):
         self.contract_name = cname
@@ -17,6 +18,25 @@ class AsmContract:
         self._source_list = None
         self.shortened_name = (cname.split("/")[-1]).split(":")[-1]
 
+    def __copy__(self) -> 'AsmContract':
+        # The lists of blocks and the data structures are copied, so the init code and the run codes of the copy
+        # can be replaced without affecting the original contract. The blocks themselves are shared, as they are
+        # replaced instead of modified (and AsmBlock copies share the instructions anyway)
+        copied = AsmContract(self.contract_name, self.has_asm_field)
+        copied._code = list(self._code)
+        copied.data = {data_id: dict(data_structure) for data_id, data_structure in self.data.items()}
+        copied.data_addresses = dict(self.data_addresses)
+        copied._source_list = self._source_list
+        return copied
+
+    def __deepcopy__(self, memo) -> 'AsmContract':
+        copied = self.__copy__()
+        copied._code = [block.__copy__() for block in copied._code]
+        for data_structure in copied.data.values():
+            if "code" in data_structure:
+                data_structure["code"] = [block.__copy__() for block in data_structure["code"]]
+        return copied
+
     @property
     def init_code(self) -> List[AsmBlock]:
         return self._code
@@ -0,0 +1,104 @@
+"""
+Incremental writer for the assembly in json format. The instructions are written block by block, so the blocks can
+be produced (for instance, as their optimization finishes) and released while the output is written. The result
+is the same as dumping AsmContract.to_asm_json and AsmJSON.to_json with json.dumps, except for the version of the
+combined json, which is written after the contracts (as solc does)
+"""
+import itertools
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+
+from sfs_generator.asm_block import AsmBlock
+from sfs_generator.asm_contract import AsmContract
+
+
+def _write_code(file: TextIO, blocks: Iterator[AsmBlock]) -> None:
+    file.write("[")
+    separator = ""
+    for block in blocks:
+        if len(block.instructions) > 0:
+            file.write(separator)
+            file.write(", ".join(json.dumps(instruction.to_json()) for instruction in block.instructions))
+            separator = ", "
+    file.write("]")
+
+
+def write_asm_contract(file: TextIO, contract: AsmContract, blocks: Optional[Iterable[AsmBlock]] = None) -> None:
+    """
+    Writes the contract in the same format as the one produced by solc with option --asm-json. If blocks are given,
+    they replace the init code and the run codes of the contract, in the same order (see
+    AsmContract.get_data_ids_with_code). Otherwise, the blocks of the contract are written
+    """
+    if blocks is None:
+        blocks = itertools.chain(contract.init_code, *(contract.get_run_code(data_id)
+                                                       for data_id in contract.get_data_ids_with_code()))
+    blocks = iter(blocks)
+
+    file.write('{".code": ')
+    _write_code(file, itertools.islice(blocks, len(contract.init_code)))
+
+    source_list = contract.source_list
+    if source_list is not None:
+        file.write(f', "sourceList": {json.dumps(source_list)}')
+
+    file.write(', ".data": {')
+    separator = ""
+    for data_id in contract.get_data_ids_with_code():
+        file.write(f'{separator}{json.dumps(data_id)}: {{')
+
+        aux_data = contract.get_auxdata(data_id)
+        if aux_data is not None:
+            file.write(f'".auxdata": {json.dumps(aux_data)}, ')
+
+        file.write('".code": ')
+        _write_code(file, itertools.islice(blocks, len(contract.get_run_code(data_id))))
+
+        data = contract.get_data_field(data_id)
+        if data is not None:
+            file.write(f', ".data": {json.dumps(data)}')
+
+        file.write("}")
+        separator = ", "
+
+    for address in contract.get_data_ids_with_data_address():
+        file.write(f'{separator}{json.dumps(address)}: {json.dumps(contract.get_data_address(address))}')
+        separator = ", "
+    file.write("}}")
+
+    # Also ensures the producer of the blocks has finished
+    if next(blocks, None) is not None:
+        raise ValueError(f"There are more blocks than in contract {contract.contract_name}")
+
+
+class AsmJSONWriter:
+    """
+    Writes a combined json (see AsmJSON) one contract at a time. The version is written when closing it
+    """
+
+    def __init__(self, file: TextIO):
+        self._file = file
+        self._separator = ""
+        self._file.write('{"contracts": {')
+
+    def write_contract(self, contract: AsmContract, blocks: Optional[Iterable[AsmBlock]] = None) -> None:
+        self._file.write(f"{self._separator}{json.dumps(contract.contract_name)}: ")
+        self._separator = ", "
+
+        # If it has no asm field, the contract name is tied to an empty dict
+        if not contract.has_asm_field:
+            self._file.write("{}")
+            return
+
+        self._file.write('{"asm": ')
+        write_asm_contract(self._file, contract, blocks)
+        self._file.write("}")
+
+    def write_contract_json(self, contract_name: str, contract_json: Dict[str, Any]) -> None:
+        """
+        Writes the json of a contract as it has been read, without building the contract
+        """
+        self._file.write(f"{self._separator}{json.dumps(contract_name)}: {json.dumps(contract_json)}")
+        self._separator = ", "
+
+    def close(self, version: str) -> None:
+        self._file.write(f'}}, "version": {json.dumps(version)}}}')
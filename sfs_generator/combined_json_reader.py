@@ -0,0 +1,142 @@
+"""
+Incremental reader for the combined json files generated by solc (option --combined-json asm). The file is read in
+chunks, and each entry of the "contracts" field is decoded on its own, so the memory needed is proportional to the
+largest contract instead of the whole file. Entries that are not selected are traversed without keeping any of
+their fields
+"""
+import json
+from json.decoder import scanstring
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO, Tuple
+
+# Characters read from the file each time the buffer needs more text
+chunk_size = 1 << 20
+
+_whitespace = " \t\n\r"
+
+
+def _discard_object(_) -> None:
+    return None
+
+
+# Decoders for the selected entries and for the ones that are skipped. The latter releases every object as soon as
+# it has been read, so only the current one is alive
+_decoder = json.JSONDecoder()
+_skipping_decoder = json.JSONDecoder(object_pairs_hook=_discard_object)
+
+
+class CombinedJsonReader:
+    """
+    Reads the entries of the "contracts" field of a combined json one at a time (see entries). The version is
+    available once it has been read: the fields are written in alphabetical order, so it usually follows the
+    contracts
+    """
+
+    def __init__(self, file: TextIO):
+        self._file = file
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.version: Optional[str] = None
+
+    def _read_more(self, minimum: int = chunk_size) -> bool:
+        """
+        Appends at least minimum characters to the buffer (unless the file ends), discarding the text that has
+        already been consumed. Returns whether some text was added
+        """
+        if self._eof:
+            return False
+        chunks = []
+        read = 0
+        while read < minimum:
+            chunk = self._file.read(max(chunk_size, minimum - read))
+            if chunk == "":
+                self._eof = True
+                break
+            chunks.append(chunk)
+            read += len(chunk)
+        self._buffer = self._buffer[self._pos:] + "".join(chunks)
+        self._pos = 0
+        return read > 0
+
+    def _next_char(self) -> str:
+        """
+        First character that is not a whitespace, without consuming it. Returns "" at the end of the file
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _whitespace:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._read_more():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def _expect(self, chars: str) -> str:
+        char = self._next_char()
+        if char == "" or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in the combined json, but found {char!r}")
+        self._pos += 1
+        return char
+
+    def _decode(self, decoder: json.JSONDecoder) -> Any:
+        """
+        Decodes the value at the current position. If the buffer ends before the value, more text is read and
+        the value is decoded again. The text added is as long as the text already buffered, so each value is
+        decoded at most twice its length on average
+        """
+        self._next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._read_more(max(chunk_size, len(self._buffer) - self._pos)):
+                    raise
+                continue
+            # Numbers and literals could continue after the end of the buffer
+            if end == len(self._buffer) and self._read_more():
+                continue
+            self._pos = end
+            return value
+
+    def _object_items(self) -> Iterator[str]:
+        """
+        Keys of the object at the current position. The value of each key must be consumed before asking for
+        the next one
+        """
+        self._expect("{")
+        if self._next_char() == "}":
+            self._pos += 1
+            return
+        while True:
+            self._expect('"')
+            key = self._decode_string()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def _decode_string(self) -> str:
+        # The opening quote has already been consumed
+        while True:
+            try:
+                key, end = scanstring(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+                continue
+            self._pos = end
+            return key
+
+    def entries(self, selected: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields the name and the decoded value of the entries of the contracts that satisfy selected (all of them by
+        default), in the same order as in the file. The rest of the fields are skipped, except the version
+        """
+        for key in self._object_items():
+            if key == "contracts":
+                for name in self._object_items():
+                    if selected is None or selected(name):
+                        yield name, self._decode(_decoder)
+                    else:
+                        self._decode(_skipping_decoder)
+            elif key == "version":
+                self.version = self._decode(_decoder)
+            else:
+                self._decode(_skipping_decoder)
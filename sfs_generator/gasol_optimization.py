@@ -14,7 +14,6 @@ from sfs_generator.utils import (all_integers, find_sublist, get_num_bytes_int,
 from typing import Optional
 from smt_encoding.json_with_dependencies import extended_json_with_minlength, instr_dependencies
 from typing import Optional, List, Tuple
-import networkx as nx
 
 terminate_block = ["ASSERTFAIL","RETURN","REVERT","SUICIDE","STOP"]
 
@@ -26,175 +25,8 @@ commutative_bytecodes = ["ADD","MUL","EQ","AND","OR","XOR"]
 
 max_bound = 22
 
-global original_opcodes
-original_opcodes = []
-
-global gas_t
-gas_t = 0
-
-global compute_gast
-compute_gast = True
-
-global int_not0
-int_not0 = []
-
-global source_name
-source_name = ""
-
-global cname
-cname = ""
-
-global saved_push
-saved_push = 0
-
-global gas_saved_op
-gas_saved_op = 0
-
-global gas_store_op
-gas_store_op = 0
-
-global gas_memory_op
-gas_memory_op = 0
-
-global blocks_json_dict
-blocks_json_dict = {}
-
-global sfs_contracts
-sfs_contracts = {}
-
-global split_sto
-split_sto = False
-
-global mem40_pattern
-mem40_pattern = False
-
-global original_ins
-original_ins = []
-
-global max_l
-max_l = 0
-
-global size_flag
-size_flag = False
-
-global pop_flag
-pop_flag = False
-
-global push_flag
-push_flag = False
-
-global revert_flag
-revert_flag = False
-
-global assignImm_values
-assignImm_values = {}
-
-global debug
-debug = False
-
-global push_rebuilt
-push_rebuilt = dict()
-
-
-def init_globals():
-    
-    global u_counter
-    u_counter = 0
-
-    global u_dict
-    u_dict = {}
-    
-    global s_counter
-    s_counter = 0
-
-    global s_dict
-    s_dict = {}
-
-    global variable_content
-    variable_content = {}
-    
-    global user_defins
-    user_defins = []
-
-    global user_def_counter
-    user_def_counter = {}
-
-    global already_defined_userdef
-    already_defined_userdef = []
-    
-    global max_instr_size
-    max_instr_size = 0
-
-    global max_stack_size
-    max_stack_size = 0
-
-    global num_pops
-    num_pops = 0
-
-    global discount_op
-    discount_op = 0
-
-    global already_considered
-    already_considered = []
-
-    global sstore_seq
-    sstore_seq = []
-
-    global sstore_v_counter
-    sstore_v_counter = 0
-
-    global mstore_seq
-    mstore_seq = []
-
-    global mstore_v_counter
-    mstore_v_counter = 0
-
-    global storage_dep
-    storage_dep = []
-
-    global memory_dep
-    memory_dep = []
-
-    global memory_opt
-    memory_opt = [False,False,False]
-
-    global storage_opt
-    storage_opt = [False, False, False]
-
-    global mem_delete_pos
-    mem_delete_pos = []
-
-    global sto_delete_pos
-    sto_delete_pos = []
-
-    global rule_applied
-    rule_applied = False
-
-    global modified_userdef_vals
-    modified_userdef_vals = {}
-
-    global rules_applied
-    rules_applied = []
-
-    global rule
-    rule = ""
-
-    global extra_dep_info
-    extra_dep_info = {}
-
-    global non_aliasing_disabled
-    non_aliasing_disabled = False
-    
-    global useless_info
-    useless_info = []
-
-    global context_info
-    context_info = {}
-    
-    
-def process_extra_dependences_info(info,location="memory"):
-    global extra_dep_info
 
+def process_extra_dependences_info(ctx, info,location="memory"):
     if location == "storage":
         equal_pairs = info.get_equal_pairs_storage()
         nonequal_pairs = info.get_nonequal_pairs_storage()
@@ -214,9 +46,9 @@ def process_extra_dependences_info(info,location="memory"):
     list(map(lambda x: x.set_values(x.get_first()-offset,x.get_second()-offset),equal_pairs))
 
     if location == "memory":
-        extra_dep_info["memory_deps_eqs"] = equal_pairs    
+        ctx.extra_dep_info["memory_deps_eqs"] = equal_pairs    
     else:
-        extra_dep_info["storage_deps_eqs"] = equal_pairs
+        ctx.extra_dep_info["storage_deps_eqs"] = equal_pairs
 
 
         
@@ -224,32 +56,28 @@ def process_extra_dependences_info(info,location="memory"):
     list(map(lambda x: x.set_values(x.get_first()-offset,x.get_second()-offset), nonequal_pairs))
     
     if location == "memory":
-        extra_dep_info["memory_deps_noneqs"] =  nonequal_pairs
+        ctx.extra_dep_info["memory_deps_noneqs"] =  nonequal_pairs
     else:
-        extra_dep_info["storage_deps_noneqs"] =  nonequal_pairs
+        ctx.extra_dep_info["storage_deps_noneqs"] =  nonequal_pairs
 
     
         
     # extra_dep_info["storage_deps"] = info.get("storage_deps",[])
     # raise Exception
-    check_and_print_debug_info(debug, extra_dep_info)
-
-def process_useless_info(info):
-    global useless_info
+    check_and_print_debug_info(ctx.debug, ctx.extra_dep_info)
 
+def process_useless_info(ctx, info):
     offset = 0
     if "JUMPDEST" in info.get_instructions():
         offset = 1
 
     l = info.get_useless_info()
-    useless_info = list(map(lambda x: x-offset,l))
+    ctx.useless_info = list(map(lambda x: x-offset,l))
            
     # extra_dep_info["storage_deps"] = info.get("storage_deps",[])
     # raise Exception
 
-def process_context_info(info,stack_idx):
-    global context_info
-
+def process_context_info(ctx, info,stack_idx):
     constancy_context = info.get_constancy_context()
     aliasing_context = info.get_aliasing_context()
 
@@ -258,10 +86,10 @@ def process_context_info(info,stack_idx):
     
     computed_aliasing = compute_potential_aliasing(valid_constancy_context, valid_aliasing_context)
     
-    context_info["constancy_context"] = valid_constancy_context
-    context_info["aliasing_context"] = valid_aliasing_context
-    context_info["computed_aliasing"] = computed_aliasing
-    context_info["stack_size"] = stack_idx
+    ctx.context_info["constancy_context"] = valid_constancy_context
+    ctx.context_info["aliasing_context"] = valid_aliasing_context
+    ctx.context_info["computed_aliasing"] = computed_aliasing
+    ctx.context_info["stack_size"] = stack_idx
 
 
 def compute_potential_aliasing(constancy_list,aliasing_list):
@@ -382,17 +210,14 @@ def contained_in_source_stack(v,instructions,source_stack):
     return contained
 
 #Here instructions = instrs+nops
-def get_encoding_init_block(instructions,source_stack):
-    global s_dict
-    global u_dict
-
+def get_encoding_init_block(ctx, instructions,source_stack):
     sstore_count = 0
     mstore_count = 0
     mstore8_count = 0
     mstoreImm_count = 0
     
-    old_sdict = dict(s_dict)
-    old_u_dict = dict(u_dict)
+    old_sdict = dict(ctx.s_dict)
+    old_u_dict = dict(ctx.u_dict)
     
     i = 0
     opcodes = []
@@ -412,8 +237,8 @@ def get_encoding_init_block(instructions,source_stack):
                         var = instructions[i-1].split("=")[0].strip()
                         instructions_without_nop = list(filter(lambda x: not x.startswith("nop("), instructions[:i]))
                         instructions_reverse = instructions_without_nop[::-1]
-                        search_for_value(var,instructions_reverse, source_stack, False)
-                        opcodes.append((s_dict[var],u_dict[s_dict[var]]))
+                        search_for_value(ctx, var,instructions_reverse, source_stack, False)
+                        opcodes.append((ctx.s_dict[var],ctx.u_dict[ctx.s_dict[var]]))
                     else:
                         opcodes.append(instr)
                         push_values.append(value) #normal push
@@ -422,8 +247,8 @@ def get_encoding_init_block(instructions,source_stack):
 
                     instructions_without_nop = list(filter(lambda x: not x.startswith("nop("), instructions[:i]))
                     instructions_reverse = instructions_without_nop[::-1]
-                    search_for_value(var,instructions_reverse, source_stack, False)
-                    opcodes.append((s_dict[var],u_dict[s_dict[var]]))
+                    search_for_value(ctx, var,instructions_reverse, source_stack, False)
+                    opcodes.append((ctx.s_dict[var],ctx.u_dict[ctx.s_dict[var]]))
                     
                 else: #DUP SWAP POP
                     opcodes.append(instr)
@@ -434,11 +259,11 @@ def get_encoding_init_block(instructions,source_stack):
 
                     instructions_without_nop = list(filter(lambda x: not x.startswith("nop("), instructions[:i]))
                     instructions_reverse = instructions_without_nop[::-1]
-                    search_for_value(var,instructions_reverse, source_stack, False)
-                    opcodes.append((s_dict[var],u_dict[s_dict[var]]))
+                    search_for_value(ctx, var,instructions_reverse, source_stack, False)
+                    opcodes.append((ctx.s_dict[var],ctx.u_dict[ctx.s_dict[var]]))
                     
                 else:
-                    exp = generate_sstore_mstore(instructions[i-1],instructions[i-2::-1],source_stack,len(instructions)-(i-1))
+                    exp = generate_sstore_mstore(ctx, instructions[i-1],instructions[i-2::-1],source_stack,len(instructions)-(i-1))
                     if exp[0][-1] == "sstore":
                         instr = "SSTORE_"+str(sstore_count)
                         sstore_count+=1
@@ -466,7 +291,7 @@ def get_encoding_init_block(instructions,source_stack):
             args_exp = instruction[1][0]
             arity_exp = instruction[1][1]
             
-            user_def = build_initblock_userdef(u_var,args_exp,arity_exp)
+            user_def = build_initblock_userdef(ctx, u_var,args_exp,arity_exp)
             for u in user_def:
                 if u not in init_user_def:
                     init_user_def.append(u)
@@ -485,21 +310,10 @@ def get_encoding_init_block(instructions,source_stack):
 
 
 
-def search_for_value(var, instructions,source_stack,evaluate = True):
-    global s_counter
-    global s_dict
-    
-    search_for_value_aux(var,instructions,source_stack,0,evaluate)
-    
-def search_for_value_aux(var, instructions,source_stack,level,evaluate = True):
-    global s_counter
-    global s_dict
-    global u_counter
-    global u_dict
-    global rule_applied
-    global rules_applied
-    global rule
+def search_for_value(ctx, var, instructions,source_stack,evaluate = True):
+    search_for_value_aux(ctx, var,instructions,source_stack,0,evaluate)
     
+def search_for_value_aux(ctx, var, instructions,source_stack,level,evaluate = True):
     i = 0
     found = False
     vars_instr = " "
@@ -519,7 +333,7 @@ def search_for_value_aux(var, instructions,source_stack,level,evaluate = True):
     else:
         value = var.strip()
         
-    new_vars, funct = get_involved_vars(value,vars_instr[0])
+    new_vars, funct = get_involved_vars(ctx, value,vars_instr[0])
 
     if len(new_vars) == 1:
         
@@ -531,77 +345,77 @@ def search_for_value_aux(var, instructions,source_stack,level,evaluate = True):
             else:
                 val = new_vars[0]
 
-            update_unary_func(funct,var,new_vars[0],evaluate)
-            if rule_applied:
-                rules_applied.append(rule)
-                rule = ""
+            update_unary_func(ctx, funct,var,new_vars[0],evaluate)
+            if ctx.rule_applied:
+                ctx.rules_applied.append(ctx.rule)
+                ctx.rule = ""
         else:
 
             if new_vars[0] not in zero_ary and new_vars[0].find("gas")==-1 and new_vars[0].find("timestamp")==-1:
-                search_for_value_aux(new_vars[0],instructions[i:],source_stack,level,evaluate)
-                val = s_dict[new_vars[0]]
+                search_for_value_aux(ctx, new_vars[0],instructions[i:],source_stack,level,evaluate)
+                val = ctx.s_dict[new_vars[0]]
             else:
                 val = new_vars[0]
-            update_unary_func(funct,var,val,evaluate)
-            if rule_applied:
-                rules_applied.append(rule)
-                rule = ""
+            update_unary_func(ctx, funct,var,val,evaluate)
+            if ctx.rule_applied:
+                ctx.rules_applied.append(ctx.rule)
+                ctx.rule = ""
     else:
     
-        u_var = create_new_svar()
-        s_dict_old = dict(s_dict)
+        u_var = create_new_svar(ctx)
+        s_dict_old = dict(ctx.s_dict)
 
         values = {}
 
         for v in new_vars:
 
-            search_for_value_aux(v,instructions[i:],source_stack,level,evaluate)
+            search_for_value_aux(ctx, v,instructions[i:],source_stack,level,evaluate)
     
-            values[v] = s_dict[v]
+            values[v] = ctx.s_dict[v]
 
-        exp_join = rebuild_expression(new_vars,funct,values,level,evaluate)
+        exp_join = rebuild_expression(ctx, new_vars,funct,values,level,evaluate)
         r = exp_join[0]
         exp = (exp_join[1],exp_join[2])
 
         if r:
-            rules_applied.append(rule)
-            rule = ""
-            s_dict[var] = exp[0]
+            ctx.rules_applied.append(ctx.rule)
+            ctx.rule = ""
+            ctx.s_dict[var] = exp[0]
 
         else:
 
-            new_u, defined = is_already_defined(exp)
+            new_u, defined = is_already_defined(ctx, exp)
             if defined:
                 u_var = new_u
             else:
-                u_dict[u_var] = exp
+                ctx.u_dict[u_var] = exp
 
-            s_dict = s_dict_old
+            ctx.s_dict = s_dict_old
         
-            s_dict[var] = u_var
+            ctx.s_dict[var] = u_var
 
             
-def generate_sstore_mstore(store_ins,instructions,source_stack,pos,simp):
+def generate_sstore_mstore(ctx, store_ins,instructions,source_stack,pos,simp):
     level = 0
-    new_vars, funct = get_involved_vars(store_ins,"")
+    new_vars, funct = get_involved_vars(ctx, store_ins,"")
     
     values = {}
 
-    pre = already_considered 
+    pre = ctx.already_considered 
 
     for v in new_vars:
-        search_for_value_aux(v,instructions,source_stack,pos,simp)
+        search_for_value_aux(ctx, v,instructions,source_stack,pos,simp)
         
-        values[v] = s_dict[v]
+        values[v] = ctx.s_dict[v]
 
 
-    exp_join = rebuild_expression(new_vars,funct,values,level,simp)
+    exp_join = rebuild_expression(ctx, new_vars,funct,values,level,simp)
 
     
     return exp_join[1],exp_join[2]
 
 
-def generate_sload_mload(load_ins,instructions,source_stack,pos,simp):
+def generate_sload_mload(ctx, load_ins,instructions,source_stack,pos,simp):
 
     level = pos
 
@@ -609,7 +423,7 @@ def generate_sload_mload(load_ins,instructions,source_stack,pos,simp):
         load_ins = load_ins.split("=")[-1].strip()
 
     
-    new_vars, funct = get_involved_vars(load_ins,"")
+    new_vars, funct = get_involved_vars(ctx, load_ins,"")
     
     in_sourcestack = contained_in_source_stack(new_vars[0],instructions,source_stack)
     
@@ -621,23 +435,23 @@ def generate_sload_mload(load_ins,instructions,source_stack,pos,simp):
             #update_unary_func(funct,var,new_vars[0])
 
         elem = ((new_vars[0],funct),1)
-        new_uvar, defined = is_already_defined(elem)
+        new_uvar, defined = is_already_defined(ctx, elem)
         return new_uvar,elem
             
     else:
         if new_vars[0] not in zero_ary and new_vars[0].find("gas")==-1 and new_vars[0].find("timestamp")==-1:
-            search_for_value_aux(new_vars[0],instructions,source_stack,level,simp)
-            val = s_dict[new_vars[0]]
+            search_for_value_aux(ctx, new_vars[0],instructions,source_stack,level,simp)
+            val = ctx.s_dict[new_vars[0]]
         else:
             val = new_vars[0]
         #update_unary_func(funct,var,val)
 
         elem = ((val,funct),1)
-        new_uvar, defined = is_already_defined(elem)
+        new_uvar, defined = is_already_defined(ctx, elem)
         return new_uvar,elem
 
 
-def generate_instruction(load_ins,instructions,source_stack,pos,simp):
+def generate_instruction(ctx, load_ins,instructions,source_stack,pos,simp):
 
     level = pos
 
@@ -645,25 +459,25 @@ def generate_instruction(load_ins,instructions,source_stack,pos,simp):
         load_ins = load_ins.split("=")[-1].strip()
 
     
-    new_vars, funct = get_involved_vars(load_ins,"")
+    new_vars, funct = get_involved_vars(ctx, load_ins,"")
     
     values = {}
 
-    pre = already_considered 
+    pre = ctx.already_considered 
 
     for v in new_vars:
-        search_for_value_aux(v,instructions,source_stack,pos,simp)
+        search_for_value_aux(ctx, v,instructions,source_stack,pos,simp)
     
-        values[v] = s_dict[v]
+        values[v] = ctx.s_dict[v]
 
-    exp_join = rebuild_expression(new_vars,funct,values,level,simp)
+    exp_join = rebuild_expression(ctx, new_vars,funct,values,level,simp)
 
     return exp_join[1],exp_join[2]
     
 
-def is_already_defined(elem):
-    for u_var in u_dict.keys():
-        if elem == u_dict[u_var]:
+def is_already_defined(ctx, elem):
+    for u_var in ctx.u_dict.keys():
+        if elem == ctx.u_dict[u_var]:
             return u_var, True
 
     return -1, False
@@ -682,20 +496,14 @@ def is_already_defined_storage(elem,location):
 
     return -1, False
 
-def update_unary_func(func,var,val,evaluate):
-    global s_dict
-    global u_dict
-    global gas_saved_op    
-    global rule_applied
-    global rule
-    
+def update_unary_func(ctx, func,var,val,evaluate):
     if func != "":
 
         #check for value of val when considering constancy
         #TODO
-        if context_info.get("constancy_context",[]) != []:
+        if ctx.context_info.get("constancy_context",[]) != []:
             
-            val_aux = get_value_constancy_context(val)
+            val_aux = get_value_constancy_context(ctx, val)
 
             if val_aux != -1 and (func=="not" or func=="iszero"):
                 val = val_aux
@@ -704,7 +512,7 @@ def update_unary_func(func,var,val,evaluate):
             if func == "not":
                 val_end = ~(int(val))+2**256
 
-                if size_flag:
+                if ctx.size_flag:
 
                     v0 = int(val)
 
@@ -712,12 +520,12 @@ def update_unary_func(func,var,val,evaluate):
                     bytes_sol = get_num_bytes_int(val_end)
                                 
                     if bytes_sol <= bytes_v0+1:
-                        s_dict[var] = val_end
-                        gas_saved_op+=3
-                        rule_applied = True
-                        rule = "NOT(X)"
+                        ctx.s_dict[var] = val_end
+                        ctx.gas_saved_op+=3
+                        ctx.rule_applied = True
+                        ctx.rule = "NOT(X)"
                     else:
-                        u_var = create_new_svar()
+                        u_var = create_new_svar(ctx)
 
                         if val in zero_ary or val.find("gas")!=-1 or val.find("timestamp")!=-1:
                             arity = 0
@@ -725,30 +533,30 @@ def update_unary_func(func,var,val,evaluate):
                             arity = 1
 
                         elem = ((val,func),arity)
-                        new_uvar, defined = is_already_defined(elem)
+                        new_uvar, defined = is_already_defined(ctx, elem)
                         if defined:
-                            s_dict[var] = new_uvar
+                            ctx.s_dict[var] = new_uvar
                  
                         else:
-                            u_dict[u_var] = elem
-                            s_dict[var] = u_var
+                            ctx.u_dict[u_var] = elem
+                            ctx.s_dict[var] = u_var
                 else:
-                    gas_saved_op+=3
-                    s_dict[var] = val_end
-                    rule = "NOT(X)"
-                    rule_applied = True
+                    ctx.gas_saved_op+=3
+                    ctx.s_dict[var] = val_end
+                    ctx.rule = "NOT(X)"
+                    ctx.rule_applied = True
 
             elif func == "iszero":
                 aux = int(val)
                 val_end = 1 if aux == 0 else 0
-                gas_saved_op+=3
-                rule = "EVAL(ISZERO("+str(val_end)+"))"
-                s_dict[var] = val_end
-                rule_applied = True
+                ctx.gas_saved_op+=3
+                ctx.rule = "EVAL(ISZERO("+str(val_end)+"))"
+                ctx.s_dict[var] = val_end
+                ctx.rule_applied = True
 
                 
         else:
-            u_var = create_new_svar()
+            u_var = create_new_svar(ctx)
 
             if val in zero_ary or val.find("gas")!=-1 or val.find("timestamp")!=-1:
                 arity = 0
@@ -757,18 +565,18 @@ def update_unary_func(func,var,val,evaluate):
 
             elem = ((val,func),arity)
 
-            new_uvar, defined = is_already_defined(elem)
+            new_uvar, defined = is_already_defined(ctx, elem)
             if defined:
-                s_dict[var] = new_uvar
+                ctx.s_dict[var] = new_uvar
                 
             else:
-                u_dict[u_var] = elem
-                s_dict[var] = u_var
+                ctx.u_dict[u_var] = elem
+                ctx.s_dict[var] = u_var
                 
     else:
-        s_dict[var] = val
+        ctx.s_dict[var] = val
 
-def get_involved_vars(instr,var):
+def get_involved_vars(ctx, instr,var):
     var_list = []
     funct = ""
     
@@ -779,7 +587,7 @@ def get_involved_vars(instr,var):
         var0 = arg0.strip()
         var_list.append(var0)
 
-        if not split_sto:
+        if not ctx.split_sto:
             funct = instr_new[:pos]
         else:
             funct = "mload"
@@ -792,7 +600,7 @@ def get_involved_vars(instr,var):
         var0 = arg0.strip()
         var_list.append(var0)
 
-        if not split_sto: 
+        if not ctx.split_sto: 
             funct = instr_new[:pos]
         else:
             funct = "sload"
@@ -855,7 +663,7 @@ def get_involved_vars(instr,var):
         var_list.append(var0)
         var_list.append(var1)
 
-        if not split_sto:
+        if not ctx.split_sto:
             funct = instr_new[:pos]
         else:
             funct = "sha3"
@@ -872,7 +680,7 @@ def get_involved_vars(instr,var):
         var_list.append(var1)
 
         
-        if not split_sto: 
+        if not ctx.split_sto: 
             funct = instr_new[:pos]
         else:
             funct = "keccak256"
@@ -1514,24 +1322,16 @@ def evaluate_expression_ter(funct,val0,val1,val2):
         return aux%val2
 
     
-def compute_binary(expression,level):
-    global discount_op
-    global saved_push
-    global gas_saved_op
-    global already_considered    
-    global rule_applied
-    global rule
-    global push_rebuilt
-    
+def compute_binary(ctx, expression,level):
     v0 = expression[0]
     v1 = expression[1]
     funct = expression[2]
 
     r, vals = all_integers([v0,v1])
     
-    if not r and context_info.get("constancy_context",[]) != []:
-        v0 = get_value_constancy_context(v0)
-        v1 = get_value_constancy_context(v1)
+    if not r and ctx.context_info.get("constancy_context",[]) != []:
+        v0 = get_value_constancy_context(ctx, v0)
+        v1 = get_value_constancy_context(ctx, v1)
 
         if v0 != -1 and v1!=-1:
             vals = [int(v0),int(v1)]
@@ -1552,51 +1352,45 @@ def compute_binary(expression,level):
 
         # The condition filters computations of the form * PUSH 1 MUL or * PUSH 0 ADD
         if vals[0] != val and vals[1] != val:
-            push_rebuilt[val] = (vals[1], vals[0], funct_to_opcode(funct))
+            ctx.push_rebuilt[val] = (vals[1], vals[0], funct_to_opcode(funct))
 
-        if size_flag:
+        if ctx.size_flag:
             r, exp = check_size(expression,val)
 
             if exp == expression:
                 return False, expression
         
-        if exp_str not in already_considered:
+        if exp_str not in ctx.already_considered:
 
             if funct in ["*","/","%"]:
-                gas_saved_op+=5
+                ctx.gas_saved_op+=5
             else:
-                gas_saved_op+=3
+                ctx.gas_saved_op+=3
                 
-            saved_push+=2
+            ctx.saved_push+=2
             
-            if (funct in ["+","*","and","or","xor","eq","shl","shr","sar"]) and (exp_str not in already_considered):
-                discount_op+=2
-                rule = "EVAL "+str(expression)
+            if (funct in ["+","*","and","or","xor","eq","shl","shr","sar"]) and (exp_str not in ctx.already_considered):
+                ctx.discount_op+=2
+                ctx.rule = "EVAL "+str(expression)
                 msg = "[RULE]: Evaluate expression "+str(expression)
-                check_and_print_debug_info(debug, msg)
-                rule_applied = True
+                check_and_print_debug_info(ctx.debug, msg)
+                ctx.rule_applied = True
                 
             elif funct not in ["+","*","and","or","xor","eq","shl","shr","sar"]:
-                discount_op+=2
-                rule = "EVAL "+str(expression)
+                ctx.discount_op+=2
+                ctx.rule = "EVAL "+str(expression)
                 msg = "[RULE]: Evaluate expression "+str(expression)
-                check_and_print_debug_info(debug, msg)
-                rule_applied = True
+                check_and_print_debug_info(ctx.debug, msg)
+                ctx.rule_applied = True
 
-        already_considered.append(exp_str)
+        ctx.already_considered.append(exp_str)
         
         return True, str(val)
         
     else:
         return False, expression
 
-def compute_ternary(expression):
-    global discount_op
-    global saved_push
-    global gas_saved_op
-    global rule_applied
-    global rule
-    
+def compute_ternary(ctx, expression):
     v0 = expression[0]
     v1 = expression[1]
     v2 = expression[2]
@@ -1604,10 +1398,10 @@ def compute_ternary(expression):
 
     r, vals = all_integers([v0,v1,v2])
 
-    if not r and context_info.get("constancy_context",[]) != []:
-        v0 = get_value_constancy_context(v0)
-        v1 = get_value_constancy_context(v1)
-        v2 = get_value_constancy_context(v2)
+    if not r and ctx.context_info.get("constancy_context",[]) != []:
+        v0 = get_value_constancy_context(ctx, v0)
+        v1 = get_value_constancy_context(ctx, v1)
+        v2 = get_value_constancy_context(ctx, v2)
         
         if v0 != -1 and v1!=-1 and v2!=-1:
             vals = [v0,v1,v2]
@@ -1624,20 +1418,20 @@ def compute_ternary(expression):
 
         # The condition filters computations of the form * PUSH 1 MUL or * PUSH 0 ADD
         if vals[1] != val and vals[2] != val and vals[0] != val:
-            push_rebuilt[val] = (vals[2], vals[1], vals[0], funct_to_opcode(funct))
+            ctx.push_rebuilt[val] = (vals[2], vals[1], vals[0], funct_to_opcode(funct))
 
 
-        rule = "EVAL "+str(expression)
+        ctx.rule = "EVAL "+str(expression)
 
         msg = "[RULE]: Evaluate expression "+str(expression)
-        check_and_print_debug_info(debug, msg)
+        check_and_print_debug_info(ctx.debug, msg)
 
-        rule_applied = True
+        ctx.rule_applied = True
         
-        gas_saved_op+=8
-        saved_push+=3
+        ctx.gas_saved_op+=8
+        ctx.saved_push+=3
         
-        discount_op+=3
+        ctx.discount_op+=3
         return True, str(val)
     else:
         return False, expression
@@ -1660,14 +1454,14 @@ def check_size(exp_without, expression):
     else:
         return False,exp_without
     
-def rebuild_expression(vars_input,funct,values,level,evaluate = True):
+def rebuild_expression(ctx, vars_input,funct,values,level,evaluate = True):
 
     if len(vars_input) == 2:
         v0 = values[vars_input[0]]
         v1 = values[vars_input[1]]
         expression_without_simp = (v0, v1, funct)
         if evaluate:
-            r, expression = compute_binary(expression_without_simp,level)
+            r, expression = compute_binary(ctx, expression_without_simp,level)
         else:
             r = False
             expression = expression_without_simp
@@ -1678,7 +1472,7 @@ def rebuild_expression(vars_input,funct,values,level,evaluate = True):
         v2 = values[vars_input[2]]
         expression_without_simp = (v0,v1,v2,funct)
         if evaluate:
-            r, expression = compute_ternary(expression_without_simp)
+            r, expression = compute_ternary(ctx, expression_without_simp)
         else:
             r = False
             expression = expression_without_simp
@@ -1694,36 +1488,28 @@ def rebuild_expression(vars_input,funct,values,level,evaluate = True):
         arity = len(vars_input)
     return r, expression, arity
 
-def create_new_uvar():
-    global u_counter
-
-    var =  "u"+str(u_counter)
-    u_counter+=1
+def create_new_uvar(ctx):
+    var =  "u"+str(ctx.u_counter)
+    ctx.u_counter+=1
 
     return var
 
 
-def create_new_svar():
-    global s_counter
-    
-    var =  "s("+str(s_counter)+")"
-    s_counter+=1
+def create_new_svar(ctx):
+    var =  "s("+str(ctx.s_counter)+")"
+    ctx.s_counter+=1
 
     return var
 
-def create_new_sstorevar():
-    global sstore_v_counter
-
-    var =  "sto"+str(sstore_v_counter)
-    sstore_v_counter+=1
+def create_new_sstorevar(ctx):
+    var =  "sto"+str(ctx.sstore_v_counter)
+    ctx.sstore_v_counter+=1
 
     return var
 
-def create_new_mstorevar():
-    global mstore_v_counter
-
-    var =  "mem"+str(mstore_v_counter)
-    mstore_v_counter+=1
+def create_new_mstorevar(ctx):
+    var =  "mem"+str(ctx.mstore_v_counter)
+    ctx.mstore_v_counter+=1
 
     return var
   
@@ -1735,65 +1521,54 @@ def simplify_constants(opcodes_seq,user_def):
             result = evaluate(elems)
 
 
-def update_info_with_context():
-    global u_dict
-    global variable_content
-    global s_dict
-    
-    for p in context_info["aliasing_context"]:
-        old_value = "s("+str(context_info["stack_size"]-1-p[1])+")"
-        new_value = "s("+str(context_info["stack_size"]-1-p[0])+")"
+def update_info_with_context(ctx):
+    for p in ctx.context_info["aliasing_context"]:
+        old_value = "s("+str(ctx.context_info["stack_size"]-1-p[1])+")"
+        new_value = "s("+str(ctx.context_info["stack_size"]-1-p[0])+")"
 
-        for u in u_dict:
-            var = u_dict[u]
+        for u in ctx.u_dict:
+            var = ctx.u_dict[u]
             ins = list(var[0])
             for i in range(len(ins)):
                 if ins[i] == old_value:
                     ins[i] = new_value
             new_var = (tuple(ins),var[1])
-            u_dict[u] = new_var
+            ctx.u_dict[u] = new_var
 
-        for v in variable_content:
-            if str(variable_content[v]).find(old_value)!=-1:
-                variable_content[v] = new_value
+        for v in ctx.variable_content:
+            if str(ctx.variable_content[v]).find(old_value)!=-1:
+                ctx.variable_content[v] = new_value
             
-        for s_var in s_dict:
-            if str(s_dict[s_var]).find(old_value)!=-1:
-                s_dict[s_var] = new_value
+        for s_var in ctx.s_dict:
+            if str(ctx.s_dict[s_var]).find(old_value)!=-1:
+                ctx.s_dict[s_var] = new_value
 
 
-def update_info_with_constancy():
-    global u_dict
-    global variable_content
-    global s_dict
-    
-    for p in context_info["constancy_context"]:
-        old_value = "s("+str(context_info["stack_size"]-1-p[0])+")"
+def update_info_with_constancy(ctx):
+    for p in ctx.context_info["constancy_context"]:
+        old_value = "s("+str(ctx.context_info["stack_size"]-1-p[0])+")"
         new_value = str(p[1])
-        for u in u_dict:
-            var = u_dict[u]
+        for u in ctx.u_dict:
+            var = ctx.u_dict[u]
             ins = list(var[0])
             for i in range(len(ins)):
                 if old_value == ins[i]:
                     ins[i] = new_value
             new_var = (tuple(ins),var[1])
-            u_dict[u] = new_var
+            ctx.u_dict[u] = new_var
 
-        for v in variable_content:
-            if str(variable_content[v]).find(old_value)!=-1:
-                variable_content[v] = new_value
+        for v in ctx.variable_content:
+            if str(ctx.variable_content[v]).find(old_value)!=-1:
+                ctx.variable_content[v] = new_value
             
-        for s_var in s_dict:
-            if str(s_dict[s_var]).find(old_value)!=-1:
-                s_dict[s_var] = new_value
-
-def update_memory_with_context(m_sequence):
-    global memory_order
-    global storage_order
-    
-    for p in context_info["aliasing_context"]:
-        old_value = "s("+str(context_info["stack_size"]-1-p[1])+")"
-        new_value = "s("+str(context_info["stack_size"]-1-p[0])+")"
+        for s_var in ctx.s_dict:
+            if str(ctx.s_dict[s_var]).find(old_value)!=-1:
+                ctx.s_dict[s_var] = new_value
+
+def update_memory_with_context(ctx, m_sequence):
+    for p in ctx.context_info["aliasing_context"]:
+        old_value = "s("+str(ctx.context_info["stack_size"]-1-p[1])+")"
+        new_value = "s("+str(ctx.context_info["stack_size"]-1-p[0])+")"
         i = 0
         
         while(i<len(m_sequence)):
@@ -1807,12 +1582,9 @@ def update_memory_with_context(m_sequence):
             m_sequence[i] = new_var
             i+=1
 
-def update_memory_with_constancy(m_sequence):
-    global memory_order
-    global storage_order
-    
-    for p in context_info["constancy_context"]:
-        old_value = "s("+str(context_info["stack_size"]-1-p[0])+")"
+def update_memory_with_constancy(ctx, m_sequence):
+    for p in ctx.context_info["constancy_context"]:
+        old_value = "s("+str(ctx.context_info["stack_size"]-1-p[0])+")"
         new_value = str(p[1])
         i = 0
         while(i<len(m_sequence)):
@@ -1827,151 +1599,127 @@ def update_memory_with_constancy(m_sequence):
                 
                 
                 
-def generate_encoding(instructions,variables,source_stack,opcodes,simplification=True):
-    global s_dict
-    global u_dict
-    global variable_content
-    global memory_order
-    global storage_order
-    global storage_dep
-    global memory_dep
-    
-    
+def generate_encoding(ctx, instructions,variables,source_stack,opcodes,simplification=True):
     instructions_reverse = instructions[::-1]
-    u_dict = {}
+    ctx.u_dict = {}
     
-    variable_content = {}
+    ctx.variable_content = {}
     for v in variables:
-        s_dict = {}
-        search_for_value(v,instructions_reverse, source_stack,simplification)
-        variable_content[v] = s_dict[v]    
+        ctx.s_dict = {}
+        search_for_value(ctx, v,instructions_reverse, source_stack,simplification)
+        ctx.variable_content[v] = ctx.s_dict[v]    
         
-    if not split_sto:
-        generate_storage_info(instructions,source_stack,opcodes,simplification)
+    if not ctx.split_sto:
+        generate_storage_info(ctx, instructions,source_stack,opcodes,simplification)
         
-        if context_info != {}:
+        if ctx.context_info != {}:
             
-            update_info_with_context()
-            update_info_with_constancy()
+            update_info_with_context(ctx)
+            update_info_with_constancy(ctx)
                         
-            update_memory_with_context(memory_order)
-            update_memory_with_constancy(memory_order)
+            update_memory_with_context(ctx, ctx.memory_order)
+            update_memory_with_constancy(ctx, ctx.memory_order)
             
-            update_memory_with_context(storage_order)
-            update_memory_with_constancy(storage_order)
+            update_memory_with_context(ctx, ctx.storage_order)
+            update_memory_with_constancy(ctx, ctx.storage_order)
 
             msg = "Recomputing memory simplification with context info"
-            check_and_print_debug_info(debug, msg)
+            check_and_print_debug_info(ctx.debug, msg)
 
-            compute_memory_dependences(simplification)
+            compute_memory_dependences(ctx, simplification)
             
     else:
-        memory_order = []
-        storage_order = []
+        ctx.memory_order = []
+        ctx.storage_order = []
 
     # print(u_dict)
     # print(variable_content)
     # raise Exception
         
-def compute_memory_dependences(simplification):
-    global memory_order
-    global storage_order
-    global storage_dep
-    global memory_dep
-    global non_aliasing_disabled
-
+def compute_memory_dependences(ctx, simplification):
     modified = False
-    if non_aliasing_disabled:
+    if ctx.non_aliasing_disabled:
         modified = True
-        old_value = non_aliasing_disabled
-        non_aliasing_disabled = not non_aliasing_disabled
+        old_value = ctx.non_aliasing_disabled
+        ctx.non_aliasing_disabled = not ctx.non_aliasing_disabled
         
-    remove_loads_instructions()
+    remove_loads_instructions(ctx)
     
     if simplification:
         simp = True
         while(simp):
-            simp = simplify_memory(storage_order, memory_order, "storage")
+            simp = simplify_memory(ctx, ctx.storage_order, ctx.memory_order, "storage")
 
             
-    storage_order = list(filter(lambda x: type(x) == tuple, storage_order))
-    unify_loads_instructions(storage_order, "storage")
+    ctx.storage_order = list(filter(lambda x: type(x) == tuple, ctx.storage_order))
+    unify_loads_instructions(ctx, ctx.storage_order, "storage")
 
 
-    msg = "Storage order: "+str(storage_order)
-    check_and_print_debug_info(debug, msg)
+    msg = "Storage order: "+str(ctx.storage_order)
+    check_and_print_debug_info(ctx.debug, msg)
 
     if modified:
-        non_aliasing_disabled = old_value
+        ctx.non_aliasing_disabled = old_value
         modified = False
     
-    stdep = generate_dependences(storage_order,"storage")
+    stdep = generate_dependences(ctx, ctx.storage_order,"storage")
 
     msg = "Storage dep: "+str(stdep)
-    check_and_print_debug_info(debug, msg)
+    check_and_print_debug_info(ctx.debug, msg)
 
     stdep = simplify_dependences(stdep)
 
     msg = "Storage dep simplified: "+str(stdep)
-    check_and_print_debug_info(debug, msg)
+    check_and_print_debug_info(ctx.debug, msg)
 
 
     modified = False
-    if non_aliasing_disabled:
+    if ctx.non_aliasing_disabled:
         modified = True
-        old_value = non_aliasing_disabled
-        non_aliasing_disabled = not non_aliasing_disabled
+        old_value = ctx.non_aliasing_disabled
+        ctx.non_aliasing_disabled = not ctx.non_aliasing_disabled
 
         
     if simplification:
         simp = True
         while(simp):
-            simp = simplify_memory(memory_order, storage_order, "memory")
+            simp = simplify_memory(ctx, ctx.memory_order, ctx.storage_order, "memory")
             
-    memory_order = list(filter(lambda x: type(x) == tuple, memory_order))    
+    ctx.memory_order = list(filter(lambda x: type(x) == tuple, ctx.memory_order))    
 
-    unify_loads_instructions(memory_order, "memory")
+    unify_loads_instructions(ctx, ctx.memory_order, "memory")
     
-    unify_keccak_instructions(memory_order,storage_order)
+    unify_keccak_instructions(ctx, ctx.memory_order,ctx.storage_order)
 
-    msg = "Memory order: "+str(memory_order)
-    check_and_print_debug_info(debug, msg)
+    msg = "Memory order: "+str(ctx.memory_order)
+    check_and_print_debug_info(ctx.debug, msg)
 
     if modified:
-        non_aliasing_disabled = old_value
+        ctx.non_aliasing_disabled = old_value
         modified = False
     
-    memdep = generate_dependences(memory_order,"memory")
+    memdep = generate_dependences(ctx, ctx.memory_order,"memory")
     
     msg = "Memory dep: "+str(memdep)
-    check_and_print_debug_info(debug, msg)
+    check_and_print_debug_info(ctx.debug, msg)
 
     memdep = simplify_dependences(memdep)
 
     msg = "Memory dep simplified: "+str(memdep)
-    check_and_print_debug_info(debug, msg)
+    check_and_print_debug_info(ctx.debug, msg)
 
     s1= compute_clousure(stdep)
     m1 = compute_clousure(memdep)
     
-    get_best_storage(s1, len(storage_order))
+    get_best_storage(s1, len(ctx.storage_order))
     
-    storage_dep = stdep
-    memory_dep = memdep
+    ctx.storage_dep = stdep
+    ctx.memory_dep = memdep
 
 
 
         
-def generate_storage_info(instructions,source_stack,opcodes,simplification=True):
-    global sstore_seq
-    global mstore_seq
-    global storage_order
-    global memory_order
-    global storage_dep
-    global memory_dep
-    global extra_dep_info
-
-
+def generate_storage_info(ctx, instructions,source_stack,opcodes,simplification=True):
     sload_relative_pos = {}
     mload_relative_pos = {}
 
@@ -1980,26 +1728,26 @@ def generate_storage_info(instructions,source_stack,opcodes,simplification=True)
 
         if instructions[x].find("sstore")!=-1:
             ins_list = [] if x == 0 else instructions[x-1::-1]
-            exp = generate_sstore_mstore(instructions[x],ins_list,source_stack,len(instructions)-x, simplification)
-            sstore_seq.append(exp)
+            exp = generate_sstore_mstore(ctx, instructions[x],ins_list,source_stack,len(instructions)-x, simplification)
+            ctx.sstore_seq.append(exp)
 
         elif instructions[x].find("keccak")!=-1 or instructions[x].find("sha3")!=-1:
             ins_list = [] if x == 0 else instructions[x-1::-1]
-            exp = generate_instruction(instructions[x],ins_list,source_stack,len(instructions)-x,simplification)
-            sstore_seq.append(exp)
-            mstore_seq.append(exp)
+            exp = generate_instruction(ctx, instructions[x],ins_list,source_stack,len(instructions)-x,simplification)
+            ctx.sstore_seq.append(exp)
+            ctx.mstore_seq.append(exp)
         elif instructions[x].find("mstore")!=-1:
             ins_list = [] if x == 0 else instructions[x-1::-1]
-            exp = generate_sstore_mstore(instructions[x],ins_list,source_stack,len(instructions)-x,simplification)
-            mstore_seq.append(exp)
+            exp = generate_sstore_mstore(ctx, instructions[x],ins_list,source_stack,len(instructions)-x,simplification)
+            ctx.mstore_seq.append(exp)
 
     last_sload = ""
-    sstores = list(sstore_seq)
+    sstores = list(ctx.sstore_seq)
     last_mload = ""
-    mstores = list(mstore_seq)
+    mstores = list(ctx.mstore_seq)
     
-    storage_order = []
-    memory_order = []
+    ctx.storage_order = []
+    ctx.memory_order = []
 
     extra_dep_info_ins2int = {}
     extra_dep_info_ins2int_sto = {}
@@ -2022,36 +1770,36 @@ def generate_storage_info(instructions,source_stack,opcodes,simplification=True)
         
         if instructions[x].find("sload")!=-1:
             ins_list = [] if x == 0 else instructions[x-1::-1]
-            exp,r = generate_sload_mload(instructions[x],ins_list,source_stack,len(instructions)-x,simplification)
+            exp,r = generate_sload_mload(ctx, instructions[x],ins_list,source_stack,len(instructions)-x,simplification)
             last_sload = exp
-            storage_order.append(r)
-            extra_dep_info_ins2int_sto[opcodes_idx] = (r,len(storage_order)-1)
+            ctx.storage_order.append(r)
+            extra_dep_info_ins2int_sto[opcodes_idx] = (r,len(ctx.storage_order)-1)
             
         elif instructions[x].find("sstore")!=-1: #and last_sload != "" and sload_relative_pos.get(last_sload,[])==[]:
             sload_relative_pos[last_sload]=sstores.pop(0)
-            storage_order.append(sload_relative_pos[last_sload])
-            extra_dep_info_ins2int_sto[opcodes_idx] = (sload_relative_pos[last_sload],len(storage_order)-1)
+            ctx.storage_order.append(sload_relative_pos[last_sload])
+            extra_dep_info_ins2int_sto[opcodes_idx] = (sload_relative_pos[last_sload],len(ctx.storage_order)-1)
             
         elif instructions[x].find("mload")!=-1:
             ins_list = [] if x == 0 else instructions[x-1::-1]
-            exp,r = generate_sload_mload(instructions[x],ins_list,source_stack,len(instructions)-x,simplification)
+            exp,r = generate_sload_mload(ctx, instructions[x],ins_list,source_stack,len(instructions)-x,simplification)
             last_mload = exp
-            memory_order.append(r)
-            extra_dep_info_ins2int[opcodes_idx] = (r,len(memory_order)-1)
+            ctx.memory_order.append(r)
+            extra_dep_info_ins2int[opcodes_idx] = (r,len(ctx.memory_order)-1)
             
         elif instructions[x].find("mstore")!=-1: #and last_mload != "" and mload_relative_pos.get(last_mload,[])==[]:
             # print(instructions[x])
             # print("*/*/*/*/*/*/*/*/*/")
             mload_relative_pos[last_mload]=mstores.pop(0)
-            memory_order.append(mload_relative_pos[last_mload])
-            extra_dep_info_ins2int[opcodes_idx] = (mload_relative_pos[last_mload],len(memory_order)-1)
+            ctx.memory_order.append(mload_relative_pos[last_mload])
+            extra_dep_info_ins2int[opcodes_idx] = (mload_relative_pos[last_mload],len(ctx.memory_order)-1)
             
         elif instructions[x].find("keccak")!=-1 or instructions[x].find("sha3")!=-1:
             keccak = mstores.pop(0)
             keccak1 = sstores.pop(0)
-            memory_order.append(keccak)
-            storage_order.append(keccak)
-            extra_dep_info_ins2int[opcodes_idx] = (keccak,len(memory_order)-1)
+            ctx.memory_order.append(keccak)
+            ctx.storage_order.append(keccak)
+            extra_dep_info_ins2int[opcodes_idx] = (keccak,len(ctx.memory_order)-1)
 
         if x >= next_val:    
             if  opcodes[opcodes_idx].find("SWAP")!=-1:
@@ -2064,30 +1812,30 @@ def generate_storage_info(instructions,source_stack,opcodes,simplification=True)
                 if opcodes[opcodes_idx].find("POP")!=-1:
                     opcodes_idx+=1
     
-    if extra_dep_info != {}:
-        extra_dep_info["mem_deps_int2ins"] = extra_dep_info_ins2int
-        extra_dep_info["sto_deps_int2ins"] = extra_dep_info_ins2int_sto
+    if ctx.extra_dep_info != {}:
+        ctx.extra_dep_info["mem_deps_int2ins"] = extra_dep_info_ins2int
+        ctx.extra_dep_info["sto_deps_int2ins"] = extra_dep_info_ins2int_sto
 
-    if useless_info != []: #It deletes from memory_order de useless mstores
+    if ctx.useless_info != []: #It deletes from memory_order de useless mstores
         new_memory_order = []
         extra_deps_todelete = []
         
-        for i in range(len(memory_order)):
+        for i in range(len(ctx.memory_order)):
             for x in extra_dep_info_ins2int:
                 if i in extra_dep_info_ins2int[x]:
-                    if x not in useless_info:
-                        new_memory_order.append(memory_order[i])
+                    if x not in ctx.useless_info:
+                        new_memory_order.append(ctx.memory_order[i])
                     else:
-                        if extra_dep_info != {}:
+                        if ctx.extra_dep_info != {}:
                             extra_deps_todelete.append(i)
 
-        if extra_dep_info != {}:
+        if ctx.extra_dep_info != {}:
             for x in extra_deps_todelete[::-1]:
-                remove_extra_deps_info(x, "memory")
+                remove_extra_deps_info(ctx, x, "memory")
 
-        memory_order = new_memory_order
+        ctx.memory_order = new_memory_order
 
-    compute_memory_dependences(simplification)
+    compute_memory_dependences(ctx, simplification)
             
 def generate_source_stack_variables(idx):
     ss_list = []
@@ -2097,15 +1845,13 @@ def generate_source_stack_variables(idx):
     
     return ss_list
     
-def get_s_counter(source_stack,target_stack):
-    global s_counter
-
+def get_s_counter(ctx, source_stack,target_stack):
     max_ss = int(source_stack[0].strip()[2:-1]) if source_stack !=[] else -1
     max_ts = int(target_stack[0].strip()[2:-1]) if target_stack != [] else -1
 
-    s_counter = max(max_ss,max_ts)
-    s_counter+=1
-    return s_counter
+    ctx.s_counter = max(max_ss,max_ts)
+    ctx.s_counter+=1
+    return ctx.s_counter
 
 
 def compute_reverse_svar(var, max_idx):
@@ -2123,12 +1869,12 @@ def compute_reverse_svar(var, max_idx):
         
     return new_var
 
-def compute_vars_set(sstack,tstack):
+def compute_vars_set(ctx, sstack,tstack):
     vars_list = []
 
     vars_list = list(sstack)
 
-    for user_ins in user_defins:
+    for user_ins in ctx.user_defins:
         output_vars = user_ins["outpt_sk"]
         input_vars = user_ins["inpt_sk"]
         potential_vars = output_vars+input_vars+tstack
@@ -2157,10 +1903,10 @@ def recompute_vars_set(sstack,tstack,userdef,user_def_init):
     vars_list.sort()
     return vars_list
 
-def compute_target_stack(tstack):
+def compute_target_stack(ctx, tstack):
     new_vals = []
     for v in tstack:
-        new_vals.append(variable_content[v])
+        new_vals.append(ctx.variable_content[v])
 
     return new_vals
 
@@ -2182,12 +1928,9 @@ def compute_max_idx(max_ss,ss):
 
 
 
-def generate_sstore_info(sstore_elem):
-    global user_def_counter
-    global sstore_v_counter
-
+def generate_sstore_info(ctx, sstore_elem):
     obj = {}
-    idx  = user_def_counter.get("SSTORE",0)
+    idx  = ctx.user_def_counter.get("SSTORE",0)
 
     instr_name = "SSTORE"
     name = "SSTORE"+"_"+str(idx)
@@ -2214,27 +1957,24 @@ def generate_sstore_info(sstore_elem):
     obj["push"] = False
     obj["storage"] = True
     obj["size"] = get_ins_size(instr_name)
-    user_def_counter["SSTORE"]=idx+1
+    ctx.user_def_counter["SSTORE"]=idx+1
 
     return obj
 
-def generate_mstore_info(mstore_elem):
-    global user_def_counter
-    global mstore_v_counter
-
+def generate_mstore_info(ctx, mstore_elem):
     obj = {}
 
 
     if mstore_elem[0][-1].find("mstore8")!=-1:
-        idx  = user_def_counter.get("MSTORE8",0)
+        idx  = ctx.user_def_counter.get("MSTORE8",0)
         instr_name = "MSTORE8"
 
     elif mstore_elem[0][-1].find("mstoreImmutable")!=-1:
-        idx  = user_def_counter.get("ASSIGNIMMUTABLE",0)
+        idx  = ctx.user_def_counter.get("ASSIGNIMMUTABLE",0)
         instr_name = "ASSIGNIMMUTABLE"
         
     else:
-        idx  = user_def_counter.get("MSTORE",0)
+        idx  = ctx.user_def_counter.get("MSTORE",0)
         instr_name = "MSTORE"
             
     name = instr_name+"_"+str(idx)
@@ -2263,29 +2003,27 @@ def generate_mstore_info(mstore_elem):
     obj["storage"] = True
     
     if instr_name == "ASSIGNIMMUTABLE":
-        obj["value"] = assignImm_values[int(mstore_elem[0][-1].lstrip("mstoreImmutable"))]
+        obj["value"] = ctx.assignImm_values[int(mstore_elem[0][-1].lstrip("mstoreImmutable"))]
         
-    user_def_counter[instr_name]=idx+1
+    ctx.user_def_counter[instr_name]=idx+1
 
     return obj
 
 
-def modified_variables_userdefins(storage_ins):
-    global modified_userdef_vals
-    
-    for s in modified_userdef_vals.keys():
+def modified_variables_userdefins(ctx, storage_ins):
+    for s in ctx.modified_userdef_vals.keys():
         ins_lis = filter(lambda x: str(x[0][0]).find(s)!=-1,storage_ins)
         for x in ins_lis:
             pos = storage_ins.index(x)
             ins = storage_ins[pos]
-            new_ins =((modified_userdef_vals[s],ins[0][1],ins[0][-1]),ins[1])
+            new_ins =((ctx.modified_userdef_vals[s],ins[0][1],ins[0][-1]),ins[1])
             storage_ins[pos] = new_ins
 
         ins_lis = filter(lambda x: str(x[0][1]).find(s)!=-1,storage_ins)
         for x in ins_lis:
             pos = storage_ins.index(x)
             ins = storage_ins[pos]
-            new_ins =((ins[0][0],modified_userdef_vals[s],ins[0][-1]),ins[1])
+            new_ins =((ins[0][0],ctx.modified_userdef_vals[s],ins[0][-1]),ins[1])
             storage_ins[pos] = new_ins
     
 
@@ -2295,9 +2033,15 @@ def extend_mem_deps_with_subterm_relation(json_dict):
     with the relations of
     """
     # We include the subterms dependencies from memory instructions
-    instr_deps = instr_dependencies(json_dict)
     mem_accesses = [mem_instr["id"] for mem_instr in json_dict["user_instrs"] if mem_instr["storage"] or
                     "KECCAK" in mem_instr["disasm"] or "LOAD" in mem_instr["disasm"]]
+
+    # No dependency can be added with less than two accesses. networkx is only loaded otherwise
+    if len(mem_accesses) < 2:
+        return json_dict
+
+    import networkx as nx
+    instr_deps = instr_dependencies(json_dict)
     instr_deps_graph = nx.from_dict_of_lists(instr_deps, nx.DiGraph)
 
     for i, access1 in enumerate(mem_accesses):
@@ -2314,12 +2058,7 @@ def extend_mem_deps_with_subterm_relation(json_dict):
     return json_dict
 
 
-def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,simplification = True):
-    global max_instr_size
-    global num_pops
-    global blocks_json_dict
-    global rule_applied
-    global rules_applied
+def generate_json(ctx, block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,simplification = True):
     split_by = False
 
 
@@ -2331,14 +2070,14 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
     new_ss = []
     new_ts = []
     
-    ts_aux = compute_target_stack(ts)
+    ts_aux = compute_target_stack(ctx, ts)
     
     for v in ss:
         new_v = compute_reverse_svar(v,max_ss_idx)
         new_ss.append(new_v)
 
-    if context_info != {}:
-        new_ss = modify_sstack_context_info(new_ss)
+    if ctx.context_info != {}:
+        new_ss = modify_sstack_context_info(ctx, new_ss)
         
     for v in ts_aux:
         new_v = compute_reverse_svar(v,max_ss_idx)
@@ -2350,28 +2089,28 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
             
     sto_objs = []
 
-    sstore_ins = list(filter(lambda x: x[0][-1].find("sstore")!=-1,storage_order))
+    sstore_ins = list(filter(lambda x: x[0][-1].find("sstore")!=-1,ctx.storage_order))
 
-    modified_variables_userdefins(sstore_ins)
+    modified_variables_userdefins(ctx, sstore_ins)
 
     for sto in sstore_ins:
-        x = generate_sstore_info(sto)
+        x = generate_sstore_info(ctx, sto)
         sto_objs.append(x)
 
     mem_objs = []
-    mstore_ins = list(filter(lambda x: x[0][-1].find("mstore")!=-1,memory_order))
+    mstore_ins = list(filter(lambda x: x[0][-1].find("mstore")!=-1,ctx.memory_order))
 
     
-    modified_variables_userdefins(mstore_ins)
+    modified_variables_userdefins(ctx, mstore_ins)
 
     
     
     for mem in mstore_ins:
-        x = generate_mstore_info(mem)
+        x = generate_mstore_info(ctx, mem)
         mem_objs.append(x)
 
         
-    all_user_defins = user_defins+sto_objs+mem_objs
+    all_user_defins = ctx.user_defins+sto_objs+mem_objs
         
             
     for user_ins in all_user_defins:
@@ -2385,13 +2124,13 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
 
     remove_vars=[]
 
-    vars_list = compute_vars_set(new_ss,new_ts)
+    vars_list = compute_vars_set(ctx, new_ss,new_ts)
 
     #Adding sstore seq
     
     if simplification:
-        new_user_defins,new_ts = apply_all_simp_rules(all_user_defins,vars_list,new_ts)
-        apply_all_comparison(new_user_defins,new_ts)
+        new_user_defins,new_ts = apply_all_simp_rules(ctx, all_user_defins,vars_list,new_ts)
+        apply_all_comparison(ctx, new_user_defins,new_ts)
     else:
         new_user_defins = all_user_defins
 
@@ -2400,7 +2139,7 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
 
     removed_instructions = list(filter(lambda x: x not in new_user_defins1,new_user_defins))    
     
-    update_storage_sequences(removed_instructions,simplification,max_ss_idx)
+    update_storage_sequences(ctx, removed_instructions,simplification,max_ss_idx)
 
     new_user_defins, new_ts = unify_all_user_defins(new_ts,new_user_defins1,vars_list)
     
@@ -2409,12 +2148,12 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
     # else:
     #     vars_list = recompute_vars_set(new_ss,new_ts,new_user_defins,opcodes_seq["non_inter"])
     
-    if context_info != {}:
-        new_ts, new_user_defins = modify_json_info_with_constancy(new_ts,new_user_defins)
+    if ctx.context_info != {}:
+        new_ts, new_user_defins = modify_json_info_with_constancy(ctx, new_ts,new_user_defins)
         
         if simplification:
-            new_user_defins,new_ts = apply_all_simp_rules(new_user_defins,vars_list,new_ts)
-            apply_all_comparison(new_user_defins,new_ts)
+            new_user_defins,new_ts = apply_all_simp_rules(ctx, new_user_defins,vars_list,new_ts)
+            apply_all_comparison(ctx, new_user_defins,new_ts)
         else:
             new_user_defins = all_user_defins
 
@@ -2422,7 +2161,7 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
 
         removed_instructions = list(filter(lambda x: x not in new_user_defins1,new_user_defins))
     
-        update_storage_sequences(removed_instructions,simplification,max_ss_idx)
+        update_storage_sequences(ctx, removed_instructions,simplification,max_ss_idx)
     
         new_user_defins, new_ts = unify_all_user_defins(new_ts,new_user_defins1,vars_list)
     
@@ -2440,7 +2179,7 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
 
     optimized_json(total_inpt_vars,new_ss,new_ts,remove_vars)
     
-    max_sk_sz_idx = max(len(vars_list),max_stack_size)
+    max_sk_sz_idx = max(len(vars_list),ctx.max_stack_size)
         
     for s in remove_vars:
         if s in vars_list:
@@ -2449,7 +2188,7 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
 
     not_used = get_not_used_stack_variables(new_ss,new_ts,total_inpt_vars)
     
-    if pop_flag :
+    if ctx.pop_flag :
         pop_instructions = generate_pops(not_used)
     else:
         pop_instructions = []
@@ -2457,11 +2196,11 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
     num = check_all_pops(new_ss, new_ts, new_user_defins)
 
     if num !=-1:
-        max_instr_size = num
-        num_pops = num
+        ctx.max_instr_size = num
+        ctx.num_pops = num
         
-    if not split_sto:
-        sto_dep, mem_dep = translate_dependences_sfs(new_user_defins)
+    if not ctx.split_sto:
+        sto_dep, mem_dep = translate_dependences_sfs(ctx, new_user_defins)
 
     else:
         sto_dep, mem_dep = [],[]
@@ -2469,15 +2208,15 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
     bound_comp = compute_vars(new_ts, new_ss, new_user_defins)
     stack_bound = min(max_sk_sz_idx-len(remove_vars),bound_comp)
 
-    if push_flag:
-        new_var_list, new_push_ins = transform_push_uninterpreted_functions(new_ts,new_user_defins)
+    if ctx.push_flag:
+        new_var_list, new_push_ins = transform_push_uninterpreted_functions(ctx, new_ts,new_user_defins)
         
     else:
         new_var_list = []
         new_push_ins = []
         
-    json_dict["init_progr_len"] = max_instr_size-discount_op
-    json_dict["max_progr_len"] = max_instr_size
+    json_dict["init_progr_len"] = ctx.max_instr_size-ctx.discount_op
+    json_dict["max_progr_len"] = ctx.max_instr_size
     json_dict["max_sk_sz"] = stack_bound #max_sk_sz_idx-len(remove_vars)
     json_dict["vars"] = vars_list+new_var_list
     json_dict["src_ws"] = new_ss
@@ -2487,11 +2226,11 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
     json_dict["storage_dependences"] = [list(dep) for dep in sto_dep]
     json_dict["memory_dependences"]= [list(dep) for dep in mem_dep]
     json_dict["dependencies"] = [*json_dict["storage_dependences"], *json_dict["memory_dependences"]]
-    json_dict["is_revert"]= True if revert_flag else False
-    json_dict["rules_applied"] = rule_applied
-    json_dict["rules"] = list(filter(lambda x: x != "", rules_applied))
+    json_dict["is_revert"]= True if ctx.revert_flag else False
+    json_dict["rules_applied"] = ctx.rule_applied
+    json_dict["rules"] = list(filter(lambda x: x != "", ctx.rules_applied))
     
-    json_dict["original_instrs"] = " ".join(original_ins)
+    json_dict["original_instrs"] = " ".join(ctx.original_ins)
     json_dict = extended_json_with_minlength(json_dict)
     json_dict = extend_mem_deps_with_subterm_relation(json_dict)
 
@@ -2507,25 +2246,26 @@ def generate_json(block_name,ss,ts,max_ss_idx1,gas,opcodes_seq,subblock = None,s
         block_nm = block_name + "_0"
 
         
-    if rule_applied:
+    if ctx.rule_applied:
         msg = "SFS with rule: "+block_nm + "_input.json"
-        check_and_print_debug_info(debug, msg)
+        check_and_print_debug_info(ctx.debug, msg)
 
     if ((max_sk_sz_idx-len(remove_vars)) > bound_comp):
         msg = "MEJORADO: "+paths.json_path+"/"+ block_nm + "_input.json --- "+str((max_sk_sz_idx, bound_comp))
-        check_and_print_debug_info(debug, msg)
+        check_and_print_debug_info(ctx.debug, msg)
         # print("MEJORADO: "+paths.json_path+"/"+ block_nm + "_input.json --- "+str((max_sk_sz_idx, bound_comp)))
         
-    blocks_json_dict[block_nm] = json_dict
+    ctx.blocks_json_dict[block_nm] = json_dict
 
-    if "jsons" not in os.listdir(paths.gasol_path):
-        os.mkdir(paths.json_path)
+    # The SFS is only stored as a file if the intermediate files are kept
+    if ctx.keep_files:
+        os.makedirs(paths.json_path, exist_ok=True)
 
-    with open(paths.json_path+"/"+ block_nm + "_input.json","w") as json_file:
-        json.dump(json_dict, json_file, indent=4)
+        with open(paths.json_path+"/"+ block_nm + "_input.json","w") as json_file:
+            json.dump(json_dict, json_file, indent=4)
 
     # print(paths.json_path+"/"+ block_nm + "_input.json")
-    rule_applied = False
+    ctx.rule_applied = False
     
     return split_by,""
 
@@ -2561,19 +2301,19 @@ def optimized_json(inpt_vars,ss,ts,remove_vars):
             end = True
         i-=1
 
-def build_initblock_userdef(u_var,args_exp,arity_exp):
+def build_initblock_userdef(ctx, u_var,args_exp,arity_exp):
     if arity_exp ==0 or arity_exp == 1:
         funct = args_exp[1]
         args = args_exp[0]
 
-        is_new, obj = generate_userdefname(u_var,funct,[args],arity_exp,True)
+        is_new, obj = generate_userdefname(ctx, u_var,funct,[args],arity_exp,True)
                 
         return [obj]
             
     elif arity_exp == 2:
         funct = args_exp[2]
         args = [args_exp[0],args_exp[1]]
-        is_new, obj = generate_userdefname(u_var,funct,args,arity_exp,True)
+        is_new, obj = generate_userdefname(ctx, u_var,funct,args,arity_exp,True)
         return [obj]
     
     elif arity_exp == 3:
@@ -2581,9 +2321,9 @@ def build_initblock_userdef(u_var,args_exp,arity_exp):
 
         if funct == "+" or funct == "*":
             
-            new_uvar = create_new_svar()
+            new_uvar = create_new_svar(ctx)
             args01 = [args_exp[0],args_exp[1]]
-            is_new, obj = generate_userdefname(new_uvar,funct,args01,arity_exp,True)
+            is_new, obj = generate_userdefname(ctx, new_uvar,funct,args01,arity_exp,True)
             
             funct = "%"
             if not is_new:
@@ -2593,13 +2333,13 @@ def build_initblock_userdef(u_var,args_exp,arity_exp):
                 
             args = [u_var_aux,args_exp[2]]
 
-            is_new, obj1 = generate_userdefname(u_var,funct,args,arity_exp,True)
+            is_new, obj1 = generate_userdefname(ctx, u_var,funct,args,arity_exp,True)
             
             return [obj, obj1]
         else:
 
             args = [args_exp[0],args_exp[1],args_exp[2]]
-            is_new, obj = generate_userdefname(u_var,funct,args,arity_exp,True)
+            is_new, obj = generate_userdefname(ctx, u_var,funct,args,arity_exp,True)
             
             return [obj]
     else:
@@ -2608,23 +2348,18 @@ def build_initblock_userdef(u_var,args_exp,arity_exp):
         for v in args_exp[:-1]:
             args.append(v)
             
-        is_new, obj = generate_userdefname(u_var,funct,args,arity_exp,True)
+        is_new, obj = generate_userdefname(ctx, u_var,funct,args,arity_exp,True)
 
         return [obj]
 
         
-def build_userdef_instructions():
-    global user_defins
-    global already_defined_userdef
-    global modified_userdef_vals
-
-    
-    already_defined_userdef = []
+def build_userdef_instructions(ctx):
+    ctx.already_defined_userdef = []
     
-    u_dict_sort = sorted(u_dict.keys())
+    u_dict_sort = sorted(ctx.u_dict.keys())
     
     for u_var in u_dict_sort:
-        exp = u_dict[u_var]
+        exp = ctx.u_dict[u_var]
         arity_exp = exp[1]
         args_exp = exp[0]
 
@@ -2632,45 +2367,45 @@ def build_userdef_instructions():
             funct = args_exp[1]
             args = args_exp[0]
 
-            is_new, obj = generate_userdefname(u_var,funct,[args],arity_exp)
+            is_new, obj = generate_userdefname(ctx, u_var,funct,[args],arity_exp)
 
             
             if not is_new and funct.find("timestamp")==-1 and funct.find("returndatasize")==-1 and funct.find("gas")==-1:
-                if not split_sto and funct.find("sload")==-1 and funct.find("mload")==-1:
-                    user_defins.append(obj)
+                if not ctx.split_sto and funct.find("sload")==-1 and funct.find("mload")==-1:
+                    ctx.user_defins.append(obj)
                 else:
-                    modified_svariable(u_var, obj["outpt_sk"][0])
-                    modified_userdef_vals[u_var] = obj["outpt_sk"][0]
+                    modified_svariable(ctx, u_var, obj["outpt_sk"][0])
+                    ctx.modified_userdef_vals[u_var] = obj["outpt_sk"][0]
             else:
-                user_defins.append(obj)
+                ctx.user_defins.append(obj)
             
         elif arity_exp == 2:
             funct = args_exp[2]
             args = [args_exp[0],args_exp[1]]
-            is_new, obj = generate_userdefname(u_var,funct,args,arity_exp)
+            is_new, obj = generate_userdefname(ctx, u_var,funct,args,arity_exp)
 
             
             if not is_new:
-                modified_svariable(u_var, obj["outpt_sk"][0])
-                modified_userdef_vals[u_var] = obj["outpt_sk"][0]
+                modified_svariable(ctx, u_var, obj["outpt_sk"][0])
+                ctx.modified_userdef_vals[u_var] = obj["outpt_sk"][0]
             else:
-                user_defins.append(obj)
+                ctx.user_defins.append(obj)
 
         elif arity_exp == 3:
             funct = args_exp[3]
 
             if funct == "+" or funct == "*":
             
-                new_uvar = create_new_svar()
+                new_uvar = create_new_svar(ctx)
                 args01 = [args_exp[0],args_exp[1]]
-                is_new, obj = generate_userdefname(new_uvar,funct,args01,arity_exp)
+                is_new, obj = generate_userdefname(ctx, new_uvar,funct,args01,arity_exp)
 
                 if not is_new:
-                    modified_svariable(new_uvar, obj["outpt_sk"][0])
-                    modified_userdef_vals[new_uvar] = obj["outpt_sk"][0]
+                    modified_svariable(ctx, new_uvar, obj["outpt_sk"][0])
+                    ctx.modified_userdef_vals[new_uvar] = obj["outpt_sk"][0]
                     
                 else:
-                    user_defins.append(obj)
+                    ctx.user_defins.append(obj)
 
                 funct = "%"
                 if not is_new:
@@ -2680,37 +2415,37 @@ def build_userdef_instructions():
                 
                 args = [u_var_aux,args_exp[2]]
 
-                is_new, obj = generate_userdefname(u_var,funct,args,arity_exp)
+                is_new, obj = generate_userdefname(ctx, u_var,funct,args,arity_exp)
 
                 if not is_new:
-                    modified_svariable(new_uvar, obj["outpt_sk"][0])
-                    modified_userdef_vals[new_uvar] = obj["outpt_sk"][0]
+                    modified_svariable(ctx, new_uvar, obj["outpt_sk"][0])
+                    ctx.modified_userdef_vals[new_uvar] = obj["outpt_sk"][0]
                 else:
-                    user_defins.append(obj)
+                    ctx.user_defins.append(obj)
 
             else:
 
                 args = [args_exp[0],args_exp[1],args_exp[2]]
-                is_new, obj = generate_userdefname(u_var,funct,args,arity_exp)
+                is_new, obj = generate_userdefname(ctx, u_var,funct,args,arity_exp)
 
                 if not is_new:
-                    modified_svariable(u_var, obj["outpt_sk"][0])
-                    modified_userdef_vals[u_var] = obj["outpt_sk"][0]
+                    modified_svariable(ctx, u_var, obj["outpt_sk"][0])
+                    ctx.modified_userdef_vals[u_var] = obj["outpt_sk"][0]
                 else:
-                    user_defins.append(obj)
+                    ctx.user_defins.append(obj)
         else:
             funct = args_exp[-1]
             args = []
             for v in args_exp[:-1]:
                 args.append(v)
 
-            is_new, obj = generate_userdefname(u_var,funct,args,arity_exp)
+            is_new, obj = generate_userdefname(ctx, u_var,funct,args,arity_exp)
 
             if not is_new:
-                modified_svariable(u_var, obj["outpt_sk"][0])
-                modified_userdef_vals[u_var] = obj["outpt_sk"][0]
+                modified_svariable(ctx, u_var, obj["outpt_sk"][0])
+                ctx.modified_userdef_vals[u_var] = obj["outpt_sk"][0]
             else:
-                user_defins.append(obj)
+                ctx.user_defins.append(obj)
 
 
 def funct_to_opcode(funct: str) -> Optional[str]:
@@ -2922,23 +2657,21 @@ def funct_to_opcode(funct: str) -> Optional[str]:
 
     return instr_name
 
-def generate_userdefname(u_var,funct,args,arity,init=False):
-    global user_def_counter
-    global already_defined_userdef
+def generate_userdefname(ctx, u_var,funct,args,arity,init=False):
 
     #TODO: Add more opcodes
     instr_name = funct_to_opcode(funct)
     
-    if instr_name in already_defined_userdef:
-        if not split_sto and not init and instr_name in ["SLOAD","MLOAD","KECCAK256","SHA3"]:
+    if instr_name in ctx.already_defined_userdef:
+        if not ctx.split_sto and not init and instr_name in ["SLOAD","MLOAD","KECCAK256","SHA3"]:
             defined = -1
         else:
-            defined = check_inputs(instr_name,args)
+            defined = check_inputs(ctx, instr_name,args)
     else:
         defined = -1
 
         # if instr_name not in ["PUSH [tag]","PUSH #[$]","PUSH [$]","PUSH data"]:
-        already_defined_userdef.append(instr_name)
+        ctx.already_defined_userdef.append(instr_name)
             
     if defined == -1:
         obj = {}
@@ -2950,7 +2683,7 @@ def generate_userdefname(u_var,funct,args,arity,init=False):
         if funct == args: #0-ary functions
             name = instr_name
         else:
-            idx = user_def_counter.get(instr_name,0)    
+            idx = ctx.user_def_counter.get(instr_name,0)    
             name = instr_name+"_"+str(idx)
 
         args_aux = []
@@ -2972,7 +2705,7 @@ def generate_userdefname(u_var,funct,args,arity,init=False):
         obj["storage"] = False #It is true only for MSTORE and SSTORE
         if instr_name in ["PUSH [tag]","PUSH #[$]","PUSH [$]","PUSH data","PUSHIMMUTABLE","PUSHLIB"]:
             obj["value"] = args_aux
-        user_def_counter[instr_name]=idx+1
+        ctx.user_def_counter[instr_name]=idx+1
         obj["size"] = get_ins_size(instr_name)
         
         new = True
@@ -2997,35 +2730,30 @@ def process_opcode(result):
         op_val = "0"+str(op_val)
     return op_val
 
-def modified_svariable(old_uvar, new_uvar):
-    global s_dict
-    global u_dict
-    global variable_content
-    global user_defins
-    
-    for s_var in s_dict.keys():
-        if str(s_dict[s_var]).find(old_uvar)!=-1:
-            s_dict[s_var] = new_uvar
+def modified_svariable(ctx, old_uvar, new_uvar):
+    for s_var in ctx.s_dict.keys():
+        if str(ctx.s_dict[s_var]).find(old_uvar)!=-1:
+            ctx.s_dict[s_var] = new_uvar
 
-    for u_var in u_dict.keys():
-        pos = old_uvar in u_dict[u_var][0]
+    for u_var in ctx.u_dict.keys():
+        pos = old_uvar in ctx.u_dict[u_var][0]
         if pos:
-            elems = list(u_dict[u_var][0])
+            elems = list(ctx.u_dict[u_var][0])
             pos_var = elems.index(old_uvar)
             elems[pos_var] = new_uvar
-            new_val = (tuple(elems),u_dict[u_var][1])
-            u_dict[u_var] = new_val
+            new_val = (tuple(elems),ctx.u_dict[u_var][1])
+            ctx.u_dict[u_var] = new_val
             
-    for v_var in variable_content.keys():
-        if str(variable_content[v_var]).find(old_uvar)!=-1:
-            variable_content[v_var] = new_uvar
+    for v_var in ctx.variable_content.keys():
+        if str(ctx.variable_content[v_var]).find(old_uvar)!=-1:
+            ctx.variable_content[v_var] = new_uvar
 
-    for uf in user_defins:
+    for uf in ctx.user_defins:
         if old_uvar in uf["inpt_sk"]:
             pos = uf["inpt_sk"].index(old_uvar)
             uf["inpt_sk"][pos] = new_uvar
         
-def check_inputs(instr_name,args_aux):
+def check_inputs(ctx, instr_name,args_aux):
     
     args = []
     for a in args_aux:
@@ -3035,7 +2763,7 @@ def check_inputs(instr_name,args_aux):
             args.append(a)
             
     
-    for elem in user_defins:
+    for elem in ctx.user_defins:
         name = elem["disasm"]
         if name == instr_name and name not in ["PUSH [tag]","PUSH #[$]","PUSH [$]","PUSH data","PUSHIMMUTABLE","PUSHLIB"]:
             input_variables = elem["inpt_sk"]
@@ -3123,12 +2851,7 @@ def is_optimizable(opcode_instructions,instructions):
     else:
         return False
 
-def translate_block(rule,instructions,opcodes,isolated,sub_block_name,simp):
-    global max_instr_size
-    global max_stack_size
-    global num_pops
-    global gas_t
-    
+def translate_block(ctx, rule,instructions,opcodes,isolated,sub_block_name,simp):
     source_stack_idx = get_stack_variables(rule)   
     
     if not isolated: 
@@ -3144,19 +2867,19 @@ def translate_block(rule,instructions,opcodes,isolated,sub_block_name,simp):
         guards_op = []
         
     if "nop(JUMP)" in opcodes or "nop(JUMPI)" in opcodes:
-        max_instr_size = len(opcodes)-num_guard-1
+        ctx.max_instr_size = len(opcodes)-num_guard-1
     else:
-        max_instr_size = len(opcodes)-num_guard
+        ctx.max_instr_size = len(opcodes)-num_guard
 
-    max_instr_size = compute_max_program_len(opcodes, num_guard)
+    ctx.max_instr_size = compute_max_program_len(opcodes, num_guard)
     
     if not isolated:
         pops = list(filter(lambda x: x.find("nop(POP)")!=-1,opcodes))
-        num_pops = len(pops)
+        ctx.num_pops = len(pops)
         x = list(filter(lambda x: (x.find("POP")==-1) and (x.find("JUMPDEST")==-1) and (x.find("JUMP")==-1)and(x.find("JUMPI")==-1),opcodes))
-        if x == [] and num_pops >0:
+        if x == [] and ctx.num_pops >0:
 
-            t_vars_idx = source_stack_idx-num_pops
+            t_vars_idx = source_stack_idx-ctx.num_pops
             seq = range(0,t_vars_idx)
             t_vars = list(map(lambda x: "s("+str(x)+")",seq))[::-1]
             
@@ -3166,21 +2889,21 @@ def translate_block(rule,instructions,opcodes,isolated,sub_block_name,simp):
         t_vars = generate_target_stack_idx(source_stack_idx,opcodes)[::-1]
 
     pops = list(filter(lambda x: x.find("nop(POP)")!=-1,opcodes))
-    num_pops = len(pops)
+    ctx.num_pops = len(pops)
 
     source_stack = generate_source_stack_variables(source_stack_idx)
-    get_s_counter(source_stack,t_vars)
+    get_s_counter(ctx, source_stack,t_vars)
 
-    generate_encoding(instructions,t_vars,source_stack,opcodes,simp)
+    generate_encoding(ctx, instructions,t_vars,source_stack,opcodes,simp)
     
-    build_userdef_instructions()
+    build_userdef_instructions(ctx)
 
     gas = get_block_cost(opcodes,len(guards_op))
-    max_stack_size = max_idx_used(instructions,t_vars)
+    ctx.max_stack_size = max_idx_used(instructions,t_vars)
 
-    if  gas!=0 and not is_identity_map(source_stack,t_vars,instructions):
+    if  gas!=0 and not is_identity_map(ctx, source_stack,t_vars,instructions):
        
-        gas_t+=get_cost(original_opcodes)
+        ctx.gas_t+=get_cost(ctx.original_opcodes)
         
         new_opcodes = compute_opcodes2write(opcodes,num_guard)
 
@@ -3189,8 +2912,8 @@ def translate_block(rule,instructions,opcodes,isolated,sub_block_name,simp):
         #     init_info = get_encoding_init_block(rule.get_instructions()[index:fin+1],source_stack)
         # else:
         init_info = {}
-        generate_json(sub_block_name,source_stack,t_vars,source_stack_idx-1,gas, init_info,simplification = simp)
-        if simp:
+        generate_json(ctx, sub_block_name,source_stack,t_vars,source_stack_idx-1,gas, init_info,simplification = simp)
+        if simp and ctx.keep_files:
             write_instruction_block(sub_block_name,new_opcodes)
 
 
@@ -3209,12 +2932,9 @@ def compute_opcodes2write(opcodes,num_guard):
 
     return new_opcodes
         
-def generate_subblocks(rule,list_subblocks,isolated,sub_block_name,simplification):
-    global gas_t
-    global revert_flag
-
-    prev_revert_flag = revert_flag
-    revert_flag = False
+def generate_subblocks(ctx, rule,list_subblocks,isolated,sub_block_name,simplification):
+    prev_revert_flag = ctx.revert_flag
+    ctx.revert_flag = False
     
     source_stack_idx = get_stack_variables(rule)
     source_stack = generate_source_stack_variables(source_stack_idx)
@@ -3225,7 +2945,7 @@ def generate_subblocks(rule,list_subblocks,isolated,sub_block_name,simplificatio
     pops2remove = 0
     while(i < len(list_subblocks)-1):
 
-        init_globals()
+        ctx.reset_block_state()
         block = list_subblocks[i]
         nop_instr = block[-1]
         last_instr = block[-2]
@@ -3235,7 +2955,7 @@ def generate_subblocks(rule,list_subblocks,isolated,sub_block_name,simplificatio
         seq = range(ts_idx,-1,-1)
         target_stack = list(map(lambda x: "s("+str(x)+")",seq))
 
-        new_nexts, pops2remove = translate_subblock(rule,block,source_stack,target_stack,source_stack_idx,i,list_subblocks[i+1],sub_block_name,simplification,pops2remove)
+        new_nexts, pops2remove = translate_subblock(ctx, rule,block,source_stack,target_stack,source_stack_idx,i,list_subblocks[i+1],sub_block_name,simplification,pops2remove)
 
         if new_nexts == []:
         #We update the source stack for the new block
@@ -3259,20 +2979,14 @@ def generate_subblocks(rule,list_subblocks,isolated,sub_block_name,simplificatio
 
     block = instrs[2:]
     if block != []:
-        revert_flag = prev_revert_flag
-        translate_last_subblock(rule,block,source_stack,source_stack_idx,i,isolated,sub_block_name,simplification,pops2remove)
+        ctx.revert_flag = prev_revert_flag
+        translate_last_subblock(ctx, rule,block,source_stack,source_stack_idx,i,isolated,sub_block_name,simplification,pops2remove)
 
-    if compute_gast:
-        gas_t+=get_cost(original_opcodes)
+    if ctx.compute_gast:
+        ctx.gas_t+=get_cost(ctx.original_opcodes)
 
     
-def translate_subblock(rule,instrs,sstack,tstack,sstack_idx,idx,next_block,sub_block_name,simp,prev_pops):
-    global max_instr_size
-    global max_stack_size
-    global num_pops
-    global compute_gast
-    global original_ins
-    
+def translate_subblock(ctx, rule,instrs,sstack,tstack,sstack_idx,idx,next_block,sub_block_name,simp,prev_pops):
     if idx == 0:
         instructions = instrs[:-2]
     else:
@@ -3282,24 +2996,24 @@ def translate_subblock(rule,instrs,sstack,tstack,sstack_idx,idx,next_block,sub_b
     instr = list(filter(lambda x: x!="" and x.find("skip")==-1, rbr_ins_aux))
     
     opcodes = list(filter(lambda x: x.find("nop(")!=-1,instructions))
-    max_instr_size = compute_max_program_len(opcodes, 0)
+    ctx.max_instr_size = compute_max_program_len(opcodes, 0)
 
     
     pops = list(filter(lambda x: x.find("nop(POP)")!=-1,opcodes))
-    num_pops = len(pops)
+    ctx.num_pops = len(pops)
 
     new_nexts = []
     
     if instr!=[]:
-        get_s_counter(sstack,tstack)
+        get_s_counter(ctx, sstack,tstack)
         
-        generate_encoding(instr,tstack,sstack,opcodes,simp)
-        build_userdef_instructions()
+        generate_encoding(ctx, instr,tstack,sstack,opcodes,simp)
+        build_userdef_instructions(ctx)
         gas = get_block_cost(opcodes,0)
-        max_stack_size = max_idx_used(instructions,tstack)
+        ctx.max_stack_size = max_idx_used(instructions,tstack)
         pops2remove = 0
-        if max_stack_size!=0 and gas !=0 and not is_identity_map(sstack,tstack,instructions):
-            compute_gast = True
+        if ctx.max_stack_size!=0 and gas !=0 and not is_identity_map(ctx, sstack,tstack,instructions):
+            ctx.compute_gast = True
             new_tstack,new_nexts = tstack,[] #optimize_splitpop_block(tstack,sstack,next_block,opcodes)
             # if new_nexts != []:
             #     pops2remove = new_nexts[2]
@@ -3308,7 +3022,7 @@ def translate_subblock(rule,instrs,sstack,tstack,sstack_idx,idx,next_block,sub_b
 
             new_opcodes = compute_opcodes2write(opcodes,0)
             new_ops = list(map(lambda x: x[4:-1],new_opcodes))
-            original_ins = new_ops
+            ctx.original_ins = new_ops
 
             # if not simp:
             #     index, fin = find_sublist(instructions,new_opcodes)
@@ -3319,8 +3033,8 @@ def translate_subblock(rule,instrs,sstack,tstack,sstack_idx,idx,next_block,sub_b
             if prev_pops != 0:
                 gas = gas+2*prev_pops
                 
-            generate_json(sub_block_name,sstack,new_tstack,sstack_idx,gas,init_info,subblock=idx,simplification = simp)
-            if simp:
+            generate_json(ctx, sub_block_name,sstack,new_tstack,sstack_idx,gas,init_info,subblock=idx,simplification = simp)
+            if simp and ctx.keep_files:
                 write_instruction_block(sub_block_name, new_opcodes,subblock=idx)
             
         return new_nexts, pops2remove
@@ -3329,10 +3043,10 @@ def translate_subblock(rule,instrs,sstack,tstack,sstack_idx,idx,next_block,sub_b
 
             
 
-def optimize_splitpop_block(tstack,source_stack,next_block,opcodes):
+def optimize_splitpop_block(ctx, tstack,source_stack,next_block,opcodes):
     
     i = 0
-    target_stack = compute_target_stack(tstack)
+    target_stack = compute_target_stack(ctx, tstack)
     opcodes_next_total = list(filter(lambda x: x.find("nop(")!=-1,next_block))
     split_opcode = opcodes_next_total[0]
     opcodes_next = opcodes_next_total[1:]
@@ -3398,14 +3112,8 @@ def modify_next_block(next_block,pops2remove):
     return new_nextblock,idx2-pops2remove
     
     
-def translate_last_subblock(rule,block,sstack,sstack_idx,idx,isolated,block_name,simp, prev_pops):
-    global max_instr_size
-    global max_stack_size
-    global num_pops
-    global compute_gast
-    global original_ins
-    
-    init_globals()
+def translate_last_subblock(ctx, rule,block,sstack,sstack_idx,idx,isolated,block_name,simp, prev_pops):
+    ctx.reset_block_state()
     
     if not isolated:
         if "nop(JUMPI)" in block:
@@ -3424,20 +3132,20 @@ def translate_last_subblock(rule,block,sstack,sstack_idx,idx,isolated,block_name
 
     
     opcodes = list(filter(lambda x: x.find("nop(")!=-1,block))
-    max_instr_size = compute_max_program_len(opcodes, num_guard)
+    ctx.max_instr_size = compute_max_program_len(opcodes, num_guard)
     
     if opcodes != []:
 
         pops = list(filter(lambda x: x.find("nop(POP)")!=-1,opcodes))
-        num_pops = len(pops)
+        ctx.num_pops = len(pops)
         
         if not isolated:
 
             x = list(filter(lambda x: (x.find("POP")==-1) and (x.find("JUMPDEST")==-1) and (x.find("JUMP")==-1)and(x.find("JUMPI")==-1),opcodes))
 
-            if x == [] and num_pops >0:
-                t_vars_idx = sstack_idx-num_pops+1
-                if t_vars_idx == sstack_idx and num_pops>0:
+            if x == [] and ctx.num_pops >0:
+                t_vars_idx = sstack_idx-ctx.num_pops+1
+                if t_vars_idx == sstack_idx and ctx.num_pops>0:
                     t_vars_idx-=1
                 seq = range(0,t_vars_idx)
                 tstack = list(map(lambda x: "s("+str(x)+")",seq))[::-1]
@@ -3448,7 +3156,7 @@ def translate_last_subblock(rule,block,sstack,sstack_idx,idx,isolated,block_name
         else:
             
             tstack = generate_target_stack_idx(len(sstack),opcodes)[::-1]
-        get_s_counter(sstack,tstack)
+        get_s_counter(ctx, sstack,tstack)
 
         if idx is not None:
             block_nm = block_name + "_" + str(idx)
@@ -3457,19 +3165,19 @@ def translate_last_subblock(rule,block,sstack,sstack_idx,idx,isolated,block_name
 
 
         msg = paths.json_path+"/"+ block_nm + "_input.json"
-        check_and_print_debug_info(debug, msg)
+        check_and_print_debug_info(ctx.debug, msg)
 
-        generate_encoding(instructions,tstack,sstack,opcodes,simp)
+        generate_encoding(ctx, instructions,tstack,sstack,opcodes,simp)
     
-        build_userdef_instructions()
+        build_userdef_instructions(ctx)
         gas = get_block_cost(opcodes,len(guards_op))
-        max_stack_size = max_idx_used(instructions,tstack)
-        if gas!=0 and not is_identity_map(sstack,tstack,instructions):
-            compute_gast = True
+        ctx.max_stack_size = max_idx_used(instructions,tstack)
+        if gas!=0 and not is_identity_map(ctx, sstack,tstack,instructions):
+            ctx.compute_gast = True
             new_opcodes = compute_opcodes2write(opcodes,num_guard)
             new_ops = list(map(lambda x: x[4:-1],new_opcodes))
 
-            original_ins = new_ops
+            ctx.original_ins = new_ops
             
             # if not simp:
             #     index, fin = find_sublist(block,new_opcodes)
@@ -3480,8 +3188,8 @@ def translate_last_subblock(rule,block,sstack,sstack_idx,idx,isolated,block_name
             if prev_pops!=0:
                 gas+=2*prev_pops
                 
-            generate_json(block_name,sstack,tstack,sstack_idx,gas,init_info,subblock=idx,simplification = simp)
-            if simp:
+            generate_json(ctx, block_name,sstack,tstack,sstack_idx,gas,init_info,subblock=idx,simplification = simp)
+            if simp and ctx.keep_files:
                 write_instruction_block(block_name,new_opcodes,subblock=idx)
     
 def get_new_source_stack(instr,nop_instr,idx):
@@ -3591,9 +3299,7 @@ def split_terminal_block(rule):
     
     return blocks
 
-def generate_terminal_subblocks(rule,list_subblocks):
-    global gas_t
-    
+def generate_terminal_subblocks(ctx, rule,list_subblocks):
     source_stack_idx = get_stack_variables(rule)
     source_stack = generate_source_stack_variables(source_stack_idx)
 
@@ -3602,7 +3308,7 @@ def generate_terminal_subblocks(rule,list_subblocks):
 
     pops2remove = 0
     while(i < len(list_subblocks)-1):
-        init_globals()
+        ctx.reset_block_state()
         block = list_subblocks[i]
         
         nop_instr = block[-1]
@@ -3613,7 +3319,7 @@ def generate_terminal_subblocks(rule,list_subblocks):
         target_stack = list(map(lambda x: "s("+str(x)+")",seq))
         
 
-        new_nexts,pops2remove = translate_subblock(rule,block,source_stack,target_stack,source_stack_idx,i,list_subblocks[i+1], pops2remove)
+        new_nexts,pops2remove = translate_subblock(ctx, rule,block,source_stack,target_stack,source_stack_idx,i,list_subblocks[i+1], pops2remove)
 
         if new_nexts == []:
 
@@ -3627,12 +3333,12 @@ def generate_terminal_subblocks(rule,list_subblocks):
             source_stack = list(map(lambda x: "s("+str(x)+")",seq))
 
         i+=1
-    if compute_gast:
-        gas_t+=get_cost(original_opcodes)
+    if ctx.compute_gast:
+        ctx.gas_t+=get_cost(ctx.original_opcodes)
         
-def translate_terminal_block(rule):
+def translate_terminal_block(ctx, rule):
     blocks = split_terminal_block(rule)
-    generate_terminal_subblocks(rule,blocks)
+    generate_terminal_subblocks(ctx, rule,blocks)
 
         
 def write_instruction_block(rule_name,opcodes,subblock = None):
@@ -3643,8 +3349,7 @@ def write_instruction_block(rule_name,opcodes,subblock = None):
 
     op = list(map(lambda x: x[4:-1],opcodes))
     
-    if "disasms" not in os.listdir(paths.gasol_path):
-        os.mkdir(paths.gasol_path+"/disasms")
+    os.makedirs(paths.gasol_path+"/disasms", exist_ok=True)
     
     byte_file =  open(paths.gasol_path+"/disasms/" + block_nm+".disasm","w")
     for e in op:
@@ -3697,46 +3402,25 @@ def compute_max_program_len(opcodes, num_guard,block = None):
     return len(new_opcodes)
     
 
-def smt_translate_block(rule,file_name,block_name,immutable_dict,simplification=True,storage = False, size = False, part = False, pop = False, push = False, revert = False,extra_dependences_info={},extra_opt_info= {}, debug_info = False):
-    global s_counter
-    global max_instr_size
-    global int_not0
-    global source_name
-    global blocks_json_dict
-    global sfs_contracts
-    global split_sto
-    global original_ins
-    global max_l
-    global size_flag
-    global pop_flag
-    global push_flag
-    global revert_flag
-    global assignImm_values
-    global debug
-    global non_aliasing_disabled
-    
-    init_globals()
-    
+def smt_translate_block(ctx, rule,file_name,block_name,immutable_dict,simplification=True,storage = False, size = False, part = False, pop = False, push = False, revert = False,extra_dependences_info={},extra_opt_info= {}, debug_info = False):
     if storage:
-        split_sto = True
+        ctx.split_sto = True
         constants.append_store_instructions_to_split()
 
-    size_flag = size
-    pop_flag = pop
-    push_flag = push
-    revert_flag = revert
-    assignImm_values = immutable_dict
-    debug = debug_info
-            
-    sfs_contracts = {}
+    ctx.size_flag = size
+    ctx.pop_flag = pop
+    ctx.push_flag = push
+    ctx.revert_flag = revert
+    ctx.assignImm_values = immutable_dict
+    ctx.debug = debug_info
 
-    blocks_json_dict = {}
+    ctx.blocks_json_dict = {}
     
     info_deploy = []
 
-    source_name = file_name
+    ctx.source_name = file_name
 
-    int_not0 = [-1+2**256]#map(lambda x: -1+2**x, range(8,264,8))
+    ctx.int_not0 = [-1+2**256]#map(lambda x: -1+2**x, range(8,264,8))
     
     begin = dtimer()
     
@@ -3745,16 +3429,16 @@ def smt_translate_block(rule,file_name,block_name,immutable_dict,simplification=
     opcodes = get_opcodes(rule)    
     
     if extra_opt_info.get("dependences",False) and extra_dependences_info:
-        process_extra_dependences_info(extra_dependences_info,"memory")
-        process_extra_dependences_info(extra_dependences_info,"storage")
-        non_aliasing_disabled = extra_opt_info.get("non_aliasing_disabled",False)
+        process_extra_dependences_info(ctx, extra_dependences_info,"memory")
+        process_extra_dependences_info(ctx, extra_dependences_info,"storage")
+        ctx.non_aliasing_disabled = extra_opt_info.get("non_aliasing_disabled",False)
         
     if extra_opt_info.get("useless",False) and extra_dependences_info:
-        process_useless_info(extra_dependences_info)
+        process_useless_info(ctx, extra_dependences_info)
         
     if extra_opt_info.get("context",False) and extra_dependences_info:
         idx = get_stack_variables(rule)
-        process_context_info(extra_dependences_info,idx)
+        process_context_info(ctx, extra_dependences_info,idx)
         
         
     info = "INFO DEPLOY "+paths.gasol_path+"ethir_OK_"+ block_name + " LENGTH="+str(len(opcodes))+" PUSH="+str(len(list(filter(lambda x: x.find("nop(PUSH")!=-1,opcodes))))
@@ -3765,26 +3449,26 @@ def smt_translate_block(rule,file_name,block_name,immutable_dict,simplification=
     if res:
         ops = list(map(lambda x: x[4:-1],opcodes))
 
-        original_ins = ops
+        ctx.original_ins = ops
 
         if part:
-            if len(opcodes) > max_bound and not split_sto:
+            if len(opcodes) > max_bound and not ctx.split_sto:
                 stores_pos = compute_position_stores(opcodes)
                 where2split = split_by_numbers(stores_pos)
 
                 if where2split == []:
                     subblocks = [opcodes]
-                    translate_block(rule,instructions,opcodes,True,block_name,simplification)
+                    translate_block(ctx, rule,instructions,opcodes,True,block_name,simplification)
 
                 else:
                     subblocks = split_blocks_by_number(rule.get_instructions(),where2split)
-                    generate_subblocks(rule,subblocks,True,block_name,simplification)
+                    generate_subblocks(ctx, rule,subblocks,True,block_name,simplification)
             else:
                 subblocks = [opcodes]
-                translate_block(rule,instructions,opcodes,True,block_name,simplification)
+                translate_block(ctx, rule,instructions,opcodes,True,block_name,simplification)
         else:
             subblocks = [opcodes]
-            translate_block(rule,instructions,opcodes,True,block_name,simplification)
+            translate_block(ctx, rule,instructions,opcodes,True,block_name,simplification)
     else: #we need to split the blocks into subblocks
         r = False
         new_instructions = []
@@ -3796,7 +3480,7 @@ def smt_translate_block(rule,file_name,block_name,immutable_dict,simplification=
             for s in subblocks:
                 o = list(filter(lambda x:x.find("nop(")!=-1,s))
 
-                if split_sto:
+                if ctx.split_sto:
                     stores_pos = []
                 else:
                     stores_pos = compute_position_stores(o)
@@ -3811,11 +3495,10 @@ def smt_translate_block(rule,file_name,block_name,immutable_dict,simplification=
                 else:
                     end_subblocks.append(s)
             subblocks = end_subblocks
-        generate_subblocks(rule,subblocks,True,block_name,simplification)
+        generate_subblocks(ctx, rule,subblocks,True,block_name,simplification)
 
     end = dtimer()
 
-    sfs_contracts["syrup_contract"] = blocks_json_dict
     end = dtimer()
 
     subblocks_postprocess = []
@@ -3826,56 +3509,50 @@ def smt_translate_block(rule,file_name,block_name,immutable_dict,simplification=
 
     return subblocks_postprocess
 
-def apply_transform(instr):
-    global discount_op
-    global saved_push
-    global gas_saved_op
-    global rule
-
-    
+def apply_transform(ctx, instr):
     opcode = instr["disasm"]
     if opcode == "AND":
         inp_vars = instr["inpt_sk"]
         if 0 in inp_vars:
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
             
-            discount_op+=1
-            rule = "AND(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = "AND(X,0)"
             return 0
         elif inp_vars[0] == inp_vars[1]:
-            saved_push+=1
-            gas_saved_op+=3
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "AND(X,X)"
+            ctx.discount_op+=1
+            ctx.rule = "AND(X,X)"
             return inp_vars[0]
     
-        elif inp_vars[0] in int_not0 or inp_vars[1] in int_not0:
-            saved_push+=2
-            gas_saved_op+=3
+        elif inp_vars[0] in ctx.int_not0 or inp_vars[1] in ctx.int_not0:
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "AND(X,2^256-1)"
-            return inp_vars[1] if (inp_vars[0] in int_not0) else inp_vars[0]
+            ctx.discount_op+=1
+            ctx.rule = "AND(X,2^256-1)"
+            return inp_vars[1] if (inp_vars[0] in ctx.int_not0) else inp_vars[0]
         else:
             return -1
         
     elif opcode == "OR":
         inp_vars = instr["inpt_sk"]
         if 0 in inp_vars:
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "OR(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = "OR(X,0)"
             return inp_vars[1] if inp_vars[0] == 0 else inp_vars[0]
         elif inp_vars[0] == inp_vars[1]:
-            saved_push+=1
-            gas_saved_op+=3
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "OR(X,X)"
+            ctx.discount_op+=1
+            ctx.rule = "OR(X,X)"
             return inp_vars[0]
         else:
             return -1
@@ -3884,18 +3561,18 @@ def apply_transform(instr):
         inp_vars = instr["inpt_sk"]
         
         if inp_vars[0] == inp_vars[1]:
-            saved_push+=1
-            gas_saved_op+=3
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "XOR(X,X)"
+            ctx.discount_op+=1
+            ctx.rule = "XOR(X,X)"
             return 0
         elif 0 in inp_vars:
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "XOR(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = "XOR(X,0)"
             return inp_vars[1] if inp_vars[0] == 0 else inp_vars[0]
         else:
             return -1
@@ -3904,24 +3581,24 @@ def apply_transform(instr):
         inp_vars = instr["inpt_sk"]
         
         if inp_vars[1] == 0:
-            saved_push+=2
-            gas_saved_op+=60
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=60
 
-            discount_op+=1
-            rule = "EXP(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = "EXP(X,0)"
             return 1
         elif inp_vars[1] == 1:
-            saved_push+=1
-            gas_saved_op+=60
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=60
             
-            discount_op+=1
-            rule = "EXP(X,1)"
+            ctx.discount_op+=1
+            ctx.rule = "EXP(X,1)"
             return inp_vars[0]
         elif inp_vars[0] == 1:
-            gas_saved_op+=60
+            ctx.gas_saved_op+=60
             
-            discount_op+=1
-            rule = "EXP(1,X)"
+            ctx.discount_op+=1
+            ctx.rule = "EXP(1,X)"
             return 1
         else:
             return -1
@@ -3929,11 +3606,11 @@ def apply_transform(instr):
     elif opcode == "ADD":
         inp_vars = instr["inpt_sk"]
         if 0 in inp_vars:
-            saved_push+=1
-            gas_saved_op+=3
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "ADD(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = "ADD(X,0)"
             return inp_vars[1] if inp_vars[0] == 0 else inp_vars[0]
         else:
             return -1
@@ -3941,18 +3618,18 @@ def apply_transform(instr):
     elif opcode == "SUB":
         inp_vars = instr["inpt_sk"]
         if 0 == inp_vars[1]:
-            saved_push+=1
-            gas_saved_op+=3
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "SUB(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = "SUB(X,0)"
             return inp_vars[0]
         elif inp_vars[0] == inp_vars[1]:
-            saved_push+=1
-            gas_saved_op+=3
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
-            rule = "SUB(X,X)"
+            ctx.discount_op+=1
+            ctx.rule = "SUB(X,X)"
             return 0
         else:
             return -1
@@ -3960,18 +3637,18 @@ def apply_transform(instr):
     elif opcode == "MUL":
         inp_vars = instr["inpt_sk"]
         if 0 in inp_vars:
-            saved_push+=2
-            gas_saved_op+=5
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=5
 
-            discount_op+=1
-            rule = "MUL(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = "MUL(X,0)"
             return 0
         elif 1 in inp_vars:
-            saved_push+=1
-            gas_saved_op+=5
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=5
             
-            discount_op+=1
-            rule = "MUL(X,1)"
+            ctx.discount_op+=1
+            ctx.rule = "MUL(X,1)"
             return inp_vars[1] if inp_vars[0] == 1 else inp_vars[0]
         else:
             return -1
@@ -3979,27 +3656,27 @@ def apply_transform(instr):
     elif opcode == "DIV" or opcode == "SDIV":
         inp_vars = instr["inpt_sk"]
         if 1 == inp_vars[1]:
-            saved_push+=1
-            gas_saved_op+=5
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=5
             
-            discount_op+=1
-            rule = f"{opcode}(X,1)"
+            ctx.discount_op+=1
+            ctx.rule = f"{opcode}(X,1)"
             return inp_vars[0]
 
         elif 0 in inp_vars:
-            saved_push+=2
-            gas_saved_op+=5
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=5
 
-            discount_op+=1
-            rule = f"{opcode}(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = f"{opcode}(X,0)"
             return 0
 
         elif inp_vars[0] == inp_vars[1]:
-            saved_push+=2
-            gas_saved_op+=5
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=5
 
-            discount_op+=1
-            rule = f"{opcode}(X,X)"
+            ctx.discount_op+=1
+            ctx.rule = f"{opcode}(X,X)"
             return 1
         else:
             return -1
@@ -4007,27 +3684,27 @@ def apply_transform(instr):
     elif opcode == "MOD":
         inp_vars = instr["inpt_sk"]
         if  1 == inp_vars[1]:
-            saved_push+=2
-            gas_saved_op+=5
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=5
             
-            discount_op+=1
-            rule = "MOD(X,1)"
+            ctx.discount_op+=1
+            ctx.rule = "MOD(X,1)"
             return 0
 
         elif inp_vars[0] == inp_vars[1]:
-            saved_push+=2
-            gas_saved_op+=5
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=5
 
-            discount_op+=1
-            rule = "MOD(X,X)"
+            ctx.discount_op+=1
+            ctx.rule = "MOD(X,X)"
             return 0
 
         elif inp_vars[1] == 0:
-            saved_push+=2
-            gas_saved_op+=5
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=5
 
-            discount_op+=1
-            rule = "MOD(X,0)"
+            ctx.discount_op+=1
+            ctx.rule = "MOD(X,0)"
             return 0
 
         else:
@@ -4036,11 +3713,11 @@ def apply_transform(instr):
     elif opcode == "EQ":
         inp_vars = instr["inpt_sk"]
         if inp_vars[0] == inp_vars[1]:
-            discount_op+=1
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.discount_op+=1
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            rule = "EQ(X,X)"
+            ctx.rule = "EQ(X,X)"
             
             return 1
         else:
@@ -4049,20 +3726,20 @@ def apply_transform(instr):
     elif opcode == "GT" or opcode == "SGT":
         inp_vars = instr["inpt_sk"]
         if inp_vars[0] == 0 and opcode == "GT":
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
+            ctx.discount_op+=1
 
-            rule = "GT(0,X)"
+            ctx.rule = "GT(0,X)"
             
             return 0
         elif inp_vars[0] == inp_vars[1]:
-            discount_op+=1
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.discount_op+=1
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            rule = opcode+"(X,X)"
+            ctx.rule = opcode+"(X,X)"
             return 0
         else:
             return -1
@@ -4070,19 +3747,19 @@ def apply_transform(instr):
     elif opcode == "LT" or opcode == "SLT":
         inp_vars = instr["inpt_sk"]
         if inp_vars[1] == 0 and opcode == "LT":
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            discount_op+=1
+            ctx.discount_op+=1
 
-            rule = "LT(X,0)"
+            ctx.rule = "LT(X,0)"
             return 0
         elif inp_vars[0] == inp_vars[1]:
-            discount_op+=1
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.discount_op+=1
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            rule = opcode+"(X,X)"
+            ctx.rule = opcode+"(X,X)"
             return 0
         else:
             return -1
@@ -4093,23 +3770,23 @@ def apply_transform(instr):
         if r:
             val_end = ~(int(val[0]))+2**256
 
-            if size_flag:
+            if ctx.size_flag:
                 v0 = int(val[0])
                 bytes_v0 = get_num_bytes_int(v0)
                 bytes_sol = get_num_bytes_int(val_end)
 
                 if bytes_sol <= bytes_v0+1:    
-                    saved_push+=1
-                    gas_saved_op+=3
-                    rule = "NOT(X)"
+                    ctx.saved_push+=1
+                    ctx.gas_saved_op+=3
+                    ctx.rule = "NOT(X)"
                     return val_end
                 else:
                     return -1
 
             else:
-                saved_push+=1
-                gas_saved_op+=3
-                rule = "NOT(X)"
+                ctx.saved_push+=1
+                ctx.gas_saved_op+=3
+                ctx.rule = "NOT(X)"
                 return val_end
             
         else:
@@ -4118,14 +3795,14 @@ def apply_transform(instr):
     elif opcode == "ISZERO":
         inp_vars = instr["inpt_sk"]
         if inp_vars[0] == 0:
-            gas_saved_op+=3
-            saved_push+=1
-            rule = "ISZ(0)"
+            ctx.gas_saved_op+=3
+            ctx.saved_push+=1
+            ctx.rule = "ISZ(0)"
             return 1
         elif inp_vars[0] == 1:
-            gas_saved_op+=3
-            saved_push+=1
-            rule = "ISZ(1)"
+            ctx.gas_saved_op+=3
+            ctx.saved_push+=1
+            ctx.rule = "ISZ(1)"
             return 0
         else:
             return -1
@@ -4133,53 +3810,48 @@ def apply_transform(instr):
     elif opcode == "SHR" or opcode == "SHL":
         inp_vars = instr["inpt_sk"]
         if inp_vars[0] == 0:
-            discount_op+=1
-            saved_push+=2
-            gas_saved_op+=3
+            ctx.discount_op+=1
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
 
-            rule = opcode+"(0,X)"
+            ctx.rule = opcode+"(0,X)"
             
             return inp_vars[0]
         elif inp_vars[1] == 0:
-            discount_op+=1
-            saved_push+=2
-            gas_saved_op+=3
-            rule = opcode+"(X,0)"
+            ctx.discount_op+=1
+            ctx.saved_push+=2
+            ctx.gas_saved_op+=3
+            ctx.rule = opcode+"(X,0)"
             return inp_vars[0]
         else:
             return -1
 
 
-def apply_all_simp_rules(user_def,list_vars,tstack):
-    global rule_applied
-    
+def apply_all_simp_rules(ctx, user_def,list_vars,tstack):
     modified = True
     user_def_instrs = user_def
     target_stack = tstack
     while(modified):
 
-        modified, user_def_instrs,target_stack = apply_transform_rules(user_def_instrs,list_vars,target_stack)
+        modified, user_def_instrs,target_stack = apply_transform_rules(ctx, user_def_instrs,list_vars,target_stack)
         if modified:
-           rule_applied = True 
+           ctx.rule_applied = True 
     return user_def_instrs,target_stack
 
-def apply_transform_rules(user_def_instrs,list_vars,tstack):
-    global rules_applied
-    global rule
-
+def apply_transform_rules(ctx, user_def_instrs,list_vars,tstack):
     to_delete = []
     target_stack = tstack
     modified = False
     for instr in user_def_instrs:
         
         if instr["disasm"] in ["AND","OR","XOR","ADD","SUB","MUL","DIV","EXP","EQ","GT","LT","SGT","SLT","SDIV", "NOT","ISZERO","SHL","SHR"]:
-            r = apply_transform(instr)
+            r = apply_transform(ctx, instr)
 
             if r!=-1:
-                rules_applied.append(rule)
-                rule = ""
+                ctx.rules_applied.append(ctx.rule)
+                ctx.rule = ""
                 msg = "[RULE]: Simplification rule type 1: "+str(instr)
-                check_and_print_debug_info(debug, msg)
+                check_and_print_debug_info(ctx.debug, msg)
                 
                 replace_var_userdef(instr["outpt_sk"][0],r,user_def_instrs)
                 target_stack = replace_var(instr["outpt_sk"][0],r,target_stack)
@@ -4230,13 +3902,7 @@ def check_rule_iszero_gt(num_gt,num_iszero):
         
 
 
-def apply_cond_transformation(instr,user_def_instrs,tstack):
-    global discount_op
-    global saved_push
-    global gas_saved_op
-    global user_def_counter
-    global rule
-    
+def apply_cond_transformation(ctx, instr,user_def_instrs,tstack):
     opcode = instr["disasm"]
     
     if opcode == "GT" or opcode == "SGT":
@@ -4249,16 +3915,16 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 index = user_def_instrs.index(is_zero[0])
                 zero_instr = user_def_instrs[index]
                 zero_instr["inpt_sk"] = [instr["inpt_sk"][0]]
-                saved_push+=2
-                gas_saved_op+=3
+                ctx.saved_push+=2
+                ctx.gas_saved_op+=3
 
                 
                 if out_var not in tstack:
-                    discount_op+=2
+                    ctx.discount_op+=2
 
                 msg = "ISZ(GT(X,0))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
                 
                 return True, []
             else:
@@ -4266,20 +3932,20 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
 
         elif 1 == instr["inpt_sk"][0] and opcode == "GT":
             var = instr["inpt_sk"][1]
-            idx = user_def_counter.get("ISZERO",0)
+            idx = ctx.user_def_counter.get("ISZERO",0)
             instr["id"] = "ISZERO_"+str(idx)
             instr["opcode"] = "15"
             instr["disasm"] = "ISZERO"
             instr["inpt_sk"] = [var]
             instr["commutative"] = False
-            discount_op+=1
-            saved_push+=2
+            ctx.discount_op+=1
+            ctx.saved_push+=2
 
-            user_def_counter["ISZERO"]=idx+1
+            ctx.user_def_counter["ISZERO"]=idx+1
             
             msg = "GT(1,X)"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
             return True, []
 
 
@@ -4295,13 +3961,13 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                     new_var = zero2[0]["outpt_sk"]
                     instr["outpt_sk"] = new_var
                     
-                    discount_op+=2
+                    ctx.discount_op+=2
 
-                    gas_saved_op+=6
+                    ctx.gas_saved_op+=6
 
                     msg = "ISZ(ISZ("+opcode+"(X,Y)))" #It may be GT or SGT
-                    rule = msg
-                    check_and_print_debug_info(debug, msg)
+                    ctx.rule = msg
+                    check_and_print_debug_info(ctx.debug, msg)
 
                     update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                     
@@ -4331,13 +3997,13 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 new_var = zero2[0]["outpt_sk"]
                 instr["outpt_sk"] = new_var
 
-                discount_op+=2
+                ctx.discount_op+=2
                 
-                gas_saved_op+=6
+                ctx.gas_saved_op+=6
 
                 msg = "ISZ(ISZ(ISZ(X)))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 
@@ -4353,14 +4019,14 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 new_var = eq["outpt_sk"]
                 # instr["outpt_sk"] = eq["outpt_sk"]
                 instr["outpt_sk"] = new_var
-                discount_op+=1
+                ctx.discount_op+=1
 
-                saved_push+=1
-                gas_saved_op+=3
+                ctx.saved_push+=1
+                ctx.gas_saved_op+=3
 
                 msg = "EQ(1,ISZ(X))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 
@@ -4382,14 +4048,14 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 zero_instr["inpt_sk"] = [instr["inpt_sk"][1]]
 
                 if out_var not in tstack:
-                    discount_op+=2
+                    ctx.discount_op+=2
 
-                saved_push+=1
-                gas_saved_op+=3
+                ctx.saved_push+=1
+                ctx.gas_saved_op+=3
 
                 msg = "ISZ(LT(0,X))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
                 
                 return True, []
             else:
@@ -4406,22 +4072,22 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 delete = [instr]
             else:
-                idx = user_def_counter.get("ISZERO",0)
+                idx = ctx.user_def_counter.get("ISZERO",0)
                 instr["id"] = "ISZERO_"+str(idx)
                 instr["opcode"] = "15"
                 instr["disasm"] = "ISZERO"
                 instr["inpt_sk"] = [var]
                 instr["commutative"] = False
-                user_def_counter["ISZERO"]=idx+1
+                ctx.user_def_counter["ISZERO"]=idx+1
                 delete = []
                 
-            discount_op+=1
+            ctx.discount_op+=1
 
-            saved_push+=1
+            ctx.saved_push+=1
 
             msg = "LT(X,1)"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
             return True, delete
         
          else:
@@ -4436,13 +4102,13 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                     instr["outpt_sk"] = new_var
 
                     # instr["outpt_sk"] = zero2[0]["outpt_sk"]
-                    discount_op+=2
+                    ctx.discount_op+=2
 
-                    gas_saved_op+=6
+                    ctx.gas_saved_op+=6
 
                     msg = "ISZ(ISZ("+opcode+"(X,Y)))" # It may be LT or SLT
-                    rule = msg
-                    check_and_print_debug_info(debug, msg)
+                    ctx.rule = msg
+                    check_and_print_debug_info(ctx.debug, msg)
 
                     update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                     
@@ -4469,23 +4135,23 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 delete = [instr]
 
             else:
-                idx = user_def_counter.get("ISZERO",0)
+                idx = ctx.user_def_counter.get("ISZERO",0)
                 instr["id"] = "ISZERO_"+str(idx)
                 instr["opcode"] = "15"
                 instr["disasm"] = "ISZERO"
                 instr["inpt_sk"] = [nonz]
                 instr["commutative"] = False
-                user_def_counter["ISZERO"]=idx+1
+                ctx.user_def_counter["ISZERO"]=idx+1
                 delete = []
 
             
 
-            discount_op+=1
-            saved_push+=1
+            ctx.discount_op+=1
+            ctx.saved_push+=1
 
             msg = "EQ(0,X)"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
 
             # user_def_counter["ISZERO"]=idx+1
             
@@ -4504,14 +4170,14 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                     new_var = zero2[0]["outpt_sk"]
                     instr["outpt_sk"] = new_var
                     # instr["outpt_sk"] = zero2[0]["outpt_sk"]
-                    discount_op+=2
+                    ctx.discount_op+=2
 
-                    gas_saved_op+=6
+                    ctx.gas_saved_op+=6
 
 
                     msg = "ISZ(ISZ(EQ(X,Y)))"
-                    rule = msg
-                    check_and_print_debug_info(debug, msg)
+                    ctx.rule = msg
+                    check_and_print_debug_info(ctx.debug, msg)
 
                     update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                     
@@ -4536,14 +4202,14 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 new_var = and_instr["outpt_sk"]
                 instr["outpt_sk"] = new_var
                 # instr["outpt_sk"] = and_instr["outpt_sk"]
-                discount_op+=1
+                ctx.discount_op+=1
 
-                saved_push+=1
-                gas_saved_op+=3
+                ctx.saved_push+=1
+                ctx.gas_saved_op+=3
 
                 msg = "AND(X,AND(X,Y))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 
@@ -4585,13 +4251,13 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                     pos = elems["inpt_sk"].index(out_pt2)
                     elems["inpt_sk"][pos] = x
                     
-            discount_op+=2
-            gas_saved_op+=6
+            ctx.discount_op+=2
+            ctx.gas_saved_op+=6
 
 
             msg = "OR(X,AND(X,Y))"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
             
             return True, [or_instr]
             
@@ -4607,14 +4273,14 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
             or_instr = or_op[0]
             if (or_instr["inpt_sk"][1] in instr["inpt_sk"]) or (or_instr["inpt_sk"][0] in instr["inpt_sk"]):
                 instr["outpt_sk"] = or_instr["outpt_sk"]
-                discount_op+=1
+                ctx.discount_op+=1
 
-                saved_push+=1
-                gas_saved_op+=3
+                ctx.saved_push+=1
+                ctx.gas_saved_op+=3
 
                 msg = "OR(OR(X,Y),Y)"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
                 
                 return True, [or_instr]
             else:
@@ -4654,12 +4320,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                     pos = elems["inpt_sk"].index(out_pt2)
                     elems["inpt_sk"][pos] = x
                     
-            discount_op+=2
-            gas_saved_op+=6
+            ctx.discount_op+=2
+            ctx.gas_saved_op+=6
 
             msg = "AND(X,OR(X,Y))"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
             
             return True, [and_instr]
             
@@ -4707,12 +4373,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                     pos = elems["inpt_sk"].index(out_pt2)
                     elems["inpt_sk"][pos] = y
                     
-            discount_op+=2
-            gas_saved_op+=6
+            ctx.discount_op+=2
+            ctx.gas_saved_op+=6
 
             msg = "XOR(X,XOR(X,Y))"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
             
             return True, [xor_instr]
 
@@ -4734,17 +4400,17 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
 
                 
             elif out_pt not in tstack and len(list(filter(lambda x: out_pt in x["inpt_sk"] and x!= isz_instr, user_def_instrs))) == 0:
-                idx = user_def_counter.get("EQ",0)
+                idx = ctx.user_def_counter.get("EQ",0)
                 isz_instr["inpt_sk"] = instr["inpt_sk"]
                 isz_instr["id"] = "EQ_"+str(idx)
                 isz_instr["opcode"] = "14"
                 isz_instr["disasm"] = "EQ"
                 isz_instr["commutative"] = True
-                user_def_counter["EQ"]=idx+1
+                ctx.user_def_counter["EQ"]=idx+1
                 delete = []
                 
-                discount_op+=1
-                gas_saved_op+=3
+                ctx.discount_op+=1
+                ctx.gas_saved_op+=3
                 
             else:
                 return False, []
@@ -4759,8 +4425,8 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
             # user_def_counter["EQ"]=idx+1
 
             msg = "ISZ(XOR(X,Y))"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
             
             return True, delete
                 
@@ -4790,12 +4456,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                     pos = elems["inpt_sk"].index(out_pt2)
                     elems["inpt_sk"][pos] = real_var
                     
-                discount_op+=2
-                gas_saved_op+=6
+                ctx.discount_op+=2
+                ctx.gas_saved_op+=6
 
                 msg = "NOT(NOT(X))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
                 
                 return True, [not_instr]
             else:
@@ -4818,12 +4484,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                         pos = elems["inpt_sk"].index(out_pt2)
                         elems["inpt_sk"][pos] = real_var
                     
-                discount_op+=2
-                gas_saved_op+=6
+                ctx.discount_op+=2
+                ctx.gas_saved_op+=6
 
                 msg = "AND(X,NOT(X))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
                 
                 return True, [and_instr]
 
@@ -4847,12 +4513,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                         pos = elems["inpt_sk"].index(out_pt2)
                         elems["inpt_sk"][pos] = real_var
                     
-                discount_op+=2
-                gas_saved_op+=6
+                ctx.discount_op+=2
+                ctx.gas_saved_op+=6
 
                 msg = "OR(X,NOT(X))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
                 
                 return True, [or_instr]
 
@@ -4870,14 +4536,14 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 old_var = instr["outpt_sk"]
                 new_var = and_instr["outpt_sk"]
                 instr["outpt_sk"] = new_var
-                discount_op+=1
+                ctx.discount_op+=1
 
-                saved_push+=1
-                gas_saved_op+=3
+                ctx.saved_push+=1
+                ctx.gas_saved_op+=3
 
                 msg = "AND(ORIGIN,2^160-1)"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 
@@ -4907,17 +4573,17 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 delete = [isz_instr]
 
             elif out_pt not in tstack and len(list(filter(lambda x: out_pt in x["inpt_sk"] and x!=isz_instr, user_def_instrs))) == 0:
-                idx = user_def_counter.get("EQ",0)
+                idx = ctx.user_def_counter.get("EQ",0)
                 isz_instr["inpt_sk"] = instr["inpt_sk"]
                 isz_instr["id"] = "EQ_"+str(idx)
                 isz_instr["opcode"] = "14"
                 isz_instr["disasm"] = "EQ"
                 isz_instr["commutative"] = True
-                user_def_counter["EQ"]=idx+1
+                ctx.user_def_counter["EQ"]=idx+1
                 delete = []
 
-                discount_op+=1
-                gas_saved_op+=3
+                ctx.discount_op+=1
+                ctx.gas_saved_op+=3
 
             else:
                 return False, []
@@ -4934,8 +4600,8 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
 
 
             msg = "ISZ(SUB(X,Y))"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
 
             # update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
             
@@ -4965,12 +4631,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 else:
                     mul_instr["inpt_sk"] = new_input
                                         
-                    idx = user_def_counter.get("SHL",0)
+                    idx = ctx.user_def_counter.get("SHL",0)
                     mul_instr["id"] = "SHL_"+str(idx)
                     mul_instr["opcode"] = "1b"
                     mul_instr["disasm"] = "SHL"
                     mul_instr["commutative"] = False            
-                    user_def_counter["SHL"]=idx+1
+                    ctx.user_def_counter["SHL"]=idx+1
                     delete = []
                     
                 # old_var = instr["outpt_sk"]
@@ -4978,13 +4644,13 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 # instr["outpt_sk"] = new_var
                 # instr["inpt_sk"][1] = mul_instr["inpt_sk"][0]
 
-                discount_op+=1
-                gas_saved_op+=5
-                saved_push+=1
+                ctx.discount_op+=1
+                ctx.gas_saved_op+=5
+                ctx.saved_push+=1
 
                 msg = "MUL(X,SHL(Y,1)"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 # update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 
@@ -5003,12 +4669,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 else:
                     mul_instr["inpt_sk"] = new_input
                                         
-                    idx = user_def_counter.get("SHL",0)
+                    idx = ctx.user_def_counter.get("SHL",0)
                     mul_instr["id"] = "SHL_"+str(idx)
                     mul_instr["opcode"] = "1b"
                     mul_instr["disasm"] = "SHL"
                     mul_instr["commutative"] = False            
-                    user_def_counter["SHL"]=idx+1
+                    ctx.user_def_counter["SHL"]=idx+1
                     delete = []
 
                 # instr["outpt_sk"] = mul_instr["outpt_sk"]
@@ -5017,13 +4683,13 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 # instr["outpt_sk"] = new_var
                 # instr["inpt_sk"][1] = mul_instr["inpt_sk"][1]
 
-                discount_op+=1
-                gas_saved_op+=5
-                saved_push+=1
+                ctx.discount_op+=1
+                ctx.gas_saved_op+=5
+                ctx.saved_push+=1
 
                 msg = "MUL(SHL(X,1),Y)"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 # update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 
@@ -5047,12 +4713,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 else:
                     div_instr["inpt_sk"] = new_input
                     
-                    idx = user_def_counter.get("SHR",0)
+                    idx = ctx.user_def_counter.get("SHR",0)
                     div_instr["id"] = "SHR_"+str(idx)
                     div_instr["opcode"] = "1c"
                     div_instr["disasm"] = "SHR"
                     div_instr["commutative"] = False            
-                    user_def_counter["SHR"]=idx+1
+                    ctx.user_def_counter["SHR"]=idx+1
                     delete = []
                     
                 # old_var = instr["outpt_sk"]
@@ -5069,14 +4735,14 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 # instr["commutative"] = False            
                 
                 
-                discount_op+=1
-                gas_saved_op+=5
-                saved_push+=1
+                ctx.discount_op+=1
+                ctx.gas_saved_op+=5
+                ctx.saved_push+=1
 
                 # user_def_counter["SHR"]=idx+1
                 msg = "DIV(X,SHL(Y,1))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 # update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 
@@ -5109,32 +4775,32 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 inpt2 = instr["inpt_sk"][1]
                 inpt3 = shl1["inpt_sk"][1]
                 
-                new_and_idx = user_def_counter.get("AND",0)
+                new_and_idx = ctx.user_def_counter.get("AND",0)
 
                 instr["inpt_sk"] = [inpt2,inpt3]
                 instr["id"] = "AND_"+str(new_and_idx)
                 instr["opcode"] = "16"
                 instr["disasm"] = "AND"
                 instr["commutative"] = True
-                user_def_counter["AND"]=new_and_idx+1
+                ctx.user_def_counter["AND"]=new_and_idx+1
 
-                new_shl_idx = user_def_counter.get("SHL",0)
+                new_shl_idx = ctx.user_def_counter.get("SHL",0)
                 
                 and_ins["inpt_sk"] = [inpt1,instr["outpt_sk"][0]]
                 and_ins["id"] = "SHL_"+str(new_shl_idx)
                 and_ins["opcode"] = "1b"
                 and_ins["disasm"] = "SHL"
                 and_ins["commutative"] = False
-                user_def_counter["SHL"]=new_shl_idx+1
+                ctx.user_def_counter["SHL"]=new_shl_idx+1
 
                 delete = [shl1]
                 
-                discount_op+=1
-                gas_saved_op+=3
+                ctx.discount_op+=1
+                ctx.gas_saved_op+=3
 
                 msg = "AND(SHL(X,Y), SHL(X,Z))"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 return True, delete
             else:
@@ -5161,12 +4827,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
             else:
                 bal_instr["inpt_sk"] = []
                     
-                idx = user_def_counter.get("SELFBALANCE",0)
+                idx = ctx.user_def_counter.get("SELFBALANCE",0)
                 bal_instr["id"] = "SELFBALANCE_"+str(idx)
                 bal_instr["opcode"] = "47"
                 bal_instr["disasm"] = "SELFBALANCE"
                 bal_instr["commutative"] = False            
-                user_def_counter["SELFBALANCE"]=idx+1
+                ctx.user_def_counter["SELFBALANCE"]=idx+1
                 delete = []
 
             
@@ -5183,13 +4849,13 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
             # instr["disasm"] = "SELFBALANCE"
             # instr["commutative"] = False            
                 
-            discount_op+=1
-            gas_saved_op+=397 #BALANCE 400 ADDRESS 2 SELFBALANCE 5
+            ctx.discount_op+=1
+            ctx.gas_saved_op+=397 #BALANCE 400 ADDRESS 2 SELFBALANCE 5
 
             # user_def_counter["SELFBALANCE"]=idx+1
             msg = "BALANCE(ADDRESS)"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
 
             # update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
             
@@ -5203,14 +4869,14 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 new_var = and_instr["outpt_sk"]
                 instr["outpt_sk"] = new_var
 
-                discount_op+=1
+                ctx.discount_op+=1
 
-                saved_push+=1
-                gas_saved_op+=3
+                ctx.saved_push+=1
+                ctx.gas_saved_op+=3
 
                 msg = "AND(ADDRESS,2^160)"
-                rule = msg
-                check_and_print_debug_info(debug, msg)
+                ctx.rule = msg
+                check_and_print_debug_info(ctx.debug, msg)
 
                 update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 
@@ -5232,22 +4898,22 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 delete = [instr]
             else:
-                idx = user_def_counter.get("ISZERO",0)
+                idx = ctx.user_def_counter.get("ISZERO",0)
             
                 instr["id"] = "ISZERO_"+str(idx)
                 instr["opcode"] = "15"
                 instr["disasm"] = "ISZERO"
                 instr["commutative"] = False            
-                user_def_counter["ISZERO"]=idx+1
+                ctx.user_def_counter["ISZERO"]=idx+1
                 delete = []
                 
-            saved_push+=1
-            gas_saved_op+=57
+            ctx.saved_push+=1
+            ctx.gas_saved_op+=57
 
 
             msg = "EXP(0,X)"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
             
             return True, delete
 
@@ -5263,13 +4929,13 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
                 update_tstack_userdef(old_var[0], new_var[0],tstack, user_def_instrs)
                 delete = [instr]
             else:
-                idx = user_def_counter.get("SHL",0)
+                idx = ctx.user_def_counter.get("SHL",0)
                 instr["inpt_sk"] = new_input
                 instr["id"] = "SHL_"+str(idx)
                 instr["opcode"] = "1b"
                 instr["disasm"] = "SHL"
                 instr["commutative"] = False            
-                user_def_counter["SHL"]=idx+1
+                ctx.user_def_counter["SHL"]=idx+1
                 delete = []
             
             
@@ -5282,12 +4948,12 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
             # instr["disasm"] = "SHL"
             # instr["commutative"] = False            
                 
-            gas_saved_op+=57 #EXP-SHL
+            ctx.gas_saved_op+=57 #EXP-SHL
 
             # user_def_counter["SHL"]=idx+1
             msg = "EXP(2,X)"
-            rule = msg
-            check_and_print_debug_info(debug, msg)
+            ctx.rule = msg
+            check_and_print_debug_info(ctx.debug, msg)
 
             return True, delete
 
@@ -5299,34 +4965,29 @@ def apply_cond_transformation(instr,user_def_instrs,tstack):
 
 
     
-def apply_all_comparison(user_def_instrs,tstack):
-    global rule_applied
-
+def apply_all_comparison(ctx, user_def_instrs,tstack):
     modified = True
     while(modified):
         msg = "********************IT*********************"
-        check_and_print_debug_info(debug, msg)
-        modified = apply_comparation_rules(user_def_instrs,tstack)
+        check_and_print_debug_info(ctx.debug, msg)
+        modified = apply_comparation_rules(ctx, user_def_instrs,tstack)
         if modified:
-            rule_applied = True
+            ctx.rule_applied = True
         
-def apply_comparation_rules(user_def_instrs,tstack):
-    global rules_applied
-    global rule
-    
+def apply_comparation_rules(ctx, user_def_instrs,tstack):
     modified = False
 
     for instr in user_def_instrs:
         
-        r, d_instr = apply_cond_transformation(instr,user_def_instrs,tstack)
+        r, d_instr = apply_cond_transformation(ctx, instr,user_def_instrs,tstack)
 
         if r:
             
-            rules_applied.append(rule)
-            rule = ""
+            ctx.rules_applied.append(ctx.rule)
+            ctx.rule = ""
             msg = "[RULE]: Simplification rule type 2: "+str(instr)
             msg = msg+"\n[RULE]: Delete rules: "+str(d_instr)
-            check_and_print_debug_info(debug, msg)
+            check_and_print_debug_info(ctx.debug, msg)
 
             modified = True
             for b in d_instr:
@@ -5347,23 +5008,17 @@ def update_tstack_userdef(old_var, new_var,tstack, user_def_instrs):
             i = inp_st.index(old_var)
             instr["inpt_sk"][i] = new_var
             
-def get_sfs_dict():
-    return sfs_contracts
-
-def get_discount_op():
-    return discount_op
+def is_identity_map(ctx, source_stack,target_stack,instructions):
 
-def is_identity_map(source_stack,target_stack,instructions):
-
-    if len(user_defins) > 0:
+    if len(ctx.user_defins) > 0:
         return False
     
     if len(source_stack) != len(target_stack):
         return False
 
     
-    for v in variable_content:
-        if v != variable_content[v]:
+    for v in ctx.variable_content:
+        if v != ctx.variable_content[v]:
             return False
 
     storage_ins = list(filter(lambda x: x.find("mstore")!=-1 or x.find("sstore")!=-1,instructions))
@@ -5374,37 +5029,35 @@ def is_identity_map(source_stack,target_stack,instructions):
     return True
 
 
-def get_idx_in_instructions(idx_in_seq, location = "memory"):
+def get_idx_in_instructions(ctx, idx_in_seq, location = "memory"):
     if location == "memory":
-        for i in extra_dep_info["mem_deps_int2ins"]:
-            if idx_in_seq in extra_dep_info["mem_deps_int2ins"][i]:
+        for i in ctx.extra_dep_info["mem_deps_int2ins"]:
+            if idx_in_seq in ctx.extra_dep_info["mem_deps_int2ins"][i]:
                 return i
     elif location == "storage":
-        for i in extra_dep_info["sto_deps_int2ins"]:
-            if idx_in_seq in extra_dep_info["sto_deps_int2ins"][i]:
+        for i in ctx.extra_dep_info["sto_deps_int2ins"]:
+            if idx_in_seq in ctx.extra_dep_info["sto_deps_int2ins"][i]:
                 return i
     else:
         raise Exception("Unknown location")
     
     return -1
 
-def remove_extra_deps_info(idx_in_seq, location = "memory"):
-    global extra_dep_info
-
-    idx = get_idx_in_instructions(idx_in_seq, location)
+def remove_extra_deps_info(ctx, idx_in_seq, location = "memory"):
+    idx = get_idx_in_instructions(ctx, idx_in_seq, location)
 
     if idx != -1 and location == "memory":
-        extra_dep_info["memory_deps_eqs"] = list(filter(lambda x: x.get_first()!=idx and x.get_second()!= idx,extra_dep_info["memory_deps_eqs"]))
-        extra_dep_info["memory_deps_noneqs"] = list(filter(lambda x: x.get_first()!=idx and x.get_second()!= idx,extra_dep_info["memory_deps_noneqs"]))
-        extra_dep_info["mem_deps_int2ins"].pop(idx) 
+        ctx.extra_dep_info["memory_deps_eqs"] = list(filter(lambda x: x.get_first()!=idx and x.get_second()!= idx,ctx.extra_dep_info["memory_deps_eqs"]))
+        ctx.extra_dep_info["memory_deps_noneqs"] = list(filter(lambda x: x.get_first()!=idx and x.get_second()!= idx,ctx.extra_dep_info["memory_deps_noneqs"]))
+        ctx.extra_dep_info["mem_deps_int2ins"].pop(idx) 
 
-        for x in extra_dep_info["memory_deps_eqs"]:
+        for x in ctx.extra_dep_info["memory_deps_eqs"]:
             if x.get_first() > idx:
                 x.set_first(x.get_first()-1)
             if x.get_second() > idx:
                 x.set_second(x.get_second()-1)
 
-        for x in extra_dep_info["memory_deps_noneqs"]:
+        for x in ctx.extra_dep_info["memory_deps_noneqs"]:
             if x.get_first() > idx:
                 x.set_first(x.get_first()-1)
             if x.get_second() > idx:
@@ -5412,31 +5065,31 @@ def remove_extra_deps_info(idx_in_seq, location = "memory"):
 
         new_dict = {}
             
-        for i in extra_dep_info["mem_deps_int2ins"]:
-            if extra_dep_info["mem_deps_int2ins"][i][1]>idx_in_seq:
-                new_val = (extra_dep_info["mem_deps_int2ins"][i][0],extra_dep_info["mem_deps_int2ins"][i][1]-1)
+        for i in ctx.extra_dep_info["mem_deps_int2ins"]:
+            if ctx.extra_dep_info["mem_deps_int2ins"][i][1]>idx_in_seq:
+                new_val = (ctx.extra_dep_info["mem_deps_int2ins"][i][0],ctx.extra_dep_info["mem_deps_int2ins"][i][1]-1)
                 new_dict[i-1] = new_val
             else:
-                new_dict[i] = extra_dep_info["mem_deps_int2ins"][i]
+                new_dict[i] = ctx.extra_dep_info["mem_deps_int2ins"][i]
 
-        extra_dep_info["mem_deps_int2ins"] = new_dict
+        ctx.extra_dep_info["mem_deps_int2ins"] = new_dict
 
         # for i in extra_dep_info["mem_deps_int2ins"]:
         #     if extra_dep_info["mem_deps_int2ins"][i][1]>idx_in_seq:
         #         extra_dep_info["mem_deps_int2ins"][i] = (extra_dep_info["mem_deps_int2ins"][i][0],extra_dep_info["mem_deps_int2ins"][i][1]-1)  
                 
     elif idx != -1 and location == "storage":
-        extra_dep_info["storage_deps_eqs"] = list(filter(lambda x: x.get_first()!=idx and x.get_second()!= idx,extra_dep_info["storage_deps_eqs"]))
-        extra_dep_info["storage_deps_noneqs"] = list(filter(lambda x: x.get_first()!=idx and x.get_second()!= idx,extra_dep_info["storage_deps_noneqs"]))
-        extra_dep_info["sto_deps_int2ins"].pop(idx) 
+        ctx.extra_dep_info["storage_deps_eqs"] = list(filter(lambda x: x.get_first()!=idx and x.get_second()!= idx,ctx.extra_dep_info["storage_deps_eqs"]))
+        ctx.extra_dep_info["storage_deps_noneqs"] = list(filter(lambda x: x.get_first()!=idx and x.get_second()!= idx,ctx.extra_dep_info["storage_deps_noneqs"]))
+        ctx.extra_dep_info["sto_deps_int2ins"].pop(idx) 
 
-        for x in extra_dep_info["storage_deps_eqs"]:
+        for x in ctx.extra_dep_info["storage_deps_eqs"]:
             if x.get_first() > idx:
                 x.set_first(x.get_first()-1)
             if x.get_second() > idx:
                 x.set_second(x.get_second()-1)
 
-        for x in extra_dep_info["storage_deps_noneqs"]:
+        for x in ctx.extra_dep_info["storage_deps_noneqs"]:
             if x.get_first() > idx:
                 x.set_first(x.get_first()-1)
             if x.get_second() > idx:
@@ -5444,28 +5097,28 @@ def remove_extra_deps_info(idx_in_seq, location = "memory"):
 
         new_dict = {}
                 
-        for i in extra_dep_info["sto_deps_int2ins"]:
-            if extra_dep_info["sto_deps_int2ins"][i][1]>idx_in_seq:
-                new_val = (extra_dep_info["sto_deps_int2ins"][i][0],extra_dep_info["sto_deps_int2ins"][i][1]-1)
+        for i in ctx.extra_dep_info["sto_deps_int2ins"]:
+            if ctx.extra_dep_info["sto_deps_int2ins"][i][1]>idx_in_seq:
+                new_val = (ctx.extra_dep_info["sto_deps_int2ins"][i][0],ctx.extra_dep_info["sto_deps_int2ins"][i][1]-1)
                 new_dict[i-1] = new_val
             else:
-                new_dict[i] = extra_dep_info["sto_deps_int2ins"][i]
+                new_dict[i] = ctx.extra_dep_info["sto_deps_int2ins"][i]
 
-        extra_dep_info["sto_deps_int2ins"] = new_dict
+        ctx.extra_dep_info["sto_deps_int2ins"] = new_dict
 
                 
-def remove_loads(storage,instruction):
+def remove_loads(ctx, storage,instruction):
     new_storage = []
     for i in range(0,len(storage)):
         s = storage[i]
         if s[0][-1].find(instruction)!=-1:
-            if s in list(u_dict.values()) :
+            if s in list(ctx.u_dict.values()) :
                 new_storage.append(s)
             else:
-                if instruction == "mload" and extra_dep_info != {}: #in order to distinguish with the case of sload
-                    remove_extra_deps_info(i,"memory")
-                elif instruction == "sload" and extra_dep_info != {}:
-                    remove_extra_deps_info(i, "storage")
+                if instruction == "mload" and ctx.extra_dep_info != {}: #in order to distinguish with the case of sload
+                    remove_extra_deps_info(ctx, i,"memory")
+                elif instruction == "sload" and ctx.extra_dep_info != {}:
+                    remove_extra_deps_info(ctx, i, "storage")
         else:
             new_storage.append(s)
     return new_storage
@@ -5473,42 +5126,31 @@ def remove_loads(storage,instruction):
 # It removes from storage_order or memory_order the loads instructions
 # that are not used neither in the target stack nor the storage
 # operations
-def remove_loads_instructions():
-    global storage_order
-    global memory_order
+def remove_loads_instructions(ctx):
+    target_stack_content = ctx.variable_content.values()
 
-    target_stack_content = variable_content.values()
-
-    sstore_instructions = filter(lambda x: x[0][-1].find("sstore")!=-1,storage_order)
+    sstore_instructions = filter(lambda x: x[0][-1].find("sstore")!=-1,ctx.storage_order)
     sstore_vars = list(map(lambda x: x[0][0],sstore_instructions))
     
-    mstore_instructions = filter(lambda x: x[0][-1].find("mstore")!=-1,memory_order)
+    mstore_instructions = filter(lambda x: x[0][-1].find("mstore")!=-1,ctx.memory_order)
     mstore_vars = list(map(lambda x: x[0][0],mstore_instructions))
                 
-    storage_order = remove_loads(storage_order,"sload")
-    memory_order = remove_loads(memory_order,"mload")
+    ctx.storage_order = remove_loads(ctx, ctx.storage_order,"sload")
+    ctx.memory_order = remove_loads(ctx, ctx.memory_order,"mload")
 
 
 
 #Here it means that we have sloads between the sstores that are equals.
 #Otherwise it would have been removed with remove_store_recursive_dif
-def replace_loads_by_sstores(storage_location, complementary_location, location):
-    global u_dict
-    global variable_content
-    global gas_store_op
-    global gas_memory_op
-    global discount_op
-    global rule_applied
-    global rules_applied
-    
+def replace_loads_by_sstores(ctx, storage_location, complementary_location, location):
     if location == "storage":
         store_ins = "sstore"
         load_ins = "sload"
-        extra_dep = extra_dep_info["storage_deps_eqs"] if extra_dep_info != {} else []
+        extra_dep = ctx.extra_dep_info["storage_deps_eqs"] if ctx.extra_dep_info != {} else []
     else:
         store_ins = "mstore"
         load_ins = "mload"
-        extra_dep = extra_dep_info["memory_deps_eqs"] if extra_dep_info != {} else []
+        extra_dep = ctx.extra_dep_info["memory_deps_eqs"] if ctx.extra_dep_info != {} else []
 
 
     i = 0
@@ -5520,14 +5162,14 @@ def replace_loads_by_sstores(storage_location, complementary_location, location)
             var = elem[0][0]
             value = elem[0][1]
 
-            if extra_dep_info != {} and extra_dep != [] and len(storage_location[i+1::])>0:
+            if ctx.extra_dep_info != {} and extra_dep != [] and len(storage_location[i+1::])>0:
                 l_ins = []
-                dep_pos = get_idx_in_instructions(i,location)
+                dep_pos = get_idx_in_instructions(ctx, i,location)
                 subl = storage_location[i+1::]
                 for j in range(len(subl)):
                     ins = storage_location[i+1+j]
                     if ins[0][-1].find(load_ins)!=-1:
-                        dep_pos_load = get_idx_in_instructions(j+i+1, location)
+                        dep_pos_load = get_idx_in_instructions(ctx, j+i+1, location)
 
                         l = list(filter(lambda x: x.get_first() == dep_pos and x.get_second() == dep_pos_load,extra_dep))
                         
@@ -5543,7 +5185,7 @@ def replace_loads_by_sstores(storage_location, complementary_location, location)
                 rest_list = storage_location[i+1:i+pos+1]
                 dep = []
                 for j in range(len(rest_list)):
-                    dep.append(are_dependent(elem, rest_list[j],i,j+i+1, location))
+                    dep.append(are_dependent(ctx, elem, rest_list[j],i,j+i+1, location))
                 # dep = list(map(lambda x: are_dependent(elem,x),rest_list))
 
                 if True in dep and elem[0][-1].find("mstore8") == -1:
@@ -5556,40 +5198,40 @@ def replace_loads_by_sstores(storage_location, complementary_location, location)
                 if True not in dep and elem[0][-1].find("mstore8") == -1: #it does not work for mstore8
                     if location == "storage":
                         msg = "[OPT]: Replaced sload by its value"
-                        check_and_print_debug_info(debug, msg)
+                        check_and_print_debug_info(ctx.debug, msg)
 
-                        gas_store_op+=700
+                        ctx.gas_store_op+=700
                     else:
                         msg = "[OPT]: Replaced mload by its value"
-                        check_and_print_debug_info(debug, msg)
+                        check_and_print_debug_info(ctx.debug, msg)
 
-                        gas_memory_op+=3
+                        ctx.gas_memory_op+=3
                     storage_location.pop(i+pos+1)
-                    if extra_dep_info != {}:
-                        remove_extra_deps_info(i+pos+1, location)
+                    if ctx.extra_dep_info != {}:
+                        remove_extra_deps_info(ctx, i+pos+1, location)
                     # discount_op+=1  @It may be replace by a DUP+SWAP
                     finish = True
 
-                    rule_applied = True
-                    rules_applied.append(str(load)+"= "+str(elem[0]))
+                    ctx.rule_applied = True
+                    ctx.rules_applied.append(str(load)+"= "+str(elem[0]))
 
                     
-                    for v in u_dict:
-                        elem = u_dict[v]
+                    for v in ctx.u_dict:
+                        elem = ctx.u_dict[v]
                         if elem == load:
                             var2replace = v
                              
-                    for v in u_dict:
-                        elem = u_dict[v]
+                    for v in ctx.u_dict:
+                        elem = ctx.u_dict[v]
                         list_tuple = list(elem[0])
                         if var2replace in list_tuple:
                             pos = elem[0].index(var2replace)
                             list_tuple[pos] = value
-                            u_dict[v] = (tuple(list_tuple),elem[1])
+                            ctx.u_dict[v] = (tuple(list_tuple),elem[1])
     
-                    for var in variable_content:
-                        if variable_content[var] == var2replace:
-                            variable_content[var] = value
+                    for var in ctx.variable_content:
+                        if ctx.variable_content[var] == var2replace:
+                            ctx.variable_content[var] = value
 
                     for i in range(0,len(storage_location)):
                         elem = storage_location[i]
@@ -5607,25 +5249,19 @@ def replace_loads_by_sstores(storage_location, complementary_location, location)
                             list_tuple[pos] = value
                             complementary_location[i] = (tuple(list_tuple),elem[1])
 
-                    del u_dict[var2replace]
+                    del ctx.u_dict[var2replace]
 
-                    replace_loads_by_sstores(storage_location, complementary_location,location)
+                    replace_loads_by_sstores(ctx, storage_location, complementary_location,location)
         i+=1
 
     
-def remove_store_recursive_dif(storage_location, location):
-    global gas_store_op
-    global gas_memory_op
-    global discount_op
-    global rule_applied
-    global rules_applied
-    
+def remove_store_recursive_dif(ctx, storage_location, location):
     if location == "storage":
         instruction = "sstore"
-        extra_dep = extra_dep_info["storage_deps_eqs"] if extra_dep_info != {} else []
+        extra_dep = ctx.extra_dep_info["storage_deps_eqs"] if ctx.extra_dep_info != {} else []
     else:
         instruction = "mstore"
-        extra_dep = extra_dep_info["memory_deps_eqs"] if extra_dep_info != {} else []
+        extra_dep = ctx.extra_dep_info["memory_deps_eqs"] if ctx.extra_dep_info != {} else []
 
     
     i = 0
@@ -5638,15 +5274,15 @@ def remove_store_recursive_dif(storage_location, location):
             var = elem[0][0]
 
             eq_rel = []
-            if extra_dep_info != {} and extra_dep != [] and len(storage_location[i+1::])>0:
+            if ctx.extra_dep_info != {} and extra_dep != [] and len(storage_location[i+1::])>0:
                 rest = []
-                dep_pos = get_idx_in_instructions(i,location)
+                dep_pos = get_idx_in_instructions(ctx, i,location)
                 subl = storage_location[i+1::]
                 
                 for j in range(len(subl)):
                     ins = storage_location[i+1+j]
                     if ins[0][-1].find(instruction)!=-1:
-                        dep_pos_load = get_idx_in_instructions(j+i+1, location)
+                        dep_pos_load = get_idx_in_instructions(ctx, j+i+1, location)
 
                         
                         l = list(filter(lambda x: x.get_first() == dep_pos and x.get_second() == dep_pos_load,extra_dep))
@@ -5669,30 +5305,30 @@ def remove_store_recursive_dif(storage_location, location):
 
                 dep = []
                 for j in range(len(sublist)):
-                    dep.append(are_dependent(elem, sublist[j],i,j+i+1, location))
+                    dep.append(are_dependent(ctx, elem, sublist[j],i,j+i+1, location))
                 # dep = list(map(lambda x: are_dependent(elem, x),sublist)) #It checks for loads and and keccaks betweeen the stores
                 
                 #Keccaks are considered in dep list
                 if True not in dep:
                     storage_location.pop(i)
-                    if extra_dep_info != {}:
-                        remove_extra_deps_info(i, location)
-                    discount_op+=1
+                    if ctx.extra_dep_info != {}:
+                        remove_extra_deps_info(ctx, i, location)
+                    ctx.discount_op+=1
                     if location == "storage":
                         msg = "[OPT]: Removed sstore sstore "
-                        check_and_print_debug_info(debug, msg)
+                        check_and_print_debug_info(ctx.debug, msg)
 
-                        gas_store_op+=5000
+                        ctx.gas_store_op+=5000
                     else:
                         msg = "[OPT]: Removed mstore mstore "
-                        check_and_print_debug_info(debug, msg)
+                        check_and_print_debug_info(ctx.debug, msg)
 
-                        gas_memory_op+=3
+                        ctx.gas_memory_op+=3
 
-                    rule_applied = True
-                    rules_applied.append(str(elem[0])+" useless")
+                    ctx.rule_applied = True
+                    ctx.rules_applied.append(str(elem[0])+" useless")
                     
-                    remove_store_recursive_dif(storage_location,location)
+                    remove_store_recursive_dif(ctx, storage_location,location)
                     finish = True
 
                 elif True in dep and (next_ins == elem or (elem,next_ins) in eq_rel) and location == "memory": #It may happend that two mstores can be optimized though a keccak is between them. mstore(x,y) keccak(x,z), mstore(x,y)
@@ -5707,20 +5343,20 @@ def remove_store_recursive_dif(storage_location, location):
                         j+=1
 
                     if all_keccaks:
-                        rules_applied.append(str(storage_location[i+pos+1])+" useless")
+                        ctx.rules_applied.append(str(storage_location[i+pos+1])+" useless")
 
                         storage_location.pop(i+pos+1)
-                        if extra_dep_info != {}:
-                            remove_extra_deps_info(i+pos+1, location)
-                        discount_op+=1
+                        if ctx.extra_dep_info != {}:
+                            remove_extra_deps_info(ctx, i+pos+1, location)
+                        ctx.discount_op+=1
                         msg = "[OPT]: Removed mstore mstore with KECCAK"
-                        check_and_print_debug_info(debug, msg)
-                        gas_memory_op+=3
+                        check_and_print_debug_info(ctx.debug, msg)
+                        ctx.gas_memory_op+=3
 
-                        rule_applied = True
+                        ctx.rule_applied = True
 
                         
-                        remove_store_recursive_dif(storage_location,location)
+                        remove_store_recursive_dif(ctx, storage_location,location)
                         finish = True
 
                 else: #True in list. If we have dependences, we an delete them if all are stores. mstore(x,y) mstore(z,w) mstore(x,k)
@@ -5735,45 +5371,39 @@ def remove_store_recursive_dif(storage_location, location):
 
                         if all_mstores:
                             storage_location.pop(i)
-                            if extra_dep_info != {}:
-                                remove_extra_deps_info(i, location)
-                            discount_op+=1
+                            if ctx.extra_dep_info != {}:
+                                remove_extra_deps_info(ctx, i, location)
+                            ctx.discount_op+=1
                             if location == "storage":
                                 msg = "[OPT]: Removed sstore sstore "
-                                check_and_print_debug_info(debug, msg)
+                                check_and_print_debug_info(ctx.debug, msg)
 
-                                gas_store_op+=5000
+                                ctx.gas_store_op+=5000
                             else:
                                 msg = "[OPT]: Removed mstore mstore "
-                                check_and_print_debug_info(debug, msg)
+                                check_and_print_debug_info(ctx.debug, msg)
 
-                                gas_memory_op+=3
+                                ctx.gas_memory_op+=3
                                
-                            rule_applied = True
-                            rules_applied.append(str(elem[0])+" useless")
+                            ctx.rule_applied = True
+                            ctx.rules_applied.append(str(elem[0])+" useless")
                             
-                            remove_store_recursive_dif(storage_location,location)
+                            remove_store_recursive_dif(ctx, storage_location,location)
                             finish = True
                     
         i+=1
 
 
 #It removes things of the type sstore(4,sload(4))
-def remove_store_loads(storage_location, location):
-    global gas_store_op
-    global gas_memory_op
-    global discount_op
-    global rule_applied
-    global rules_applied
-    
+def remove_store_loads(ctx, storage_location, location):
     if storage_location == "storage":
         store_ins = "sstore"
         load_ins = "sload"
-        extra_dep = extra_dep_info["storage_deps_eqs"] if extra_dep_info != {} else []
+        extra_dep = ctx.extra_dep_info["storage_deps_eqs"] if ctx.extra_dep_info != {} else []
     else:
         store_ins = "mstore"
         load_ins = "mload"
-        extra_dep = extra_dep_info["memory_deps_eqs"] if extra_dep_info != {} else []
+        extra_dep = ctx.extra_dep_info["memory_deps_eqs"] if ctx.extra_dep_info != {} else []
         
     i = 0
     finished = False
@@ -5782,21 +5412,21 @@ def remove_store_loads(storage_location, location):
         if elem[0][-1].find(store_ins)!=-1:
             var = elem[0][0]
             value = elem[0][1]
-            if value in u_dict:
-                symb_ins = u_dict[value]
+            if value in ctx.u_dict:
+                symb_ins = ctx.u_dict[value]
 
                 find_potential = False
                 
-                if extra_dep_info != {} and extra_dep != [] and symb_ins[0][-1].find(load_ins)!=-1:
-                    dep_pos = get_idx_in_instructions(i,location)
+                if ctx.extra_dep_info != {} and extra_dep != [] and symb_ins[0][-1].find(load_ins)!=-1:
+                    dep_pos = get_idx_in_instructions(ctx, i,location)
                     pos = storage_location.index(symb_ins)
-                    dep_pos_load = get_idx_in_instructions(pos, location)
+                    dep_pos_load = get_idx_in_instructions(ctx, pos, location)
                             
                     l = list(filter(lambda x: x.get_first() == dep_pos_load and x.get_second() == dep_pos,extra_dep))    
                     if len(l) == 1:
                         find_potential = True
 
-                elif extra_dep_info == {}:
+                elif ctx.extra_dep_info == {}:
                     if symb_ins[0][-1].find(load_ins)!=-1 and symb_ins[0][0] == var:
                         find_potential = True
                         
@@ -5807,49 +5437,44 @@ def remove_store_loads(storage_location, location):
 
                     variables = []
                     for j in range(len(rest_instructions)):
-                        variables.append(are_dependent(elem,rest_instructions[j],i,j+pos+1, location))
+                        variables.append(are_dependent(ctx, elem,rest_instructions[j],i,j+pos+1, location))
                     # variables = list(map(lambda x: are_dependent(elem,x),rest_instructions))
 
                     
                     #Keccaks are considered in the previous list
                     if True not in variables:
                         storage_location.pop(i)
-                        if extra_dep_info != {}:
-                            remove_extra_deps_info(i, location)
-                        discount_op+=1
+                        if ctx.extra_dep_info != {}:
+                            remove_extra_deps_info(ctx, i, location)
+                        ctx.discount_op+=1
                         finished = True
 
                         if storage_location == "storage":
                             msg = "[OPT]: OPTIMIZATION sstore OF sload"
-                            check_and_print_debug_info(debug, msg)
+                            check_and_print_debug_info(ctx.debug, msg)
 
-                            gas_store_op+=5000
+                            ctx.gas_store_op+=5000
                         else:
                             msg = "[OPT]: OPTIMIZATION mstore OF mload"
-                            check_and_print_debug_info(debug, msg)
+                            check_and_print_debug_info(ctx.debug, msg)
 
-                            gas_memory_op+=3
+                            ctx.gas_memory_op+=3
 
-                        rule_applied = True
-                        rules_applied.append(str(elem[0])+" of mload")
+                        ctx.rule_applied = True
+                        ctx.rules_applied.append(str(elem[0])+" of mload")
 
                         
-                        remove_store_loads(storage_location,location)
+                        remove_store_loads(ctx, storage_location,location)
         i+=1
 
 
 
 
-def simplify_memory(storage_location, complementary_location, location):
-    global memory_opt
-    global storage_opt
-    global mem_delete_pos
-    global sto_delete_pos
-
+def simplify_memory(ctx, storage_location, complementary_location, location):
     del_pos = []
     old_storage_location = list(storage_location)
 
-    replace_loads_by_sstores(storage_location, complementary_location, location)
+    replace_loads_by_sstores(ctx, storage_location, complementary_location, location)
 
     if old_storage_location != storage_location:
         old_storage_location = list(filter(lambda x: type(x)==tuple, old_storage_location))
@@ -5858,13 +5483,13 @@ def simplify_memory(storage_location, complementary_location, location):
         
         del_pos+=pos
         if location == "storage":
-            storage_opt[0] = True
+            ctx.storage_opt[0] = True
         else:
-            memory_opt[0] = True
+            ctx.memory_opt[0] = True
 
     old_storage_location2 = list(storage_location)
 
-    remove_store_recursive_dif(storage_location,location)
+    remove_store_recursive_dif(ctx, storage_location,location)
     
     if old_storage_location2 != storage_location:
 
@@ -5875,13 +5500,13 @@ def simplify_memory(storage_location, complementary_location, location):
 
         
         if location == "storage":
-            storage_opt[1] = True
+            ctx.storage_opt[1] = True
         else:
-            memory_opt[1] = True
+            ctx.memory_opt[1] = True
 
     
     old_storage_location3 = list(storage_location)
-    remove_store_loads(storage_location,location)
+    remove_store_loads(ctx, storage_location,location)
 
     if old_storage_location3 != storage_location:
 
@@ -5891,15 +5516,15 @@ def simplify_memory(storage_location, complementary_location, location):
         del_pos+=pos
         
         if location == "storage":
-            storage_opt[2] = True
+            ctx.storage_opt[2] = True
         else:
-            memory_opt[2] = True
+            ctx.memory_opt[2] = True
 
 
     if location == "storage":
-        sto_delete_pos = del_pos
+        ctx.sto_delete_pos = del_pos
     else:
-        mem_delete_pos = del_pos
+        ctx.mem_delete_pos = del_pos
 
         
     if storage_location != old_storage_location:
@@ -5909,7 +5534,7 @@ def simplify_memory(storage_location, complementary_location, location):
 
 
 
-def are_dependent_variables(v1,v2):
+def are_dependent_variables(ctx, v1,v2):
     # print("AREDEPENDENTVARIABLES")
     # print(v1)
     # print(v2)
@@ -5917,8 +5542,8 @@ def are_dependent_variables(v1,v2):
     # print(u_dict[v1][0])
     # print(u_dict[v2][0])
     
-    exp_v1 = (v1) if v1 not in u_dict.keys() else u_dict[v1][0]
-    exp_v2 = (v2) if v2 not in u_dict.keys() else u_dict[v2][0]
+    exp_v1 = (v1) if v1 not in ctx.u_dict.keys() else ctx.u_dict[v1][0]
+    exp_v2 = (v2) if v2 not in ctx.u_dict.keys() else ctx.u_dict[v2][0]
 
     if v1 == v2:
         return False
@@ -5944,7 +5569,7 @@ def are_dependent_variables(v1,v2):
     
     
 #storage location may be storage_order or memory_order
-def generate_dependences(storage_location, location):
+def generate_dependences(ctx, storage_location, location):
     storage_dependences = []
 
     if location == "storage":
@@ -5973,7 +5598,7 @@ def generate_dependences(storage_location, location):
                     # print(i)
                     # print(j)
                     # raise Exception
-                    dep = are_dependent(elem,store,i,j, location)
+                    dep = are_dependent(ctx, elem,store,i,j, location)
                     # dep = are_dependent(elem,store)
                     if dep:
                         if elem[0][1] != store[0][1]: #if the value is the same they are not dependent
@@ -5983,7 +5608,7 @@ def generate_dependences(storage_location, location):
                             # print(elem)
                             # print(store)
                             # print(are_dependent_variables(elem[0][0],store[0][0]))
-                            if are_dependent_variables(elem[0][0],store[0][0]): #if they stored the same value but on index depends on the other
+                            if are_dependent_variables(ctx, elem[0][0],store[0][0]): #if they stored the same value but on index depends on the other
                             # store[0][0] in u_dict[elem[0][0]][0]:
 
                                 storage_dependences.append((j,i))
@@ -6004,7 +5629,7 @@ def generate_dependences(storage_location, location):
                 store = predecessor[j]
                 if store[0][-1].find(instruction)!=-1:
                     var_rest = store[0][0]
-                    dep = are_dependent(store,elem,j,i, location)
+                    dep = are_dependent(ctx, store,elem,j,i, location)
                     # dep = are_dependent(store,elem)
                     if dep:
                         storage_dependences.append((j,i))                                
@@ -6016,7 +5641,7 @@ def generate_dependences(storage_location, location):
                 store = successor[j]
                 if store[0][-1].find(instruction)!=-1:
                     var_rest = store[0][0]
-                    dep = are_dependent(elem,store,i,i+1+j, location)
+                    dep = are_dependent(ctx, elem,store,i,i+1+j, location)
                     # dep = are_dependent(elem,store)
                     if dep:
                         storage_dependences.append((i,i+j+1))
@@ -6040,7 +5665,7 @@ def generate_dependences(storage_location, location):
                     # print(store)
                     # print(i)
                     # print(j)
-                    dep = are_dependent(elem, store,i,j, location)
+                    dep = are_dependent(ctx, elem, store,i,j, location)
                     # dep = are_dependent(elem,store)
                     if dep:
                         if elem[0][1] != store[0][1]: #if the value is the same they are not dependent
@@ -6058,7 +5683,7 @@ def generate_dependences(storage_location, location):
                 store = successor[j]
                 if store[0][-1].find(instruction)!=-1:
                     var_rest = store[0][0]
-                    dep = are_dependent(elem,store,i,i+1+j, location)
+                    dep = are_dependent(ctx, elem,store,i,i+1+j, location)
                     # dep = are_dependent(elem,store)
                     if dep:
                         if elem[0][1] != store[0][1]: #if the value is the same they are not dependent
@@ -6073,39 +5698,40 @@ def generate_dependences(storage_location, location):
     return storage_dependences
 
 def simplify_dependences(deps: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-    dg = nx.DiGraph(deps)
+    # Blocks without dependences do not need to load networkx
+    if len(deps) == 0:
+        return []
+
+    import networkx as nx
+    # Building the graph from the edges directly avoids the conversion in nx.DiGraph(deps), which imports pandas
+    dg = nx.DiGraph()
+    dg.add_edges_from(deps)
     tr = nx.transitive_reduction(dg)
     return list(tr.edges)
 
 
-def update_variables_loads(elem1, elem2, storage_location, location):
-    global variable_content
-    global storage_order
-    global memory_order
-    global u_dict
-
-
-    for v in u_dict:
-        elem = u_dict[v]
+def update_variables_loads(ctx, elem1, elem2, storage_location, location):
+    for v in ctx.u_dict:
+        elem = ctx.u_dict[v]
         if elem == elem1:
             var2keep = v
         if elem == elem2:
             var2replace = v
             
     #We remove the second sload
-    u_dict.pop(var2replace)
+    ctx.u_dict.pop(var2replace)
 
-    for v in u_dict:
-        elem = u_dict[v]
+    for v in ctx.u_dict:
+        elem = ctx.u_dict[v]
         list_tuple = list(elem[0])
         if var2replace in list_tuple:
             pos = elem[0].index(var2replace)
             list_tuple[pos] = var2keep
-            u_dict[v] = (tuple(list_tuple),elem[1])
+            ctx.u_dict[v] = (tuple(list_tuple),elem[1])
     
-    for var in variable_content:
-        if variable_content[var] == var2replace:
-            variable_content[var] = var2keep
+    for var in ctx.variable_content:
+        if ctx.variable_content[var] == var2replace:
+            ctx.variable_content[var] = var2keep
 
     for i in range(0,len(storage_location)):
         elem = storage_location[i]
@@ -6117,9 +5743,9 @@ def update_variables_loads(elem1, elem2, storage_location, location):
 
 
     if location == "storage":
-        complement_order = memory_order
+        complement_order = ctx.memory_order
     else:
-        complement_order = storage_order
+        complement_order = ctx.storage_order
 
     for i in range(0,len(complement_order)):
         elem = complement_order[i]
@@ -6134,32 +5760,28 @@ def update_variables_loads(elem1, elem2, storage_location, location):
             
             
 
-def update_variables_keccaks(elem1, elem2, storage_location, storage_order):
-    global variable_content
-    global u_dict
-
-
-    for v in u_dict:
-        elem = u_dict[v]
+def update_variables_keccaks(ctx, elem1, elem2, storage_location, storage_order):
+    for v in ctx.u_dict:
+        elem = ctx.u_dict[v]
         if elem == elem1:
             var2keep = v
         if elem == elem2:
             var2replace = v
             
     #We remove the second sload
-    u_dict.pop(var2replace)
+    ctx.u_dict.pop(var2replace)
 
-    for v in u_dict:
-        elem = u_dict[v]
+    for v in ctx.u_dict:
+        elem = ctx.u_dict[v]
         list_tuple = list(elem[0])
         if var2replace in list_tuple:
             pos = elem[0].index(var2replace)
             list_tuple[pos] = var2keep
-            u_dict[v] = (tuple(list_tuple),elem[1])
+            ctx.u_dict[v] = (tuple(list_tuple),elem[1])
     
-    for var in variable_content:
-        if variable_content[var] == var2replace:
-            variable_content[var] = var2keep
+    for var in ctx.variable_content:
+        if ctx.variable_content[var] == var2replace:
+            ctx.variable_content[var] = var2keep
 
     for i in range(0,len(storage_location)):
         elem = storage_location[i]
@@ -6181,9 +5803,7 @@ def update_variables_keccaks(elem1, elem2, storage_location, storage_order):
             
     
 #It checks in which cases the loads are the same
-def unify_loads_instructions(storage_location, location):
-    global variable_content
-
+def unify_loads_instructions(ctx, storage_location, location):
     if location == "storage":
         instruction = "sload"
         store_ins = "sstore"
@@ -6206,7 +5826,7 @@ def unify_loads_instructions(storage_location, location):
                 for j in range(len(rest_list)):
                     x = rest_list[j]
                     if(x[0][-1].find(store_ins)!=-1):
-                        dep.append(are_dependent(elem,x,i,i+1+j, location))
+                        dep.append(are_dependent(ctx, elem,x,i,i+1+j, location))
                 # st_list = list(filter(lambda x: x[0][-1].find(store_ins)!=-1, rest_list))
                 # dep = list(map(lambda x: are_dependent(elem,x),st_list))
                 
@@ -6217,8 +5837,8 @@ def unify_loads_instructions(storage_location, location):
                     # print(elem, load_ins)                    
                     
                     old = storage_location.pop(pos_aux+i+1)
-                    update_variables_loads(elem,load_ins,storage_location, location)
-                    unify_loads_instructions(storage_location,location)
+                    update_variables_loads(ctx, elem,load_ins,storage_location, location)
+                    unify_loads_instructions(ctx, storage_location,location)
                     # storage_location.insert(pos_aux+i+1,old)
                     finished = True
                 
@@ -6228,9 +5848,7 @@ def unify_loads_instructions(storage_location, location):
 
 #It checks in which cases the loads are the same
 #It is checked only respect to memory as it is the storage location that may affect keccaks
-def unify_keccak_instructions(storage_location,storage_order, location = "memory"):
-    global variable_content
-
+def unify_keccak_instructions(ctx, storage_location,storage_order, location = "memory"):
     instruction = "keccak"
     store_ins = "mstore"
 
@@ -6250,12 +5868,12 @@ def unify_keccak_instructions(storage_location,storage_order, location = "memory
                 for j in range(len(rest_list)):
                     x = rest_list[j]
                     if(x[0][-1].find(store_ins)!=-1):
-                        dep.append(are_dependent(elem,x,i,i+1+j, location))
+                        dep.append(are_dependent(ctx, elem,x,i,i+1+j, location))
                 
                 if True not in dep:
                     old = storage_location.pop(pos_aux+i+1)
-                    update_variables_keccaks(elem,k_ins,storage_location,storage_order)
-                    unify_keccak_instructions(storage_location,storage_order)
+                    update_variables_keccaks(ctx, elem,k_ins,storage_location,storage_order)
+                    unify_keccak_instructions(ctx, storage_location,storage_order)
                     # storage_location.insert(pos_aux+i+1,old)
                     finished = True
                 
@@ -6263,7 +5881,7 @@ def unify_keccak_instructions(storage_location,storage_order, location = "memory
         i+=1
 
         
-def compute_identifiers_storage_instructions(storage_location, location, new_user_defins):
+def compute_identifiers_storage_instructions(ctx, storage_location, location, new_user_defins):
 
     if location == "storage":
         store = "sstore"
@@ -6284,8 +5902,8 @@ def compute_identifiers_storage_instructions(storage_location, location, new_use
     
     storage_identifiers = []
 
-    key_list = list(u_dict.keys())
-    values_list = list(u_dict.values())
+    key_list = list(ctx.u_dict.keys())
+    values_list = list(ctx.u_dict.values())
 
     # print(storage_location)
     
@@ -6336,17 +5954,11 @@ def compute_identifiers_storage_instructions(storage_location, location, new_use
 
 
 
-def update_storage_sequences(removed_instructions,simplification,max_ss_idx):
-    global storage_order
-    global memory_order
-    global storage_dep
-    global memory_dep
-    global non_aliasing_disabled
-    
+def update_storage_sequences(ctx, removed_instructions,simplification,max_ss_idx):
     new_storage_order = []
     new_memory_order = []
     
-    for ins in storage_order:
+    for ins in ctx.storage_order:
         instructions_name = ins[0][-1]
         inpt_var = ins[0][0]
         if instructions_name.find("sload")!=-1:
@@ -6373,7 +5985,7 @@ def update_storage_sequences(removed_instructions,simplification,max_ss_idx):
                 found = False
                 for u in unused:
                     out_var = u["outpt_sk"][0]
-                    if u_dict[out_var] == ins:
+                    if ctx.u_dict[out_var] == ins:
                         found = True
                 if not found:
                     new_storage_order.append(ins)
@@ -6390,32 +6002,32 @@ def update_storage_sequences(removed_instructions,simplification,max_ss_idx):
             new_storage_order.append(ins)
 
 
-    if storage_order != new_storage_order:
-        storage_order = new_storage_order
+    if ctx.storage_order != new_storage_order:
+        ctx.storage_order = new_storage_order
         
         modified = False
-        if non_aliasing_disabled:
+        if ctx.non_aliasing_disabled:
             modified = True
-            old_value = non_aliasing_disabled
-            non_aliasing_disabled = not non_aliasing_disabled
+            old_value = ctx.non_aliasing_disabled
+            ctx.non_aliasing_disabled = not ctx.non_aliasing_disabled
 
         
         if simplification:
             simp = True
             while(simp):
-                simp = simplify_memory(storage_order, memory_order, "storage")
+                simp = simplify_memory(ctx, ctx.storage_order, ctx.memory_order, "storage")
 
         if modified:
             modified = False
-            non_aliasing_disabled = old_value
+            ctx.non_aliasing_disabled = old_value
                 
-        stdep = generate_dependences(storage_order,"storage")
+        stdep = generate_dependences(ctx, ctx.storage_order,"storage")
         stdep = simplify_dependences(stdep)
         
-        storage_dep = stdep
+        ctx.storage_dep = stdep
         # storage_order = new_storage_order
         
-    for ins in memory_order:
+    for ins in ctx.memory_order:
         instructions_name = ins[0][-1]
         inpt_var = ins[0][0]
         if instructions_name.find("mload")!=-1:
@@ -6450,36 +6062,36 @@ def update_storage_sequences(removed_instructions,simplification,max_ss_idx):
                 found = False
                 for u in unused:
                     out_var = u["outpt_sk"][0]
-                    if u_dict[out_var] == ins:
+                    if ctx.u_dict[out_var] == ins:
                         found = True
                 if not found:
                     new_memory_order.append(ins)
         else:
             new_memory_order.append(ins)
             
-    if memory_order != new_memory_order:
-        memory_order = new_memory_order
+    if ctx.memory_order != new_memory_order:
+        ctx.memory_order = new_memory_order
 
         modified = False
-        if non_aliasing_disabled:
+        if ctx.non_aliasing_disabled:
             modified = True
-            old_value = non_aliasing_disabled
-            non_aliasing_disabled = not non_aliasing_disabled
+            old_value = ctx.non_aliasing_disabled
+            ctx.non_aliasing_disabled = not ctx.non_aliasing_disabled
         
         if simplification:
             simp = True
             while(simp):
-                simp = simplify_memory(memory_order, storage_order, "memory")
+                simp = simplify_memory(ctx, ctx.memory_order, ctx.storage_order, "memory")
 
 
         if modified:
             modified = False
-            non_aliasing_disabled = old_value
+            ctx.non_aliasing_disabled = old_value
                 
-        memdep = generate_dependences(memory_order,"memory")
+        memdep = generate_dependences(ctx, ctx.memory_order,"memory")
         memdep = simplify_dependences(memdep)
         
-        memory_dep = memdep
+        ctx.memory_dep = memdep
         # memory_order = new_memory_order
 
 
@@ -6491,18 +6103,18 @@ def unify_stack_variables_unused(unused,max_ss_idx):
                 val = int(u["inpt_sk"][i][2:-1])
                 u["inpt_sk"][i] = "s("+str(max_ss_idx-val)+")"
 
-def translate_dependences_sfs(new_user_defins):    
+def translate_dependences_sfs(ctx, new_user_defins):    
     new_storage_dep = []
     new_memory_dep = []
     
-    storage = compute_identifiers_storage_instructions(storage_order,"storage",new_user_defins)
-    memory = compute_identifiers_storage_instructions(memory_order,"memory",new_user_defins)
+    storage = compute_identifiers_storage_instructions(ctx, ctx.storage_order,"storage",new_user_defins)
+    memory = compute_identifiers_storage_instructions(ctx, ctx.memory_order,"memory",new_user_defins)
     
-    for e in storage_dep:
+    for e in ctx.storage_dep:
         first, second = e    
         new_storage_dep.append((storage[first],storage[second]))
 
-    for e in memory_dep:
+    for e in ctx.memory_dep:
         first, second = e
         new_memory_dep.append((memory[first],memory[second]))
 
@@ -6511,21 +6123,21 @@ def translate_dependences_sfs(new_user_defins):
 
 #it receives two tuples of the form ((ar1,arg2, opcode),arity) and
 #checks if t1 has to be executed before t2.
-def are_dependent(t1, t2, idx1, idx2, location = "memory"):
+def are_dependent(ctx, t1, t2, idx1, idx2, location = "memory"):
     dep = False
 
 
     #It uses memory analysis dependences
-    if extra_dep_info!={} and not non_aliasing_disabled:
-        pc_index1 = get_idx_in_instructions(idx1, location)
-        pc_index2 = get_idx_in_instructions(idx2, location)
+    if ctx.extra_dep_info!={} and not ctx.non_aliasing_disabled:
+        pc_index1 = get_idx_in_instructions(ctx, idx1, location)
+        pc_index2 = get_idx_in_instructions(ctx, idx2, location)
 
         if location == "memory":
-            eqs = extra_dep_info["memory_deps_eqs"]
-            neqs = extra_dep_info["memory_deps_noneqs"]
+            eqs = ctx.extra_dep_info["memory_deps_eqs"]
+            neqs = ctx.extra_dep_info["memory_deps_noneqs"]
         elif location == "storage":
-            eqs = extra_dep_info["storage_deps_eqs"]
-            neqs = extra_dep_info["storage_deps_noneqs"]
+            eqs = ctx.extra_dep_info["storage_deps_eqs"]
+            neqs = ctx.extra_dep_info["storage_deps_noneqs"]
         else:
             raise Exception("Unknown location")
 
@@ -6592,8 +6204,8 @@ def are_dependent(t1, t2, idx1, idx2, location = "memory"):
         if var1_str.startswith("s") and var2_str.startswith("s"):
             list1 = []
             list2 = []
-            get_variables(var1,list1)
-            get_variables(var2,list2)
+            get_variables(ctx, var1,list1)
+            get_variables(ctx, var2,list2)
             if var1 in list2 or var2 in list1:
                 dep = False
             else:
@@ -6601,7 +6213,7 @@ def are_dependent(t1, t2, idx1, idx2, location = "memory"):
 
                 
         elif var1_str.startswith("s") or var2_str.startswith("s"):
-            if mem40_pattern:
+            if ctx.mem40_pattern:
                 if (ins1.find("mload")!=-1 or ins1.find("mstore")!=-1) and (var1_str =="64" or var2_str == "64"):
                     dep = False
                 else:
@@ -6638,12 +6250,12 @@ def are_dependent(t1, t2, idx1, idx2, location = "memory"):
             
     return dep
 
-def get_variables(var1,list_variables):
-    if var1 in u_dict:
-        values = list(u_dict[var1])
+def get_variables(ctx, var1,list_variables):
+    if var1 in ctx.u_dict:
+        values = list(ctx.u_dict[var1])
 
         for v in values[:-1]:
-            get_variables(v,list_variables)
+            get_variables(ctx, v,list_variables)
         
     else:
         list_variables.append(var1)
@@ -6872,9 +6484,7 @@ def generate_push_instruction(idx, value, out):
 
     return obj
 
-def transform_push_uninterpreted_functions(target_stack,uninterpreted_functions):
-    global s_counter
-
+def transform_push_uninterpreted_functions(ctx, target_stack,uninterpreted_functions):
     push_variables = {}
     new_variables = []
     new_uninterpreted = []
@@ -6887,9 +6497,9 @@ def transform_push_uninterpreted_functions(target_stack,uninterpreted_functions)
         if is_integer(v) != -1:
             s_var = push_variables.get(v,-1)
             if s_var == -1:
-                s_var = "s("+str(s_counter)+")"
+                s_var = "s("+str(ctx.s_counter)+")"
                 push_variables[v] = s_var
-                s_counter+=1
+                ctx.s_counter+=1
                 new_obj = generate_push_instruction(push_idx, v, s_var)
                 push_idx+=1
                 new_uninterpreted.append(new_obj)
@@ -6910,9 +6520,9 @@ def transform_push_uninterpreted_functions(target_stack,uninterpreted_functions)
             if is_integer(in_v) != -1:
                 s_var = push_variables.get(in_v,-1)
                 if s_var == -1:
-                    s_var = "s("+str(s_counter)+")"
+                    s_var = "s("+str(ctx.s_counter)+")"
                     push_variables[in_v] = s_var
-                    s_counter+=1
+                    ctx.s_counter+=1
                     new_obj = generate_push_instruction(push_idx, in_v, s_var)
                     push_idx+=1
                     new_uninterpreted.append(new_obj)
@@ -7207,17 +6817,17 @@ def unify_user_defins(ts,user_def_instructions,list_vars):
     return modified, new_user_def, target_stack
         
 
-def modify_sstack_context_info(sstack):
+def modify_sstack_context_info(ctx, sstack):
     
-    for p in context_info["aliasing_context"]:
+    for p in ctx.context_info["aliasing_context"]:
         old_value = "s("+str(p[1])+")"
         new_value = "s("+str(p[0])+")"
         if old_value in sstack:
             pos = sstack.index("s("+str(p[1])+")")
             sstack = sstack[:pos]+["s("+str(p[0])+")"]+sstack[pos+1:]
 
-    for v in context_info["computed_aliasing"]:
-        alias = context_info["computed_aliasing"][v]
+    for v in ctx.context_info["computed_aliasing"]:
+        alias = ctx.context_info["computed_aliasing"][v]
         new_value = "s("+str(alias[0])+")"
         for r in alias[1:]:
             old_value = "s("+str(r)+")"
@@ -7228,28 +6838,28 @@ def modify_sstack_context_info(sstack):
 
     return sstack
 
-def get_value_constancy_context(variable):
+def get_value_constancy_context(ctx, variable):
 
     if is_integer(variable) != -1:
         return variable
 
     if variable.find("s(")!=-1:
-        number = context_info["stack_size"]-1-int(variable[2:-1])
-        c_info = list(filter(lambda x: x[0] == int(number), context_info["constancy_context"]))
+        number = ctx.context_info["stack_size"]-1-int(variable[2:-1])
+        c_info = list(filter(lambda x: x[0] == int(number), ctx.context_info["constancy_context"]))
         if len(c_info)!=0:
             return str(c_info[0][1])
         else:
             return -1
 
 
-def modify_json_info_with_constancy(ts,user_defins):
+def modify_json_info_with_constancy(ctx, ts,user_defins):
 
-    constancy_info = context_info["constancy_context"]
+    constancy_info = ctx.context_info["constancy_context"]
 
     for c in constancy_info: #c is a pair (pos, val)
-        if c[1] in context_info["computed_aliasing"]:
+        if c[1] in ctx.context_info["computed_aliasing"]:
             val = c[1]
-            new_val = "s("+str(context_info["computed_aliasing"][val][0])+")"
+            new_val = "s("+str(ctx.context_info["computed_aliasing"][val][0])+")"
         else:
             new_val = "s("+str(c[0])+")"
 
@@ -7,108 +7,50 @@ from timeit import default_timer as dtimer
 import global_params.paths as paths
 from sfs_generator.gasol_optimization import smt_translate_block, generate_subblocks2split
 from sfs_generator.rbr_rule import RBRRule
+from sfs_generator.sfs_context import SFSContext
 from sfs_generator.utils import get_push_number_hex, isYulInstruction
 
 '''
-It initialize the globals variables. 
--List opcodeX contains the evm bytecodes from set X.
--current_local_var has the max index of the local variables created.
--rbr_blocks is a mapping rbr_id->list of rbr rules (jumps contains 2 rules per rbr_id).
--stack_index is a mapping block_id->[stack_height_begin, stack_heigh_end].
--max_field_list keeps the id of the known fields accessed during the execution.
--bc_in_use keeps the contract data used during the execution.
--new fid keeps the index of the new fresh variable.
+Lists opcodeX contain the evm bytecodes from set X.
+The state of the RBR generation (current_local_var, rbr_blocks, stack_index...)
+is stored in the SFSContext of each block.
 '''
-def init_globals():
-    
-    global opcodes0
-    opcodes0 = ["STOP", "ADD", "MUL", "SUB", "DIV", "SDIV", "MOD",
-                "SMOD", "ADDMOD", "MULMOD", "EXP", "SIGNEXTEND"]
-
-    global opcodes10
-    opcodes10 = ["LT", "GT", "SLT", "SGT", "EQ", "ISZERO", "AND", "OR",
-                 "XOR", "NOT", "BYTE","SHL","SHR","SAR"]
-
-    global opcodes20
-    opcodes20 = ["SHA3","KECCAK256"]
+opcodes0 = ["STOP", "ADD", "MUL", "SUB", "DIV", "SDIV", "MOD",
+            "SMOD", "ADDMOD", "MULMOD", "EXP", "SIGNEXTEND"]
 
-    global opcodes30
-    opcodes30 = ["ADDRESS", "BALANCE", "ORIGIN", "CALLER",
-                 "CALLVALUE", "CALLDATALOAD", "CALLDATASIZE",
-                 "CALLDATACOPY", "CODESIZE", "CODECOPY", "GASPRICE",
-                 "EXTCODESIZE", "EXTCODECOPY", "MCOPY","EXTCODEHASH"]
+opcodes10 = ["LT", "GT", "SLT", "SGT", "EQ", "ISZERO", "AND", "OR",
+             "XOR", "NOT", "BYTE","SHL","SHR","SAR"]
 
-    global opcodes40
-    opcodes40 = ["BLOCKHASH", "COINBASE", "TIMESTAMP", "NUMBER",
-                 "DIFFICULTY", "PREVRANDAO", "GASLIMIT","SELFBALANCE","CHAINID","BASEFEE"]
+opcodes20 = ["SHA3","KECCAK256"]
 
-    global opcodes50
-    opcodes50 = ["POP", "MLOAD", "MSTORE", "MSTORE8", "SLOAD",
-                 "SSTORE", "JUMP", "JUMPI", "PC", "MSIZE", "GAS", "JUMPDEST",
-                 "SLOADEXT", "SSTOREEXT", "SLOADBYTESEXT", "SSTOREBYTESEXT"]
+opcodes30 = ["ADDRESS", "BALANCE", "ORIGIN", "CALLER",
+             "CALLVALUE", "CALLDATALOAD", "CALLDATASIZE",
+             "CALLDATACOPY", "CODESIZE", "CODECOPY", "GASPRICE",
+             "EXTCODESIZE", "EXTCODECOPY", "MCOPY","EXTCODEHASH"]
 
-    global opcodes60
-    opcodes60 = ["PUSH"]
+opcodes40 = ["BLOCKHASH", "COINBASE", "TIMESTAMP", "NUMBER",
+             "DIFFICULTY", "PREVRANDAO", "GASLIMIT","SELFBALANCE","CHAINID","BASEFEE"]
 
-    global opcodes80
-    opcodes80 = ["DUP"]
+opcodes50 = ["POP", "MLOAD", "MSTORE", "MSTORE8", "SLOAD",
+             "SSTORE", "JUMP", "JUMPI", "PC", "MSIZE", "GAS", "JUMPDEST",
+             "SLOADEXT", "SSTOREEXT", "SLOADBYTESEXT", "SSTOREBYTESEXT"]
 
-    global opcodes90
-    opcodes90 = ["SWAP"]
+opcodes60 = ["PUSH"]
 
-    global opcodesA
-    opcodesA = ["LOG0", "LOG1", "LOG2", "LOG3", "LOG4"]
+opcodes80 = ["DUP"]
 
-    global opcodesF
-    opcodesF = ["CREATE", "CALL", "CALLCODE", "RETURN", "REVERT",
-                "ASSERTFAIL", "DELEGATECALL", "BREAKPOINT", "RNGSEED", "SSIZEEXT",
-                "SLOADBYTES", "SSTOREBYTES", "SSIZE", "STATEROOT", "TXEXECGAS",
-                "CALLSTATIC", "INVALID", "SUICIDE","STATICCALL","CREATE2"]
+opcodes90 = ["SWAP"]
 
-    global opcodesZ
-    opcodesZ = ["RETURNDATACOPY","RETURNDATASIZE"]
-
-    global opcodesYul
-    opcodesYul = ["PUSH [tag]","PUSH #[$]","PUSH [$]", "PUSH data", "PUSHDEPLOYADDRESS", "ASSIGNIMMUTABLE","PUSHSIZE","PUSHIMMUTABLE","PUSHLIB"]
-    
-    global current_local_var
-    current_local_var = 0
-        
-    global rbr_blocks
-    rbr_blocks = {}
+opcodesA = ["LOG0", "LOG1", "LOG2", "LOG3", "LOG4"]
 
-    global stack_index
-    stack_index = {}
-
-    global top_index
-    top_index = 0
-
-    global blockhash_cont
-    blockhash_cont = 0
-
-    global pc_cont
-    pc_cont = 0
-
-    global mload_counter
-    mload_counter = 0
-    
-    global sload_counter
-    sload_counter = 0
+opcodesF = ["CREATE", "CALL", "CALLCODE", "RETURN", "REVERT",
+            "ASSERTFAIL", "DELEGATECALL", "BREAKPOINT", "RNGSEED", "SSIZEEXT",
+            "SLOADBYTES", "SSTOREBYTES", "SSIZE", "STATEROOT", "TXEXECGAS",
+            "CALLSTATIC", "INVALID", "SUICIDE","STATICCALL","CREATE2"]
 
-    global gas_counter
-    gas_counter = 0
+opcodesZ = ["RETURNDATACOPY","RETURNDATASIZE"]
 
-    global hash_counter
-    hash_counter = 0
-
-    global timestamp_counter
-    timestamp_counter = 0
-
-    global assignImmutable_counter
-    assignImmutable_counter = 0
-
-    global assignImmutable_dict
-    assignImmutable_dict = {}
+opcodesYul = ["PUSH [tag]","PUSH #[$]","PUSH [$]", "PUSH data", "PUSHDEPLOYADDRESS", "ASSIGNIMMUTABLE","PUSHSIZE","PUSHIMMUTABLE","PUSHLIB"]
 
 
 '''
@@ -117,19 +59,17 @@ stack when arriving and leaving the block.
 -bock:block start address. int.
 -It returns a list with 2 elements. [int, int].
 '''
-def get_stack_index(block):
+def get_stack_index(ctx, block):
     try:
-        return stack_index[block]
+        return ctx.stack_index[block]
     
     except:
         return [0,0]
 
 
-def update_top_index(val):
-    global top_index
-
-    if top_index < val:
-        top_index = val
+def update_top_index(ctx, val):
+    if ctx.top_index < val:
+        ctx.top_index = val
         
 
 '''
@@ -154,9 +94,9 @@ index.
 -index_variables: int.
 -It returns a tuple (stack variable, top stack index). (string, int).
 '''
-def get_new_variable(index_variables):
+def get_new_variable(ctx, index_variables):
     new_current = index_variables + 1
-    update_top_index(new_current)
+    update_top_index(ctx, new_current)
     return "s(" + str(new_current) + ")", new_current
 
 
@@ -206,63 +146,63 @@ generates variables depending on the bytecode and returns the
 corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 '''
-def translateOpcodes0(opcode,index_variables):
+def translateOpcodes0(ctx, opcode,index_variables):
     if opcode == "ADD":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = " + v1 + "+" + v2
     elif opcode == "MUL":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = " + v1 + "*" + v2
     elif opcode == "SUB":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = " + v1 + "-" + v2
     elif opcode == "DIV":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = " + v1 + "/" + v2
     elif opcode == "SDIV":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = f"{v3} = sdiv({v1}, {v2})"
     elif opcode == "MOD":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = " + v1 + "%" + v2
     elif opcode == "SMOD":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = " + v1 + "%" + v2
     elif opcode == "ADDMOD":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
         v3, updated_variables = get_consume_variable(updated_variables)
-        v4, updated_variables = get_new_variable(updated_variables)
+        v4, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v4+" = addmod(" + v1 + "," + v2 + ", " + v3+")"
     elif opcode == "MULMOD":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
         v3, updated_variables = get_consume_variable(updated_variables)
-        v4, updated_variables = get_new_variable(updated_variables)
+        v4, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v4+" = mulmod(" + v1 + "," + v2 + ","  + v3+")"
     elif opcode == "EXP":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = " + v1 + "^" + v2
     elif opcode == "SIGNEXTEND":
         v0_aux, updated_variables = get_consume_variable(index_variables)
         v0, updated_variables = get_consume_variable(updated_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         instr = v1+" = signextend("+v0_aux+","+v0+")"
 
@@ -283,11 +223,11 @@ generates variables depending on the bytecode and returns the
 corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 '''
-def translateOpcodes10(opcode, index_variables,cond):
+def translateOpcodes10(ctx, opcode, index_variables,cond):
     if opcode == "LT":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3 , updated_variables = get_new_variable(updated_variables)
+        v3 , updated_variables = get_new_variable(ctx, updated_variables)
         if cond :
             instr = v3+ " = lt(" + v1 + ", "+v2+")"
         else :
@@ -296,7 +236,7 @@ def translateOpcodes10(opcode, index_variables,cond):
     elif opcode == "GT":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3 , updated_variables = get_new_variable(updated_variables)
+        v3 , updated_variables = get_new_variable(ctx, updated_variables)
         if cond :
             instr = v3+ " = gt(" + v1 + ", "+v2+")"
         else :
@@ -306,7 +246,7 @@ def translateOpcodes10(opcode, index_variables,cond):
     elif opcode == "SLT":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3 , updated_variables = get_new_variable(updated_variables)
+        v3 , updated_variables = get_new_variable(ctx, updated_variables)
         if cond :
             instr = v3+ " = slt(" + v1 + ", "+v2+")"
         else :
@@ -315,7 +255,7 @@ def translateOpcodes10(opcode, index_variables,cond):
     elif opcode == "SGT":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3 , updated_variables = get_new_variable(updated_variables)
+        v3 , updated_variables = get_new_variable(ctx, updated_variables)
         if cond :
             instr = v3+ " = sgt(" + v1 + ", "+v2+")"
         else :
@@ -324,7 +264,7 @@ def translateOpcodes10(opcode, index_variables,cond):
     elif opcode == "EQ":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3 , updated_variables = get_new_variable(updated_variables)
+        v3 , updated_variables = get_new_variable(ctx, updated_variables)
         if cond:
             instr = v3+ "= eq(" + v1 + ", "+v2+")"
         else:
@@ -332,7 +272,7 @@ def translateOpcodes10(opcode, index_variables,cond):
 
     elif opcode == "ISZERO":
         v1, updated_variables = get_consume_variable(index_variables)
-        v2 , updated_variables = get_new_variable(updated_variables)
+        v2 , updated_variables = get_new_variable(ctx, updated_variables)
         if cond:
             instr = v2+ "= eq(" + v1 + ", 0)"
         else:
@@ -341,48 +281,48 @@ def translateOpcodes10(opcode, index_variables,cond):
     elif opcode == "AND":
             v1, updated_variables = get_consume_variable(index_variables)
             v2, updated_variables = get_consume_variable(updated_variables)
-            v3, updated_variables = get_new_variable(updated_variables)
+            v3, updated_variables = get_new_variable(ctx, updated_variables)
             instr = v3+" = and(" + v1 + ", " + v2+")"
 
     elif opcode == "OR":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = or(" + v1 + ", " + v2+")"
 
     elif opcode == "XOR":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v3+" = xor(" + v1 + ", " + v2+")"
 
     elif opcode == "NOT":
         v1, updated_variables = get_consume_variable(index_variables)
-        v2, updated_variables = get_new_variable(updated_variables)
+        v2, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v2+" = not(" + v1 + ")"
 
     elif opcode == "BYTE":
         v0, updated_variables = get_consume_variable(index_variables)
         v1, updated_variables = get_consume_variable(updated_variables)
-        v2, updated_variables = get_new_variable(updated_variables)
+        v2, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v2+" = byte(" + v0 + " , " + v1 + ")"
 
     elif opcode == "SHL":
         v0, updated_variables = get_consume_variable(index_variables)
         v1, updated_variables = get_consume_variable(updated_variables)
-        v2, updated_variables = get_new_variable(updated_variables)
+        v2, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v2+" = shl(" + v0 + " , " + v1 + ")" 
 
     elif opcode == "SHR":
         v0, updated_variables = get_consume_variable(index_variables)
         v1, updated_variables = get_consume_variable(updated_variables)
-        v2, updated_variables = get_new_variable(updated_variables)
+        v2, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v2+" = shr(" + v0 + " , " + v1 + ")" 
 
     elif opcode == "SAR":
         v0, updated_variables = get_consume_variable(index_variables)
         v1, updated_variables = get_consume_variable(updated_variables)
-        v2, updated_variables = get_new_variable(updated_variables)
+        v2, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v2+" = sar(" + v0 + " , " + v1 + ")" 
 
     else:    
@@ -398,21 +338,19 @@ generates variables depending on the bytecode and returns the
 corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 '''
-def translateOpcodes20(opcode, index_variables):
-    global hash_counter
-
+def translateOpcodes20(ctx, opcode, index_variables):
     if opcode == "SHA3":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
-        instr = v3+" = sha3+"+str(hash_counter)+"("+ v1+", "+v2+")"
-        hash_counter+=1
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
+        instr = v3+" = sha3+"+str(ctx.hash_counter)+"("+ v1+", "+v2+")"
+        ctx.hash_counter+=1
     elif opcode == "KECCAK256":
         v1, updated_variables = get_consume_variable(index_variables)
         v2, updated_variables = get_consume_variable(updated_variables)
-        v3, updated_variables = get_new_variable(updated_variables)
-        instr = v3+" = keccak256"+str(hash_counter)+"("+ v1+", "+v2+")"
-        hash_counter+=1
+        v3, updated_variables = get_new_variable(ctx, updated_variables)
+        instr = v3+" = keccak256"+str(ctx.hash_counter)+"("+ v1+", "+v2+")"
+        ctx.hash_counter+=1
     else:
         instr = "Error opcodes20: "+opcode
         updated_variables = index_variables
@@ -425,38 +363,38 @@ generates variables depending on the bytecode and returns the
 corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 '''
-def translateOpcodes30(opcode, value, index_variables):
+def translateOpcodes30(ctx, opcode, value, index_variables):
     
     if opcode == "ADDRESS":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = address"
 
     elif opcode == "BALANCE":
         _, updated_variables = get_consume_variable(index_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v1+" = balance"
 
     elif opcode == "ORIGIN":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = origin"
 
     elif opcode == "CALLER":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = caller"
 
     elif opcode == "CALLVALUE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = callvalue"
 
     elif opcode == "CALLDATALOAD":
         v0, updated_variables = get_consume_variable(index_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         instr = v1+" = calldataload"
 
             
     elif opcode == "CALLDATASIZE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = calldatasize"
 
     elif opcode == "CALLDATACOPY":
@@ -467,7 +405,7 @@ def translateOpcodes30(opcode, value, index_variables):
         instr = "calldatacopy("+v0+","+v1+","+v2+")"
         
     elif opcode == "CODESIZE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = codesize"
 
     elif opcode == "CODECOPY":
@@ -478,12 +416,12 @@ def translateOpcodes30(opcode, value, index_variables):
         instr = "calldatacopy("+v0+","+v1+","+v2+")"  
         
     elif opcode == "GASPRICE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = gasprice"
 
     elif opcode == "EXTCODESIZE":
         v0, updated_variables = get_consume_variable(index_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v1+" = extcodesize"
 
     elif opcode == "EXTCODECOPY":
@@ -496,7 +434,7 @@ def translateOpcodes30(opcode, value, index_variables):
 
     elif opcode == "EXTCODEHASH":
         _, updated_variables = get_consume_variable(index_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
         instr = v1+" = extcodehash("+v1+")"  
         
     elif opcode == "MCOPY":
@@ -514,52 +452,49 @@ generates variables depending on the bytecode and returns the
 corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 '''
-def translateOpcodes40(opcode, index_variables):
-    global blockhash_cont
-    global timestamp_counter
-    
+def translateOpcodes40(ctx, opcode, index_variables):
     if opcode == "BLOCKHASH":
         v0, updated_variables = get_consume_variable(index_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
-        instr = v1+" = blockhash_"+str(blockhash_cont)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
+        instr = v1+" = blockhash_"+str(ctx.blockhash_cont)
 
-        blockhash_cont +=1
+        ctx.blockhash_cont +=1
     elif opcode == "COINBASE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = coinbase"
 
     elif opcode == "TIMESTAMP":
-        v1, updated_variables = get_new_variable(index_variables)
-        instr = v1+" = timestamp"+str(timestamp_counter)
-        timestamp_counter+=1
+        v1, updated_variables = get_new_variable(ctx, index_variables)
+        instr = v1+" = timestamp"+str(ctx.timestamp_counter)
+        ctx.timestamp_counter+=1
 
     elif opcode == "NUMBER":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = number"
 
     elif opcode == "DIFFICULTY":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = difficulty"
 
     elif opcode == "PREVRANDAO":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = prevrandao"
 
     elif opcode == "BASEFEE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = basefee"
 
         
     elif opcode == "GASLIMIT":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = gaslimit"
 
     elif opcode == "SELFBALANCE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = selfbalance"
 
     elif opcode == "CHAINID":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = chainid"
 
 
@@ -576,21 +511,16 @@ generates variables depending on the bytecode and returns the
 corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 '''
-def translateOpcodes50(opcode, value, index_variables):
-    global pc_cont
-    global sload_counter
-    global mload_counter
-    global gas_counter
-    
+def translateOpcodes50(ctx, opcode, value, index_variables):
     if opcode == "POP":        
         v1, updated_variables = get_consume_variable(index_variables)
         instr=""
     elif opcode == "MLOAD":
         _ , updated_variables = get_consume_variable(index_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
-        instr = v1+" = mload"+str(mload_counter)+"("+v1+")"
-        mload_counter+=1
+        instr = v1+" = mload"+str(ctx.mload_counter)+"("+v1+")"
+        ctx.mload_counter+=1
         
     elif opcode == "MSTORE":
         v0 , updated_variables = get_consume_variable(index_variables)
@@ -606,10 +536,10 @@ def translateOpcodes50(opcode, value, index_variables):
 
     elif opcode == "SLOAD":
         _ , updated_variables = get_consume_variable(index_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
-        instr = v1+" = sload"+str(sload_counter)+"("+v1+")"
-        sload_counter+=1
+        instr = v1+" = sload"+str(ctx.sload_counter)+"("+v1+")"
+        ctx.sload_counter+=1
 
     elif opcode == "SSTORE":
         v0 , updated_variables = get_consume_variable(index_variables)
@@ -618,18 +548,18 @@ def translateOpcodes50(opcode, value, index_variables):
         instr = "sstore("+v0+","+v1+")"
 
     elif opcode == "PC":
-        v1, updated_variables = get_new_variable(index_variables)
-        instr = v1 + " = pc"+str(pc_cont)
-        pc_cont+=1
+        v1, updated_variables = get_new_variable(ctx, index_variables)
+        instr = v1 + " = pc"+str(ctx.pc_cont)
+        ctx.pc_cont+=1
 
     elif opcode == "MSIZE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1 + " = msize"
 
     elif opcode == "GAS":
-        v1, updated_variables = get_new_variable(index_variables)
-        instr = v1+" = "+"gas"+str(gas_counter)
-        gas_counter+=1
+        v1, updated_variables = get_new_variable(ctx, index_variables)
+        instr = v1+" = "+"gas"+str(ctx.gas_counter)
+        ctx.gas_counter+=1
     elif opcode == "JUMPDEST":
         instr = ""
         updated_variables = index_variables
@@ -707,12 +637,12 @@ generates variables depending on the bytecode and returns the
 corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 '''
-def translateOpcodesF(opcode, index_variables, addr):
+def translateOpcodesF(ctx, opcode, index_variables, addr):
     if opcode == "CREATE":
         v00, updated_variables = get_consume_variable(index_variables)
         v01, updated_variables = get_consume_variable(updated_variables)
         v02, updated_variables = get_consume_variable(updated_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         instr = v1+" = create("+v00+","+v01+","+v02+")"
 
@@ -721,7 +651,7 @@ def translateOpcodesF(opcode, index_variables, addr):
         v01, updated_variables = get_consume_variable(updated_variables)
         v02, updated_variables = get_consume_variable(updated_variables)
         v03, updated_variables = get_consume_variable(updated_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         val = " = create2("+v00+","+v01+","+v02+","+v03+")"
 
@@ -735,7 +665,7 @@ def translateOpcodesF(opcode, index_variables, addr):
         v04, updated_variables = get_consume_variable(updated_variables)
         v05, updated_variables = get_consume_variable(updated_variables)
         v06, updated_variables = get_consume_variable(updated_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         instr = v1+" = call("+v00+","+v01+","+v02+","+v03+","+v04+","+v05+","+v06+")"  
         
@@ -747,7 +677,7 @@ def translateOpcodesF(opcode, index_variables, addr):
         v04, updated_variables = get_consume_variable(updated_variables)
         v05, updated_variables = get_consume_variable(updated_variables)
         v06, updated_variables = get_consume_variable(updated_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         instr = v1+" = callcode("+v00+","+v01+","+v02+","+v03+","+v04+","+v05+","+v06+")"  
         
@@ -776,7 +706,7 @@ def translateOpcodesF(opcode, index_variables, addr):
         v03, updated_variables = get_consume_variable(updated_variables)
         v04, updated_variables = get_consume_variable(updated_variables)
         v05, updated_variables = get_consume_variable(updated_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         instr = v1+" = delegatecall("+v00+","+v01+","+v02+","+v03+","+v04+","+v05+")"  
 
@@ -788,7 +718,7 @@ def translateOpcodesF(opcode, index_variables, addr):
         v03, updated_variables = get_consume_variable(updated_variables)
         v04, updated_variables = get_consume_variable(updated_variables)
         v05, updated_variables = get_consume_variable(updated_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         instr = v1+" = staticcall("+v00+","+v01+","+v02+","+v03+","+v04+","+v05+")"  
 
@@ -800,7 +730,7 @@ def translateOpcodesF(opcode, index_variables, addr):
         v04, updated_variables = get_consume_variable(updated_variables)
         v05, updated_variables = get_consume_variable(updated_variables)
         v06, updated_variables = get_consume_variable(updated_variables)
-        v1, updated_variables = get_new_variable(updated_variables)
+        v1, updated_variables = get_new_variable(ctx, updated_variables)
 
         instr = v1+" = callstatic("+v00+","+v01+","+v02+","+v03+","+v04+","+v05+","+v06+")"  
 
@@ -823,14 +753,14 @@ corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 -value is astring that contains the number pushed to the stack.
 '''
-def translateOpcodes60(opcode, value, index_variables):
+def translateOpcodes60(ctx, opcode, value, index_variables):
 
     if opcode.startswith("PUSH0"):
-        v1,updated_variables = get_new_variable(index_variables)
+        v1,updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = 0"
     
     elif opcode.startswith("PUSH"):
-        v1,updated_variables = get_new_variable(index_variables)
+        v1,updated_variables = get_new_variable(ctx, index_variables)
         dec_value = int(value,16)
         instr = v1+" = " + str(dec_value)
     else:
@@ -851,10 +781,10 @@ It duplicates what is stored in the stack at pos value (when
 value == 1, it duplicates the top of the stack) .
 -value refers to the position to be duplicated. string.
 '''
-def translateOpcodes80(opcode, value, index_variables):
+def translateOpcodes80(ctx, opcode, value, index_variables):
     if opcode == "DUP":
         v1 = get_ith_variable(index_variables,int(value)-1)
-        v2, updated_variables= get_new_variable(index_variables)
+        v2, updated_variables= get_new_variable(ctx, index_variables)
         instr = v2+" = "+v1
     else:
         instr = "Error opcodes80: "+opcode
@@ -871,11 +801,11 @@ corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 -value refers to the position involved in the swap. string.
 '''
-def translateOpcodes90(opcode, value, index_variables):
+def translateOpcodes90(ctx, opcode, value, index_variables):
     if opcode == "SWAP":
         v1 = get_ith_variable(index_variables,int(value))
         v2 = get_current_variable(index_variables)
-        v3,_ = get_new_variable(index_variables)
+        v3,_ = get_new_variable(ctx, index_variables)
         instr1 = v3 + " = " + v1
         instr2 = v1 + " = " + v2
         instr3 = v2 + " = " + v3
@@ -892,9 +822,9 @@ corresponding translated instruction and the variables's index
 updated. It also updated the corresponding global variables.
 Unclassified opcodes.
 '''
-def translateOpcodesZ(opcode, index_variables):
+def translateOpcodesZ(ctx, opcode, index_variables):
     if opcode == "RETURNDATASIZE":
-        v1, updated_variables = get_new_variable(index_variables)
+        v1, updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = returndatasize"
 
     elif opcode == "RETURNDATACOPY":
@@ -909,10 +839,7 @@ def translateOpcodesZ(opcode, index_variables):
 
     return instr, updated_variables
 
-def translateYulOpcodes(opcode, value, index_variables):
-    global assignImmutable_dict
-    global assignImmutable_counter
-    
+def translateYulOpcodes(ctx, opcode, value, index_variables):
     if opcode == "ASSIGNIMMUTABLE":
         v0 , updated_variables = get_consume_variable(index_variables)
         v1 , updated_variables = get_consume_variable(updated_variables)
@@ -924,22 +851,22 @@ def translateYulOpcodes(opcode, value, index_variables):
         
         #instr = "assignimmutable("+v0+","+v1+","+value+")"
 
-        instr = "mstoreImmutable"+str(assignImmutable_counter)+"("+v0+","+v1+")"
-        assignImmutable_dict[assignImmutable_counter] = value
-        assignImmutable_counter+=1
+        instr = "mstoreImmutable"+str(ctx.assignImmutable_counter)+"("+v0+","+v1+")"
+        ctx.assignImmutable_dict[ctx.assignImmutable_counter] = value
+        ctx.assignImmutable_counter+=1
 
         
     elif opcode == "PUSHDEPLOYADDRESS":
-        v1,updated_variables = get_new_variable(index_variables)
+        v1,updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = pushdeployaddress"
 
     elif opcode == "PUSHSIZE":
-        v1,updated_variables = get_new_variable(index_variables)
+        v1,updated_variables = get_new_variable(ctx, index_variables)
         instr = v1+" = pushsize"
 
         
     else:
-        v1,updated_variables = get_new_variable(index_variables)
+        v1,updated_variables = get_new_variable(ctx, index_variables)
         dec_value = int(value,16)
 
         if opcode == "PUSH [tag]":
@@ -973,7 +900,7 @@ They are remove when displaying.
 -nop is True when generating nop annotations with the opcode. False otherwise.
 -index_variables refers to the top stack index. int.
 '''
-def compile_instr(rule,evm_opcode,variables,list_jumps,cond):
+def compile_instr(ctx, rule,evm_opcode,variables,list_jumps,cond):
     opcode = evm_opcode.split(" ")
 
     if len(opcode) > 1:
@@ -986,22 +913,22 @@ def compile_instr(rule,evm_opcode,variables,list_jumps,cond):
     # print(opcode_name, opcode_rest)
 
     if opcode_name in opcodes0:
-        value, index_variables = translateOpcodes0(opcode_name, variables)
+        value, index_variables = translateOpcodes0(ctx, opcode_name, variables)
         rule.add_instr(value)
     elif opcode_name in opcodes10:
-        value, index_variables = translateOpcodes10(opcode_name, variables,cond)
+        value, index_variables = translateOpcodes10(ctx, opcode_name, variables,cond)
         rule.add_instr(value)
     elif opcode_name in opcodes20:
-        value, index_variables = translateOpcodes20(opcode_name, variables)
+        value, index_variables = translateOpcodes20(ctx, opcode_name, variables)
         rule.add_instr(value)
     elif opcode_name in opcodes30:
-        value, index_variables = translateOpcodes30(opcode_name,opcode_rest,variables)
+        value, index_variables = translateOpcodes30(ctx, opcode_name,opcode_rest,variables)
         rule.add_instr(value)
     elif opcode_name in opcodes40:
-        value, index_variables = translateOpcodes40(opcode_name,variables)
+        value, index_variables = translateOpcodes40(ctx, opcode_name,variables)
         rule.add_instr(value)
     elif opcode_name in opcodes50:
-        value, index_variables = translateOpcodes50(opcode_name, opcode_rest, variables)
+        value, index_variables = translateOpcodes50(ctx, opcode_name, opcode_rest, variables)
         if type(value) is list:
             for ins in value:
                 rule.add_instr(ins)
@@ -1011,14 +938,14 @@ def compile_instr(rule,evm_opcode,variables,list_jumps,cond):
         if opcode_name.startswith("PUSH0"):
             opcode_rest = "0"
             
-        value, index_variables = translateOpcodes60(opcode_name, opcode_rest, variables)
+        value, index_variables = translateOpcodes60(ctx, opcode_name, opcode_rest, variables)
         pushid = get_push_number_hex(opcode_rest)
         rule.add_instr(value)
     elif opcode_name[:3] in opcodes80:
-        value, index_variables = translateOpcodes80(opcode_name[:3], opcode_name[3:], variables)
+        value, index_variables = translateOpcodes80(ctx, opcode_name[:3], opcode_name[3:], variables)
         rule.add_instr(value)
     elif opcode_name[:4] in opcodes90:
-        value, index_variables = translateOpcodes90(opcode_name[:4], opcode_name[4:], variables)
+        value, index_variables = translateOpcodes90(ctx, opcode_name[:4], opcode_name[4:], variables)
 
         for ins in value: #SWAP returns a list (it is translated into 3 instructions)
             rule.add_instr(ins)
@@ -1027,14 +954,14 @@ def compile_instr(rule,evm_opcode,variables,list_jumps,cond):
         value, index_variables = translateOpcodesA(opcode_name, variables)
         rule.add_instr(value)
     elif opcode_name in opcodesF:
-        value, index_variables = translateOpcodesF(opcode_name,variables,opcode_rest)
+        value, index_variables = translateOpcodesF(ctx, opcode_name,variables,opcode_rest)
         #RETURN
         rule.add_instr(value)
     elif opcode_name in opcodesZ:
-        value, index_variables = translateOpcodesZ(opcode_name,variables)
+        value, index_variables = translateOpcodesZ(ctx, opcode_name,variables)
         rule.add_instr(value)
     elif opcode_name in opcodesYul:
-        value, index_variables = translateYulOpcodes(opcode_name,opcode_rest,variables)
+        value, index_variables = translateYulOpcodes(ctx, opcode_name,opcode_rest,variables)
         rule.add_instr(value)
         if evm_opcode.startswith("ASSIGNIMMUTABLE"):
             evm_opcode = "ASSIGNIMMUTABLE"
@@ -1052,12 +979,9 @@ It generates the rbr rules corresponding to a block from the CFG.
 index_variables points to the corresponding top stack index.
 The stack could be reconstructed as [s(ith)...s(0)].
 '''
-def compile_block(instrs,input_stack,block_id):
-    global rbr_blocks
-    global top_index
-
+def compile_block(ctx, instrs,input_stack,block_id):
     cont = 0
-    top_index = 0
+    ctx.top_index = 0
     finish = False
     
     index_variables = input_stack-1
@@ -1070,10 +994,10 @@ def compile_block(instrs,input_stack,block_id):
     while not(finish) and cont< len(l_instr):
         # if l_instr[cont].find("KECCAK")!=-1 and l_instr[cont-1].find("MSTORE")!=-1:
         #     #print("KECCYES")
-        index_variables = compile_instr(rule,l_instr[cont],index_variables,[],True)        
+        index_variables = compile_instr(ctx, rule,l_instr[cont],index_variables,[],True)        
         cont+=1
 
-    rule.set_fresh_index(top_index)
+    rule.set_fresh_index(ctx.top_index)
 
     return rule
 
@@ -1086,8 +1010,7 @@ for each smart contract.
 -executions refers to the number of smart contract that has been translated. int.
 '''
 def write_rbr(rule,block_name):
-    if paths.gasol_folder not in os.listdir(paths.tmp_path):
-        os.mkdir(paths.gasol_path)
+    os.makedirs(paths.gasol_path, exist_ok=True)
 
     name = paths.gasol_path+block_name+".rbr"
         
@@ -1105,11 +1028,13 @@ Main function that build the rbr representation from the CFG of a solidity file.
 -nop_opcodes is True if it has to annotate the evm bytecodes.
 -saco_rbr is True if it has to generate the RBR in SACO syntax.
 -exe refers to the number of smart contracts analyzed.
+-keep_files is True if the intermediate files (.rbr, .disasm and the SFS jsons) are stored in gasol_path.
+-ctx is the SFSContext used for the translation. A fresh one is created if it is not provided.
+-It returns the exit code, the list of sub-blocks and the SFS of each sub-block (syrup_contract).
 '''
-def evm2rbr_compiler(file_name = None,block = None, block_id = -1, block_name = "",simplification = True, storage = False, size = False, part = False, pop = False, push = False, revert = False,extra_dependences_info={},extra_opt_info={},debug_info = False):
-    global rbr_blocks
-    
-    init_globals()
+def evm2rbr_compiler(file_name = None,block = None, block_id = -1, block_name = "",simplification = True, storage = False, size = False, part = False, pop = False, push = False, revert = False,extra_dependences_info={},extra_opt_info={},debug_info = False,keep_files = False,ctx = None):
+    if ctx is None:
+        ctx = SFSContext(keep_files)
     
     begin = dtimer()
 
@@ -1117,11 +1042,12 @@ def evm2rbr_compiler(file_name = None,block = None, block_id = -1, block_name =
         instructions = block["instructions"]
         input_stack = int(block["input"])
         
-        rule = compile_block(instructions,input_stack,block_id)
+        rule = compile_block(ctx, instructions,input_stack,block_id)
 
         has_sto = has_storage_ins(instructions)
 
-        write_rbr(rule,block_name)
+        if ctx.keep_files:
+            write_rbr(rule,block_name)
 
         # print(preffix)
         
@@ -1129,22 +1055,22 @@ def evm2rbr_compiler(file_name = None,block = None, block_id = -1, block_name =
         ethir_time = end-begin
         #print("Build RBR: "+str(ethir_time)+"s")
     
-        subblocks = smt_translate_block(rule,file_name,block_name,assignImmutable_dict,simplification,storage, size, part, pop, push,revert,extra_dependences_info,extra_opt_info,debug_info)
+        subblocks = smt_translate_block(ctx,rule,file_name,block_name,ctx.assignImmutable_dict,simplification,storage, size, part, pop, push,revert,extra_dependences_info,extra_opt_info,debug_info)
                 
-        return 0, subblocks
+        return 0, subblocks, ctx.blocks_json_dict
         
     except Exception as e:
         traceback.print_exc()
         raise Exception("Error in RBR generation",4)
             
 def get_subblocks(block = None,storage = False,part = False,block_id = -1):
-    init_globals()
+    ctx = SFSContext()
 
     try:
         instructions = block["instructions"]
         input_stack = int(block["input"])
         
-        rule = compile_block(instructions,input_stack,block_id)
+        rule = compile_block(ctx, instructions,input_stack,block_id)
 
         subblocks = generate_subblocks2split(rule,part,storage)
         
@@ -0,0 +1,199 @@
+"""
+Metadata of the opcodes compiled into tables indexed by an integer opcode id, so that the gas, size and length of
+the blocks in whole contracts can be computed with a few vectorized reductions (see EncodedBlocks).
+The values are taken from sfs_generator.opcodes and sfs_generator.utils.get_ins_size, so both representations
+always agree
+"""
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import global_params.constants as constants
+import sfs_generator.opcodes as opcodes
+from sfs_generator.utils import get_ins_size, get_num_bytes_int
+
+# NumPy is only imported by the vectorized operations, as the tables of single opcodes are needed on start-up
+if TYPE_CHECKING:
+    import numpy as np
+
+# Opcodes whose gas depends on whether the slot or the address has already been accessed in the block. Blocks
+# that contain them need the symbolic execution in AsmBlock.gas_spent
+access_dependent_opcodes = ("SLOAD", "SSTORE", "BALANCE", "EXTCODESIZE", "EXTCODEHASH", "EXTCODECOPY")
+
+# Value that marks the size, pops or pushes of an opcode that is not recognized by get_ins_size or get_opcode
+unknown = -1
+
+
+def instruction_name(disasm: str, value: Optional[str]) -> str:
+    """
+    Name used to index the tables. PUSH 0 is considered as PUSH0 when it is enabled (see asm_bytecode.is_push0)
+    """
+    if constants.push0_enabled and disasm == "PUSH" and value == "0":
+        return "PUSH0"
+    return disasm
+
+
+def push_width(disasm: str, value: Optional[str]) -> int:
+    """
+    Bytes of the value pushed by PUSH, which are not included in the size of the opcode in the tables
+    """
+    if disasm == "PUSH" and value is not None and not (constants.push0_enabled and value == "0"):
+        return get_num_bytes_int(int(value, 16))
+    return 0
+
+
+class OpcodeTables:
+    """
+    Gas (assuming cold accesses), bytes, number of elements popped and pushed and whether each opcode counts for
+    the length of a block (tags do not), indexed by opcode id. Opcodes are registered the first time they are found,
+    so pseudo-opcodes such as PUSH [tag] also get an id. The lists are used when accessing a single opcode, and
+    the arrays (rebuilt when new opcodes are registered) for the vectorized operations
+    """
+
+    def __init__(self, address_length: int = 2):
+        self._address_length = address_length
+        self._ids: Dict[str, int] = dict()
+        self.names: List[str] = []
+        self.gas: List[int] = []
+        self.size: List[int] = []
+        self.pops: List[int] = []
+        self.pushes: List[int] = []
+        self.counted: List[bool] = []
+        self.access_dependent: List[bool] = []
+        self._arrays: Optional[Dict[str, 'np.ndarray']] = None
+        self._lock = threading.Lock()
+
+    def opcode_id(self, name: str) -> int:
+        opcode_id = self._ids.get(name, None)
+        if opcode_id is None:
+            with self._lock:
+                opcode_id = self._ids.get(name, None)
+                if opcode_id is None:
+                    opcode_id = self._register(name)
+        return opcode_id
+
+    def _register(self, name: str) -> int:
+        try:
+            # The pushed value of PUSH is added separately (see push_width)
+            size = 1 if name == "PUSH" else get_ins_size(name, None, self._address_length)
+        except ValueError:
+            size = unknown
+        try:
+            opcode_info = opcodes.get_opcode(name)
+            pops, pushes = opcode_info[1], opcode_info[2]
+        except ValueError:
+            pops, pushes = unknown, unknown
+
+        self.names.append(name)
+        self.gas.append(opcodes.get_ins_cost(name))
+        self.size.append(size)
+        self.pops.append(pops)
+        self.pushes.append(pushes)
+        self.counted.append(name != "tag")
+        self.access_dependent.append(name in access_dependent_opcodes)
+        self._arrays = None
+
+        # The id is published once the entries of the opcode have been added
+        opcode_id = len(self.names) - 1
+        self._ids[name] = opcode_id
+        return opcode_id
+
+    def array(self, table: str) -> 'np.ndarray':
+        """
+        Table as a NumPy array: 'gas', 'size', 'pops', 'pushes', 'counted' or 'access_dependent'
+        """
+        arrays = self._arrays
+        if arrays is None:
+            import numpy as np
+            with self._lock:
+                arrays = {"gas": np.array(self.gas, dtype=np.int64), "size": np.array(self.size, dtype=np.int64),
+                          "pops": np.array(self.pops, dtype=np.int64),
+                          "pushes": np.array(self.pushes, dtype=np.int64),
+                          "counted": np.array(self.counted, dtype=bool),
+                          "access_dependent": np.array(self.access_dependent, dtype=bool)}
+                self._arrays = arrays
+        return arrays[table]
+
+    def encode(self, instructions: Sequence) -> Tuple[List[int], List[int]]:
+        """
+        Opcode ids and push widths of a sequence of AsmBytecode
+        """
+        opcode_ids, push_widths = [], []
+        for instruction in instructions:
+            disasm, value = instruction.disasm, instruction.value
+            opcode_ids.append(self.opcode_id(instruction_name(disasm, value)))
+            push_widths.append(push_width(disasm, value))
+        return opcode_ids, push_widths
+
+    def check_sizes(self, opcode_ids: Sequence[int]) -> None:
+        for opcode_id in opcode_ids:
+            if self.size[opcode_id] == unknown:
+                raise ValueError("Opcode not recognized", self.names[opcode_id])
+
+    def instruction_gas(self, disasm: str, value: Optional[str]) -> int:
+        return self.gas[self.opcode_id(instruction_name(disasm, value))]
+
+    def instruction_size(self, disasm: str, value: Optional[str]) -> int:
+        opcode_id = self.opcode_id(instruction_name(disasm, value))
+        if self.size[opcode_id] == unknown:
+            raise ValueError("Opcode not recognized", disasm)
+        return self.size[opcode_id] + push_width(disasm, value)
+
+
+_tables: Dict[int, OpcodeTables] = dict()
+
+
+def opcode_tables(address_length: int = 2) -> OpcodeTables:
+    """
+    Tables shared by all the modules for the given length of the addresses of tags
+    """
+    tables = _tables.get(address_length, None)
+    if tables is None:
+        tables = _tables.setdefault(address_length, OpcodeTables(address_length))
+    return tables
+
+
+class EncodedBlocks:
+    """
+    Instructions of a list of blocks as flat arrays of opcode ids and push widths, together with the offset where
+    each block starts. The gas, size and length of all the blocks are computed with a reduction per metric
+    """
+
+    def __init__(self, blocks: Sequence, tables: Optional[OpcodeTables] = None):
+        import numpy as np
+
+        self.blocks = blocks
+        self.tables = opcode_tables() if tables is None else tables
+        opcode_ids, push_widths, lengths = [], [], []
+        for block in blocks:
+            block_ids, block_widths = self.tables.encode(block.instructions)
+            opcode_ids.extend(block_ids)
+            push_widths.extend(block_widths)
+            lengths.append(len(block_ids))
+        self.opcode_ids = np.array(opcode_ids, dtype=np.int64)
+        self.push_widths = np.array(push_widths, dtype=np.int64)
+        # Block that contains each instruction
+        self.block_index = np.repeat(np.arange(len(blocks)), lengths)
+
+    def _sum_per_block(self, values: 'np.ndarray') -> 'np.ndarray':
+        import numpy as np
+        return np.bincount(self.block_index, weights=values, minlength=len(self.blocks)).astype(np.int64)
+
+    def length(self) -> 'np.ndarray':
+        return self._sum_per_block(self.tables.array("counted")[self.opcode_ids])
+
+    def bytes_required(self) -> 'np.ndarray':
+        sizes = self.tables.array("size")[self.opcode_ids]
+        if (sizes == unknown).any():
+            self.tables.check_sizes(self.opcode_ids[sizes == unknown])
+        return self._sum_per_block(sizes + self.push_widths)
+
+    def gas_spent(self) -> 'np.ndarray':
+        """
+        Gas of each block. The blocks with opcodes whose gas depends on previous accesses are the only ones
+        that are executed symbolically (see AsmBlock.gas_spent)
+        """
+        gas = self._sum_per_block(self.tables.array("gas")[self.opcode_ids])
+        access_dependent = self.tables.array("access_dependent")[self.opcode_ids]
+        for block_idx in set(self.block_index[access_dependent].tolist()):
+            gas[block_idx] = self.blocks[block_idx].gas_spent
+        return gas
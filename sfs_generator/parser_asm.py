@@ -2,12 +2,13 @@
 import itertools
 import json
 import re
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Iterator, Optional, Tuple
 
 from sfs_generator.asm_block import AsmBlock
 from sfs_generator.asm_bytecode import AsmBytecode, ASM_Json_T
 from sfs_generator.asm_contract import AsmContract
 from sfs_generator.asm_json import AsmJSON
+from sfs_generator.combined_json_reader import CombinedJsonReader
 from sfs_generator.utils import isYulKeyword
 import global_params.constants as constants
 
@@ -137,24 +138,58 @@ def parse_json_asm(file_name: str) -> AsmContract:
     return build_asm_contract("contract", data)
 
 
-def parse_asm(file_name : str) -> AsmJSON:
-    with open(file_name) as f:
-        data = json.load(f)
+def asm_json_length(contract_json : Dict[str, Any]) -> int:
+    """
+    Number of assembly items in the init code and the run codes of the contract json, without building its blocks
+    """
+    asm = contract_json.get("asm", None)
+    if asm is None:
+        return 0
+    return len(asm[".code"]) + sum(len(data[".code"]) for data in asm[".data"].values() if not isinstance(data, str))
+
+
+def contract_from_json(cname : str, contract_json : Dict[str, Any]) -> AsmContract:
+    if contract_json.get("asm",None) is None:
+        return AsmContract(cname, False)
+    return build_asm_contract(cname, contract_json["asm"])
 
-    solc_v = data["version"]
-    asm_json = AsmJSON(solc_v)
-    
-    contracts = data["contracts"]
 
+class StreamedAsm:
+    """
+    Contracts of a combined json built one at a time while the file is read (see
+    sfs_generator.combined_json_reader), so only the contract being processed needs to be kept in memory. If a
+    contract name is given, the rest of the contracts are skipped without being decoded. The version is available
+    once the contracts have been traversed
+    """
 
-    for c in contracts:
-        if contracts[c].get("asm",None) is None:
-            asm_json.add_contract(AsmContract(c, False))
-            continue
+    def __init__(self, file_name : str, contract_name : Optional[str] = None):
+        self.file_name = file_name
+        self.contract_name = contract_name
+        self.version = None
 
-        asm_c = build_asm_contract(c,contracts[c]["asm"])
-        asm_json.add_contract(asm_c)
+    def _selected(self, cname : str) -> bool:
+        return self.contract_name is None or (cname.split("/")[-1]).split(":")[-1] == self.contract_name
+
+    def entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Name and json of each contract, without building the contract (see contract_from_json)
+        """
+        with open(self.file_name) as f:
+            reader = CombinedJsonReader(f)
+            yield from reader.entries(self._selected)
+            self.version = reader.version
+
+    def contracts(self) -> Iterator[AsmContract]:
+        for cname, contract_json in self.entries():
+            yield contract_from_json(cname, contract_json)
+
+
+def parse_asm(file_name : str) -> AsmJSON:
+    streamed_asm = StreamedAsm(file_name)
+    contracts = list(streamed_asm.contracts())
 
+    asm_json = AsmJSON(streamed_asm.version)
+    asm_json.contracts = contracts
     return asm_json
 
 
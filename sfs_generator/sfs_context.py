@@ -0,0 +1,105 @@
+class SFSContext:
+    """
+    State shared by the functions that translate a block into its SFS: the RBR generation (ir_block)
+    and the symbolic execution (gasol_optimization). Every block is translated with its own context,
+    so several blocks can be translated at the same time
+    """
+
+    def __init__(self, keep_files: bool = False):
+        # Whether the intermediate files (.rbr, .disasm and the SFS jsons) are stored
+        # in gasol_path. Otherwise, the translation is done completely in memory
+        self.keep_files = keep_files
+
+        # RBR generation (ir_block)
+
+        # Max index of the local variables created
+        self.current_local_var = 0
+
+        # Mapping rbr_id -> list of rbr rules
+        self.rbr_blocks = {}
+
+        # Mapping block_id -> [stack_height_begin, stack_height_end]
+        self.stack_index = {}
+        self.top_index = 0
+
+        # Counters for the fresh variables introduced for each kind of instruction
+        self.blockhash_cont = 0
+        self.pc_cont = 0
+        self.mload_counter = 0
+        self.sload_counter = 0
+        self.gas_counter = 0
+        self.hash_counter = 0
+        self.timestamp_counter = 0
+        self.assignImmutable_counter = 0
+        self.assignImmutable_dict = {}
+
+        # SFS generation (gasol_optimization)
+
+        # Options from smt_translate_block
+        self.source_name = ""
+        self.cname = ""
+        self.split_sto = False
+        self.mem40_pattern = False
+        self.size_flag = False
+        self.pop_flag = False
+        self.push_flag = False
+        self.revert_flag = False
+        self.assignImm_values = {}
+        self.debug = False
+        self.int_not0 = []
+
+        # SFS from each sub-block, indexed by the sub-block name
+        self.blocks_json_dict = {}
+
+        self.original_opcodes = []
+        self.original_ins = []
+        self.max_l = 0
+        self.memory_order = []
+        self.storage_order = []
+
+        # Information about the gas saved by the simplification rules
+        self.gas_t = 0
+        self.compute_gast = True
+        self.saved_push = 0
+        self.gas_saved_op = 0
+        self.gas_store_op = 0
+        self.gas_memory_op = 0
+        self.push_rebuilt = dict()
+
+        self.reset_block_state()
+
+    def reset_block_state(self) -> None:
+        """
+        Resets the information that is computed for each sub-block
+        """
+        self.u_counter = 0
+        self.u_dict = {}
+        self.s_counter = 0
+        self.s_dict = {}
+        self.variable_content = {}
+        self.user_defins = []
+        self.user_def_counter = {}
+        self.already_defined_userdef = []
+        self.max_instr_size = 0
+        self.max_stack_size = 0
+        self.num_pops = 0
+        self.discount_op = 0
+        self.already_considered = []
+        self.sstore_seq = []
+        self.sstore_v_counter = 0
+        self.mstore_seq = []
+        self.mstore_v_counter = 0
+        self.storage_dep = []
+        self.memory_dep = []
+        self.memory_opt = [False, False, False]
+        self.storage_opt = [False, False, False]
+        self.mem_delete_pos = []
+        self.sto_delete_pos = []
+        self.rule_applied = False
+        self.modified_userdef_vals = {}
+        self.rules_applied = []
+        self.rule = ""
+        self.extra_dep_info = {}
+        self.non_aliasing_disabled = False
+        self.useless_info = []
+        self.context_info = {}
@@ -1,7 +1,6 @@
 import math
 from typing import Tuple, Dict, List
 import os
-from copy import deepcopy
 import sfs_generator.opcodes as opcodes
 import global_params.paths as paths
 
@@ -283,7 +282,8 @@ def check_and_print_debug_info(debug,msg):
 # Given a list of sub-blocks obtained that include the instruction use for splitting,
 # returns a similar list removing these opcodes
 def process_blocks_split(sub_blocks: List[List[str]]) -> List[List[str]]:
-    optimization_sub_blocks = deepcopy(sub_blocks)
+    # Instructions are strings, so copying the lists is enough
+    optimization_sub_blocks = [list(sub_block) for sub_block in sub_blocks]
     for i in range(len(sub_blocks)-1):
         _ = optimization_sub_blocks[i].pop()
         optimization_sub_blocks[i+1].pop(0)
@@ -6,6 +6,10 @@ from typing import List, Tuple
 import global_params.paths as paths
 from global_params.options import OptimizationParams
 import pathlib
+import time
+
+# Minimum time in seconds to run a query in the iterative deepening
+min_query_time = 0.1
 
 
 class BlockOptimizer:
@@ -22,18 +26,28 @@ class BlockOptimizer:
         encoding_file = f"{paths.smt_encoding_path}/{self._block_id}_encoding_{self._flags.smt_solver}.smt2"
         self._encoding_file = encoding_file
 
+        # The encoding is streamed to the solver, so it is only stored if we are keeping the intermediate files
+        solver_file = encoding_file if self._flags.keep_files else None
+
         if self._flags.smt_solver == "oms":
-            return OMSExecutable(encoding_file)
+            return OMSExecutable(solver_file)
         else:
-            return Z3Executable(encoding_file)
+            return Z3Executable(solver_file)
 
     def _initialize_solver(self) -> None:
         solver = self._choose_solver()
         solver.set_timeout(self._tout)
 
+        if self._flags.solver_session:
+            solver.use_session()
+
         full_encoding = FullEncoding(self._sms, self._flags, self._initial_idx)
         self._full_encoding = full_encoding
 
+        # Literals for the iterative deepening on the length of the sequence, which must be declared
+        if self._flags.iterative_deepening:
+            self._length_literals = full_encoding.length_literals(self._sms.get('min_length', 0))
+
         hard_constraints, soft_constraints = full_encoding.generate_full_encoding()
 
         solver.assert_hard(hard_constraints)
@@ -64,7 +78,10 @@ class BlockOptimizer:
         self._solver = solver
 
     def optimize_block(self) -> Tuple[OptimizeOutcome, float, List[str]]:
-        pathlib.Path(paths.smt_encoding_path).mkdir(parents=True, exist_ok=True)
+        if self._flags.keep_files:
+            pathlib.Path(paths.smt_encoding_path).mkdir(parents=True, exist_ok=True)
+        if self._flags.iterative_deepening:
+            return self._optimize_block_by_length()
         optimization_outcome = self._solver.check_sat()
         time = self._solver.time_statistics()
 
@@ -72,6 +89,76 @@ class BlockOptimizer:
             return optimization_outcome, time, []
         return optimization_outcome, time, self._rebuild_block_from_solver()
 
+    def _optimize_block_by_length(self) -> Tuple[OptimizeOutcome, float, List[str]]:
+        """
+        Iterative deepening on the length of the sequence. The encoding is sent once to a solver process,
+        which checks if there is a sequence with at most k instructions for increasing values of k, starting
+        from the minimum length of the SFS. The first k that is satisfiable gives the shortest sequence,
+        which is optimal if the criteria is the length. Otherwise, the soft constraints are added in the same
+        process to search for the optimal sequence with the remaining time, keeping the shortest sequence
+        if the solver finds nothing better. If no k is satisfiable, the last query (without bounding the
+        length) determines whether there is any sequence
+        """
+        start = time.time()
+        solver = self._solver
+        shortest_ids = None
+
+        if solver.start_incremental():
+            for k, literal in self._length_literals.items():
+                remaining = self._tout - (time.time() - start)
+                if remaining < min_query_time:
+                    break
+                solver.set_timeout(remaining)
+                is_sat = solver.check_sat_assuming(literal)
+                if is_sat:
+                    shortest_ids = self._rebuild_block_from_solver()
+                    break
+                elif is_sat is None:
+                    # The time has run out or the solver has failed
+                    break
+
+            if shortest_ids is not None and self._flags.criteria == "length":
+                solver.stop_incremental()
+                return OptimizeOutcome.optimal, solver.time_statistics(), shortest_ids
+
+            remaining = self._tout - (time.time() - start)
+            optimization_outcome = OptimizeOutcome.no_model
+            if remaining >= min_query_time:
+                solver.set_timeout(remaining)
+                optimization_outcome = solver.check_sat_incremental()
+        else:
+            optimization_outcome = OptimizeOutcome.no_model
+        solver.stop_incremental()
+        solver_time = solver.time_statistics()
+
+        if optimization_outcome == OptimizeOutcome.unsat:
+            return optimization_outcome, solver_time, []
+        elif optimization_outcome != OptimizeOutcome.no_model:
+            optimized_ids = self._rebuild_block_from_solver()
+            if shortest_ids is None or self.sequence_cost(optimized_ids) <= self.sequence_cost(shortest_ids):
+                return optimization_outcome, solver_time, optimized_ids
+        if shortest_ids is None:
+            return OptimizeOutcome.no_model, solver_time, []
+        return OptimizeOutcome.non_optimal, solver_time, shortest_ids
+
+    def terminate(self) -> None:
+        """
+        Stops the solver if it is currently optimizing the block. Can be called from another thread
+        """
+        self._solver.terminate()
+
+    def sequence_cost(self, ids: List[str]) -> int:
+        """
+        Cost of the sequence of instruction ids according to the optimization criteria
+        """
+        id_to_instr = {instr.id: instr for instr in self._full_encoding.theta_to_instr.values()}
+        if self._flags.criteria == "size":
+            return sum(id_to_instr[instr_id].size_cost for instr_id in ids)
+        elif self._flags.criteria == "length":
+            return len([instr_id for instr_id in ids if instr_id != 'NOP'])
+        else:
+            return sum(id_to_instr[instr_id].gas_cost for instr_id in ids)
+
     def generate_intermediate_files(self) -> None:
         pathlib.Path(paths.smt_encoding_path).mkdir(parents=True, exist_ok=True)
         with open(self._encoding_file, 'w') as f:
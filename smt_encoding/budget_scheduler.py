@@ -0,0 +1,179 @@
+import multiprocessing
+import time
+from typing import Dict, List, Optional, Tuple, Iterable
+from sfs_generator.asm_bytecode import AsmBytecode
+from smt_encoding.complete_encoding.synthesis_full_encoding import SMS_T
+
+# Approximate cost of a stack manipulation instruction (POP, DUPx or SWAPx) for each criterion
+stack_instr_cost = {"gas": 3, "size": 1, "length": 1}
+
+# Fraction of the budget that is not assigned to the solver, as it is spent generating the SFS and verifying the
+# optimized blocks
+overhead_fraction = 0.1
+
+# Seconds that are kept between the end of the last solver call and the deadline
+deadline_margin = 1
+
+# Blocks and sub-blocks are identified by the full name of their contract and their name, as the names of the blocks
+# only include the last part of the contract name
+BlockKey_T = Tuple[str, str]
+
+
+def sequence_cost(instructions: List[AsmBytecode], criteria: str) -> int:
+    if criteria == "size":
+        return sum(instr.bytes_required for instr in instructions)
+    elif criteria == "gas":
+        return sum(instr.gas_spent for instr in instructions)
+    return len(instructions)
+
+
+def expected_savings(sfs_block: SMS_T, criteria: str) -> int:
+    """
+    Estimation of the savings the solver can obtain for the sub-block: the cost of the stack manipulation
+    instructions in the original sequence (those that are not in the SFS). It only depends on the size of the SFS,
+    so that the sub-blocks can be planned without searching them
+    """
+    stack_instrs = max(0, sfs_block["init_progr_len"] - len(sfs_block["user_instrs"]))
+    return stack_instrs * stack_instr_cost.get(criteria, 1)
+
+
+def difficulty(sfs_block: SMS_T) -> int:
+    """
+    Estimation of the difficulty of the SMT problem from the size of the encoding: the number of positions
+    times the number of candidate instructions in each position
+    """
+    return max(1, sfs_block["init_progr_len"] * (len(sfs_block["user_instrs"]) + sfs_block["max_sk_sz"]))
+
+
+def sub_block_priority(sfs_block: SMS_T, criteria: str) -> float:
+    return expected_savings(sfs_block, criteria) / difficulty(sfs_block)
+
+
+class BudgetScheduler:
+    """
+    Distributes a global budget of wall time among the sub-blocks to optimize. Before the blocks of each contract
+    are optimized, the solver time is reserved in priority order (expected savings divided by difficulty), and
+    each sub-block receives at most the timeout it would have without a budget. Each contract can only reserve
+    its share of the time left, according to its number of instructions (see expect_instructions), and blocks
+    are meant to be optimized in priority order as well (see priority). When a sub-block is optimized, it also
+    gets the time that is not reserved for other sub-blocks, so the time the previous sub-blocks have not used
+    goes back to the pool. Only the committed time is shared by all the workers: the reservations are sent to
+    the workers with the blocks (see reservations). A new plan replaces the reservations of the previous one, as
+    the main process does not know which of them the workers have used. No sub-block is assigned time beyond the
+    deadline, so sub-blocks that get no time are not passed to the solver. The time needed to write the output
+    is kept before the deadline (see reserve_output_time)
+    """
+
+    def __init__(self, budget: float, jobs: int = 1):
+        self._deadline = time.time() + budget
+        self._jobs = max(1, jobs)
+        self._allotments: Dict[BlockKey_T, int] = dict()
+        self._priorities: Dict[BlockKey_T, float] = dict()
+        # Instructions that have not been planned yet, and seconds kept after the optimization to write the output.
+        # Only used in the main process
+        self._pending_instructions = 0
+        self._output_time = 0.0
+        # Seconds reserved for the planned sub-blocks that have not started yet, plus the seconds
+        # assigned to the sub-blocks that are being optimized
+        self._committed = multiprocessing.Value('d', 0.0)
+        # Seconds assigned to the sub-blocks that are being optimized. Protected by the lock of the committed time
+        self._in_flight = multiprocessing.RawValue('d', 0.0)
+
+    def expect_instructions(self, pending_instructions: int) -> None:
+        """
+        Sets the number of instructions that will be planned, so that each plan only reserves the share of its
+        instructions
+        """
+        self._pending_instructions = pending_instructions
+
+    def reserve_output_time(self, output_time: float) -> None:
+        """
+        Keeps the given seconds before the deadline to write the output, so the optimization stops before
+        """
+        self._output_time = output_time
+
+    def remaining_time(self) -> float:
+        """
+        Seconds left until the optimization must stop
+        """
+        return self._deadline - self._output_time - time.time()
+
+    def exhausted(self) -> bool:
+        """
+        Whether the deadline has been reached, so the remaining blocks must be kept as they are
+        """
+        return self.remaining_time() <= 0
+
+    def capacity(self) -> float:
+        """
+        Solver time left in all the workers, as they run in parallel
+        """
+        return max(0.0, self.remaining_time()) * self._jobs * (1 - overhead_fraction)
+
+    def plan(self, blocks: List[Tuple[BlockKey_T, List[Tuple[BlockKey_T, float, int]]]],
+             instructions: Optional[int] = None) -> None:
+        """
+        Reserves the solver time for each sub-block. Blocks are given as a tuple with the key of the block and
+        its sub-blocks, each of them with its key, its priority (see sub_block_priority) and the timeout it would
+        have without a budget. If the number of instructions of the blocks is given, only the share of the capacity
+        that corresponds to them among the pending ones is reserved, so the blocks that are planned later also get
+        time
+        """
+        capacity = self.capacity()
+        if instructions is not None:
+            capacity *= min(1.0, instructions / max(1, self._pending_instructions))
+            self._pending_instructions = max(0, self._pending_instructions - instructions)
+        self._allotments.clear()
+        sub_blocks = []
+        for block_key, block_sub_blocks in blocks:
+            self._priorities[block_key] = max((priority for _, priority, _ in block_sub_blocks), default=0)
+            sub_blocks.extend((priority, sub_block_key, timeout)
+                              for sub_block_key, priority, timeout in block_sub_blocks)
+
+        # Sorting is stable, so sub-blocks with the same priority are considered in order of appearance
+        for _, sub_block_key, timeout in sorted(sub_blocks, key=lambda sub_block: -sub_block[0]):
+            allotted = max(0, min(timeout, int(capacity)))
+            self._allotments[sub_block_key] = allotted
+            capacity -= allotted
+
+        with self._committed.get_lock():
+            self._committed.value = self._in_flight.value + sum(self._allotments.values())
+
+    def reservations(self, sub_block_keys: Iterable[BlockKey_T]) -> Dict[BlockKey_T, int]:
+        """
+        Time reserved for the given sub-blocks in the last plan, to be sent to the worker that optimizes them
+        """
+        return {sub_block_key: self._allotments.get(sub_block_key, 0) for sub_block_key in sub_block_keys}
+
+    def add_reservations(self, reservations: Dict[BlockKey_T, int]) -> None:
+        """
+        Stores the reservations received from the main process in the copy of a worker
+        """
+        self._allotments.update(reservations)
+
+    def priority(self, block_key: BlockKey_T) -> float:
+        """
+        Highest priority among the sub-blocks of the block, or 0 if it has not been planned
+        """
+        return self._priorities.get(block_key, 0)
+
+    def allot(self, block_key: BlockKey_T, timeout: int) -> int:
+        """
+        Solver time for the sub-block, given the timeout it would have without a budget. Returns 0 if the
+        sub-block must not be passed to the solver. The time must be given back with release once the
+        sub-block has been optimized
+        """
+        planned = self._allotments.pop(block_key, 0)
+        with self._committed.get_lock():
+            self._committed.value -= planned
+            # Time that is not reserved for the rest of sub-blocks, which includes the reservation of this one
+            free = max(0, int(self.capacity() - self._committed.value))
+            allotted = max(0, min(timeout, max(planned, free), int(self.remaining_time() - deadline_margin)))
+            self._committed.value += allotted
+            self._in_flight.value += allotted
+        return allotted
+
+    def release(self, allotted: int) -> None:
+        with self._committed.get_lock():
+            self._committed.value -= allotted
+            self._in_flight.value -= allotted
@@ -1,6 +1,8 @@
+import threading
+from collections import OrderedDict
 from smt_encoding.complete_encoding.synthesis_functions import SynthesisFunctions
 from smt_encoding.constraints.assertions import AssertHard
-from typing import List, Callable, Generator
+from typing import List, Callable, Generator, Dict, Hashable, Tuple
 from smt_encoding.instructions.encoding_instruction import ThetaValue
 from smt_encoding.instructions.instruction_bounds import InstructionBounds
 from smt_encoding.instructions.encoding_instruction import EncodingInstruction
@@ -27,13 +29,58 @@ def stack_constraints_with_bounds(func: Callable[..., AssertHard], theta_val: Th
                                                                                bounds.upper_bound_theta_value(theta_val) + 1))
 
 
+# Number of block shapes whose precompiled constraints are kept in memory (see PrecompiledFragments)
+max_cached_shapes = 16
+
+
+class PrecompiledFragments:
+    """
+    Cache of the hard constraints of the instructions whose encoding only depends on the shape of the block: the
+    max stack size and the representation of the terms (see SynthesisFunctions.representation_key). This is the
+    case of NOP, POP, DUPk and SWAPk, so blocks with the same shape reuse their constraints for each position
+    instead of building them again. Formulas are hash-consed, so the cached constraints are the same objects
+    that would be built for the block. Only the shapes used most recently are kept
+    """
+
+    def __init__(self, max_shapes: int = max_cached_shapes):
+        self._max_shapes = max_shapes
+        self._shapes: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fragments(self, shape: Hashable) -> Dict[Tuple, AssertHard]:
+        """
+        Constraints stored for the shape, indexed by the instruction key and the position
+        """
+        with self._lock:
+            fragments = self._shapes.get(shape, None)
+            if fragments is None:
+                fragments = dict()
+                self._shapes[shape] = fragments
+                if len(self._shapes) > self._max_shapes:
+                    self._shapes.popitem(last=False)
+            else:
+                self._shapes.move_to_end(shape)
+        return fragments
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+
+precompiled_fragments = PrecompiledFragments()
+
+
 class EncodingForStack:
 
-    def __init__(self):
+    def __init__(self, fragments: PrecompiledFragments = precompiled_fragments):
         self._instructions_registered = set()
         self._encoding_function = dict()
         self._args = dict()
         self._kwargs = dict()
+        # Instructions whose constraints only depend on the shape of the block, with the key that identifies
+        # their constraints among those of the shape
+        self._shape_keys: Dict[str, Tuple] = dict()
+        self._fragments = fragments
 
     def register_function_for_encoding(self, instruction: EncodingInstruction,
                                        encoding_function: Callable[..., AssertHard], *args, **kwargs) -> None:
@@ -42,11 +89,41 @@ class EncodingForStack:
         self._encoding_function[instruction_id] = encoding_function
         self._args[instruction_id] = args
         self._kwargs[instruction_id] = kwargs
+        self._shape_keys.pop(instruction_id, None)
+
+    def register_basic_function_for_encoding(self, instruction: EncodingInstruction,
+                                             encoding_function: Callable[..., AssertHard], *args, **kwargs) -> None:
+        """
+        Registers the encoding function for an instruction whose constraints only depend on the shape of the block
+        and the arguments given, so they are taken from the precompiled fragments when available
+        """
+        self.register_function_for_encoding(instruction, encoding_function, *args, **kwargs)
+        self._shape_keys[instruction.id] = (encoding_function, instruction.theta_value, args,
+                                            tuple(sorted(kwargs.items())))
 
     def encode_instruction(self, instruction: EncodingInstruction, bounds: InstructionBounds,
                            sf: SynthesisFunctions, bs: int) -> Generator:
         instruction_id = instruction.id
         if instruction_id not in self._instructions_registered:
             raise ValueError(instruction_id + " has no encoding function linked")
+        if instruction_id in self._shape_keys:
+            yield from self._encode_from_fragments(instruction, bounds, sf, bs)
+            return
         yield from stack_constraints_with_bounds(self._encoding_function[instruction_id],instruction.theta_value,
                                                  bounds, sf, bs, *self._args[instruction_id], **self._kwargs[instruction_id])
+
+
+    def _encode_from_fragments(self, instruction: EncodingInstruction, bounds: InstructionBounds,
+                               sf: SynthesisFunctions, bs: int) -> Generator:
+        instruction_id = instruction.id
+        fragments = self._fragments.fragments((bs, sf.representation_key()))
+        shape_key = self._shape_keys[instruction_id]
+        encoding_function, args, kwargs = self._encoding_function[instruction_id], self._args[instruction_id], \
+            self._kwargs[instruction_id]
+        theta_val = instruction.theta_value
+        for pos in range(bounds.lower_bound_theta_value(theta_val), bounds.upper_bound_theta_value(theta_val) + 1):
+            constraint = fragments.get((shape_key, pos), None)
+            if constraint is None:
+                constraint = encoding_function(pos, theta_val, sf, bs, *args, **kwargs)
+                fragments[(shape_key, pos)] = constraint
+            yield constraint
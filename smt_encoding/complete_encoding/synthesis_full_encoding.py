@@ -6,7 +6,9 @@ from smt_encoding.instructions.instruction_bounds import InstructionBounds
 from smt_encoding.instructions.instruction_bounds_simple import DumbInstructionBounds
 from smt_encoding.instructions.instruction_bounds_with_dependencies import InstructionBoundsWithDependencies
 import global_params.constants as constants
-from smt_encoding.constraints.function import Function, Sort
+from smt_encoding.constraints.function import Function, Sort, ExpressionReference
+from smt_encoding.constraints.assertions import AssertHard
+from smt_encoding.constraints.connector_factory import add_implies, add_eq
 from smt_encoding.instructions.encoding_instruction import InstructionSubset, Id_T
 from smt_encoding.complete_encoding.synthesis_opcode_term_creation import UninterpretedOpcodeTermCreation, Formula_T
 from smt_encoding.complete_encoding.synthesis_initialize_variables import stack_encoding_for_position, \
@@ -69,6 +71,9 @@ class FullEncoding:
 
         self._bounds = self._initialize_bounds()
 
+        # Literals that bound the length of the sequence, indexed by the corresponding length (see length_literals)
+        self._length_literals: Dict[int, ExpressionReference] = dict()
+
     def _initialize_from_sms(self, sms: SMS_T) -> None:
         self.bs = sms['max_sk_sz']
         self.b0 = sms['init_progr_len']
@@ -93,31 +98,31 @@ class FullEncoding:
         nop_instruction = self._instruction_factory.create_instruction_name("NOP")
         basic_instructions = [nop_instruction]
         encoding_function = nop_encoding_empty if self._flags.empty else nop_encoding
-        stack_encoding.register_function_for_encoding(nop_instruction, encoding_function)
+        stack_encoding.register_basic_function_for_encoding(nop_instruction, encoding_function)
 
         if not self._flags.pop_uninterpreted:
             pop_instruction = self._instruction_factory.create_instruction_name("POP")
             basic_instructions.append(pop_instruction)
             encoding_function = pop_encoding_empty if self._flags.empty else pop_encoding
-            stack_encoding.register_function_for_encoding(pop_instruction, encoding_function)
+            stack_encoding.register_basic_function_for_encoding(pop_instruction, encoding_function)
 
         if self._flags.push_basic:
             push_basic = self._instruction_factory.create_instruction_name("PUSH")
             basic_instructions.append(push_basic)
             encoding_function = push_basic_encoding_empty if self._flags.empty else push_basic_encoding
-            stack_encoding.register_function_for_encoding(push_basic, encoding_function)
+            stack_encoding.register_basic_function_for_encoding(push_basic, encoding_function)
 
         for k in range(1, min(self.bs, constants.max_k_dup + 1)):
             dupk_instruction = self._instruction_factory.create_instruction_name(''.join(('DUP', str(k))))
             basic_instructions.append(dupk_instruction)
             encoding_function = dupk_encoding_empty if self._flags.empty else dupk_encoding
-            stack_encoding.register_function_for_encoding(dupk_instruction, encoding_function, k=k)
+            stack_encoding.register_basic_function_for_encoding(dupk_instruction, encoding_function, k=k)
 
         for k in range(1, min(self.bs, constants.max_k_swap + 1)):
             swapk_instruction = self._instruction_factory.create_instruction_name(''.join(('SWAP', str(k))))
             basic_instructions.append(swapk_instruction)
             encoding_function = swapk_encoding_empty if self._flags.empty else swapk_encoding
-            stack_encoding.register_function_for_encoding(swapk_instruction, encoding_function, k=k)
+            stack_encoding.register_basic_function_for_encoding(swapk_instruction, encoding_function, k=k)
 
         self._basic_instructions = basic_instructions
 
@@ -250,6 +255,23 @@ class FullEncoding:
                 yield from initialize_stack_variables(self._term_factory, 0)
 
         yield from self._select_additional_constraints_from_flags()
+        yield from self._length_constraints()
+
+    def length_literals(self, min_length: int) -> Dict[int, ExpressionReference]:
+        """
+        Introduces a Boolean literal len_leq_k for each length k from min_length to b0 - 1 that forces a NOP in
+        position k when it holds. As NOP can only be followed by NOP, the sequence has at most k instructions.
+        Must be called before generating the encoding and declaring the functions
+        """
+        self._length_literals = {k: self._term_factory.len_leq(k) for k in range(max(0, min_length), self.b0)}
+        return self._length_literals
+
+    def _length_constraints(self) -> Generator:
+        theta_nop = \
+            [instruction.theta_value for instruction in self._basic_instructions if instruction.opcode_name == "NOP"][0]
+        for k, literal in self._length_literals.items():
+            yield AssertHard(add_implies(literal, add_eq(self._term_factory.t(self._initial_idx + k),
+                                                         self._term_factory.theta_value(theta_nop))))
 
     def generate_soft_constraints(self) -> Generator:
 
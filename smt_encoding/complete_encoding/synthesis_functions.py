@@ -3,7 +3,7 @@ import copy
 from smt_encoding.constraints.function import Function, Sort, ExpressionReference
 from smt_encoding.instructions.encoding_instruction import ThetaValue, Stack_Var_T
 from smt_encoding.constraints.connector import Formula_T
-from typing import List, Union, Tuple, Dict
+from typing import List, Union, Tuple, Dict, Callable
 
 
 def _sub_idx_rep(var_name: str, *indexes: Union[int, ThetaValue]) -> str:
@@ -30,6 +30,10 @@ class SynthesisFunctions:
         self._expression_instances: Dict[str, Formula_T] = copy.deepcopy(term_to_formula)
         self._theta_expressions = {}
         self._other_expressions = {}
+        # Terms u, x, t, a and l indexed by their name and indexes, to avoid building their string representation
+        self._indexed_terms: Dict[Tuple, ExpressionReference] = {}
+        # Formulas that are shared among the constraints, such as the move predicates (see memoize_formula)
+        self._memoized_formulas: Dict[Tuple, Formula_T] = {}
         self._evm_repr_sort = evm_repr_sort
         self._theta_repr_sort = theta_repr_sort
 
@@ -63,25 +67,55 @@ class SynthesisFunctions:
         self._other_expressions[func_id] = term
         return term
 
+    def _indexed_term(self, var_name: str, var_type: Tuple[Sort], *indexes: Union[int, ThetaValue]) \
+            -> ExpressionReference:
+        key = (var_name, *indexes)
+        term = self._indexed_terms.get(key, None)
+        if term is None:
+            str_rep = _sub_idx_rep(var_name, *indexes)
+            term = self._create_and_store_term(str_rep, var_type, tuple(), str_rep)
+            self._indexed_terms[key] = term
+        return term
+
     def u(self, i: int, j: int) -> ExpressionReference:
-        str_rep = _sub_idx_rep("u", i, j)
-        return self._create_and_store_term(str_rep, (Sort.boolean,), tuple(), str_rep)
+        return self._indexed_term("u", (Sort.boolean,), i, j)
 
     def x(self, i: int, j: int) -> ExpressionReference:
-        str_rep = _sub_idx_rep("x", i, j)
-        return self._create_and_store_term(str_rep, (self._evm_repr_sort,), tuple(), str_rep)
+        return self._indexed_term("x", (self._evm_repr_sort,), i, j)
 
     def t(self, i: int) -> ExpressionReference:
-        str_rep = _sub_idx_rep("t", i)
-        return self._create_and_store_term(str_rep, (self._theta_repr_sort,), tuple(), str_rep)
+        return self._indexed_term("t", (self._theta_repr_sort,), i)
 
     def a(self, i: int) -> ExpressionReference:
-        str_rep = _sub_idx_rep("a", i)
-        return self._create_and_store_term(str_rep, (self._evm_repr_sort,), tuple(), str_rep)
+        return self._indexed_term("a", (self._evm_repr_sort,), i)
 
     def l(self, i: ThetaValue) -> ExpressionReference:
-        str_rep = _sub_idx_rep("l", i)
-        return self._create_and_store_term(str_rep, (Sort.integer,), tuple(), str_rep)
+        return self._indexed_term("l", (Sort.integer,), i)
+
+    def len_leq(self, k: int) -> ExpressionReference:
+        """
+        Boolean literal that bounds the length of the sequence to k instructions (see FullEncoding.length_literals)
+        """
+        return self._indexed_term("len_leq", (Sort.boolean,), k)
+
+    def memoize_formula(self, key: Tuple, create: Callable[[], Formula_T]) -> Formula_T:
+        """
+        Returns the formula associated to the key, creating it the first time. Used for formulas that appear
+        in the constraints of several instructions, so that they are built once
+        """
+        formula = self._memoized_formulas.get(key, None)
+        if formula is None:
+            formula = create()
+            self._memoized_formulas[key] = formula
+        return formula
+
+    def representation_key(self) -> Tuple:
+        """
+        Identifies how the terms u, x, t, a and the theta values are represented, which only depends on the sorts
+        and the representation of the empty element (if any). Constraints that only use these terms are the same
+        for all the factories with the same key
+        """
+        return self._evm_repr_sort, self._theta_repr_sort, self._expression_instances.get("empty", None)
 
     def empty(self) -> ExpressionReference:
         stack_var = "empty"
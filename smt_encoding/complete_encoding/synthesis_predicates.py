@@ -6,12 +6,14 @@ def move(sf: SynthesisFunctions, j: int, alpha: int, beta: int, delta: int) -> F
     # Move can be empty
     if alpha > beta:
         return True
-    return add_and(*(eq for i in range(alpha, beta+1) for eq in [add_eq(sf.u(i+delta, j+1), sf.u(i, j)),
-                                                                 add_eq(sf.x(i+delta, j+1), sf.x(i, j))]))
+    return sf.memoize_formula(("move", j, alpha, beta, delta), lambda: add_and(
+        *(eq for i in range(alpha, beta+1) for eq in [add_eq(sf.u(i+delta, j+1), sf.u(i, j)),
+                                                      add_eq(sf.x(i+delta, j+1), sf.x(i, j))])))
 
 
 def move_only_x_j_i(sf: SynthesisFunctions, j: int, alpha: int, beta: int, delta: int) -> Formula_T:
     # Move can be empty
     if alpha > beta:
         return True
-    return add_and(*(add_eq(sf.x(i+delta, j+1), sf.x(i, j)) for i in range(alpha, beta+1)))
+    return sf.memoize_formula(("move_only_x_j_i", j, alpha, beta, delta), lambda: add_and(
+        *(add_eq(sf.x(i+delta, j+1), sf.x(i, j)) for i in range(alpha, beta+1))))
@@ -1,50 +1,89 @@
-from typing import List, Union
-import itertools
-from smt_encoding.constraints.function import ExpressionReference
+from collections import Counter
+from typing import Tuple, Union, Hashable
+from weakref import WeakValueDictionary
+from smt_encoding.constraints.function import ExpressionReference, intern_node, argument_key
+
+# Connectors are hash-consed as well (see function.py)
+_interned_connectors: WeakValueDictionary = WeakValueDictionary()
 
 
 class Connector:
+    """
+    Class that represents the application of a logical connector. Instances are immutable and hash-consed on
+    their structure: connectors with the same name and the same arguments in the same order are the same object.
+    Commutative connectors are not interned up to permutations, so that each connector keeps the order of its
+    arguments in the encoding. Hence, a commutative connector is equal to (and has the same hash as) those with
+    its arguments permuted (see canonical_key), but they are different objects: connectors must be compared with
+    == instead of is. Nodes that contain connectors as arguments are interned by the identity of the arguments
+    """
+    __slots__ = ("_name", "_is_commutative", "_args", "_canonical_key", "_hash", "__weakref__")
+
+    def __new__(cls, name: str, is_commutative: bool, *args):
+        return intern_node(_interned_connectors, (name, is_commutative, *map(argument_key, args)),
+                           lambda: cls._create(name, is_commutative, args))
+
+    @classmethod
+    def _create(cls, name: str, is_commutative: bool, args: Tuple['Formula_T', ...]) -> 'Connector':
+        connector = object.__new__(cls)
+        connector._name = name
+        connector._is_commutative = is_commutative
+        connector._args = args
+        connector._canonical_key = None
+        connector._hash = None
+        return connector
+
+    def __reduce__(self):
+        return Connector, (self._name, self._is_commutative, *self._args)
+
+    def __copy__(self):
+        return self
 
-    def __init__(self, name: str, is_commutative: bool, *args):
-        self._name = name
-        self._is_commutative = is_commutative
-        self._args = list(args)
+    def __deepcopy__(self, memo):
+        return self
 
     @property
     def connector_name(self) -> str:
         return self._name
 
     @property
-    def arguments(self) -> List['Formula_T']:
+    def arguments(self) -> Tuple['Formula_T', ...]:
         return self._args
 
     @property
     def is_commutative(self) -> bool:
         return self._is_commutative
 
+    @property
+    def canonical_key(self) -> Hashable:
+        """
+        Key that identifies the connector up to permutations of the arguments of the commutative connectors
+        (including the nested ones). It is computed once per connector
+        """
+        if self._canonical_key is None:
+            # Integers and Booleans include their type, as True == 1
+            argument_keys = (argument.canonical_key if type(argument) == Connector else
+                             (type(argument), argument) if type(argument) in (int, bool) else id(argument)
+                             for argument in self._args)
+            if self._is_commutative:
+                self._canonical_key = self._name, True, frozenset(Counter(argument_keys).items())
+            else:
+                self._canonical_key = self._name, False, tuple(argument_keys)
+        return self._canonical_key
+
     def __str__(self):
         return self._name + "(" + ','.join([str(arg) for arg in self._args]) + ")"
 
     def __repr__(self):
         return repr(self._name + "(" + ','.join([str(arg) for arg in self._args]) + ")")
 
-    # Allows comparing commutative connectors as well
+    # Allows comparing commutative connectors as well, as connectors with permuted arguments are different objects
     def __eq__(self, other):
-        if type(self) != type(other) or self.is_commutative != other.is_commutative:
-            return False
-        if self.is_commutative:
-            if len(self.arguments) == len(other.arguments):
-                exists_correct = False
-                for permutation in itertools.permutations(self.arguments):
-                    correct_permutation = all(arg1 == arg2 for arg1, arg2 in zip(list(permutation), other.arguments))
-                    if correct_permutation:
-                        exists_correct = True
-                        break
-                return self.connector_name == other.connector_name and exists_correct
-            else:
-                return False
-        return self.connector_name == other.connector_name and len(self.arguments) == len(other.arguments) and \
-               all(arg1 == arg2 for arg1, arg2 in zip(self.arguments, other.arguments))
+        return self is other or (type(self) == type(other) and self.canonical_key == other.canonical_key)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self.canonical_key)
+        return self._hash
 
 
 Formula_T = Union[Connector, ExpressionReference, bool, int]
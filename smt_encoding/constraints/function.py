@@ -1,5 +1,7 @@
+import threading
 from enum import Enum, unique
-from typing import List, Tuple, Union
+from typing import Any, Callable, Hashable, Tuple, Union
+from weakref import WeakValueDictionary
 
 
 @unique
@@ -10,17 +12,70 @@ class Sort(Enum):
     uninterpreted_theta = 3
 
 
+# Functions and expressions are hash-consed: structurally identical instances are represented by the same
+# object, as long as some reference to it is alive. The tables only hold weak references, so instances from
+# previous encodings can be released
+_interned_functions: WeakValueDictionary = WeakValueDictionary()
+_interned_expressions: WeakValueDictionary = WeakValueDictionary()
+_interning_lock = threading.Lock()
+
+
+def intern_node(table: WeakValueDictionary, key: Hashable, create: Callable[[], Any]) -> Any:
+    """
+    Returns the instance stored in the table for the key, creating it if it does not exist. The lock is only
+    acquired when the instance is created, so that two threads never create different instances for the same key.
+    Arguments of the nodes are identified in the keys as in argument_key
+    """
+    node = table.get(key, None)
+    if node is None:
+        with _interning_lock:
+            node = table.get(key, None)
+            if node is None:
+                node = create()
+                table[key] = node
+    return node
+
+
+def argument_key(arg: Any) -> Hashable:
+    """
+    Identifies an argument of a node in the interning keys. Integers and Booleans are identified by their value
+    and type, as equal values may be different objects and True == 1. The rest of arguments are interned nodes,
+    so they are identified by their id, as they are alive as long as the node that contains them
+    """
+    return (type(arg), arg) if type(arg) in (int, bool) else id(arg)
+
+
 class Function:
     """
-    Class that represents a function in the encoding (including constants)
+    Class that represents a function in the encoding (including constants). Instances are immutable and
+    hash-consed
     """
+    __slots__ = ("_name", "_type", "_comm_assoc", "_hash", "__weakref__")
 
-    def __init__(self, name: str, *var_type: Sort, **kwargs):
+    def __new__(cls, name: str, *var_type: Sort, **kwargs):
         if not len(var_type) > 0:
             raise ValueError(name + " needs at least one argument")
-        self._name = name
-        self._type = var_type
-        self._comm_assoc = kwargs.get('comm_assoc', False)
+        comm_assoc = kwargs.get('comm_assoc', False)
+        return intern_node(_interned_functions, (name, var_type, comm_assoc),
+                           lambda: cls._create(name, var_type, comm_assoc))
+
+    @classmethod
+    def _create(cls, name: str, var_type: Tuple[Sort, ...], comm_assoc: bool) -> 'Function':
+        function = object.__new__(cls)
+        function._name = name
+        function._type = var_type
+        function._comm_assoc = comm_assoc
+        function._hash = hash((name, var_type))
+        return function
+
+    def __reduce__(self):
+        return _function_from_fields, (self._name, self._type, self._comm_assoc)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     @property
     def name(self) -> str:
@@ -53,7 +108,10 @@ class Function:
         return repr(self._name)
 
     def __eq__(self, other):
-        return type(self) == type(other) and self.name == other.name and self.type == other.type
+        return self is other or (type(self) == type(other) and self.name == other.name and self.type == other.type)
+
+    def __hash__(self):
+        return self._hash
 
     def __call__(self, *args: Union['ExpressionReference', int, bool]):
         if len(args) != self.arity:
@@ -70,14 +128,36 @@ class Function:
         return ExpressionReference(self, *args)
 
 
+def _function_from_fields(name: str, var_type: Tuple[Sort, ...], comm_assoc: bool) -> Function:
+    return Function(name, *var_type, comm_assoc=comm_assoc)
+
+
 class ExpressionReference:
     """
-    Class that represents an expression in the encoding
+    Class that represents an expression in the encoding. Instances are immutable and hash-consed, so two
+    expressions are equal iff they are the same object
     """
+    __slots__ = ("_func", "_args", "__weakref__")
 
-    def __init__(self, func: Function, *args: Union['ExpressionReference', int, bool]):
-        self._func = func
-        self._args = args
+    def __new__(cls, func: Function, *args: Union['ExpressionReference', int, bool]):
+        return intern_node(_interned_expressions, (id(func), *map(argument_key, args)), lambda: cls._create(func, args))
+
+    @classmethod
+    def _create(cls, func: Function, args: Tuple[Union['ExpressionReference', int, bool], ...]) \
+            -> 'ExpressionReference':
+        expression = object.__new__(cls)
+        expression._func = func
+        expression._args = args
+        return expression
+
+    def __reduce__(self):
+        return ExpressionReference, (self._func, *self._args)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     @property
     def func(self) -> Function:
@@ -88,8 +168,8 @@ class ExpressionReference:
         return self._func.range
 
     @property
-    def arguments(self) -> List[Union['ExpressionReference', int, bool]]:
-        return [*self._args]
+    def arguments(self) -> Tuple[Union['ExpressionReference', int, bool], ...]:
+        return self._args
 
     def __str__(self):
         return f"{str(self._func)}" if len(self._args) == 0 else \
@@ -99,9 +179,10 @@ class ExpressionReference:
         return str(self)
 
     def __eq__(self, other):
-        return type(self) == type(other) and self.func == other.func and self.type == other.type and \
-               len(self.arguments) == len(other.arguments) and \
-               all((self_arg1 == other_arg1 for self_arg1, other_arg1 in zip(self.arguments, other.arguments)))
+        return self is other
+
+    def __hash__(self):
+        return id(self)
 
 
 def Const(name: str, sort: Sort) -> ExpressionReference:
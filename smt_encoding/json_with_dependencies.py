@@ -10,7 +10,6 @@ from smt_encoding.instructions.instruction_dependencies import generate_dependen
 from smt_encoding.count_sms_greedy import minsize_from_json
 from typing import List, Tuple, Dict
 from copy import deepcopy
-import networkx as nx
 from pathlib import Path
 
 
@@ -118,6 +117,8 @@ def digraph_from_deps(instr_deps, color: str = 'black'):
     """
     Generates a DiGraph considering the information from successors
     """
+    # networkx is only needed for the dot graphs, so it is not loaded on start-up
+    import networkx as nx
     graph = nx.DiGraph()
     for instr_id, next_instrs in instr_deps.items():
         graph.add_node(instr_id)
@@ -155,6 +156,7 @@ def generate_dot_graph_from_sms(sms: SMS_T, block_name: str):
         else:
             renaming_dict[id_term] = f"{var_term}: {id_term}"
 
+    import networkx as nx
     renamed_digraph = nx.relabel_nodes(digraph, renaming_dict)
 
     Path(global_params.paths.dot_path).mkdir(exist_ok=True, parents=True)
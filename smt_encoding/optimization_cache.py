@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple, Any
+from smt_encoding.complete_encoding.synthesis_full_encoding import SMS_T
+from smt_encoding.solver.solver import OptimizeOutcome
+from global_params.options import OptimizationParams
+
+# Result of search_optimal: outcome, solver time, optimized ids, greedy ids and solver statistics
+SearchResult_T = Tuple[OptimizeOutcome, float, List[str], Optional[List[str]], Dict]
+
+# Fields from the SFS that determine the result of the optimization
+sfs_key_fields = ["init_progr_len", "max_sk_sz", "src_ws", "tgt_ws", "user_instrs", "storage_dependences",
+                  "memory_dependences", "dependencies", "is_revert"]
+
+# Fields from the OptimizationParams that affect how the SFS is optimized
+params_key_fields = ["smt_solver", "criteria", "greedy", "ub_greedy", "push0", "memory_encoding", "push_basic",
+                     "pop_uninterpreted", "order_bounds", "empty", "encode_terms", "terminal", "ac_solver",
+                     "direct_soft", "at_most", "pushed_once", "no_output_before_pop", "order_conflicts", "portfolio",
+                     "iterative_deepening"]
+
+
+def rename_stack_vars(element: Any, renaming: Dict[str, str]) -> Any:
+    """
+    Replaces the stack variables s(i) in element by its canonical name, which is assigned in order of appearance
+    """
+    if isinstance(element, str):
+        if element.startswith("s("):
+            if element not in renaming:
+                renaming[element] = f"s({len(renaming)})"
+            return renaming[element]
+        return element
+    elif isinstance(element, list):
+        return [rename_stack_vars(sub_element, renaming) for sub_element in element]
+    elif isinstance(element, dict):
+        return {key: rename_stack_vars(value, renaming) for key, value in element.items()}
+    return element
+
+
+def canonical_sfs(sfs: SMS_T) -> Dict:
+    """
+    Representation of the SFS that only contains the fields that are relevant for the optimization, with the
+    stack variables renamed in order of appearance. The user instructions are sorted by their id, so two SFS
+    that only differ in the naming of the stack variables have the same representation. Instruction ids
+    are kept, as they appear in the optimized sequence
+    """
+    renaming = dict()
+    canonical = {field: sfs[field] for field in sfs_key_fields if field in sfs}
+    canonical["user_instrs"] = sorted(canonical.get("user_instrs", []), key=lambda instr: instr["id"])
+    return {field: rename_stack_vars(canonical[field], renaming) for field in sfs_key_fields if field in canonical}
+
+
+def optimization_key(sfs: SMS_T, params: OptimizationParams, timeout: int) -> str:
+    """
+    Hash that identifies the optimization of the SFS with the given parameters and timeout
+    """
+    key_dict = {"sfs": canonical_sfs(sfs), "timeout": timeout,
+                "params": {field: getattr(params, field, None) for field in params_key_fields}}
+    return hashlib.sha256(json.dumps(key_dict, sort_keys=True).encode()).hexdigest()
+
+
+def pushed_constants_preserved(sfs: SMS_T) -> bool:
+    """
+    Whether the values pushed by the PUSH instructions in the SFS appear in the original instructions, i.e.
+    no simplification rule has folded the constants of the block into new ones
+    """
+    original_words = sfs["original_instrs"].split()
+    original_values = {int(value, 16) for word, value in zip(original_words, original_words[1:]) if word == "PUSH"
+                       and all(c in "0123456789abcdefABCDEF" for c in value)}
+    if "PUSH0" in original_words:
+        original_values.add(0)
+
+    return all(instr["value"][0] in original_values for instr in sfs["user_instrs"]
+               if instr["disasm"] in ["PUSH", "PUSH0"])
+
+
+def abstract_push_values(canonical: Dict) -> Dict:
+    """
+    Replaces the values of the PUSH-like instructions in a canonical SFS by symbolic slots, so that two values
+    share a slot iff they are equal. The size of each PUSH is kept, as it depends on the value
+    """
+    value_to_slot = dict()
+    abstract_instrs = []
+    for instr in canonical["user_instrs"]:
+        if "value" in instr:
+            slots = []
+            for value in instr["value"]:
+                if value not in value_to_slot:
+                    value_to_slot[value] = len(value_to_slot)
+                slots.append(f"v({value_to_slot[value]})")
+            instr = {**instr, "value": slots}
+        abstract_instrs.append(instr)
+    return {**canonical, "user_instrs": abstract_instrs}
+
+
+def template_key(sfs: SMS_T, params: OptimizationParams, timeout: int) -> str:
+    """
+    Hash that identifies the optimization of the SFS with the given parameters and timeout, regardless of the
+    values pushed in the SFS. Two SFS with the same template key share the instruction ids, so the optimized
+    sequence of ids from one of them is valid for the other
+    """
+    key_dict = {"sfs": abstract_push_values(canonical_sfs(sfs)), "timeout": timeout,
+                "params": {field: getattr(params, field, None) for field in params_key_fields}}
+    return hashlib.sha256(json.dumps(key_dict, sort_keys=True).encode()).hexdigest()
+
+
+class OptimizationCache:
+    """
+    Persistent cache with the results of optimizing each SFS, stored in a SQLite database. The database uses WAL
+    mode, so several processes can read and write it at the same time. All results are stored (including those
+    that do not improve the block or have found no model), so blocks that cannot be improved are skipped too
+    """
+
+    def __init__(self, db_path: str):
+        self._connection = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, outcome TEXT NOT NULL, "
+                                 "shown_optimal INTEGER NOT NULL, optimized_ids TEXT, greedy_ids TEXT, "
+                                 "solver_time REAL, statistics TEXT)")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def lookup(self, key: str) -> Optional[SearchResult_T]:
+        """
+        Returns the stored result for the key, if any. The solver time is the one spent when the result was
+        computed
+        """
+        row = self._connection.execute("SELECT outcome, optimized_ids, greedy_ids, solver_time, statistics "
+                                       "FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        outcome, optimized_ids, greedy_ids, solver_time, statistics = row
+        return OptimizeOutcome[outcome], solver_time, json.loads(optimized_ids), json.loads(greedy_ids), \
+            json.loads(statistics)
+
+    def store(self, key: str, result: SearchResult_T) -> None:
+        outcome, solver_time, optimized_ids, greedy_ids, statistics = result
+        self._connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 (key, outcome.name, int(outcome == OptimizeOutcome.optimal), json.dumps(optimized_ids),
+                                  json.dumps(greedy_ids), solver_time, json.dumps(statistics)))
+
+
+# Cache opened in the current process. SQLite connections cannot be shared among processes, so the
+# process id is stored to open a new connection in the workers
+_opened_cache: Optional[Tuple[int, str, OptimizationCache]] = None
+
+
+def get_optimization_cache(db_path: str) -> OptimizationCache:
+    global _opened_cache
+
+    if _opened_cache is None or _opened_cache[0] != os.getpid() or _opened_cache[1] != db_path:
+        _opened_cache = os.getpid(), db_path, OptimizationCache(db_path)
+    return _opened_cache[2]
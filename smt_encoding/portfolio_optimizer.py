@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from copy import copy, deepcopy
+from typing import List, Tuple, Dict, Optional
+from smt_encoding.block_optimizer import BlockOptimizer
+from smt_encoding.complete_encoding.synthesis_full_encoding import SMS_T
+from smt_encoding.solver.solver import OptimizeOutcome
+from global_params.options import OptimizationParams
+
+# Configuration from the portfolio: (solver, term encoding, memory encoding)
+PortfolioConfig_T = Tuple[str, str, str]
+
+# Threads that run the configurations. They are shared among blocks, so that the solver sessions
+# (which are associated to each thread) can be reused
+_portfolio_executor: Optional[ThreadPoolExecutor] = None
+_portfolio_executor_size = 0
+
+
+def config_name(config: PortfolioConfig_T) -> str:
+    return '/'.join(config)
+
+
+def _get_executor(n_configs: int) -> ThreadPoolExecutor:
+    global _portfolio_executor, _portfolio_executor_size
+
+    if _portfolio_executor is None or _portfolio_executor_size < n_configs:
+        if _portfolio_executor is not None:
+            _portfolio_executor.shutdown()
+        _portfolio_executor = ThreadPoolExecutor(max_workers=n_configs, thread_name_prefix="portfolio")
+        _portfolio_executor_size = n_configs
+    return _portfolio_executor
+
+
+class PortfolioOptimizer:
+    """
+    Optimizes a block by running several configurations of solver and encoding concurrently. As soon as one
+    of them proves optimality, the rest are stopped. Otherwise, the best model among those found when the
+    timeout is reached is chosen. Ties are broken by the order of the configurations
+    """
+
+    def __init__(self, block_id: str, sms: SMS_T, flags: OptimizationParams, timeout: int = 10,
+                 initial_idx: int = 0):
+        self._configs = flags.portfolio
+        self._optimizers: List[BlockOptimizer] = []
+
+        for solver, term_encoding, memory_encoding in self._configs:
+            config_flags = copy(flags)
+            config_flags.smt_solver = solver
+            config_flags.encode_terms = term_encoding
+            config_flags.memory_encoding = memory_encoding
+            # The block id is used to name the encoding file, so it must be different for each configuration
+            self._optimizers.append(BlockOptimizer(f"{block_id}_{term_encoding}_{memory_encoding}", deepcopy(sms),
+                                                   config_flags, timeout, initial_idx))
+
+        self._winner: Optional[str] = None
+        self._outcomes: Dict[str, str] = dict()
+
+    def optimize_block(self) -> Tuple[OptimizeOutcome, float, List[str]]:
+        executor = _get_executor(len(self._optimizers))
+        future_to_idx: Dict[Future, int] = {executor.submit(optimizer.optimize_block): i
+                                            for i, optimizer in enumerate(self._optimizers)}
+        results: Dict[int, Tuple[OptimizeOutcome, float, List[str]]] = dict()
+        pending = set(future_to_idx.keys())
+        optimal_idx = None
+
+        while pending and optimal_idx is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=future_to_idx.get):
+                idx = future_to_idx[future]
+                results[idx] = future.result()
+                if results[idx][0] == OptimizeOutcome.optimal and optimal_idx is None:
+                    optimal_idx = idx
+
+        # Stop the remaining configurations and wait for them to finish, as the threads are reused
+        for future in pending:
+            self._optimizers[future_to_idx[future]].terminate()
+        wait(pending)
+
+        for idx, config in enumerate(self._configs):
+            if idx not in results:
+                self._outcomes[config_name(config)] = "stopped"
+            else:
+                self._outcomes[config_name(config)] = results[idx][0].name
+
+        if optimal_idx is not None:
+            winner_idx = optimal_idx
+        else:
+            winner_idx = self._best_model(results)
+
+        if winner_idx is None:
+            # No configuration has found a model: we return the outcome of the first one
+            return results[0]
+
+        self._winner = config_name(self._configs[winner_idx])
+        return results[winner_idx]
+
+    def _best_model(self, results: Dict[int, Tuple[OptimizeOutcome, float, List[str]]]) -> Optional[int]:
+        best_idx, best_cost = None, None
+        for idx in sorted(results.keys()):
+            outcome, _, optimized_ids = results[idx]
+            if outcome != OptimizeOutcome.non_optimal:
+                continue
+            cost = self._optimizers[idx].sequence_cost(optimized_ids)
+            if best_cost is None or cost < best_cost:
+                best_idx, best_cost = idx, cost
+        return best_idx
+
+    def portfolio_statistics(self) -> Dict[str, str]:
+        """
+        Configuration that has provided the chosen solution (if any) and the outcome of each configuration
+        """
+        return {"portfolio_winner": self._winner,
+                "portfolio_outcomes": ';'.join(f"{name}:{outcome}" for name, outcome in self._outcomes.items())}
@@ -1,25 +1,25 @@
 from smt_encoding.solver.solver import OptimizeOutcome
-from smt_encoding.solver.solver_from_executable import SolverFromExecutable, AssertSoft, List, translate_formula, Function
+from smt_encoding.solver.solver_from_executable import SolverFromExecutable, AssertSoft, List, Optional, Function
 from global_params.paths import oms_exec
-import re
 
 
 class OMSExecutable(SolverFromExecutable):
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: Optional[str] = None):
         super(OMSExecutable, self).__init__(oms_exec, file_path)
         # Need this option to produce models
         self.set_option("produce-models", "true")
 
-    def set_timeout(self, timeout: int) -> None:
+    def set_timeout(self, timeout: float) -> None:
+        self._timeout = timeout
         # Timeout must be given as a float number
         self.set_option('timeout', str(float(timeout)))
 
     def write_soft(self, soft_constraint: AssertSoft) -> str:
         if soft_constraint.group is None:
-            return f"(assert-soft {translate_formula(soft_constraint.formula)} :weight {str(soft_constraint.weight)})"
+            return f"(assert-soft {self.translate(soft_constraint.formula)} :weight {str(soft_constraint.weight)})"
         else:
-            return f"(assert-soft {translate_formula(soft_constraint.formula)} :weight {str(soft_constraint.weight)} " \
+            return f"(assert-soft {self.translate(soft_constraint.formula)} :weight {str(soft_constraint.weight)} " \
                    f":id {soft_constraint.group})"
 
     def load_model(self) -> List[str]:
@@ -29,19 +29,17 @@ class OMSExecutable(SolverFromExecutable):
         return "(minimize cost)"
 
     def optimization_outcome(self) -> OptimizeOutcome:
-        if self._model is None:
+        if self._output is None:
             raise ValueError("Check-sat has not been called")
-        if "unsat" in self._model:
+        if self._output.status == "unsat":
             return OptimizeOutcome.unsat
-        elif "not enabled" in self._model:
+        elif self._output.has_error("not enabled"):
             return OptimizeOutcome.no_model
-        elif "partial" in self._model:
+        elif self._output.partial:
             return OptimizeOutcome.non_optimal
         else:
             return OptimizeOutcome.optimal
 
     def command_line(self) -> str:
-        return f"{oms_exec} {self._file_path} -optimization=True"
-
-    def get_value_pattern(self, var_name: str) -> str:
-        return f"\(define-fun {re.escape(var_name)} \(.*\) \S+ (.+)\)"
+        # OptiMathSAT reads the problem from the standard input when no file is given
+        return f"{oms_exec} -optimization=True"
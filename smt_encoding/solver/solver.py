@@ -26,7 +26,7 @@ class Solver(ABC):
         pass
 
     @abstractmethod
-    def set_timeout(self, timeout: int) -> None:
+    def set_timeout(self, timeout: float) -> None:
         """
         Set the timeout for the overall execution of the SMT solver
 
@@ -3,12 +3,16 @@ import resource
 import shlex
 import subprocess
 import re
+import threading
 
 from abc import abstractmethod
+from timeit import default_timer as dtimer
 from smt_encoding.solver.solver import Solver, Function, OptimizeOutcome
+from smt_encoding.solver.solver_session import SolverSession, get_solver_session
 from smt_encoding.constraints.assertions import AssertHard, AssertSoft, Formula_T
+from smt_encoding.constraints.connector import Connector
 from smt_encoding.constraints.function import Sort, ExpressionReference
-from typing import List, Dict, Optional, Union, Iterable
+from typing import List, Dict, Optional, Union, Iterable, Callable
 
 
 sort_to_str = {Sort.integer: 'Int', Sort.boolean: 'Bool', Sort.uninterpreted: 'S', Sort.uninterpreted_theta: 'T'}
@@ -28,19 +32,249 @@ def run_and_measure_command(cmd):
     return solution, usage_stop.ru_utime + usage_stop.ru_stime - usage_start.ru_utime - usage_start.ru_stime
 
 
-def translate_formula(formula: Formula_T) -> str:
-    if type(formula) == int:
-        return str(formula)
-    elif type(formula) == bool:
-        if formula:
-            return "true"
+def write_sentences(sentences: Iterable[str], stream, file_path: Optional[str] = None) -> None:
+    """
+    Writes the sentences into the stream, one per line, and closes it afterwards. If a file path is given,
+    the sentences are also stored in that file
+    """
+    try:
+        if file_path is None:
+            for sentence in sentences:
+                stream.write(sentence)
+                stream.write("\n")
         else:
-            return "false"
-    elif type(formula) == ExpressionReference:
-        return str(formula) if len(formula.arguments) == 0 else \
-            f"({str(formula.func)} {' '.join(translate_formula(arg) for arg in formula.arguments)})"
-    else:
-        return f"({formula.connector_name}  {' '.join((translate_formula(argument) for argument in formula.arguments))})"
+            with open(file_path, 'w') as f:
+                for sentence in sentences:
+                    stream.write(sentence)
+                    stream.write("\n")
+                    print(sentence, file=f)
+    except BrokenPipeError:
+        # The process has finished before reading the whole input (i.e. it has crashed)
+        pass
+    finally:
+        try:
+            stream.close()
+        except BrokenPipeError:
+            pass
+
+
+def stream_input(solver_p: subprocess.Popen, sentences: Iterable[str], file_path: Optional[str] = None,
+                 process_started: Optional[Callable[[subprocess.Popen], None]] = None) -> str:
+    """
+    Streams the sentences to the standard input of the process while they are generated, so the process
+    can start parsing before the whole input has been produced, and returns its output. The input is written
+    from a separate thread to avoid blocking when the process fills its standard output before consuming all
+    the input. process_started is called with the process before writing the input
+    """
+    if process_started is not None:
+        process_started(solver_p)
+    writer = threading.Thread(target=write_sentences, args=(sentences, solver_p.stdin, file_path))
+    writer.start()
+    output = solver_p.stdout.read()
+    writer.join()
+    return output
+
+
+def run_command_with_input(cmd: str, sentences: Iterable[str], file_path: Optional[str] = None,
+                           process_started: Optional[Callable[[subprocess.Popen], None]] = None) -> str:
+    """
+    Runs the command, streaming the sentences to its standard input (see stream_input)
+    """
+    with subprocess.Popen(shlex.split(cmd), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, text=True) as solver_p:
+        return stream_input(solver_p, sentences, file_path, process_started)
+
+
+def run_and_measure_command_with_input(cmd: str, sentences: Iterable[str], file_path: Optional[str] = None,
+                                       process_started: Optional[Callable[[subprocess.Popen], None]] = None):
+    """
+    Runs the command as in run_command_with_input and returns its output and the CPU time of the process.
+    The time is obtained from the resource usage of the process itself when it is waited for, as several
+    solvers can run at the same time in different threads (see PortfolioOptimizer) and the usage of all the
+    children would include theirs. If the process has already been waited for elsewhere (e.g. when it is
+    killed), the wall time is returned instead
+    """
+    start = dtimer()
+    solver_p = subprocess.Popen(shlex.split(cmd), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True)
+    try:
+        solution = stream_input(solver_p, sentences, file_path, process_started)
+    except BaseException:
+        solver_p.kill()
+        solver_p.wait()
+        raise
+    finally:
+        solver_p.stdout.close()
+
+    try:
+        _, status, usage = os.wait4(solver_p.pid, 0)
+    except ChildProcessError:
+        solver_p.wait()
+        return solution, dtimer() - start
+    solver_p.returncode = os.waitstatus_to_exitcode(status)
+    return solution, usage.ru_utime + usage.ru_stime
+
+
+def shared_connectors(formulas: Iterable[Formula_T]) -> Dict[int, int]:
+    """
+    Number of occurrences of the connectors that appear more than once in the formulas, indexed by their id.
+    As connectors are hash-consed, repeated subformulas are the same object. A connector inside a repeated one
+    is only counted once, as the repeated connector is written once
+    """
+    occurrences: Dict[int, int] = dict()
+    pending = list(formulas)
+    while pending:
+        formula = pending.pop()
+        if type(formula) == Connector:
+            times = occurrences.get(id(formula), 0)
+            occurrences[id(formula)] = times + 1
+            if times == 0:
+                pending.extend(formula.arguments)
+    return {connector_id: times for connector_id, times in occurrences.items() if times > 1}
+
+
+class SharedFormulaTranslator:
+    """
+    Translates formulas into SMT-LIB, writing the shared connectors once as a define-fun with no arguments
+    when it makes the encoding smaller. The definitions that are needed by the translated formulas are
+    accumulated, so they can be written right before the first sentence that uses them. All connectors are
+    Boolean
+    """
+
+    def __init__(self, shared: Dict[int, int]):
+        self._shared = shared
+        # Name of the definition or translation of each shared connector that has already been translated
+        self._translated: Dict[int, str] = dict()
+        self._definitions: List[str] = []
+        # Number of definitions that have been returned by pop_definitions
+        self._written = 0
+        # Translation of the constants that have already been written, preceded by a space
+        self._atoms: Dict[int, str] = dict()
+
+    def translate(self, formula: Formula_T) -> str:
+        buffer = []
+        self.write(formula, buffer)
+        # The translation starts with a space (see write)
+        return "".join(buffer)[1:]
+
+    def write(self, formula: Formula_T, buffer: List[str]) -> None:
+        """
+        Appends the translation of the formula to the buffer, preceded by a space. The formula is traversed
+        iteratively, so deep formulas do not reach the recursion limit. The pending list contains the formulas
+        to write in reverse order, and tuples that mark the end of a shared connector with the position in the
+        buffer where its translation starts. Each argument is preceded by a space, so no separators are pushed
+        """
+        shared, translated, atoms = self._shared, self._translated, self._atoms
+        pending = [formula]
+        while pending:
+            element = pending.pop()
+            element_type = type(element)
+            if element_type is ExpressionReference:
+                element_translation = atoms.get(id(element), None)
+                if element_translation is not None:
+                    buffer.append(element_translation)
+                elif len(element.arguments) == 0:
+                    element_translation = " " + element.func.name
+                    atoms[id(element)] = element_translation
+                    buffer.append(element_translation)
+                else:
+                    pending.append(")")
+                    pending.extend(reversed(element.arguments))
+                    buffer.append(" (" + element.func.name)
+            elif element_type is Connector:
+                element_translation = translated.get(id(element), None)
+                if element_translation is not None:
+                    buffer.append(element_translation)
+                    continue
+                if id(element) in shared:
+                    pending.append((element, len(buffer)))
+                else:
+                    pending.append(")")
+                pending.extend(reversed(element.arguments))
+                buffer.append(" (" + element.connector_name + " ")
+            elif element_type is str:
+                buffer.append(element)
+            elif element_type is bool:
+                buffer.append(" true" if element else " false")
+            elif element_type is int:
+                buffer.append(" " + str(element))
+            else:
+                # End of a shared connector: its translation is replaced by the name of its definition, if any
+                connector, start = element
+                buffer.append(")")
+                self._define(connector, "".join(buffer[start:]))
+                del buffer[start:]
+                buffer.append(translated[id(connector)])
+
+    def _define(self, connector: Connector, connector_translation: str) -> None:
+        """
+        Stores the translation of the shared connector (preceded by a space), introducing a definition if it
+        makes the encoding smaller
+        """
+        name = f"shared_{len(self._definitions)}"
+        definition = f"(define-fun {name}{connector_translation.replace(' (', ' () Bool (', 1)})"
+        times = self._shared[id(connector)]
+        if len(definition) + len(name) * times < (len(connector_translation) - 1) * times:
+            self._definitions.append(definition)
+            connector_translation = " " + name
+        self._translated[id(connector)] = connector_translation
+
+    def pop_definitions(self) -> List[str]:
+        """
+        Definitions that have been introduced since the last call
+        """
+        definitions = self._definitions[self._written:]
+        self._written = len(self._definitions)
+        return definitions
+
+
+# Elements of the output of the solver that are relevant to extract the result: the answer to check-sat, the block of
+# objectives, the definitions of constants in the model (whose values are atoms or terms without nested terms), the
+# error messages and the mark of a partial search
+solver_output_pattern = re.compile(r'^(?P<status>sat|unsat|unknown)\s*$'
+                                   r'|^\(objectives\s*$(?P<objectives>.*?)^\)'
+                                   r'|\(define-fun (?P<name>\S+) \(\) \S+\s+(?P<value>[^()\s]+|\([^()]*\))\)'
+                                   r'|\(error "(?P<error>[^"]*)"\)'
+                                   r'|(?P<partial>\bpartial\b)', re.MULTILINE | re.DOTALL)
+
+# Each objective in the block of objectives, with its name and its value
+objective_pattern = re.compile(r'^\s*\((?P<name>\S+)\s+(?P<value>.*)\)\s*$', re.MULTILINE)
+
+
+class SolverOutput:
+    """
+    Information extracted from the output of the solver in a single pass: the answer to check-sat, the values of
+    the objectives and the constants in the model, the error messages and whether the search is partial
+    """
+
+    def __init__(self, output: str):
+        self.status: Optional[str] = None
+        self.objectives: Dict[str, str] = dict()
+        self.values: Dict[str, str] = dict()
+        self.errors: List[str] = []
+        self.partial = False
+
+        for match in solver_output_pattern.finditer(output):
+            if match.group("name") is not None:
+                self.values[match.group("name")] = match.group("value")
+            elif match.group("status") is not None:
+                if self.status is None:
+                    self.status = match.group("status")
+            elif match.group("objectives") is not None:
+                self.objectives.update((objective.group("name"), objective.group("value").strip())
+                                       for objective in objective_pattern.finditer(match.group("objectives")))
+                self.partial = self.partial or "partial" in match.group("objectives")
+            elif match.group("error") is not None:
+                self.errors.append(match.group("error"))
+            else:
+                self.partial = True
+
+    def has_error(self, message: str) -> bool:
+        return any(message in error for error in self.errors)
+
+
+def translate_formula(formula: Formula_T) -> str:
+    return SharedFormulaTranslator(dict()).translate(formula)
 
 
 def translate_assert_hard(hard_constraint: AssertHard) -> str:
@@ -49,8 +283,10 @@ def translate_assert_hard(hard_constraint: AssertHard) -> str:
 
 class SolverFromExecutable(Solver):
 
-    def __init__(self, solver_path: str, file_path: str):
+    def __init__(self, solver_path: str, file_path: Optional[str] = None):
         self._solver_path = solver_path
+        # File in which the encoding is stored when the solver is executed. If None, the encoding is only
+        # passed to the solver through its standard input
         self._file_path = file_path
 
         self._logic = None
@@ -58,9 +294,60 @@ class SolverFromExecutable(Solver):
         self._sorts = []
         self._soft = None
         self._hard = None
+        # Whether the repeated subformulas are written once with define-fun (see to_smt2)
+        self.share_subformulas = True
+        # Occurrences of the shared connectors in the constraints, computed the first time they are written
+        self._shared: Optional[Dict[int, int]] = None
+        # Translator used for the formulas while the encoding is being written
+        self._translator: Optional[SharedFormulaTranslator] = None
         self._functions: Dict[str, Function] = dict()
         self._model = None
+        # Output of the solver, parsed once it has finished
+        self._output: Optional[SolverOutput] = None
         self._time = 0
+        # Timeout in seconds, as given in set_timeout
+        self._timeout = None
+        # Whether the problem is solved in a persistent solver process instead of starting a new one
+        self._use_session = False
+        # Session that solves the problem incrementally (see start_incremental), and whether it has been
+        # started only for this problem
+        self._incremental_session: Optional[SolverSession] = None
+        self._owns_incremental_session = False
+
+        # Process that is currently solving the problem, so that it can be terminated from another thread
+        self._process: Optional[subprocess.Popen] = None
+        self._terminated = False
+        self._process_lock = threading.Lock()
+
+    def use_session(self) -> None:
+        """
+        Solves the problem in the persistent session for this solver of the thread that calls check_sat,
+        so that the binary is not started again for each problem
+        """
+        self._use_session = True
+
+    def terminate(self) -> None:
+        """
+        Stops the solver if it is running, or prevents it from running if check_sat has not been called yet.
+        Can be called from a different thread than the one solving the problem
+        """
+        with self._process_lock:
+            self._terminated = True
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+
+    def _process_started(self, process: subprocess.Popen) -> None:
+        with self._process_lock:
+            self._process = process
+            if self._terminated:
+                process.kill()
+
+    def session_timeout(self) -> Optional[float]:
+        """
+        Time to wait for an answer in a session before killing the solver. The solver is expected to stop
+        by itself after the timeout, so we leave some margin
+        """
+        return None if self._timeout is None else 2 * self._timeout + 1
 
     def set_logic(self, logic: str) -> None:
         self._logic = logic
@@ -73,9 +360,11 @@ class SolverFromExecutable(Solver):
 
     def assert_hard(self, hard_constraints: Iterable):
         self._hard = hard_constraints
+        self._shared = None
 
     def assert_soft(self, soft_constraint: Iterable):
         self._soft = soft_constraint
+        self._shared = None
 
     def declare_function(self, *functions: Function):
         for function in functions:
@@ -83,8 +372,16 @@ class SolverFromExecutable(Solver):
 
     @abstractmethod
     def write_soft(self, soft_constraint: AssertSoft) -> str:
+        """
+        Sentence for the soft constraint. The formula must be translated using translate
+        """
         pass
 
+    def translate(self, formula: Formula_T) -> str:
+        if self._translator is None:
+            return translate_formula(formula)
+        return self._translator.translate(formula)
+
     @abstractmethod
     def load_model(self) -> List[str]:
         pass
@@ -95,16 +392,57 @@ class SolverFromExecutable(Solver):
 
     @abstractmethod
     def command_line(self) -> str:
+        """
+        Command that executes the solver reading the encoding from the standard input
+        """
         pass
 
     def to_smt2(self) -> Iterable:
+        """
+        Sentences of the encoding. Subformulas that appear several times in the constraints (such as the
+        stack moves shared by the instructions in each position) are declared once with define-fun
+        """
+        yield from self.hard_sentences()
+        yield from self.optimization_sentences()
+
+    def hard_sentences(self) -> Iterable:
+        """
+        First part of the encoding: the declarations and the hard constraints
+        """
+        # The constraints are traversed twice, so they cannot be generators. Stored to be written again
+        self._hard = list(self._hard)
+        self._soft = list(self._soft)
+        if not self.share_subformulas:
+            shared = dict()
+        else:
+            if self._shared is None:
+                self._shared = shared_connectors([hard_constraint.formula for hard_constraint in self._hard] +
+                                                 [soft_constraint.formula for soft_constraint in self._soft])
+            shared = self._shared
+        self._translator = SharedFormulaTranslator(shared)
+
         yield f"(set-logic {self._logic})"
         yield from (f"(set-option :{option} {value})" for option, value in self._options.items())
         yield from (f"(declare-sort {sort_to_str[sort]} 0)" for sort in self._sorts)
         yield from (f"(declare-fun {function.name} ({' '.join((sort_to_str[sort] for sort in function.domain))}) "
                     f"{sort_to_str[function.range]})" for function in self._functions.values())
-        yield from (f"(assert {translate_assert_hard(hard_constraint)})" for hard_constraint in self._hard)
-        yield from (self.write_soft(soft_constraint) for soft_constraint in self._soft)
+        for hard_constraint in self._hard:
+            buffer = ["(assert"]
+            self._translator.write(hard_constraint.formula, buffer)
+            buffer.append(")")
+            yield from self._translator.pop_definitions()
+            yield "".join(buffer)
+
+    def optimization_sentences(self) -> Iterable:
+        """
+        Second part of the encoding: the soft constraints, the cost function and the commands to optimize
+        and retrieve the model. Must follow the sentences from hard_sentences
+        """
+        for soft_constraint in self._soft:
+            sentence = self.write_soft(soft_constraint)
+            yield from self._translator.pop_definitions()
+            yield sentence
+        self._translator = None
         cost_sentence = self.cost_function()
 
         if cost_sentence is not None:
@@ -119,21 +457,100 @@ class SolverFromExecutable(Solver):
 
     def check_sat(self) -> OptimizeOutcome:
         """
-        Execute the SMT solver
+        Execute the SMT solver. The encoding is streamed to the solver through its standard input while it is
+        generated, and it is also stored in the file path (if any) for debugging purposes
         """
         if self._logic is None:
             raise ValueError("Logic has not been set to any value")
 
-        smt2_format = self.to_smt2()
-        with open(self._file_path, 'w') as f:
-            for sentence in smt2_format:
-                print(sentence, file=f)
+        if self._use_session:
+            session = get_solver_session(self.command_line())
+            model, total_time, answered = session.solve(self.to_smt2(), self.session_timeout(),
+                                                        self._file_path, self._process_started)
+        else:
+            model, total_time = run_and_measure_command_with_input(self.command_line(), self.to_smt2(),
+                                                                   self._file_path, self._process_started)
+            answered = True
+
+        with self._process_lock:
+            self._process = None
+            answered = answered and not self._terminated
 
-        model, total_time = run_and_measure_command(self.command_line())
         self._model = model
+        self._output = SolverOutput(model)
         self._time = total_time
+        # The solver was killed, so the output is incomplete
+        if not answered:
+            return OptimizeOutcome.no_model
+        return self.optimization_outcome()
+
+    def start_incremental(self) -> bool:
+        """
+        Starts solving the problem incrementally: the hard constraints are sent to a solver process that is
+        kept open to answer several queries (see check_sat_assuming and check_sat_incremental), until
+        stop_incremental is called. The session of the thread is used if use_session has been called.
+        Returns whether the solver has accepted the hard constraints
+        """
+        if self._logic is None:
+            raise ValueError("Logic has not been set to any value")
+
+        self._time = 0
+        if self._use_session:
+            self._incremental_session = get_solver_session(self.command_line())
+            self._owns_incremental_session = False
+        else:
+            self._incremental_session = SolverSession(self.command_line())
+            self._owns_incremental_session = True
+        return self._query_incremental(self.hard_sentences(), True)
+
+    def _query_incremental(self, sentences: Iterable[str], reset: bool = False) -> bool:
+        """
+        Sends the sentences to the incremental session and stores its output. Returns whether the solver
+        has answered
+        """
+        output, query_time, answered = self._incremental_session.solve(sentences, self.session_timeout(),
+                                                                       self._file_path, self._process_started, reset)
+        with self._process_lock:
+            self._process = None
+            answered = answered and not self._terminated
+
+        self._model = output
+        self._output = SolverOutput(output)
+        self._time += query_time
+        return answered
+
+    def _timeout_sentences(self) -> List[str]:
+        """
+        Sentence that updates the timeout in the middle of an incremental problem, as it is set per query
+        """
+        return [f"(set-option :timeout {self._options['timeout']})"] if "timeout" in self._options else []
+
+    def check_sat_assuming(self, literal: ExpressionReference) -> Optional[bool]:
+        """
+        Checks whether the hard constraints are satisfiable when the Boolean literal holds, within the current
+        timeout. Returns None if the solver has not determined it. If they are satisfiable, the model can be
+        retrieved with get_value
+        """
+        answered = self._query_incremental([*self._timeout_sentences(),
+                                            f"(check-sat-assuming ({translate_formula(literal)}))", "(get-model)"])
+        if not answered or self._output.status == "unknown":
+            return None
+        return self._output.status == "sat"
+
+    def check_sat_incremental(self) -> OptimizeOutcome:
+        """
+        Adds the soft constraints to the incremental problem and optimizes it as in check_sat, within the
+        current timeout
+        """
+        if not self._query_incremental([*self._timeout_sentences(), *self.optimization_sentences()]):
+            return OptimizeOutcome.no_model
         return self.optimization_outcome()
 
+    def stop_incremental(self) -> None:
+        if self._owns_incremental_session:
+            self._incremental_session.close()
+        self._incremental_session = None
+
     def time_statistics(self) -> float:
         if self._model is None:
             raise ValueError("No model has been generated yet")
@@ -144,27 +561,18 @@ class SolverFromExecutable(Solver):
             raise ValueError("No model has been generated yet")
         return self._model
 
-    def get_objectives(self):
-        return "a"
-
-    @abstractmethod
-    def get_value_pattern(self, var_name: str) -> str:
-        """
-        Generates the corresponding pattern string for obtaining a value from the model,
-        so that calling re.search().group(1) returns the corresponding representation
-
-        :return: the pattern verifying the condition
-        """
-        pass
+    def get_objectives(self) -> Dict[str, str]:
+        if self._output is None:
+            raise ValueError("No model has been generated yet")
+        return self._output.objectives
 
     def get_value(self, variable: Union[Function, str]) -> str:
-        if self._model is None:
+        if self._output is None:
             raise ValueError("No model has been generated yet")
 
-        # Format:〈function_def 〉 ::= 〈symbol〉(〈sorted_var〉∗) 〈sort〉〈term〉
-        pattern = re.compile(self.get_value_pattern(str(variable)))
-        occurrence = re.search(pattern, self._model)
-        if occurrence is not None:
-            return occurrence.group(1)
-        else:
-            raise ValueError("Invalid variable")
\ No newline at end of file
+        # The values are extracted from the definitions of constants in the model:
+        # 〈function_def 〉 ::= 〈symbol〉(〈sorted_var〉∗) 〈sort〉〈term〉
+        value = self._output.values.get(str(variable), None)
+        if value is None:
+            raise ValueError("Invalid variable")
+        return value
\ No newline at end of file
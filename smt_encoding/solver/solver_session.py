@@ -0,0 +1,158 @@
+import atexit
+import os
+import select
+import shlex
+import subprocess
+import threading
+import uuid
+from timeit import default_timer as dtimer
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class SolverSession:
+    """
+    Long-lived interactive solver process that solves several problems without restarting the binary. Each
+    problem is sent after a (reset) command, and the end of its output is detected by echoing a marker.
+    Time is accounted per problem as the wall time from sending the problem until the marker is received.
+    A problem can also be solved incrementally, sending more sentences after the solver has answered
+    """
+
+    def __init__(self, command: str):
+        self._command = command
+        self._marker = f"gasol_end_{uuid.uuid4().hex}"
+        self._process: Optional[subprocess.Popen] = None
+
+    def _start(self) -> None:
+        self._process = subprocess.Popen(shlex.split(self._command), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL)
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        for stream in [self._process.stdin, self._process.stdout]:
+            try:
+                stream.close()
+            except BrokenPipeError:
+                pass
+        self._process = None
+
+    def _send(self, sentences: Iterable[str], file_path: Optional[str], reset: bool) -> bool:
+        """
+        Streams the sentences to the solver, preceded by a (reset) if it is a new problem and followed by the
+        echo of the marker. The sentences that continue a problem are appended to the file (if any)
+        """
+        stdin = self._process.stdin
+        try:
+            if reset:
+                stdin.write(b"(reset)\n")
+            if file_path is None:
+                for sentence in sentences:
+                    stdin.write(sentence.encode())
+                    stdin.write(b"\n")
+            else:
+                with open(file_path, 'w' if reset else 'a') as f:
+                    for sentence in sentences:
+                        stdin.write(sentence.encode())
+                        stdin.write(b"\n")
+                        print(sentence, file=f)
+            stdin.write(f'(echo "{self._marker}")\n'.encode())
+            stdin.flush()
+            return True
+        except BrokenPipeError:
+            return False
+
+    def _receive(self, timeout: Optional[float]) -> Tuple[str, bool]:
+        """
+        Reads the output until the marker is found. Returns the output and whether the solver answered
+        before the timeout (if any) was exceeded
+        """
+        fd = self._process.stdout.fileno()
+        deadline = None if timeout is None else dtimer() + timeout
+        marker = (self._marker + "\n").encode()
+        output = bytearray()
+
+        while not output.endswith(marker):
+            remaining = None if deadline is None else deadline - dtimer()
+            if remaining is not None and remaining <= 0:
+                return output.decode(), False
+
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                # The solver has finished unexpectedly
+                return output.decode(), False
+            output.extend(chunk)
+
+        return output[:-len(marker)].decode(), True
+
+    def solve(self, sentences: Iterable[str], timeout: Optional[float] = None, file_path: Optional[str] = None,
+              process_started: Optional[Callable[[subprocess.Popen], None]] = None,
+              reset: bool = True) -> Tuple[str, float, bool]:
+        """
+        Solves the problem given as a sequence of SMT-LIB sentences. If the solver does not answer within the
+        timeout, the process is killed and a new one is started for the next problem. If a file path is given,
+        the problem is also stored in that file. process_started is called with the solver process before
+        sending the problem. If the process is killed meanwhile, the problem is considered as not answered.
+        If reset is False, the sentences continue the problem from the previous call, so the solver must have
+        answered all the previous sentences
+
+        :return: the output of the solver, the time spent and whether the solver has answered
+        """
+        if self._process is None or self._process.poll() is not None:
+            if not reset:
+                # The process that had the rest of the problem is no longer running
+                return "", 0, False
+            self.close()
+            self._start()
+
+        if process_started is not None:
+            process_started(self._process)
+
+        start = dtimer()
+        answered = self._send(sentences, file_path, reset)
+        output = ""
+        if answered:
+            output, answered = self._receive(timeout)
+        end = dtimer()
+
+        if not answered:
+            self.close()
+        return output, end - start, answered
+
+
+# One session per solver command in each thread, so that the solvers from different workers never share a process
+_thread_sessions = threading.local()
+_all_sessions = []
+_all_sessions_lock = threading.Lock()
+
+
+def get_solver_session(command: str) -> SolverSession:
+    """
+    Returns the session associated to the solver command in the current thread, starting it if necessary
+    """
+    sessions: Dict[str, SolverSession] = getattr(_thread_sessions, "sessions", None)
+    if sessions is None:
+        sessions = dict()
+        _thread_sessions.sessions = sessions
+
+    session = sessions.get(command, None)
+    if session is None:
+        session = SolverSession(command)
+        sessions[command] = session
+        with _all_sessions_lock:
+            _all_sessions.append(session)
+    return session
+
+
+@atexit.register
+def close_solver_sessions() -> None:
+    with _all_sessions_lock:
+        for session in _all_sessions:
+            session.close()
+        _all_sessions.clear()
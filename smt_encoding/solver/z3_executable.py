@@ -1,23 +1,23 @@
 from smt_encoding.solver.solver import OptimizeOutcome
-from smt_encoding.solver.solver_from_executable import SolverFromExecutable, AssertSoft, List, translate_formula
+from smt_encoding.solver.solver_from_executable import SolverFromExecutable, AssertSoft, List, Optional
 from global_params.paths import z3_exec
-import re
 
 
 class Z3Executable(SolverFromExecutable):
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: Optional[str] = None):
         super(Z3Executable, self).__init__(z3_exec, file_path)
 
-    def set_timeout(self, timeout: int) -> None:
+    def set_timeout(self, timeout: float) -> None:
+        self._timeout = timeout
         # Timeout is given in ms
-        self.set_option('timeout', str(1000 * timeout))
+        self.set_option('timeout', str(int(1000 * timeout)))
 
     def write_soft(self, soft_constraint: AssertSoft) -> str:
         if soft_constraint.group is None:
-            return f"(assert-soft {translate_formula(soft_constraint.formula)} :weight {str(soft_constraint.weight)})"
+            return f"(assert-soft {self.translate(soft_constraint.formula)} :weight {str(soft_constraint.weight)})"
         else:
-            return f"(assert-soft {translate_formula(soft_constraint.formula)} :weight {str(soft_constraint.weight)} " \
+            return f"(assert-soft {self.translate(soft_constraint.formula)} :weight {str(soft_constraint.weight)} " \
                    f":id {soft_constraint.group})"
 
     def load_model(self) -> List[str]:
@@ -27,19 +27,16 @@ class Z3Executable(SolverFromExecutable):
         return None
 
     def optimization_outcome(self) -> OptimizeOutcome:
-        if self._model is None:
+        if self._output is None:
             raise ValueError("Check-sat has not been called")
-        if "unsat" in self._model:
+        if self._output.status == "unsat":
             return OptimizeOutcome.unsat
-        elif "model is not available" in self._model:
+        elif self._output.has_error("model is not available"):
             return OptimizeOutcome.no_model
-        elif "interval" in self._model:
+        elif any(value.startswith("(interval") for value in self._output.objectives.values()):
             return OptimizeOutcome.non_optimal
         else:
             return OptimizeOutcome.optimal
 
     def command_line(self) -> str:
-        return f"{z3_exec} -smt2 {self._file_path}"
-
-    def get_value_pattern(self, var_name: str) -> str:
-        return f"\(define-fun {re.escape(var_name)} \(.*\) \S+\n\s*(.+)\)"
+        return f"{z3_exec} -smt2 -in"
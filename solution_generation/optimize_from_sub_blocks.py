@@ -1,7 +1,7 @@
 from typing import List, Dict
 from sfs_generator.asm_block import AsmBlock
 from sfs_generator.asm_bytecode import AsmBytecode
-from copy import deepcopy
+from copy import copy
 import global_params.constants as constants
 
 
@@ -18,7 +18,7 @@ def rebuild_optimized_asm_block(previous_block : AsmBlock, sub_block_list : List
     # Tag and JUMPDEST were skipped in sub block list, and hence, we need to skip it when analyzing the optimization
     while instr_idx < len(previous_instructions) and previous_instructions[instr_idx].to_plain() != sub_block_list[0][0]:
         # print(previous_instructions[instr_idx].to_plain(), sub_block_list[0][0])
-        optimized_instructions.append(deepcopy(previous_instructions[instr_idx]))
+        optimized_instructions.append(previous_instructions[instr_idx])
         instr_idx += 1
 
     for sub_block_idx, sub_block in enumerate(sub_block_list):
@@ -57,6 +57,7 @@ def rebuild_optimized_asm_block(previous_block : AsmBlock, sub_block_list : List
         optimized_instructions.append(previous_instructions[instr_idx])
         instr_idx += 1
 
-    optimized_block = deepcopy(previous_block)
+    # Instructions are immutable, so the unchanged ones are shared with the previous block
+    optimized_block = copy(previous_block)
     optimized_block.instructions = optimized_instructions
     return optimized_block
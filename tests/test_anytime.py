@@ -0,0 +1,204 @@
+import unittest
+from argparse import ArgumentParser
+from unittest import mock
+
+import gasol_asm
+from global_params.options import OptimizationParams
+from sfs_generator.ir_block import evm2rbr_compiler
+from smt_encoding.solver.solver import OptimizeOutcome
+
+
+def sub_block_sfs(instructions, input_stack):
+    block = {"instructions": instructions, "input": input_stack}
+    _, _, sfs_dict = evm2rbr_compiler(file_name="test", block=block, block_name="block", storage=True, part=False,
+                                      push=True)
+    return sfs_dict["block_0"]
+
+
+def anytime_params(*args):
+    ap = ArgumentParser()
+    gasol_asm.options_gasol(ap)
+    params = OptimizationParams()
+    params.parse_args(ap.parse_args(["test.json_solc", "-rounds", "3", *args]))
+    return params
+
+
+def search_result(outcome, ids, solver_time=1.0):
+    return outcome, solver_time, ids, None, {}
+
+
+class ScriptedSearch:
+    """
+    Replaces the search of the sub-blocks, returning the given results in order and recording the
+    parameters of each call
+    """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def __call__(self, sfs_block, params, tout, block_name, template_result=None):
+        self.calls.append((block_name, params.greedy, tout))
+        return self.results.pop(0)
+
+
+class TestAnytime(unittest.TestCase):
+
+    def setUp(self):
+        self.sfs = sub_block_sfs(['SWAP1', 'SWAP1', 'DUP1', 'POP', 'DUP2', 'DUP2', 'ADD', 'SWAP2', 'POP', 'POP'], 2)
+        self.params = anytime_params()
+        self.long_ids = ['SWAP1', 'SWAP1', 'DUP2', 'DUP2', 'ADD_0', 'SWAP2', 'POP', 'POP']
+        self.short_ids = ['DUP2', 'DUP2', 'ADD_0', 'SWAP2', 'POP', 'POP']
+
+        gasol_asm.init()
+        patcher = mock.patch.object(gasol_asm, "best_results", dict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_rounds(self, search, block_names, rounds, contract_name=""):
+        """
+        Runs the given rounds of the anytime mode for each sub-block of the contract, with the search replaced
+        """
+        results = []
+        with mock.patch.object(gasol_asm, "search_optimal", search), \
+                mock.patch.object(gasol_asm, "search_optimal_with_templates", search):
+            for optimization_round in rounds:
+                self.params.current_round = optimization_round
+                results.append([gasol_asm.search_optimal_anytime(self.sfs, self.params, 10, block_name, contract_name)
+                                for block_name in block_names])
+        return results
+
+    def test_improves_result(self):
+        non_optimal_long = search_result(OptimizeOutcome.non_optimal, self.long_ids)
+        non_optimal_short = search_result(OptimizeOutcome.non_optimal, self.short_ids)
+        optimal = search_result(OptimizeOutcome.optimal, self.long_ids)
+        no_model = search_result(OptimizeOutcome.no_model, [])
+        unsat = search_result(OptimizeOutcome.unsat, [])
+
+        def improves(previous_result, new_result):
+            return gasol_asm.improves_result(self.sfs, self.params, previous_result, new_result)
+
+        # Optimal results always replace the previous ones, even if they are more expensive
+        self.assertTrue(improves(non_optimal_short, optimal))
+        self.assertFalse(improves(non_optimal_long, no_model))
+        self.assertFalse(improves(no_model, unsat))
+        self.assertTrue(improves(no_model, non_optimal_long))
+        self.assertTrue(improves(non_optimal_long, non_optimal_short))
+        self.assertFalse(improves(non_optimal_short, non_optimal_long))
+        # Sequences with the same cost do not replace the previous one
+        self.assertFalse(improves(non_optimal_short, non_optimal_short))
+
+    def test_improves_result_by_criteria(self):
+        # Same gas, but the second sequence takes fewer bytes
+        push_sfs = sub_block_sfs(['PUSH 1', 'PUSH 1', 'ADD'], 0)
+        push_ids = [instr["id"] for instr in push_sfs["user_instrs"] if instr["disasm"] == "PUSH"]
+        add_id = [instr["id"] for instr in push_sfs["user_instrs"] if instr["disasm"] == "ADD"]
+        duplicated_push = search_result(OptimizeOutcome.non_optimal, [push_ids[0], push_ids[0], *add_id])
+        dup_push = search_result(OptimizeOutcome.non_optimal, [push_ids[0], 'DUP1', *add_id])
+
+        self.assertFalse(gasol_asm.improves_result(push_sfs, anytime_params(), duplicated_push, dup_push))
+        self.assertTrue(gasol_asm.improves_result(push_sfs, anytime_params("-size"), duplicated_push, dup_push))
+
+    def test_best_result_is_kept(self):
+        search = ScriptedSearch(search_result(OptimizeOutcome.non_optimal, self.short_ids, 0.5),
+                                search_result(OptimizeOutcome.non_optimal, self.long_ids, 2),
+                                search_result(OptimizeOutcome.no_model, [], 4))
+        results = [block_results[0] for block_results in self.run_rounds(search, ["block_0"], [0, 1, 2])]
+
+        # The greedy algorithm is applied in the first round, and then the SMT search
+        self.assertListEqual([greedy for _, greedy, _ in search.calls], [True, False, False])
+        for outcome, solver_time, ids, _, statistics in results:
+            self.assertEqual(outcome, OptimizeOutcome.non_optimal)
+            self.assertListEqual(ids, self.short_ids)
+            self.assertEqual(statistics["anytime_round"], 0)
+        # The time is the one spent in each round
+        self.assertListEqual([result[1] for result in results], [0.5, 2, 4])
+
+    def test_better_result_replaces_previous_one(self):
+        search = ScriptedSearch(search_result(OptimizeOutcome.non_optimal, self.long_ids),
+                                search_result(OptimizeOutcome.non_optimal, self.short_ids))
+        results = [block_results[0] for block_results in self.run_rounds(search, ["block_0"], [0, 1])]
+        self.assertListEqual(results[0][2], self.long_ids)
+        self.assertEqual(results[0][4]["anytime_round"], 0)
+        self.assertListEqual(results[1][2], self.short_ids)
+        self.assertEqual(results[1][4]["anytime_round"], 1)
+
+    def test_optimal_blocks_are_skipped(self):
+        search = ScriptedSearch(search_result(OptimizeOutcome.non_optimal, self.long_ids),
+                                search_result(OptimizeOutcome.optimal, self.short_ids, 3))
+        results = [block_results[0] for block_results in self.run_rounds(search, ["block_0"], [0, 1, 2, 3])]
+
+        self.assertEqual(len(search.calls), 2)
+        for outcome, solver_time, ids, _, statistics in results[1:]:
+            self.assertEqual(outcome, OptimizeOutcome.optimal)
+            self.assertListEqual(ids, self.short_ids)
+            self.assertEqual(statistics["anytime_round"], 1)
+        # No time is spent in the rounds after the block is shown optimal
+        self.assertListEqual([result[1] for result in results[1:]], [3, 0, 0])
+
+    def test_timeout_is_doubled(self):
+        params = anytime_params("-tout", "5", "-direct-tout")
+        timeouts = []
+        for optimization_round in range(4):
+            params.current_round = optimization_round
+            timeouts.append(gasol_asm.block_timeout(self.sfs, params))
+        self.assertListEqual(timeouts, [5, 5, 10, 20])
+
+        params = anytime_params("-tout", "5", "-direct-tout")
+        params.rounds = None
+        params.current_round = 3
+        self.assertEqual(gasol_asm.block_timeout(self.sfs, params), 5)
+
+    def test_best_results_from_workers(self):
+        # Each worker only sends back the results updated while optimizing its block
+        search = ScriptedSearch(search_result(OptimizeOutcome.non_optimal, self.long_ids),
+                                search_result(OptimizeOutcome.optimal, self.short_ids),
+                                search_result(OptimizeOutcome.no_model, []))
+
+        def optimize_block(old_block, params, contract_name, block_sfs=None, template_results=None):
+            for block_name in old_block:
+                gasol_asm.search_optimal_anytime(self.sfs, params, 10, block_name, contract_name)
+            return old_block
+
+        worker_best_results = {("a/C.sol:C", "block_1_0"): search_result(OptimizeOutcome.non_optimal, self.short_ids)}
+        with mock.patch.object(gasol_asm, "optimize_and_verify_asm_block", optimize_block), \
+                mock.patch.object(gasol_asm, "search_optimal", search), \
+                mock.patch.object(gasol_asm, "search_optimal_with_templates", search), \
+                mock.patch.object(gasol_asm, "best_results", worker_best_results), \
+                mock.patch.object(gasol_asm, "worker_params", self.params, create=True):
+            self.params.current_round = 1
+            worker_result = gasol_asm.optimize_and_verify_asm_block_in_worker(["block_0_0", "block_0_1", "block_1_0"],
+                                                                              "a/C.sol:C")
+
+        block_result, updated_results = worker_result
+        self.assertListEqual(sorted(updated_results.keys()), [("a/C.sol:C", "block_0_0"), ("a/C.sol:C", "block_0_1")])
+        self.assertEqual(updated_results[("a/C.sol:C", "block_0_1")][0], OptimizeOutcome.optimal)
+
+        # The main process merges them with the rest of best results, which are sent to the workers of the next round
+        gasol_asm.best_results[("a/C.sol:C", "block_2_0")] = search_result(OptimizeOutcome.optimal, self.short_ids)
+        self.assertEqual(gasol_asm.collect_worker_result(worker_result), block_result)
+        self.assertListEqual(sorted(gasol_asm.best_results.keys()), [("a/C.sol:C", "block_0_0"),
+                                                                     ("a/C.sol:C", "block_0_1"),
+                                                                     ("a/C.sol:C", "block_2_0")])
+        self.assertEqual(gasol_asm.best_results[("a/C.sol:C", "block_0_0")][4]["anytime_round"], 1)
+
+        # Blocks shown optimal in a worker are not searched again in the following rounds
+        search = ScriptedSearch()
+        self.assertEqual(self.run_rounds(search, ["block_0_1"], [2], "a/C.sol:C")[0][0][0], OptimizeOutcome.optimal)
+        self.assertListEqual(search.calls, [])
+
+    def test_results_are_kept_per_contract(self):
+        # The names of the blocks only include the last part of the contract name, so they can be repeated
+        search = ScriptedSearch(search_result(OptimizeOutcome.optimal, self.short_ids),
+                                search_result(OptimizeOutcome.non_optimal, self.long_ids))
+        self.run_rounds(search, ["C_0"], [1], "a/C.sol:C")
+        results = self.run_rounds(search, ["C_0"], [1], "b/C.sol:C")
+
+        self.assertEqual(len(search.calls), 2)
+        self.assertEqual(results[0][0][0], OptimizeOutcome.non_optimal)
+        self.assertListEqual(results[0][0][2], self.long_ids)
+        self.assertListEqual(gasol_asm.best_results[("a/C.sol:C", "C_0")][2], self.short_ids)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from copy import deepcopy
+
+from sfs_generator.asm_bytecode import AsmBytecode
+from sfs_generator.parser_asm import generate_block_from_plain_instructions
+
+
+class TestAsmBlockMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.block = generate_block_from_plain_instructions("PUSH 1 SLOAD PUSH 1 SLOAD ADD", "block_0")
+
+    def test_metrics_are_updated_when_adding_instructions(self):
+        # Second SLOAD accesses a warm slot
+        self.assertEqual(self.block.gas_spent, 3 + 2100 + 3 + 100 + 3)
+        self.assertEqual(self.block.bytes_required, 7)
+        self.assertEqual(self.block.length, 5)
+
+        self.block.add_instruction(AsmBytecode(-1, -1, -1, "POP", None))
+        self.assertEqual(self.block.gas_spent, 3 + 2100 + 3 + 100 + 3 + 2)
+        self.assertEqual(self.block.bytes_required, 8)
+        self.assertEqual(self.block.length, 6)
+
+    def test_metrics_are_updated_when_replacing_instructions(self):
+        copied_block = deepcopy(self.block)
+        self.assertEqual(copied_block.gas_spent, self.block.gas_spent)
+
+        self.block.instructions = self.block.instructions[:2]
+        self.assertEqual(self.block.gas_spent, 3 + 2100)
+        self.assertEqual(self.block.bytes_required, 3)
+        self.assertEqual(self.block.length, 2)
+        self.assertEqual(copied_block.gas_spent, 3 + 2100 + 3 + 100 + 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from copy import copy, deepcopy
+
+from sfs_generator.asm_bytecode import AsmBytecode
+from sfs_generator.asm_contract import AsmContract
+from sfs_generator.parser_asm import generate_block_from_plain_instructions
+
+
+class TestAsmCopies(unittest.TestCase):
+
+    def setUp(self):
+        self.block = generate_block_from_plain_instructions("PUSH 1 PUSH 2 ADD", "block_0")
+
+    def test_block_copies_share_instructions_until_modified(self):
+        for copied_block in [copy(self.block), deepcopy(self.block)]:
+            self.assertIs(copied_block.instructions, self.block.instructions)
+            copied_block.set_block_name("block_1")
+            copied_block.add_instruction(AsmBytecode(-1, -1, -1, "POP", None))
+
+            self.assertEqual(self.block.block_name, "block_0")
+            self.assertListEqual(self.block.instructions_to_optimize_plain(), ["PUSH 1", "PUSH 2", "ADD"])
+            self.assertEqual(self.block.length, 3)
+            self.assertListEqual(copied_block.instructions_to_optimize_plain(), ["PUSH 1", "PUSH 2", "ADD", "POP"])
+            self.assertEqual(copied_block.length, 4)
+            self.assertIs(copied_block.instructions[0], self.block.instructions[0])
+
+        # The original block must not modify the instructions of its copies either
+        copied_block = copy(self.block)
+        self.block.add_instruction(AsmBytecode(-1, -1, -1, "POP", None))
+        self.assertEqual(copied_block.length, 3)
+        self.assertEqual(self.block.length, 4)
+
+    def test_contract_copies_replace_blocks_independently(self):
+        contract = AsmContract("file.sol:C")
+        contract.init_code = [self.block]
+        contract.set_run_code("0", [self.block])
+        contract.set_auxdata("0", "aux")
+
+        copied_contract = copy(contract)
+        optimized_block = generate_block_from_plain_instructions("PUSH 3", "block_0")
+        copied_contract.init_code = [optimized_block]
+        copied_contract.set_run_code("0", [optimized_block])
+
+        self.assertIs(contract.init_code[0], self.block)
+        self.assertIs(contract.get_run_code("0")[0], self.block)
+        self.assertEqual(copied_contract.get_auxdata("0"), "aux")
+        self.assertDictEqual(deepcopy(contract).to_asm_json(), contract.to_asm_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import io
+import itertools
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from argparse import ArgumentParser
+from unittest import mock
+
+import gasol_asm
+import global_params.paths as paths
+from global_params.options import OptimizationParams
+from sfs_generator.asm_json_writer import AsmJSONWriter, write_asm_contract
+from sfs_generator.parser_asm import parse_asm, generate_block_from_plain_instructions
+
+
+class TestAsmJSONWriter(unittest.TestCase):
+
+    def setUp(self):
+        project_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        self.asm = parse_asm(project_path + "/examples/jsons-solc/0x08B02C0B0D5Bc97ceae343c88A90342b5e4d3C0C.json_solc")
+        self.contract = next(c for c in self.asm.contracts if c.has_asm_field)
+
+    def test_same_output_as_json_dumps(self):
+        f = io.StringIO()
+        write_asm_contract(f, self.contract)
+        self.assertEqual(f.getvalue(), json.dumps(self.contract.to_asm_json()))
+
+        f = io.StringIO()
+        asm_writer = AsmJSONWriter(f)
+        for c in self.asm.contracts:
+            asm_writer.write_contract(c)
+        asm_writer.close(self.asm.version)
+        self.assertDictEqual(json.loads(f.getvalue()), self.asm.to_json())
+
+    def test_blocks_are_replaced_in_order(self):
+        data_ids = list(self.contract.get_data_ids_with_code())
+        blocks = [generate_block_from_plain_instructions("PUSH 1", "block_0") for _ in self.contract.init_code]
+        blocks.extend(generate_block_from_plain_instructions(f"PUSH {i + 2}", "block_0")
+                      for i, data_id in enumerate(data_ids) for _ in self.contract.get_run_code(data_id))
+
+        f = io.StringIO()
+        write_asm_contract(f, self.contract, iter(blocks))
+        asm_json = json.loads(f.getvalue())
+        self.assertSetEqual({instruction["value"] for instruction in asm_json[".code"]}, {"1"})
+        for i, data_id in enumerate(data_ids):
+            self.assertSetEqual({instruction["value"] for instruction in asm_json[".data"][data_id][".code"]},
+                                {str(i + 2)})
+
+        with self.assertRaises(ValueError):
+            write_asm_contract(io.StringIO(), self.contract, blocks + blocks[:1])
+
+
+class TestOptimizedFileReplacement(unittest.TestCase):
+
+    def setUp(self):
+        project_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        self.input_file = project_path + "/examples/jsons-solc/0x08B02C0B0D5Bc97ceae343c88A90342b5e4d3C0C.json_solc"
+        self.output_dir = tempfile.mkdtemp()
+        self.optimized_file = os.path.join(self.output_dir, "optimized.json_solc")
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+        shutil.rmtree(paths.gasol_path, ignore_errors=True)
+
+    def greedy_params(self) -> OptimizationParams:
+        ap = ArgumentParser()
+        gasol_asm.options_gasol(ap)
+        params = OptimizationParams()
+        params.parse_args(ap.parse_args([self.input_file, "-greedy", "-storage"]))
+        params.optimized_file = self.optimized_file
+        params.seqs_file = os.path.join(self.output_dir, "seqs.csv")
+        params.blocks_file = os.path.join(self.output_dir, "blocks.csv")
+        gasol_asm.init()
+        gasol_asm.set_global_constants(params)
+        gasol_asm.modify_file_names(params)
+        return params
+
+    def test_interrupted_round_keeps_previous_output(self):
+        def contract_blocks(c, *args, **kwargs):
+            return itertools.chain(c.init_code, *(c.get_run_code(data_id) for data_id in c.get_data_ids_with_code()))
+
+        def interrupted_contract_blocks(c, *args, **kwargs):
+            # Some blocks are streamed into the output before the round is interrupted
+            yield from itertools.islice(contract_blocks(c), 2)
+            raise KeyboardInterrupt
+
+        with mock.patch.object(gasol_asm, "optimized_contract_blocks", contract_blocks):
+            gasol_asm.optimize_asm_in_asm_format(self.greedy_params())
+        with open(self.optimized_file) as f:
+            previous_output = f.read()
+        self.assertDictEqual(json.loads(previous_output), parse_asm(self.input_file).to_json())
+
+        with mock.patch.object(gasol_asm, "optimized_contract_blocks", interrupted_contract_blocks):
+            with self.assertRaises(KeyboardInterrupt):
+                gasol_asm.optimize_asm_in_asm_format(self.greedy_params())
+
+        with open(self.optimized_file) as f:
+            self.assertEqual(f.read(), previous_output)
+        # The temporary file of the interrupted round is removed
+        self.assertListEqual([name for name in os.listdir(self.output_dir) if name.endswith(".tmp")], [])
+
+    def test_replaced_on_completion(self):
+        with open(self.optimized_file, 'w') as f:
+            f.write("previous")
+
+        with gasol_asm.replaced_on_completion(self.optimized_file) as f:
+            f.write("new")
+            with open(self.optimized_file) as previous_f:
+                self.assertEqual(previous_f.read(), "previous")
+
+        with open(self.optimized_file) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertListEqual(os.listdir(self.output_dir), ["optimized.json_solc"])
+
+    def test_output_mode(self):
+        # New files get the mode from the umask, as with open
+        previous_umask = os.umask(0o027)
+        try:
+            with gasol_asm.replaced_on_completion(self.optimized_file) as f:
+                f.write("new")
+        finally:
+            os.umask(previous_umask)
+        self.assertEqual(stat.S_IMODE(os.stat(self.optimized_file).st_mode), 0o640)
+
+        # Replaced files keep their mode
+        os.chmod(self.optimized_file, 0o604)
+        with gasol_asm.replaced_on_completion(self.optimized_file) as f:
+            f.write("newer")
+        self.assertEqual(stat.S_IMODE(os.stat(self.optimized_file).st_mode), 0o604)
+
+
+if __name__ == '__main__':
+    unittest.main()
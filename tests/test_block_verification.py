@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from argparse import ArgumentParser
+from unittest import mock
+
+import gasol_asm
+from global_params.options import OptimizationParams
+from sfs_generator.parser_asm import generate_block_from_plain_instructions
+
+
+class TestBlockVerification(unittest.TestCase):
+
+    def setUp(self):
+        ap = ArgumentParser()
+        gasol_asm.options_gasol(ap)
+        self.params = OptimizationParams()
+        self.params.parse_args(ap.parse_args(["test.json_solc", "-greedy"]))
+        self.old_block = generate_block_from_plain_instructions("PUSH 1 PUSH 2 ADD CALLER SSTORE", "block_0")
+        self.old_sfs_dict = {"block_0_0": {}}
+
+    def optimize_and_verify(self, optimized_block, comparison=(True, "")):
+        """
+        Verifies the optimized block returned by a replaced optimization. Returns the result and the mock
+        that replaces the comparison
+        """
+        optimization = mock.Mock(return_value=(optimized_block, {"block_0": "log"}, [], self.old_sfs_dict))
+        compare = mock.Mock(return_value=comparison)
+        with mock.patch.object(gasol_asm, "optimize_asm_block_asm_format", optimization), \
+                mock.patch.object(gasol_asm, "compare_asm_block_asm_format", compare):
+            return gasol_asm.optimize_and_verify_asm_block(self.old_block, self.params), compare
+
+    def test_unchanged_block_is_not_verified(self):
+        unchanged_block = generate_block_from_plain_instructions("PUSH 1 PUSH 2 ADD CALLER SSTORE", "block_0")
+        (chosen_block, log_element, _, block_row), compare = self.optimize_and_verify(unchanged_block)
+
+        compare.assert_not_called()
+        self.assertIs(chosen_block, unchanged_block)
+        self.assertDictEqual(log_element, {"block_0": "log"})
+        self.assertTrue(block_row["gasol_checker"])
+        self.assertEqual(block_row["gasol_checker_reason"], "")
+
+    def test_changed_block_is_verified(self):
+        changed_block = generate_block_from_plain_instructions("PUSH 3 CALLER SSTORE", "block_0")
+        (chosen_block, log_element, _, block_row), compare = self.optimize_and_verify(changed_block)
+
+        # The SFS of the original block from the optimization is reused
+        compare.assert_called_once_with(self.old_block, changed_block, self.params, self.old_sfs_dict)
+        self.assertIs(chosen_block, changed_block)
+        self.assertDictEqual(log_element, {"block_0": "log"})
+        self.assertEqual(block_row["saved_length"], 2)
+
+    def test_failed_verification_keeps_original_block(self):
+        changed_block = generate_block_from_plain_instructions("PUSH 4 CALLER SSTORE", "block_0")
+        (chosen_block, log_element, _, block_row), compare = self.optimize_and_verify(changed_block,
+                                                                                      (False, "different SFS"))
+
+        compare.assert_called_once()
+        self.assertIs(chosen_block, self.old_block)
+        self.assertDictEqual(log_element, {})
+        self.assertTrue(block_row["gasol_checker"])
+        self.assertEqual(block_row["saved_length"], 0)
+
+    def test_unchanged_isolated_block_is_not_verified(self):
+        with tempfile.TemporaryDirectory() as input_dir:
+            input_file = os.path.join(input_dir, "block.txt")
+            with open(input_file, 'w') as f:
+                f.write("PUSH 1 PUSH 2 ADD CALLER SSTORE")
+            ap = ArgumentParser()
+            gasol_asm.options_gasol(ap)
+            params = OptimizationParams()
+            params.parse_args(ap.parse_args([input_file, "-bl", "-greedy"]))
+            params.optimization_enabled = False
+            gasol_asm.init()
+
+            unchanged_block = generate_block_from_plain_instructions("PUSH 1 PUSH 2 ADD CALLER SSTORE", "block_0")
+            optimization = mock.Mock(return_value=(unchanged_block, {}, [], self.old_sfs_dict))
+            compare = mock.Mock(return_value=(True, ""))
+            with mock.patch.object(gasol_asm, "optimize_asm_block_asm_format", optimization), \
+                    mock.patch.object(gasol_asm, "compare_asm_block_asm_format", compare), \
+                    mock.patch.object(gasol_asm, "check_rows_with_forves"):
+                gasol_asm.optimize_isolated_asm_block(params)
+
+        optimization.assert_called_once()
+        compare.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
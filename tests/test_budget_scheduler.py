@@ -0,0 +1,239 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from argparse import ArgumentParser
+from unittest import mock
+
+import gasol_asm
+from global_params.options import OptimizationParams
+from greedy.block_generation import greedy_standalone
+from sfs_generator.ir_block import evm2rbr_compiler
+from sfs_generator.parser_asm import generate_block_from_plain_instructions
+from smt_encoding.budget_scheduler import BudgetScheduler, sub_block_priority
+
+
+def sub_block_sfs(instructions, input_stack):
+    block = {"instructions": instructions, "input": input_stack}
+    _, _, sfs_dict = evm2rbr_compiler(file_name="test", block=block, block_name="block", storage=True, part=False,
+                                      push=True)
+    return sfs_dict["block_0"]
+
+
+def budget_params(*args):
+    ap = ArgumentParser()
+    gasol_asm.options_gasol(ap)
+    params = OptimizationParams()
+    params.parse_args(ap.parse_args(["test.json_solc", "-budget", "0", *args]))
+    return params
+
+
+class TestBudgetScheduler(unittest.TestCase):
+
+    def setUp(self):
+        # Only uninterpreted instructions: no stack manipulation can be removed
+        self.tight_sfs = sub_block_sfs(['PUSH 1', 'CALLER', 'SLOAD', 'ADD'], 0)
+        # Redundant stack manipulation
+        self.loose_sfs = sub_block_sfs(['SWAP1', 'SWAP1', 'DUP1', 'POP', 'DUP2', 'DUP2', 'ADD', 'SWAP2', 'POP', 'POP'], 2)
+
+    def test_redundant_stack_operations_have_more_priority(self):
+        self.assertEqual(sub_block_priority(self.tight_sfs, "gas"), 0)
+        self.assertGreater(sub_block_priority(self.loose_sfs, "gas"), 0)
+
+    def test_time_is_reserved_in_priority_order(self):
+        scheduler = BudgetScheduler(20)
+        scheduler.plan([(("C", "tight"), [(("C", "tight_0"), sub_block_priority(self.tight_sfs, "gas"), 10)]),
+                        (("C", "loose"), [(("C", "loose_0"), sub_block_priority(self.loose_sfs, "gas"), 10)])])
+        self.assertGreater(scheduler.priority(("C", "loose")), scheduler.priority(("C", "tight")))
+        self.assertEqual(scheduler.priority(("C", "unknown")), 0)
+
+        # The budget only covers one timeout, so the tight sub-block gets the rest while the loose one is pending
+        tight_timeout = scheduler.allot(("C", "tight_0"), 10)
+        self.assertLess(tight_timeout, 10)
+        scheduler.release(tight_timeout)
+        self.assertEqual(scheduler.allot(("C", "loose_0"), 10), 10)
+
+    def test_new_plan_replaces_reservations(self):
+        scheduler = BudgetScheduler(20)
+        in_flight = scheduler.allot(("C", "other_0"), 5)
+        # The workers allot the sub-blocks from their own copies, so the first plan is not used in this one
+        scheduler.plan([(("C", "loose"), [(("C", "loose_0"), sub_block_priority(self.loose_sfs, "gas"), 10)])])
+        scheduler.plan([(("C", "loose"), [(("C", "loose_0"), sub_block_priority(self.loose_sfs, "gas"), 10)])])
+
+        # The reservation of the first plan is not kept, so the tight sub-block gets the time that is not reserved
+        # for the loose one in the second plan nor assigned to the sub-block that is being optimized
+        free_time = scheduler.capacity() - 10 - in_flight
+        self.assertAlmostEqual(scheduler.allot(("C", "tight_0"), 20), free_time, delta=1)
+        scheduler.release(in_flight)
+
+    def test_blocks_with_the_same_name_in_different_contracts(self):
+        scheduler = BudgetScheduler(20)
+        tight_priority = sub_block_priority(self.tight_sfs, "gas")
+        loose_priority = sub_block_priority(self.loose_sfs, "gas")
+        scheduler.plan([(("a/C.sol:C", "C_0"), [(("a/C.sol:C", "C_0_0"), tight_priority, 5)]),
+                        (("b/C.sol:C", "C_0"), [(("b/C.sol:C", "C_0_0"), loose_priority, 5)])])
+        self.assertEqual(scheduler.priority(("a/C.sol:C", "C_0")), 0)
+        self.assertGreater(scheduler.priority(("b/C.sol:C", "C_0")), 0)
+
+        # Each sub-block keeps its own reservation
+        self.assertEqual(scheduler.allot(("a/C.sol:C", "C_0_0"), 5), 5)
+        self.assertEqual(scheduler.allot(("b/C.sol:C", "C_0_0"), 5), 5)
+
+    def test_no_time_after_deadline(self):
+        scheduler = BudgetScheduler(0)
+        scheduler.plan([(("C", "loose"), [(("C", "loose_0"), sub_block_priority(self.loose_sfs, "gas"), 10)])])
+        self.assertEqual(scheduler.allot(("C", "loose_0"), 10), 0)
+
+    def test_exhausted(self):
+        self.assertFalse(BudgetScheduler(20).exhausted())
+        self.assertTrue(BudgetScheduler(0).exhausted())
+
+    def test_contracts_reserve_their_share(self):
+        scheduler = BudgetScheduler(20)
+        scheduler.expect_instructions(40)
+        scheduler.plan([(("C", "loose"), [(("C", "loose_0"), sub_block_priority(self.loose_sfs, "gas"), 100)])], 10)
+
+        # The block has a quarter of the pending instructions, so it only reserves a quarter of the capacity
+        self.assertAlmostEqual(scheduler.reservations([("C", "loose_0")])[("C", "loose_0")],
+                               scheduler.capacity() / 4, delta=1)
+        self.assertDictEqual(scheduler.reservations([("C", "other_0")]), {("C", "other_0"): 0})
+
+    def test_output_time_is_kept_before_deadline(self):
+        scheduler = BudgetScheduler(20)
+        scheduler.reserve_output_time(15)
+        self.assertAlmostEqual(scheduler.remaining_time(), 5, delta=1)
+        scheduler.reserve_output_time(20)
+        self.assertTrue(scheduler.exhausted())
+
+    def test_sub_blocks_are_planned_from_their_sfs(self):
+        params = budget_params("-tout", "5", "-direct-tout")
+        tight_block = generate_block_from_plain_instructions("PUSH 1 CALLER SLOAD ADD", "tight")
+        loose_block = generate_block_from_plain_instructions("SWAP1 SWAP1 DUP1 POP DUP2 DUP2 ADD SWAP2 POP POP",
+                                                             "loose")
+        loose_block.source_stack = 2
+        blocks_sfs = [gasol_asm.compute_block_sfs(block, params) for block in [tight_block, loose_block]]
+
+        scheduler = mock.Mock()
+        with mock.patch.object(gasol_asm, "budget_scheduler", scheduler), \
+                mock.patch("greedy.block_generation.greedy_from_json") as greedy:
+            gasol_asm.plan_solver_budget([tight_block, loose_block], blocks_sfs, params, "a/C.sol:C")
+
+        # The sub-blocks are not searched to compute their priority
+        greedy.assert_not_called()
+        (planned_blocks, instructions), _ = scheduler.plan.call_args
+        self.assertEqual(instructions, len(tight_block.instructions) + len(loose_block.instructions))
+        self.assertListEqual([block_key for block_key, _ in planned_blocks],
+                             [("a/C.sol:C", "tight"), ("a/C.sol:C", "loose")])
+        (tight_sub_block,), (loose_sub_block,) = [sub_blocks for _, sub_blocks in planned_blocks]
+        self.assertTupleEqual(tight_sub_block, (("a/C.sol:C", "tight_0"), 0, 5))
+        self.assertEqual(loose_sub_block[0], ("a/C.sol:C", "loose_0"))
+        self.assertGreater(loose_sub_block[1], 0)
+        self.assertEqual(loose_sub_block[2], 5)
+
+    def test_sfs_is_computed_once(self):
+        params = budget_params("-tout", "0", "-direct-tout")
+        blocks = [generate_block_from_plain_instructions("SWAP1 SWAP1 DUP1 POP DUP2 DUP2 ADD SWAP2 POP POP",
+                                                         f"block_{i}") for i in range(2)]
+        for block in blocks:
+            block.source_stack = 2
+
+        sfs_generation = mock.Mock(wraps=gasol_asm.compute_original_sfs_with_simplifications)
+        with mock.patch.object(gasol_asm, "budget_scheduler", BudgetScheduler(20)), \
+                mock.patch.object(gasol_asm, "compute_original_sfs_with_simplifications", sfs_generation):
+            results = list(gasol_asm.optimize_asm_blocks(blocks, params, None, "C"))
+
+        # The SFS computed to plan the budget is reused to optimize and verify each block. Only the SFS of the
+        # optimized blocks are computed again to verify them
+        original_sfs_calls = [args for args, _ in sfs_generation.call_args_list if any(args[0] is b for b in blocks)]
+        self.assertEqual(len(original_sfs_calls), len(blocks))
+        self.assertEqual(len(results), len(blocks))
+
+    def test_whole_execution_within_budget(self):
+        budget = 2
+
+        def slow_greedy(sfs_block):
+            # Each sub-block takes long enough that optimizing the whole file needs several times the budget
+            time.sleep(0.1)
+            return greedy_standalone(sfs_block)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            ap = ArgumentParser()
+            gasol_asm.options_gasol(ap)
+            params = OptimizationParams()
+            params.parse_args(ap.parse_args(["examples/jsons-solc/0x363c421901B7BDCa0f2a17dA03948D676bE350E4.json_solc",
+                                             "-greedy", "-budget", str(budget)]))
+            params.optimized_file = os.path.join(output_dir, "out.json_solc")
+            params.seqs_file = os.path.join(output_dir, "seqs.csv")
+            params.blocks_file = os.path.join(output_dir, "blocks.csv")
+            gasol_asm.init()
+
+            contract_building = mock.Mock(wraps=gasol_asm.contract_from_json)
+            start = time.time()
+            with mock.patch.object(gasol_asm, "budget_scheduler", None), \
+                    mock.patch.object(gasol_asm, "greedy_standalone", slow_greedy), \
+                    mock.patch.object(gasol_asm, "contract_from_json", contract_building):
+                gasol_asm.execute_gasol(params)
+            elapsed = time.time() - start
+
+            # All the contracts are written, but the last one is copied without building it, as the budget is
+            # exhausted while optimizing the previous one
+            with open(params.optimized_file) as f:
+                optimized_contracts = json.load(f)["contracts"]
+            with open(params.input_file) as f:
+                input_contracts = json.load(f)["contracts"]
+            self.assertListEqual(list(optimized_contracts), list(input_contracts))
+            last_contract = list(input_contracts)[-1]
+            self.assertDictEqual(optimized_contracts[last_contract], input_contracts[last_contract])
+            self.assertLess(contract_building.call_count, len(input_contracts))
+            self.assertTrue(os.path.exists(params.blocks_file))
+        self.assertLess(elapsed, budget + 0.5)
+
+    def test_blocks_optimized_by_priority_are_yielded_lazily(self):
+        params = budget_params()
+        blocks = [generate_block_from_plain_instructions(f"PUSH {i}", f"block_{i}") for i in range(4)]
+        priorities = {("C", "block_0"): 0, ("C", "block_1"): 2, ("C", "block_2"): 1, ("C", "block_3"): 0}
+        optimized = []
+
+        def optimize_block(block, params, contract_name, block_sfs=None, template_results=None):
+            optimized.append(block.block_name)
+            return block, {}, [], {}
+
+        scheduler = mock.Mock(priority=priorities.get)
+        with mock.patch.object(gasol_asm, "budget_scheduler", scheduler), \
+                mock.patch.object(gasol_asm, "optimize_and_verify_asm_block", optimize_block):
+            results = gasol_asm.optimize_asm_blocks(blocks, params, None, "C")
+            self.assertListEqual(optimized, [])
+
+            # The blocks with more priority are optimized first, and kept until the previous ones are yielded
+            self.assertIs(next(results)[0], blocks[0])
+            self.assertListEqual(optimized, ["block_1", "block_2", "block_0"])
+            self.assertListEqual([result[0] for result in results], blocks[1:])
+            self.assertListEqual(optimized, ["block_1", "block_2", "block_0", "block_3"])
+
+    def test_blocks_are_kept_after_deadline(self):
+        params = budget_params()
+        block = generate_block_from_plain_instructions("PUSH 1 PUSH 2 ADD CALLER SSTORE", "block_0")
+
+        optimization = mock.Mock()
+        sfs_generation = mock.Mock()
+        with mock.patch.object(gasol_asm, "budget_scheduler", BudgetScheduler(0)), \
+                mock.patch.object(gasol_asm, "optimize_asm_block_asm_format", optimization), \
+                mock.patch.object(gasol_asm, "compute_original_sfs_with_simplifications", sfs_generation):
+            chosen_block, log_element, csv_statistics, block_row = \
+                gasol_asm.optimize_and_verify_asm_block(block, params)
+
+            gasol_asm.analyze_blocks([block], params, None, "C")
+
+        # Neither the SFS are computed nor the greedy algorithm or the solver are applied
+        optimization.assert_not_called()
+        sfs_generation.assert_not_called()
+        self.assertIs(chosen_block, block)
+        self.assertDictEqual(log_element, {})
+        self.assertListEqual(csv_statistics, [])
+        self.assertEqual(block_row["new_instrs"], block.to_plain())
+        self.assertTrue(block_row["gasol_checker"])
+
+
+if __name__ == '__main__':
+    unittest.main()
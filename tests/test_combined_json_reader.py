@@ -0,0 +1,53 @@
+import io
+import json
+import os
+import unittest
+
+import sfs_generator.combined_json_reader as combined_json_reader
+from sfs_generator.combined_json_reader import CombinedJsonReader
+from sfs_generator.parser_asm import StreamedAsm, parse_asm
+
+
+class TestCombinedJsonReader(unittest.TestCase):
+
+    def setUp(self):
+        self.chunk_size = combined_json_reader.chunk_size
+        # Small chunks force values to be split across several reads
+        combined_json_reader.chunk_size = 5
+        project_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        self.input_file = project_path + "/examples/jsons-solc/0x08B02C0B0D5Bc97ceae343c88A90342b5e4d3C0C.json_solc"
+
+    def tearDown(self):
+        combined_json_reader.chunk_size = self.chunk_size
+
+    def test_entries_match_json_load(self):
+        data = {"contracts": {"a.sol:A": {"asm": {".code": [{"name": "PUSH", "value": "8é"}]}},
+                              "a.sol:B": {}, "b.sol:C": {"asm": None, "bin": [1, 2.5, True, None]}},
+                "sourceList": ["a.sol", "b.sol"], "version": "0.8.15"}
+        reader = CombinedJsonReader(io.StringIO(json.dumps(data, indent=2)))
+        self.assertListEqual(list(reader.entries()), list(data["contracts"].items()))
+        self.assertEqual(reader.version, "0.8.15")
+
+    def test_unselected_entries_are_skipped(self):
+        data = {"version": "0.8.15", "contracts": {"a.sol:A": {"asm": {"x": [1]}}, "a.sol:B": {"asm": {"y": 2}}}}
+        reader = CombinedJsonReader(io.StringIO(json.dumps(data)))
+        self.assertListEqual(list(reader.entries(lambda name: name.endswith(":B"))), [("a.sol:B", {"asm": {"y": 2}})])
+        self.assertEqual(reader.version, "0.8.15")
+
+    def test_streamed_asm_matches_parse_asm(self):
+        with open(self.input_file) as f:
+            data = json.load(f)
+        asm = parse_asm(self.input_file)
+        self.assertEqual(asm.version, data["version"])
+        self.assertListEqual([c.contract_name for c in asm.contracts], list(data["contracts"]))
+
+        streamed_asm = StreamedAsm(self.input_file, "ServicePayer")
+        contracts = list(streamed_asm.contracts())
+        self.assertListEqual([c.shortened_name for c in contracts], ["ServicePayer"])
+        self.assertDictEqual(contracts[0].to_asm_json(),
+                             next(c for c in asm.contracts if c.shortened_name == "ServicePayer").to_asm_json())
+        self.assertEqual(streamed_asm.version, data["version"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
+import copy
+import gc
+import pickle
 import unittest
+import weakref
 from smt_encoding.constraints.connector_factory import add_eq, add_lt, add_not, add_leq, add_and, add_implies, add_or
-from smt_encoding.constraints.connector import Connector
-from smt_encoding.constraints.function import Const, Sort
+from smt_encoding.constraints.connector import Connector, _interned_connectors
+from smt_encoding.constraints.function import Const, Sort, Function
 
 
 class TestConnectors(unittest.TestCase):
@@ -235,5 +239,79 @@ class TestConnectors(unittest.TestCase):
         self.assertEqual(formula, expected_result)
 
 
+
+class TestConnectorInterning(unittest.TestCase):
+
+    def test_same_connector_object(self):
+        a = Const('a', Sort.integer)
+        u = Const('u', Sort.boolean)
+        self.assertIs(add_and(u, add_lt(a, 3)), add_and(u, add_lt(a, 3)))
+        self.assertIs(Connector('<', False, a, int('1' * 30)), Connector('<', False, a, int('1' * 30)))
+        # Permuted commutative connectors are equal, but not the same object
+        self.assertEqual(add_and(u, add_lt(a, 3)), add_and(add_lt(a, 3), u))
+
+    def test_equal_large_integers(self):
+        f = Function('f', Sort.integer, Sort.integer, Sort.integer)
+        a, b = Const('a', Sort.integer), Const('b', Sort.integer)
+        self.assertIs(add_eq(f(a, int('1' * 30)), f(b, int('1' * 30))),
+                      add_eq(f(a, int('1' * 30)), f(b, int('1' * 30))))
+        self.assertIs(add_eq(f(a, int('1' * 30)), f(a, int('1' * 30))), True)
+
+    def test_booleans_and_integers(self):
+        a = Const('a', Sort.integer)
+        self.assertIsNot(Connector('=', True, a, 1), Connector('=', True, a, True))
+        self.assertNotEqual(Connector('=', True, a, 1), Connector('=', True, a, True))
+
+    def test_hash_eq_consistency(self):
+        a = Const('a', Sort.integer)
+        u, v = Const('u', Sort.boolean), Const('v', Sort.boolean)
+        formulas = [add_or(u, v, add_lt(a, int('5' * 30))), add_or(add_lt(a, int('5' * 30)), v, u),
+                    add_or(u, v), add_or(v, u), add_and(u, v)]
+        for first in formulas:
+            for second in formulas:
+                if first == second:
+                    self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len(set(formulas)), 3)
+
+    def test_permuted_commutative_connectors(self):
+        u = Const('u', Sort.boolean)
+        v = Const('v', Sort.boolean)
+        a = Const('a', Sort.integer)
+
+        # Equal, but not the same object, as each one keeps the order of its arguments
+        formula1, formula2 = add_and(u, add_eq(a, 3), v), add_and(v, add_eq(3, a), u)
+        self.assertEqual(formula1, formula2)
+        self.assertIsNot(formula1, formula2)
+        self.assertEqual(hash(formula1), hash(formula2))
+        self.assertEqual(len({formula1, formula2}), 1)
+        self.assertEqual(str(formula1), "and(u,=(a,3),v)")
+        self.assertEqual(str(formula2), "and(v,=(3,a),u)")
+
+        # The same arguments in the same order lead to the same object
+        self.assertIs(add_and(u, add_eq(a, 3), v), formula1)
+
+        # Permuting the arguments of a non-commutative connector leads to a different formula
+        self.assertNotEqual(add_implies(u, v), add_implies(v, u))
+
+    def test_copies_return_self(self):
+        formula = add_and(Const('u', Sort.boolean), add_lt(Const('a', Sort.integer), 3))
+        self.assertIs(copy.copy(formula), formula)
+        self.assertIs(copy.deepcopy(formula), formula)
+
+    def test_pickling_reinterns(self):
+        formula = add_implies(Const('u', Sort.boolean), add_lt(Const('a', Sort.integer), int('7' * 30)))
+        self.assertIs(pickle.loads(pickle.dumps(formula)), formula)
+
+    def test_connectors_are_released(self):
+        formula = add_lt(Const('released_a', Sort.integer), Const('released_b', Sort.integer))
+        formula_ref = weakref.ref(formula)
+        n_connectors = len(_interned_connectors)
+
+        del formula
+        gc.collect()
+        self.assertIsNone(formula_ref())
+        self.assertEqual(len(_interned_connectors), n_connectors - 1)
+
+
 if __name__ == '__main__':
     unittest.main()
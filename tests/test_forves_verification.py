@@ -0,0 +1,149 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import global_params.paths as paths
+import verification.forves_verification as forves_verification
+from verification.forves_verification import compare_forves_batch, run_forves_records, forves_records
+
+
+class FakeChecker:
+    """
+    Replaces the invocation of the forves checker. Each record is judged false if its optimized sequence
+    contains a SUB and true otherwise, unless the output is given explicitly
+    """
+
+    def __init__(self, output=None):
+        self.output = output
+        self.inputs = []
+        self._lock = threading.Lock()
+
+    def __call__(self, command, input, **kwargs):
+        with self._lock:
+            self.inputs.append(input)
+
+        output = self.output
+        if output is None:
+            # Records are separated by lines "#", followed by the optimized and the original sequences
+            optimized_seqs = input.split('\n')[1::4]
+            output = ''.join(f"Example {i}: {'false' if 'SUB' in seq else 'true'}\n"
+                             for i, seq in enumerate(optimized_seqs))
+        return subprocess.CompletedProcess(command, 0, stdout=output)
+
+    def records_checked(self):
+        return sum(checker_input.count('#') for checker_input in self.inputs)
+
+
+class TestForvesVerification(unittest.TestCase):
+
+    def setUp(self):
+        # The checker must be present to be invoked
+        self.project_path = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.project_path, "bin"))
+        open(os.path.join(self.project_path, "bin", "forves-checker"), 'w').close()
+        patcher = mock.patch.object(paths, "project_path", self.project_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.project_path, ignore_errors=True)
+
+    def check_with(self, checker, *args, **kwargs):
+        with mock.patch.object(forves_verification.subprocess, "run", checker):
+            return compare_forves_batch(*args, **kwargs)
+
+    def test_verdicts_from_output(self):
+        checker = FakeChecker("Some header\nExample 1: false\nExample 0: true\n"
+                              "Example 2: parsing error at line 3\nTime: 0.1s\n")
+        records = ["# PUSH1 0x1\nPUSH1 0x1\n500"] * 3
+        with mock.patch.object(forves_verification.subprocess, "run", checker):
+            self.assertListEqual(run_forves_records(records, "size"), ["true", "false", "parsing"])
+        self.assertEqual(checker.inputs[0], '\n'.join(records))
+
+    def test_missing_or_malformed_output(self):
+        records = ["# PUSH1 0x1\nPUSH1 0x1\n500"] * 2
+        for output in ["", "Example 0: true\n", "Example 0: true\nExample 1: unknown\n", "Segmentation fault\n"]:
+            with self.subTest(output=output), mock.patch.object(forves_verification.subprocess, "run",
+                                                                FakeChecker(output)):
+                with self.assertRaises(ValueError):
+                    run_forves_records(records, "gas")
+
+        # The error is propagated to the caller of the batch
+        with self.assertRaises(ValueError):
+            self.check_with(FakeChecker(""), [("PUSH 1 PUSH 2 ADD", "PUSH 3")])
+
+    def test_pairs_get_their_verdicts(self):
+        pairs = [("PUSH 1 PUSH 2 ADD", "PUSH 3"),
+                 ("PUSH 1 PUSH 2 ADD", "PUSH 2 PUSH 1 SUB"),
+                 ("DUP1 DUP1 ADD", "DUP1 DUP2 ADD"),
+                 # Two records, the second of them false
+                 ("PUSH 1 PUSH 2 ADD LOG0 PUSH 3", "PUSH 3 LOG0 PUSH 4 PUSH 1 SUB")]
+        self.assertEqual(len(forves_records(*pairs[3])), 2)
+
+        checker = FakeChecker()
+        self.assertListEqual(self.check_with(checker, pairs), ["true", "false", "true", "false"])
+        # All the records are checked with a single invocation
+        self.assertEqual(len(checker.inputs), 1)
+        self.assertEqual(checker.records_checked(), 5)
+
+    def test_checker_timeout(self):
+        def checker(command, input, timeout=None, **kwargs):
+            raise subprocess.TimeoutExpired(command, timeout)
+
+        pairs = [("PUSH 1 PUSH 2 ADD", "PUSH 3"), ("PUSH 1", "PUSH 1")]
+        # The identical sequences are not sent to the checker, so they are still true
+        self.assertListEqual(self.check_with(checker, pairs, timeout=0.5), ["timeout", "true"])
+
+    def test_sharding(self):
+        pairs = [(f"PUSH {i} PUSH 1 ADD", f"PUSH 1 PUSH {i} {'SUB' if i % 3 == 0 else 'ADD'}") for i in range(2, 9)]
+        expected_verdicts = ["false" if i % 3 == 0 else "true" for i in range(2, 9)]
+        sequential_checker, sharded_checker = FakeChecker(), FakeChecker()
+
+        self.assertListEqual(self.check_with(sequential_checker, pairs), expected_verdicts)
+        self.assertListEqual(self.check_with(sharded_checker, pairs, shards=3), expected_verdicts)
+        self.assertEqual(len(sequential_checker.inputs), 1)
+        # Seven records in shards of at most three
+        self.assertListEqual(sorted(checker_input.count('#') for checker_input in sharded_checker.inputs), [1, 3, 3])
+
+        # There are never more shards than records
+        checker = FakeChecker()
+        self.assertListEqual(self.check_with(checker, pairs[:2], shards=8), expected_verdicts[:2])
+        self.assertEqual(len(checker.inputs), 2)
+
+    def test_repeated_and_identical_pairs(self):
+        pair = ("PUSH 1 PUSH 2 ADD", "PUSH 2 PUSH 1 SUB")
+        identical_pair = ("PUSH 1 PUSH 2 ADD", "PUSH 1 PUSH 2 ADD")
+        checker = FakeChecker()
+        self.assertListEqual(self.check_with(checker, [pair, identical_pair, pair, pair]),
+                             ["false", "true", "false", "false"])
+        self.assertEqual(checker.records_checked(), 1)
+
+        # Identical sequences are not sent to the checker
+        checker = FakeChecker()
+        self.assertListEqual(self.check_with(checker, [identical_pair, ("JUMP", "JUMP")]), ["true", "true"])
+        self.assertEqual(checker.records_checked(), 0)
+
+    def test_untranslatable_pairs(self):
+        checker = FakeChecker()
+        with mock.patch("sys.stderr"), mock.patch("traceback.print_exc"):
+            verdicts = self.check_with(checker, [("PUSH 1 UNKNOWNOP", "PUSH 1"), ("PUSH 1 PUSH 2 ADD", "PUSH 3")])
+        self.assertListEqual(verdicts, ["parsing", "true"])
+        self.assertEqual(checker.records_checked(), 1)
+
+    def test_disabled_or_missing_checker(self):
+        checker = FakeChecker()
+        pairs = [("PUSH 1 PUSH 2 ADD", "PUSH 3")] * 2
+        self.assertListEqual(self.check_with(checker, pairs, enabled=False), ["disabled", "disabled"])
+
+        os.remove(os.path.join(self.project_path, "bin", "forves-checker"))
+        self.assertListEqual(self.check_with(checker, pairs), ["missing", "missing"])
+        self.assertListEqual(checker.inputs, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
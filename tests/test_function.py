@@ -1,5 +1,10 @@
+import copy
+import gc
+import pickle
 import unittest
-from smt_encoding.constraints.function import Function, Sort, ExpressionReference
+import weakref
+from smt_encoding.constraints.function import Function, Sort, ExpressionReference, Const, _interned_expressions, \
+    _interned_functions
 
 
 class TestFunctionEncoding(unittest.TestCase):
@@ -40,5 +45,79 @@ class TestFunctionEncoding(unittest.TestCase):
         a = Function('a', Sort.boolean)()
         self.assertRaises(ValueError, f, a)
 
+
+class TestFunctionInterning(unittest.TestCase):
+
+    def test_same_function_object(self):
+        self.assertIs(Function('f', Sort.integer, Sort.integer), Function('f', Sort.integer, Sort.integer))
+        self.assertIsNot(Function('f', Sort.integer, Sort.integer), Function('f', Sort.integer, Sort.boolean))
+        self.assertIsNot(Function('f', Sort.integer, Sort.integer),
+                         Function('f', Sort.integer, Sort.integer, comm_assoc=True))
+
+    def test_same_expression_object(self):
+        f = Function('f', Sort.integer, Sort.integer, Sort.integer)
+        a, b = Const('a', Sort.integer), Const('b', Sort.integer)
+        self.assertIs(f(f(a, 3), b), f(f(a, 3), b))
+        self.assertIsNot(f(a, b), f(b, a))
+
+    def test_equal_large_integers(self):
+        f = Function('f', Sort.integer, Sort.integer, Sort.integer)
+        a = Const('a', Sort.integer)
+        # Equal integers outside the small integer cache are different objects
+        first_constant, second_constant = int('1' * 30), int('1' * 30)
+        self.assertIsNot(first_constant, second_constant)
+        self.assertIs(f(a, first_constant), f(a, second_constant))
+        self.assertEqual(f(a, first_constant), f(a, second_constant))
+        self.assertNotEqual(f(a, first_constant), f(a, first_constant + 1))
+
+    def test_booleans_and_integers(self):
+        g = Function('g', Sort.boolean, Sort.integer)
+        h = Function('h', Sort.integer, Sort.integer)
+        self.assertIs(g(True), g(True))
+        self.assertIsNot(g(True).arguments[0], h(1).arguments[0])
+        self.assertEqual(type(h(1).arguments[0]), int)
+
+    def test_hash_eq_consistency(self):
+        f = Function('f', Sort.integer, Sort.integer, Sort.integer)
+        a = Const('a', Sort.integer)
+        expressions = [f(a, int('2' * 40)), f(a, int('2' * 40)), f(f(a, 1), a), f(f(a, 1), a),
+                       a, Const('a', Sort.integer)]
+        for first in expressions:
+            for second in expressions:
+                if first == second:
+                    self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len(set(expressions)), 3)
+        self.assertEqual(len({f, Function('f', Sort.integer, Sort.integer, Sort.integer)}), 1)
+
+    def test_copies_return_self(self):
+        f = Function('f', Sort.integer, Sort.integer)
+        expression = f(f(Const('a', Sort.integer)))
+        for node in [f, expression]:
+            self.assertIs(copy.copy(node), node)
+            self.assertIs(copy.deepcopy(node), node)
+        self.assertIs(copy.deepcopy([expression])[0], expression)
+
+    def test_pickling_reinterns(self):
+        f = Function('f', Sort.integer, Sort.integer, Sort.integer, comm_assoc=True)
+        expression = f(f(Const('a', Sort.integer), int('3' * 30)), 4)
+        self.assertIs(pickle.loads(pickle.dumps(f)), f)
+        self.assertTrue(pickle.loads(pickle.dumps(f)).comm_assoc)
+        self.assertIs(pickle.loads(pickle.dumps(expression)), expression)
+
+    def test_nodes_are_released(self):
+        f = Function('released_f', Sort.integer, Sort.integer)
+        expression = f(Const('released_a', Sort.integer))
+        function_ref, expression_ref = weakref.ref(f), weakref.ref(expression)
+        n_functions, n_expressions = len(_interned_functions), len(_interned_expressions)
+
+        del f, expression
+        gc.collect()
+        self.assertIsNone(function_ref())
+        self.assertIsNone(expression_ref())
+        # Function released_a, its constant, released_f and its application
+        self.assertEqual(len(_interned_functions), n_functions - 2)
+        self.assertEqual(len(_interned_expressions), n_expressions - 2)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,73 @@
+import os
+import unittest
+from argparse import ArgumentParser
+from copy import deepcopy
+
+import gasol_asm
+import global_params.paths as paths
+from global_params.options import OptimizationParams
+from sfs_generator.ir_block import evm2rbr_compiler
+from smt_encoding.block_optimizer import BlockOptimizer
+from smt_encoding.complete_encoding.synthesis_full_encoding import FullEncoding
+from smt_encoding.constraints.connector_factory import add_implies, add_eq
+from smt_encoding.solver.solver import OptimizeOutcome
+
+
+def sub_block_sfs(instructions, input_stack):
+    block = {"instructions": instructions, "input": input_stack}
+    _, _, sfs_dict = evm2rbr_compiler(file_name="test", block=block, block_name="block", storage=True, part=False,
+                                      push=True)
+    return sfs_dict["block_0"]
+
+
+def solver_params(*args):
+    ap = ArgumentParser()
+    gasol_asm.options_gasol(ap)
+    params = OptimizationParams()
+    params.parse_args(ap.parse_args(["test.json_solc", "-solver", "z3", *args]))
+    return params
+
+
+class TestIterativeDeepening(unittest.TestCase):
+
+    def setUp(self):
+        # Redundant stack manipulation, so the optimal sequence is shorter than the original one
+        self.sfs = sub_block_sfs(['SWAP1', 'SWAP1', 'DUP1', 'POP', 'DUP2', 'DUP2', 'ADD', 'SWAP2', 'POP', 'POP'], 2)
+
+    def test_length_literals_force_nop(self):
+        encoding = FullEncoding(deepcopy(self.sfs), solver_params("-deepening"))
+        literals = encoding.length_literals(self.sfs["min_length"])
+        self.assertListEqual(list(literals), list(range(self.sfs["min_length"], self.sfs["init_progr_len"])))
+
+        declared = encoding.functions_declared()
+        hard_constraints = [constraint.formula for constraint in encoding.generate_hard_constraints()]
+        theta_nop = [theta for theta, instr in encoding.theta_to_instr.items() if instr.id == "NOP"][0]
+        for k, literal in literals.items():
+            self.assertIn(literal.func, declared)
+            self.assertIn(add_implies(literal, add_eq(encoding._term_factory.t(k),
+                                                      encoding._term_factory.theta_value(theta_nop))),
+                          hard_constraints)
+
+    @unittest.skipUnless(os.path.exists(paths.z3_exec), "z3 is not available")
+    def test_shortest_sequence_is_optimal_for_length(self):
+        outcome, _, ids = BlockOptimizer("block_0", deepcopy(self.sfs),
+                                         solver_params("-length", "-deepening"), 10).optimize_block()
+        optimal_outcome, _, optimal_ids = BlockOptimizer("block_0", deepcopy(self.sfs),
+                                                         solver_params("-length"), 10).optimize_block()
+        self.assertEqual(outcome, OptimizeOutcome.optimal)
+        self.assertEqual(optimal_outcome, OptimizeOutcome.optimal)
+        self.assertEqual(len([instr_id for instr_id in ids if instr_id != 'NOP']),
+                         len([instr_id for instr_id in optimal_ids if instr_id != 'NOP']))
+
+    @unittest.skipUnless(os.path.exists(paths.z3_exec), "z3 is not available")
+    def test_optimization_after_shortest_sequence(self):
+        optimizer = BlockOptimizer("block_0", deepcopy(self.sfs), solver_params("-deepening"), 10)
+        outcome, _, ids = optimizer.optimize_block()
+        optimal_optimizer = BlockOptimizer("block_0", deepcopy(self.sfs), solver_params(), 10)
+        optimal_outcome, _, optimal_ids = optimal_optimizer.optimize_block()
+        self.assertEqual(outcome, OptimizeOutcome.optimal)
+        self.assertEqual(optimizer.sequence_cost(ids), optimal_optimizer.sequence_cost(optimal_ids))
+
+
+if __name__ == '__main__':
+    unittest.main()
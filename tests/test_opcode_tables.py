@@ -0,0 +1,62 @@
+import unittest
+
+import global_params.constants as constants
+import sfs_generator.opcodes as opcodes
+from sfs_generator.asm_bytecode import AsmBytecode
+from sfs_generator.opcode_tables import EncodedBlocks, OpcodeTables
+from sfs_generator.parser_asm import generate_block_from_plain_instructions
+
+
+class TestOpcodeTables(unittest.TestCase):
+
+    def setUp(self):
+        self.tables = OpcodeTables()
+        self.blocks = [generate_block_from_plain_instructions("PUSH 1 SLOAD PUSH 1 SLOAD ADD", "block_0"),
+                       generate_block_from_plain_instructions("PUSH 0 PUSH ffff DUP2 SWAP1 MSTORE", "block_1"),
+                       generate_block_from_plain_instructions("", "block_2"),
+                       generate_block_from_plain_instructions("PUSH [tag] 3 JUMP", "block_3")]
+
+    def test_tables_match_opcodes(self):
+        for name in ["ADD", "DUP3", "SWAP16", "LOG2", "SSTORE", "PUSH [tag]", "tag"]:
+            opcode_id = self.tables.opcode_id(name)
+            self.assertEqual(self.tables.opcode_id(name), opcode_id)
+            self.assertEqual(self.tables.gas[opcode_id], opcodes.get_ins_cost(name))
+            self.assertEqual(self.tables.pops[opcode_id], opcodes.get_opcode(name)[1])
+            self.assertEqual(self.tables.pushes[opcode_id], opcodes.get_opcode(name)[2])
+            self.assertEqual(self.tables.array("gas")[opcode_id], opcodes.get_ins_cost(name))
+        self.assertFalse(self.tables.counted[self.tables.opcode_id("tag")])
+
+    def test_vectorized_metrics_match_blocks(self):
+        encoded_blocks = EncodedBlocks(self.blocks, self.tables)
+        self.assertListEqual(encoded_blocks.gas_spent().tolist(), [block.gas_spent for block in self.blocks])
+        self.assertListEqual(encoded_blocks.bytes_required().tolist(),
+                             [block.bytes_required for block in self.blocks])
+        self.assertListEqual(encoded_blocks.length().tolist(), [block.length for block in self.blocks])
+        # The second SLOAD accesses a warm slot
+        self.assertEqual(encoded_blocks.gas_spent()[0], 3 + 2100 + 3 + 100 + 3)
+
+    def test_push0(self):
+        push0_enabled = constants.push0_enabled
+        try:
+            for enabled, gas, size in [(False, 3, 2), (True, 2, 1)]:
+                constants.push0_enabled = enabled
+                push = AsmBytecode(-1, -1, -1, "PUSH", "0")
+                self.assertEqual(self.tables.instruction_gas(push.disasm, push.value), gas)
+                self.assertEqual(self.tables.instruction_size(push.disasm, push.value), size)
+                block = generate_block_from_plain_instructions("ADD", "block_0")
+                block.add_instruction(push)
+                self.assertEqual(EncodedBlocks([block], self.tables).gas_spent()[0], 3 + gas)
+                self.assertEqual(EncodedBlocks([block], self.tables).bytes_required()[0], 1 + size)
+        finally:
+            constants.push0_enabled = push0_enabled
+
+    def test_unknown_size(self):
+        block = generate_block_from_plain_instructions("ADD", "block_0")
+        block.add_instruction(AsmBytecode(-1, -1, -1, "PUSHTAG", "1"))
+        self.assertEqual(EncodedBlocks([block], self.tables).gas_spent()[0], 6)
+        with self.assertRaises(ValueError):
+            EncodedBlocks([block], self.tables).bytes_required()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+
+import gasol_asm
+import global_params.paths as paths
+from global_params.options import OptimizationParams
+from sfs_generator.ir_block import evm2rbr_compiler
+from sfs_generator.parser_asm import parse_asm
+from smt_encoding.optimization_cache import OptimizationCache, optimization_key, canonical_sfs, template_key, \
+    pushed_constants_preserved
+from smt_encoding.solver.solver import OptimizeOutcome
+
+
+def sub_block_sfs(instructions, input_stack):
+    block = {"instructions": instructions, "input": input_stack}
+    _, _, sfs_dict = evm2rbr_compiler(file_name="test", block=block, block_name="block", storage=True, part=False,
+                                      push=True)
+    return sfs_dict["block_0"]
+
+
+def rename_sfs_vars(sfs, offset):
+    renamed = json.dumps(sfs)
+    for var in sorted(sfs["vars"], key=lambda var: -int(var[2:-1])):
+        renamed = renamed.replace(f'"{var}"', f'"s({int(var[2:-1]) + offset})"')
+    return json.loads(renamed)
+
+
+class TestOptimizationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.params = OptimizationParams()
+        self.params.smt_solver = "oms"
+        self.params.criteria = "gas"
+        self.sfs = sub_block_sfs(['SWAP1', 'DUP2', 'ADD', 'CALLER', 'SLOAD', 'PUSH 1', 'ADD', 'CALLER', 'SSTORE'], 3)
+
+    def test_key_does_not_depend_on_var_names(self):
+        renamed_sfs = rename_sfs_vars(self.sfs, 100)
+        self.assertNotEqual(self.sfs["user_instrs"], renamed_sfs["user_instrs"])
+        self.assertDictEqual(canonical_sfs(self.sfs), canonical_sfs(renamed_sfs))
+        self.assertEqual(optimization_key(self.sfs, self.params, 2), optimization_key(renamed_sfs, self.params, 2))
+
+    def test_key_depends_on_params_and_timeout(self):
+        other_params = OptimizationParams()
+        other_params.smt_solver = "oms"
+        other_params.criteria = "size"
+        other_sfs = sub_block_sfs(['SWAP1', 'DUP2', 'ADD', 'CALLER', 'SLOAD', 'PUSH 2', 'ADD', 'CALLER', 'SSTORE'], 3)
+
+        key = optimization_key(self.sfs, self.params, 2)
+        self.assertNotEqual(key, optimization_key(self.sfs, other_params, 2))
+        self.assertNotEqual(key, optimization_key(self.sfs, self.params, 4))
+        self.assertNotEqual(key, optimization_key(other_sfs, self.params, 2))
+
+    def test_key_depends_on_deepening(self):
+        deepening_params = OptimizationParams()
+        deepening_params.smt_solver = "oms"
+        deepening_params.criteria = "gas"
+        deepening_params.iterative_deepening = True
+
+        self.assertNotEqual(optimization_key(self.sfs, self.params, 2), optimization_key(self.sfs, deepening_params, 2))
+        self.assertNotEqual(template_key(self.sfs, self.params, 2), template_key(self.sfs, deepening_params, 2))
+
+    def test_template_key_abstracts_pushed_values(self):
+        sfs = sub_block_sfs(['PUSH 20', 'DUP2', 'ADD', 'PUSH 40', 'DUP3', 'MUL', 'PUSH 40', 'SWAP1', 'SUB'], 1)
+        other_values_sfs = sub_block_sfs(['PUSH 60', 'DUP2', 'ADD', 'PUSH 80', 'DUP3', 'MUL', 'PUSH 80', 'SWAP1', 'SUB'], 1)
+        same_values_sfs = sub_block_sfs(['PUSH 60', 'DUP2', 'ADD', 'PUSH 60', 'DUP3', 'MUL', 'PUSH 60', 'SWAP1', 'SUB'], 1)
+
+        self.assertNotEqual(optimization_key(sfs, self.params, 2), optimization_key(other_values_sfs, self.params, 2))
+        self.assertEqual(template_key(sfs, self.params, 2), template_key(other_values_sfs, self.params, 2))
+        # Equal values must be preserved in the template
+        self.assertNotEqual(template_key(sfs, self.params, 2), template_key(same_values_sfs, self.params, 2))
+
+    def test_folded_constants_are_detected(self):
+        self.assertTrue(pushed_constants_preserved(self.sfs))
+        folded_sfs = sub_block_sfs(['PUSH 3', 'PUSH 4', 'ADD', 'CALLER', 'SSTORE'], 0)
+        self.assertFalse(pushed_constants_preserved(folded_sfs))
+
+    def test_store_and_lookup(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "cache.db")
+            key = optimization_key(self.sfs, self.params, 2)
+            optimal_result = (OptimizeOutcome.optimal, 0.5, ['CALLER_0', 'SLOAD_0'], None, {})
+            no_model_result = (OptimizeOutcome.no_model, 2.0, [], None, {})
+
+            cache = OptimizationCache(db_path)
+            self.assertIsNone(cache.lookup(key))
+            cache.store(key, optimal_result)
+            cache.store("no_model_key", no_model_result)
+            cache.close()
+
+            # The results are available from a different connection
+            other_cache = OptimizationCache(db_path)
+            self.assertEqual(other_cache.lookup(key), optimal_result)
+            self.assertEqual(other_cache.lookup("no_model_key"), no_model_result)
+            other_cache.close()
+
+
+class TestTemplateDeduplication(unittest.TestCase):
+
+    def tearDown(self):
+        shutil.rmtree(paths.gasol_path, ignore_errors=True)
+
+    def optimize_contracts(self, jobs):
+        input_file = "examples/jsons-solc/0x363c421901B7BDCa0f2a17dA03948D676bE350E4.json_solc"
+        ap = ArgumentParser()
+        gasol_asm.options_gasol(ap)
+        params = OptimizationParams()
+        params.parse_args(ap.parse_args([input_file, "-greedy", "-storage", "-dedup-templates", "-j", str(jobs)]))
+        gasol_asm.set_global_constants(params)
+        gasol_asm.init()
+
+        contracts = [c for c in parse_asm(input_file).contracts if c.has_asm_field]
+        if jobs == 1:
+            return [gasol_asm.optimize_asm_contract(c, params) for c in contracts]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=gasol_asm.init_block_worker,
+                                 initargs=(params, paths.gasol_path)) as pool:
+            return [gasol_asm.optimize_asm_contract(c, params, pool) for c in contracts]
+
+    def test_same_result_with_several_jobs(self):
+        sequential = self.optimize_contracts(1)
+        parallel = self.optimize_contracts(2)
+
+        template_hits = [row["template_hit"] for _, seq_rows, _, _ in sequential for row in seq_rows
+                         if "template_hit" in row]
+        self.assertIn(True, template_hits)
+        for (seq_contract, seq_rows, seq_log, _), (par_contract, par_rows, par_log, _) in zip(sequential, parallel):
+            self.assertDictEqual(seq_contract.to_asm_json(), par_contract.to_asm_json())
+            self.assertEqual([row.get("template_hit", None) for row in seq_rows],
+                             [row.get("template_hit", None) for row in par_rows])
+            self.assertDictEqual(seq_log, par_log)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import shutil
+import unittest
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+
+import gasol_asm
+import global_params.paths as paths
+from global_params.options import OptimizationParams
+from sfs_generator.parser_asm import parse_asm
+
+
+def greedy_params(input_file: str, jobs: int) -> OptimizationParams:
+    ap = ArgumentParser()
+    gasol_asm.options_gasol(ap)
+    params = OptimizationParams()
+    params.parse_args(ap.parse_args([input_file, "-greedy", "-storage", "-j", str(jobs)]))
+    gasol_asm.set_global_constants(params)
+    return params
+
+
+def remove_times(rows):
+    return [{key: value for key, value in row.items() if key != "solver_time_in_sec"} for row in rows]
+
+
+class TestParallelOptimization(unittest.TestCase):
+
+    def tearDown(self):
+        shutil.rmtree(paths.gasol_path, ignore_errors=True)
+
+    def test_parallel_matches_sequential(self):
+        input_file = "examples/jsons-solc/0x7aa21657E549943089bfA6547465b910c6b89c98.json_solc"
+        contracts = [c for c in parse_asm(input_file).contracts if c.has_asm_field]
+
+        gasol_asm.init()
+        params = greedy_params(input_file, 1)
+        sequential = [gasol_asm.optimize_asm_contract(c, params) for c in contracts]
+        sequential_gas = gasol_asm.previous_gas, gasol_asm.new_gas
+
+        gasol_asm.init()
+        params = greedy_params(input_file, 2)
+        with ProcessPoolExecutor(max_workers=2, initializer=gasol_asm.init_block_worker,
+                                 initargs=(params, paths.gasol_path)) as pool:
+            parallel = [gasol_asm.optimize_asm_contract(c, params, pool) for c in contracts]
+        parallel_gas = gasol_asm.previous_gas, gasol_asm.new_gas
+
+        self.assertEqual(sequential_gas, parallel_gas)
+        for (seq_contract, seq_rows, seq_log, seq_blocks), (par_contract, par_rows, par_log, par_blocks) in \
+                zip(sequential, parallel):
+            self.assertDictEqual(seq_contract.to_asm_json(), par_contract.to_asm_json())
+            self.assertEqual(remove_times(seq_rows), remove_times(par_rows))
+            self.assertEqual(seq_blocks, par_blocks)
+            self.assertDictEqual(seq_log, par_log)
+
+
+if __name__ == '__main__':
+    unittest.main()
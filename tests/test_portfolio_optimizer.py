@@ -0,0 +1,152 @@
+import csv
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import gasol_asm
+import smt_encoding.portfolio_optimizer as portfolio_optimizer
+from global_params.options import OptimizationParams
+from sfs_generator.parser_asm import generate_block_from_plain_instructions
+from smt_encoding.portfolio_optimizer import PortfolioOptimizer
+from smt_encoding.solver.solver import OptimizeOutcome
+from smt_encoding.solver.solver_from_executable import run_and_measure_command_with_input
+
+
+class StubOptimizer:
+    """
+    Replaces BlockOptimizer in the portfolio. The behaviour of each configuration is given by its solver name:
+    the result it returns, the delay before returning it (None waits until it is terminated) and the cost
+    of its sequence
+    """
+    behaviours = dict()
+    created = dict()
+
+    def __init__(self, block_id, sms, flags, timeout=10, initial_idx=0):
+        self._result, self._delay, self._cost = StubOptimizer.behaviours[flags.smt_solver]
+        self._terminated = threading.Event()
+        self.terminated = False
+        StubOptimizer.created[flags.smt_solver] = self
+
+    def optimize_block(self):
+        if self._delay is None:
+            self._terminated.wait(10)
+            return OptimizeOutcome.no_model, 0, []
+        time.sleep(self._delay)
+        return self._result
+
+    def terminate(self):
+        self.terminated = True
+        self._terminated.set()
+
+    def sequence_cost(self, ids):
+        return self._cost
+
+
+def portfolio_params(*solvers):
+    params = OptimizationParams()
+    params.criteria = "gas"
+    params.portfolio = [(solver, "uninterpreted_uf", "direct") for solver in solvers]
+    return params
+
+
+class TestPortfolioOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(portfolio_optimizer, "BlockOptimizer", StubOptimizer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        StubOptimizer.behaviours = dict()
+        StubOptimizer.created = dict()
+
+    def optimize(self, behaviours):
+        StubOptimizer.behaviours = behaviours
+        optimizer = PortfolioOptimizer("block_0", {}, portfolio_params(*behaviours.keys()), 10)
+        return optimizer.optimize_block(), optimizer.portfolio_statistics()
+
+    def test_optimal_stops_the_rest(self):
+        optimal_result = OptimizeOutcome.optimal, 0.1, ["ADD"]
+        result, statistics = self.optimize({"slow": (None, None, 1), "fast": (optimal_result, 0, 2),
+                                            "slower": (None, None, 1)})
+
+        self.assertEqual(result, optimal_result)
+        self.assertTrue(StubOptimizer.created["slow"].terminated)
+        self.assertTrue(StubOptimizer.created["slower"].terminated)
+        self.assertFalse(StubOptimizer.created["fast"].terminated)
+        self.assertDictEqual(statistics, {"portfolio_winner": "fast/uninterpreted_uf/direct",
+                                          "portfolio_outcomes": "slow/uninterpreted_uf/direct:stopped;"
+                                                                "fast/uninterpreted_uf/direct:optimal;"
+                                                                "slower/uninterpreted_uf/direct:stopped"})
+
+    def test_cheapest_model_is_chosen(self):
+        # The configurations finish in the reverse order, but ties are broken by the order of the configurations
+        result, statistics = self.optimize({"expensive": ((OptimizeOutcome.non_optimal, 1, ["A"]), 0.2, 5),
+                                            "first_cheap": ((OptimizeOutcome.non_optimal, 1, ["B"]), 0.1, 3),
+                                            "second_cheap": ((OptimizeOutcome.non_optimal, 1, ["C"]), 0, 3),
+                                            "no_model": ((OptimizeOutcome.no_model, 1, []), 0, 0)})
+
+        self.assertEqual(result, (OptimizeOutcome.non_optimal, 1, ["B"]))
+        self.assertEqual(statistics["portfolio_winner"], "first_cheap/uninterpreted_uf/direct")
+        self.assertEqual(statistics["portfolio_outcomes"],
+                         "expensive/uninterpreted_uf/direct:non_optimal;"
+                         "first_cheap/uninterpreted_uf/direct:non_optimal;"
+                         "second_cheap/uninterpreted_uf/direct:non_optimal;no_model/uninterpreted_uf/direct:no_model")
+
+    def test_no_model_returns_first_result(self):
+        result, statistics = self.optimize({"first": ((OptimizeOutcome.no_model, 1, []), 0.1, 0),
+                                            "second": ((OptimizeOutcome.unsat, 0.5, []), 0, 0)})
+
+        self.assertEqual(result, (OptimizeOutcome.no_model, 1, []))
+        self.assertIsNone(statistics["portfolio_winner"])
+        self.assertEqual(statistics["portfolio_outcomes"],
+                         "first/uninterpreted_uf/direct:no_model;second/uninterpreted_uf/direct:unsat")
+
+    def test_statistics_columns(self):
+        import pandas as pd
+
+        StubOptimizer.behaviours = {"stopped": (None, None, 1),
+                                    "winner": ((OptimizeOutcome.optimal, 0.1, ["ADD"]), 0, 1)}
+        params = portfolio_params(*StubOptimizer.behaviours.keys())
+        outcome, solver_time, optimized_ids, _, solver_statistics = \
+            gasol_asm.search_optimal({"init_progr_len": 3}, params, 10, "block_0")
+        self.assertEqual((outcome, optimized_ids), (OptimizeOutcome.optimal, ["ADD"]))
+
+        block = generate_block_from_plain_instructions("PUSH 1 PUSH 2 ADD", "block_0")
+        optimized_block = generate_block_from_plain_instructions("PUSH 3", "block_0")
+        row = gasol_asm.generate_statistics_info(block, outcome, solver_time, optimized_block, None, 3, 10, [],
+                                                 solver_statistics)
+
+        with tempfile.TemporaryDirectory() as csv_dir:
+            csv_file = os.path.join(csv_dir, "statistics.csv")
+            pd.DataFrame([row]).to_csv(csv_file)
+            with open(csv_file) as f:
+                csv_row = next(csv.DictReader(f))
+
+        self.assertEqual(csv_row["portfolio_winner"], "winner/uninterpreted_uf/direct")
+        self.assertEqual(csv_row["portfolio_outcomes"],
+                         "stopped/uninterpreted_uf/direct:stopped;winner/uninterpreted_uf/direct:optimal")
+
+    def test_concurrent_solver_times(self):
+        # Each command only accounts for its own CPU time, not for the one of the commands running at the same time
+        busy_command = f"{sys.executable} -c \"import sys; sys.stdin.read(); sum(range(2 * 10 ** 7))\""
+        usage_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(run_and_measure_command_with_input, busy_command, ["(check-sat)"])
+                       for _ in range(2)]
+            times = [future.result()[1] for future in futures]
+        usage_stop = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total_time = usage_stop.ru_utime + usage_stop.ru_stime - usage_start.ru_utime - usage_start.ru_stime
+
+        for solver_time in times:
+            self.assertGreater(solver_time, 0)
+            self.assertLess(solver_time, 0.75 * total_time)
+        self.assertAlmostEqual(sum(times), total_time, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import shutil
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import global_params.paths as paths
+from sfs_generator.ir_block import evm2rbr_compiler
+from sfs_generator.sfs_context import SFSContext
+
+
+def translate(instructions, input_stack, block_name, ctx=None):
+    block = {"instructions": instructions, "input": input_stack}
+    _, subblocks, sfs_dict = evm2rbr_compiler(file_name="test", block=block, block_name=block_name,
+                                              storage=True, part=False, push=True, ctx=ctx)
+    return subblocks, sfs_dict
+
+
+class TestSFSContext(unittest.TestCase):
+
+    def tearDown(self):
+        shutil.rmtree(paths.gasol_path, ignore_errors=True)
+
+    def test_translation_does_not_depend_on_previous_blocks(self):
+        first_block = ['PUSH 80', 'PUSH 40', 'MSTORE', 'CALLVALUE', 'DUP1', 'ISZERO', 'PUSH [tag] 1']
+        second_block = ['SWAP1', 'DUP2', 'ADD', 'CALLER', 'SLOAD', 'PUSH 1', 'ADD', 'CALLER', 'SSTORE', 'POP']
+
+        first_subblocks, first_sfs = translate(first_block, 0, "block0")
+        self.assertNotEqual(first_sfs, {})
+        translate(second_block, 3, "block1")
+        repeated_subblocks, repeated_sfs = translate(first_block, 0, "block0")
+
+        self.assertEqual(first_subblocks, repeated_subblocks)
+        self.assertDictEqual(first_sfs, repeated_sfs)
+
+    def test_contexts_are_independent(self):
+        block = ['SWAP1', 'DUP2', 'ADD', 'CALLER', 'SLOAD', 'PUSH 1', 'ADD', 'CALLER', 'SSTORE', 'POP']
+        first_ctx, second_ctx = SFSContext(), SFSContext()
+
+        _, first_sfs = translate(block, 3, "block", first_ctx)
+        self.assertIs(first_sfs, first_ctx.blocks_json_dict)
+        self.assertDictEqual(second_ctx.blocks_json_dict, {})
+
+        _, second_sfs = translate(block, 3, "block", second_ctx)
+        self.assertDictEqual(first_sfs, second_sfs)
+
+    def test_concurrent_translation(self):
+        blocks = [(['PUSH 80', 'PUSH 40', 'MSTORE', 'CALLVALUE', 'DUP1', 'ISZERO', 'PUSH [tag] 1'], 0),
+                  (['SWAP1', 'DUP2', 'ADD', 'CALLER', 'SLOAD', 'PUSH 1', 'ADD', 'CALLER', 'SSTORE', 'POP'], 3),
+                  (['DUP3', 'DUP3', 'MUL', 'PUSH 20', 'SWAP2', 'SUB', 'SWAP1', 'DIV'], 3)] * 8
+
+        sequential = [translate(instructions, input_stack, f"block{i}")
+                      for i, (instructions, input_stack) in enumerate(blocks)]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            concurrent = list(executor.map(lambda args: translate(args[1][0], args[1][1], f"block{args[0]}"),
+                                           enumerate(blocks)))
+
+        self.assertEqual(sequential, concurrent)
+
+
+if __name__ == '__main__':
+    unittest.main()
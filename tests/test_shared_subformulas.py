@@ -0,0 +1,62 @@
+import sys
+import unittest
+
+from smt_encoding.constraints.assertions import AssertHard, AssertSoft
+from smt_encoding.constraints.connector import Connector
+from smt_encoding.constraints.connector_factory import add_eq, add_and, add_implies, add_not
+from smt_encoding.constraints.function import Const, Sort
+from smt_encoding.solver.solver_from_executable import shared_connectors, translate_formula
+from smt_encoding.solver.z3_executable import Z3Executable
+
+
+class TestSharedSubformulas(unittest.TestCase):
+
+    def setUp(self):
+        self.t_0 = Const('t_0', Sort.integer)
+        self.t_1 = Const('t_1', Sort.integer)
+        self.u_0_0 = Const('u_0_0', Sort.boolean)
+        self.u_0_1 = Const('u_0_1', Sort.boolean)
+        self.x_0_0 = Const('x_0_0', Sort.integer)
+        self.x_0_1 = Const('x_0_1', Sort.integer)
+        self.move = add_and(add_eq(self.u_0_1, self.u_0_0), add_eq(self.x_0_1, self.x_0_0))
+
+    def test_only_repeated_connectors_are_shared(self):
+        formulas = [add_implies(add_eq(self.t_0, 1), self.move), add_implies(add_eq(self.t_0, 2), self.move)]
+        self.assertDictEqual(shared_connectors(formulas), {id(self.move): 2})
+        # The equalities inside the move are only written once, inside its definition
+        self.assertDictEqual(shared_connectors([self.move]), dict())
+
+    def test_definitions_precede_their_uses(self):
+        solver = Z3Executable()
+        solver.set_logic("QF_IDL")
+        solver.declare_function(*(var.func for var in [self.t_0, self.t_1, self.u_0_0, self.u_0_1, self.x_0_0,
+                                                       self.x_0_1]))
+        solver.assert_hard(AssertHard(add_implies(add_eq(self.t_0, value), self.move)) for value in [1, 2])
+        solver.assert_soft([AssertSoft(add_not(self.move), 2, "cost")])
+
+        sentences = list(solver.to_smt2())
+        definitions = [sentence for sentence in sentences if sentence.startswith("(define-fun")]
+        self.assertEqual(len(definitions), 1)
+        self.assertLess(sentences.index(definitions[0]), min(i for i, sentence in enumerate(sentences)
+                                                             if sentence.startswith("(assert")))
+        self.assertEqual(sum("shared_0" in sentence for sentence in sentences), 4)
+
+        # The constraints are stored, so the encoding can be generated again
+        self.assertListEqual(list(solver.to_smt2()), sentences)
+
+        solver.share_subformulas = False
+        self.assertFalse(any(sentence.startswith("(define-fun") for sentence in solver.to_smt2()))
+
+    def test_deep_formulas_are_translated(self):
+        formula = self.u_0_0
+        for i in range(2 * sys.getrecursionlimit()):
+            formula = Connector("and" if i % 2 == 0 else "or", True, formula, self.u_0_1)
+        translation = translate_formula(formula)
+        self.assertTrue(translation.startswith("(or  (and  (or  "))
+        self.assertTrue(translation.endswith(" u_0_1) u_0_1)"))
+        self.assertEqual(translation.count("("), 2 * sys.getrecursionlimit())
+        self.assertEqual(translate_formula(add_implies(add_eq(self.t_0, 1), False)), "(not  (=  t_0 1))")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from smt_encoding.solver.solver_from_executable import run_command, run_command_with_input
+from smt_encoding.solver.z3_executable import Z3Executable
+
+
+sentences = ["(set-logic QF_UF)", "(declare-fun x () Bool)", "(assert x)", "(check-sat)"]
+
+
+class TestSolverFromExecutable(unittest.TestCase):
+
+    def test_same_output_as_from_file(self):
+        with tempfile.TemporaryDirectory() as encoding_dir:
+            encoding_file = os.path.join(encoding_dir, "encoding.smt2")
+            with open(encoding_file, 'w') as f:
+                for sentence in sentences:
+                    print(sentence, file=f)
+            file_output = run_command(f"cat {encoding_file}")
+
+        self.assertEqual(run_command_with_input("cat", iter(sentences)), file_output)
+        self.assertEqual(file_output, "\n".join(sentences) + "\n")
+
+    def test_copy_of_the_input(self):
+        with tempfile.TemporaryDirectory() as encoding_dir:
+            encoding_file = os.path.join(encoding_dir, "encoding.smt2")
+            output = run_command_with_input("cat", iter(sentences), encoding_file)
+            with open(encoding_file) as f:
+                self.assertEqual(f.read(), output)
+
+    def test_stdin_closed_early(self):
+        # The process exits after reading the first line, so writing the rest of the input fails with a broken pipe
+        many_sentences = (f"(assert x_{i})" for i in range(100000))
+        with mock.patch("threading.excepthook") as excepthook:
+            self.assertEqual(run_command_with_input("head -n 1", many_sentences), "(assert x_0)\n")
+        excepthook.assert_not_called()
+
+    def test_encoding_is_kept(self):
+        # The encoding is stored when the intermediate files are kept (see BlockOptimizer)
+        with tempfile.TemporaryDirectory() as encoding_dir:
+            encoding_file = os.path.join(encoding_dir, "encoding.smt2")
+            solver = Z3Executable(encoding_file)
+            solver.set_logic("QF_UF")
+            solver.assert_hard([])
+            solver.assert_soft([])
+            with mock.patch.object(Z3Executable, "command_line", return_value="cat"):
+                solver.check_sat()
+
+            with open(encoding_file) as f:
+                self.assertEqual(f.read(), solver.get_model())
+        self.assertTrue(solver.get_model().startswith("(set-logic QF_UF)\n"))
+        self.assertIn("(check-sat)\n", solver.get_model())
+
+
+if __name__ == '__main__':
+    unittest.main()
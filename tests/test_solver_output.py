@@ -0,0 +1,62 @@
+import unittest
+
+from smt_encoding.solver.solver_from_executable import SolverOutput
+
+z3_output = """sat
+(objectives
+ (cost  (interval 3 12))
+)
+(
+  ;; universe for T:
+  ;;   T!val!1 T!val!0
+  (declare-fun T!val!1 () T)
+  (declare-fun T!val!0 () T)
+  (define-fun t_0 () T
+    T!val!1)
+  (define-fun shared_0 () Bool
+    (= x_0_1 x_0_0))
+  (define-fun l_3 () Int
+    (- 1))
+  (define-fun ADD_0 ((x!0 S) (x!1 S)) S
+    (ite (and (= x!0 S!val!2) (= x!1 S!val!1)) S!val!3
+      S!val!0))
+  (define-fun theta_ADD_0 () T
+    T!val!0)
+)
+"""
+
+oms_output = """sat
+(objectives
+ (cost 12 partial)
+)
+( (define-fun t_0 () Int 5)
+  (define-fun t_1 () Int 0) )
+"""
+
+
+class TestSolverOutput(unittest.TestCase):
+
+    def test_z3_model(self):
+        output = SolverOutput(z3_output)
+        self.assertEqual(output.status, "sat")
+        self.assertDictEqual(output.objectives, {"cost": "(interval 3 12)"})
+        self.assertDictEqual(output.values, {"t_0": "T!val!1", "shared_0": "(= x_0_1 x_0_0)", "l_3": "(- 1)",
+                                             "theta_ADD_0": "T!val!0"})
+        self.assertFalse(output.partial)
+
+    def test_oms_model(self):
+        output = SolverOutput(oms_output)
+        self.assertEqual(output.status, "sat")
+        self.assertDictEqual(output.objectives, {"cost": "12 partial"})
+        self.assertDictEqual(output.values, {"t_0": "5", "t_1": "0"})
+        self.assertTrue(output.partial)
+
+    def test_no_model(self):
+        output = SolverOutput('unsat\n(error "line 20 column 10: model is not available")\n')
+        self.assertEqual(output.status, "unsat")
+        self.assertTrue(output.has_error("model is not available"))
+        self.assertDictEqual(output.values, dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
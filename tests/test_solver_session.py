@@ -0,0 +1,159 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+import global_params.paths as paths
+from smt_encoding.constraints.assertions import AssertHard, AssertSoft
+from smt_encoding.constraints.connector_factory import add_lt, add_eq
+from smt_encoding.constraints.function import Const, Sort
+from smt_encoding.solver.solver import OptimizeOutcome
+from smt_encoding.solver.solver_session import SolverSession, get_solver_session
+from smt_encoding.solver.z3_executable import Z3Executable
+
+# Interactive solver that answers each sentence in a line: (check-sat) prints sat, (count) prints the number of
+# assertions since the last (reset), (pid) prints its process id, (sleep s) waits s seconds before reading more
+# sentences and (echo "text") prints the text
+fake_solver = """
+import os
+import sys
+import time
+
+assertions = 0
+for line in sys.stdin:
+    sentence = line.strip()
+    if sentence == "(reset)":
+        assertions = 0
+    elif sentence.startswith("(assert"):
+        assertions += 1
+    elif sentence == "(check-sat)":
+        print("sat")
+    elif sentence == "(count)":
+        print(assertions)
+    elif sentence == "(pid)":
+        print(os.getpid())
+    elif sentence.startswith("(sleep"):
+        time.sleep(float(sentence[len("(sleep "):-1]))
+    elif sentence.startswith("(echo"):
+        print(sentence[len('(echo "'):-len('")')])
+    sys.stdout.flush()
+"""
+
+
+class TestSolverSession(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        solver_file = os.path.join(self.tmp_dir, "fake_solver.py")
+        with open(solver_file, 'w') as f:
+            f.write(fake_solver)
+        self.command = f"{sys.executable} {solver_file}"
+        self.session = SolverSession(self.command)
+
+    def tearDown(self):
+        self.session.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_output_until_marker(self):
+        output, _, answered = self.session.solve(["(assert a)", "(check-sat)", '(echo "first line")', "(count)"])
+        self.assertTrue(answered)
+        self.assertEqual(output, "sat\nfirst line\n1\n")
+
+        # A problem with no output
+        output, _, answered = self.session.solve(["(assert a)"])
+        self.assertTrue(answered)
+        self.assertEqual(output, "")
+
+    def test_reset_between_problems(self):
+        output, _, _ = self.session.solve(["(pid)", "(assert a)", "(assert b)", "(count)"])
+        pid, count = output.split()
+        self.assertEqual(count, "2")
+
+        # The same process solves the next problem after a reset
+        output, _, _ = self.session.solve(["(pid)", "(assert c)", "(count)"])
+        self.assertListEqual(output.split(), [pid, "1"])
+
+        # Unless the sentences continue the previous problem
+        output, _, _ = self.session.solve(["(assert d)", "(count)"], reset=False)
+        self.assertEqual(output, "2\n")
+
+    def test_problems_stored_in_file(self):
+        file_path = os.path.join(self.tmp_dir, "encoding.smt2")
+        self.session.solve(["(assert a)", "(check-sat)"], file_path=file_path)
+        self.session.solve(["(count)"], file_path=file_path, reset=False)
+        with open(file_path) as f:
+            self.assertEqual(f.read(), "(assert a)\n(check-sat)\n(count)\n")
+
+    def test_timeout_kills_and_restarts(self):
+        output, _, _ = self.session.solve(["(pid)"])
+        first_pid = output.strip()
+
+        started_processes = []
+        output, query_time, answered = self.session.solve(["(check-sat)", "(sleep 10)", "(check-sat)"], timeout=0.3,
+                                                          process_started=started_processes.append)
+        self.assertFalse(answered)
+        # The partial output is returned
+        self.assertEqual(output, "sat\n")
+        self.assertGreaterEqual(query_time, 0.3)
+        self.assertLess(query_time, 5)
+        # The process that was solving the problem has been killed
+        self.assertEqual(len(started_processes), 1)
+        self.assertIsNotNone(started_processes[0].poll())
+
+        # The problem cannot be continued, as the process is no longer running
+        self.assertTupleEqual(self.session.solve(["(count)"], reset=False), ("", 0, False))
+
+        output, _, answered = self.session.solve(["(pid)", "(assert a)", "(count)"])
+        self.assertTrue(answered)
+        second_pid, count = output.split()
+        self.assertNotEqual(first_pid, second_pid)
+        self.assertEqual(count, "1")
+
+    def test_time_per_problem(self):
+        _, slow_time, answered = self.session.solve(["(sleep 0.5)", "(check-sat)"], timeout=5)
+        self.assertTrue(answered)
+        self.assertGreaterEqual(slow_time, 0.5)
+
+        # The time of a problem does not include the time of the previous ones
+        _, fast_time, answered = self.session.solve(["(check-sat)"], timeout=5)
+        self.assertTrue(answered)
+        self.assertLess(fast_time, 0.5)
+
+        _, continued_time, _ = self.session.solve(["(sleep 0.2)", "(check-sat)"], reset=False)
+        self.assertGreaterEqual(continued_time, 0.2)
+        self.assertLess(continued_time, 0.5)
+
+    def test_one_session_per_thread(self):
+        session = get_solver_session(self.command)
+        self.assertIs(get_solver_session(self.command), session)
+
+        other_sessions = []
+        thread = threading.Thread(target=lambda: other_sessions.append(get_solver_session(self.command)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other_sessions[0], session)
+
+    @unittest.skipUnless(os.path.exists(paths.z3_exec), "z3 is not available")
+    def test_blocks_solved_in_same_session(self):
+        # The same constants are declared in all the problems, which is only valid after a reset
+        a, b = Const('a', Sort.integer), Const('b', Sort.integer)
+        outcomes, times = [], []
+        for constraints in [[add_lt(a, b)], [add_lt(a, b), add_eq(a, b)], [add_lt(b, a)]]:
+            solver = Z3Executable()
+            solver.use_session()
+            solver.set_logic("QF_IDL")
+            solver.set_timeout(2)
+            solver.declare_function(a.func, b.func)
+            solver.assert_hard(AssertHard(constraint) for constraint in constraints)
+            solver.assert_soft([AssertSoft(add_lt(a, 0), 1, "cost")])
+            outcomes.append(solver.check_sat())
+            times.append(solver.time_statistics())
+
+        self.assertListEqual(outcomes, [OptimizeOutcome.optimal, OptimizeOutcome.unsat, OptimizeOutcome.optimal])
+        self.assertTrue(all(0 <= solver_time < 2 for solver_time in times))
+
+
+if __name__ == '__main__':
+    unittest.main()
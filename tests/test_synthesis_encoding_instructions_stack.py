@@ -1,10 +1,23 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
 import unittest
-from smt_encoding.complete_encoding.synthesis_encoding_instructions_stack import EncodingForStack
+from argparse import ArgumentParser
+from copy import deepcopy
+import gasol_asm
+from global_params.options import OptimizationParams
+from sfs_generator.ir_block import evm2rbr_compiler
+from smt_encoding.block_optimizer import BlockOptimizer
+from smt_encoding.complete_encoding.synthesis_encoding_instructions_stack import EncodingForStack, \
+    PrecompiledFragments, precompiled_fragments
 from smt_encoding.complete_encoding.synthesis_stack_constraints import push_basic_encoding, pop_uninterpreted_encoding, \
-    non_comm_function_encoding, swapk_encoding
+    non_comm_function_encoding, swapk_encoding, dupk_encoding, dupk_encoding_empty
 from smt_encoding.instructions.push_basic import PushBasic
 from smt_encoding.instructions.pop_uninterpreted import PopUninterpreted
 from smt_encoding.instructions.swapk_basic import SwapKBasic
+from smt_encoding.instructions.dupk_basic import DupKBasic
 from smt_encoding.complete_encoding.synthesis_functions import SynthesisFunctions
 from smt_encoding.instructions.instruction_bounds_simple import DumbInstructionBounds
 from smt_encoding.constraints.connector_factory import add_eq, add_and, add_implies, add_leq, add_lt, add_not
@@ -130,6 +143,134 @@ class TestSynthesisConstraints(unittest.TestCase):
         self.assertListEqual(sf.created_stack_vars(), other_sf.created_stack_vars())
         self.assertListEqual(sf.created_functions(), other_sf.created_functions())
 
+    def test_basic_constraints_are_shared_by_shape(self):
+        fragments = PrecompiledFragments()
+        dup2 = DupKBasic(3, 2)
+
+        def encode(bounds, bs, sf, encoding_function=dupk_encoding):
+            encoding_factory = EncodingForStack(fragments)
+            encoding_factory.register_basic_function_for_encoding(dup2, encoding_function, k=2)
+            return list(encoding_factory.encode_instruction(dup2, bounds, sf, bs))
+
+        hard_constraints = encode(DumbInstructionBounds(0, 3), 4, SynthesisFunctions(dict()))
+        other_sf = SynthesisFunctions(dict())
+        self.assertListEqual(hard_constraints, [dupk_encoding(j, 3, other_sf, 4, 2) for j in range(4)])
+
+        # Same shape: the constraints of the common positions are reused
+        reused_constraints = encode(DumbInstructionBounds(2, 5), 4, SynthesisFunctions(dict()))
+        self.assertIs(reused_constraints[0], hard_constraints[2])
+        self.assertIs(reused_constraints[1], hard_constraints[3])
+        self.assertListEqual(reused_constraints, [dupk_encoding(j, 3, other_sf, 4, 2) for j in range(2, 6)])
+
+        # Other max stack size or representation of the empty element: new constraints are built
+        self.assertListEqual(encode(DumbInstructionBounds(0, 3), 5, SynthesisFunctions(dict())),
+                             [dupk_encoding(j, 3, other_sf, 5, 2) for j in range(4)])
+        for empty in [10, 11]:
+            empty_sf = SynthesisFunctions({"empty": empty})
+            self.assertListEqual(encode(DumbInstructionBounds(0, 3), 4, empty_sf, dupk_encoding_empty),
+                                 [dupk_encoding_empty(j, 3, empty_sf, 4, 2) for j in range(4)])
+
+
+def sub_block_sfs(instructions, input_stack):
+    block = {"instructions": instructions, "input": input_stack}
+    _, _, sfs_dict = evm2rbr_compiler(file_name="test", block=block, block_name="block", storage=True, part=False,
+                                      push=True)
+    return sfs_dict["block_0"]
+
+
+def encoding_params(*args):
+    ap = ArgumentParser()
+    gasol_asm.options_gasol(ap)
+    params = OptimizationParams()
+    params.parse_args(ap.parse_args(["test.json_solc", "-solver", "z3", *args]))
+    return params
+
+
+class TestPrecompiledFragments(unittest.TestCase):
+
+    def setUp(self):
+        # Two max stack sizes, each one with two different numbers of stack variables (and hence, empty values)
+        self.blocks = [sub_block_sfs(['SWAP1', 'DUP2', 'ADD', 'CALLER', 'SLOAD', 'PUSH 1', 'ADD', 'CALLER', 'SSTORE'],
+                                     3),
+                       sub_block_sfs(['DUP2', 'DUP2', 'ADD', 'SWAP2', 'POP', 'POP'], 2),
+                       sub_block_sfs(['SWAP1', 'DUP2', 'ADD', 'PUSH 3', 'MUL', 'SWAP1', 'POP'], 2),
+                       sub_block_sfs(['DUP4', 'DUP4', 'ADD', 'DUP3', 'SUB', 'SWAP4', 'POP', 'POP', 'POP', 'POP'], 4)]
+
+    def tearDown(self):
+        precompiled_fragments.clear()
+
+    @staticmethod
+    def smt2(sfs, params):
+        return list(BlockOptimizer("block_0", deepcopy(sfs), params, 10)._solver.to_smt2())
+
+    def test_warm_cache_same_encoding(self):
+        self.assertGreater(len({sfs["max_sk_sz"] for sfs in self.blocks}), 1)
+        for flags in [[], ["-empty"], ["-term-encoding", "int"], ["-term-encoding", "int", "-empty"],
+                      ["-push-basic", "-term-encoding", "int"]]:
+            params = encoding_params(*flags)
+            with self.subTest(flags=flags):
+                precompiled_fragments.clear()
+                cold_encodings = []
+                for sfs in self.blocks:
+                    precompiled_fragments.clear()
+                    cold_encodings.append(self.smt2(sfs, params))
+
+                # The cache is filled with the constraints of all the blocks before encoding them again
+                for sfs in self.blocks:
+                    self.smt2(sfs, params)
+                for sfs, cold_encoding in zip(self.blocks, cold_encodings):
+                    self.assertListEqual(self.smt2(sfs, params), cold_encoding)
+                # In reverse order, so each block is encoded after others with a different shape
+                for sfs, cold_encoding in reversed(list(zip(self.blocks, cold_encodings))):
+                    self.assertListEqual(self.smt2(sfs, params), cold_encoding)
+
+    def test_warm_cache_across_representations(self):
+        # Encodings that only differ in the representation of the terms or the empty element do not share
+        # their constraints
+        all_flags = [[], ["-empty"], ["-term-encoding", "int"], ["-term-encoding", "int", "-empty"]]
+        cold_encodings = dict()
+        for i, flags in enumerate(all_flags):
+            precompiled_fragments.clear()
+            cold_encodings[i] = self.smt2(self.blocks[0], encoding_params(*flags))
+
+        for i, flags in enumerate(all_flags * 2):
+            self.assertListEqual(self.smt2(self.blocks[0], encoding_params(*flags)),
+                                 cold_encodings[i % len(all_flags)])
+
+    def test_lru_eviction(self):
+        fragments = PrecompiledFragments(max_shapes=2)
+        first_fragments = fragments.fragments((3, "first"))
+        first_fragments["key"] = "constraint"
+        fragments.fragments((4, "second"))
+
+        # Accessing the first shape makes the second one the least recently used
+        self.assertIs(fragments.fragments((3, "first")), first_fragments)
+        fragments.fragments((5, "third"))
+        self.assertIs(fragments.fragments((3, "first")), first_fragments)
+        self.assertDictEqual(fragments.fragments((4, "second")), dict())
+
+        # The third shape was evicted when the second one was added again
+        self.assertDictEqual(fragments.fragments((5, "third")), dict())
+        fragments.clear()
+        self.assertDictEqual(fragments.fragments((3, "first")), dict())
+
+    def test_evicted_shapes_same_encoding(self):
+        fragments = PrecompiledFragments(max_shapes=1)
+        dup2 = DupKBasic(3, 2)
+
+        def encode(bs):
+            encoding_factory = EncodingForStack(fragments)
+            encoding_factory.register_basic_function_for_encoding(dup2, dupk_encoding, k=2)
+            return list(encoding_factory.encode_instruction(dup2, DumbInstructionBounds(0, 3),
+                                                            SynthesisFunctions(dict()), bs))
+
+        first_constraints = encode(4)
+        encode(5)
+        # The constraints of the first shape are built again, and they are the same hash-consed objects
+        rebuilt_constraints = encode(4)
+        self.assertListEqual(rebuilt_constraints, first_constraints)
+        self.assertIs(encode(4)[0], rebuilt_constraints[0])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,9 @@
 import subprocess
 import shlex
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import re
-from typing import List, Union
+from typing import List, Union, Optional, Tuple, Dict
 import sys
 import os
 import global_params.paths as paths
@@ -178,7 +178,11 @@ def str_to_list(bytecode_str: str) -> List[List[str]]:
     return out_seqs
 
 
-def forves_format(seq1, seq2) -> str:
+def forves_records(seq1, seq2) -> Optional[List[str]]:
+    """
+    Records in the forves input format to check both sequences are equivalent, one for each subsequence that is
+    optimized separately. Returns None if the sequences cannot be translated
+    """
     try:
         initial_seqs = str_to_list(seq1)
         opt_seqs = str_to_list(seq2)
@@ -200,53 +204,110 @@ def forves_format(seq1, seq2) -> str:
 
             words = ['#', opt_bytecode, bytecode, str(stack_size)]
             forves_str.append('\n'.join(words))
-        return '\n'.join(forves_str)
+        return forves_str
 
     except Exception as e:
         traceback.print_exc()
         print(e, file=sys.stderr)
 
 
-def compare_forves(previous_block: str, new_solution: str, criteria: str = "size", enabled: bool = True):
-    if not enabled:
-        return "disabled"
-
-    forves_exec = Path(paths.project_path).joinpath('bin/forves-checker')
+def forves_format(seq1, seq2) -> Optional[str]:
+    records = forves_records(seq1, seq2)
+    return '\n'.join(records) if records is not None else None
 
-    # Check if the bin for forves is present
-    if not forves_exec.exists():
-        return "missing"
 
+def forves_command(criteria: str) -> str:
     criteria_flag = "all" if criteria == "gas" else "all_size"
-    forves_input = forves_format(previous_block, new_solution)
+    return f"{Path(paths.project_path).joinpath('bin/forves-checker')} " \
+           f"-opt_rep 20 -pipeline_rep 20 -opt {criteria_flag} -mu basic -su basic -ms basic -ss basic " \
+           f"-ssv_c basic -mem_c po -strg_c po -sha3_c trivial "
+
 
-    # If there is a simple JUMP to compare or a block with no opcodes to optimize, then we return true directly
-    if forves_input == '':
-        return "true"
+def run_forves_records(records: List[str], criteria: str, timeout: Optional[float] = None) -> List[str]:
+    """
+    Checks the records with a single invocation of the checker, which reads them from the standard input.
+    Returns the verdict for each record ("true", "false" or "parsing"), or "timeout" for all of them if the
+    checker does not finish in the given seconds
+    """
+    try:
+        output = subprocess.run(shlex.split(forves_command(criteria)), input='\n'.join(records),
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=timeout).stdout
+    except subprocess.TimeoutExpired:
+        return ["timeout"] * len(records)
+
+    # The checker reports one line "Example i: verdict" per record
+    verdicts = dict()
+    for match in re.finditer(r"^Example ([0-9]+): (.*)$", output, re.MULTILINE):
+        verdict = match.group(2)
+        if "false" in verdict:
+            verdicts[int(match.group(1))] = "false"
+        elif "parsing error" in verdict:
+            verdicts[int(match.group(1))] = "parsing"
+        elif "true" in verdict:
+            verdicts[int(match.group(1))] = "true"
+
+    if len(verdicts) != len(records):
+        raise ValueError("Not recognized option in output:", output)
+    return [verdicts[i] for i in range(len(records))]
 
-    fd, tmp_file = tempfile.mkstemp()
 
-    with open(tmp_file, 'w') as f:
-        forves_input = forves_format(previous_block, new_solution)
-        f.write(forves_input)
+def compare_forves_batch(pairs: List[Tuple[str, str]], criteria: str = "size", enabled: bool = True,
+                         shards: int = 1, timeout: Optional[float] = None) -> List[str]:
+    """
+    Checks each pair of previous and new sequences with the forves checker. The records from all the pairs are
+    checked at once, splitting them into several shards that are checked in parallel. Identical sequences and
+    repeated pairs are not sent to the checker. Returns the verdict for each pair, which is "false" if some of
+    its records is false, "parsing" if some record cannot be parsed, "timeout" if the checker has not finished
+    in the given seconds and "true" otherwise
+    """
+    if not enabled:
+        return ["disabled"] * len(pairs)
 
-    command = f"{forves_exec} -i {tmp_file} " \
-              f"-opt_rep 20 -pipeline_rep 20 -opt {criteria_flag} -mu basic -su basic -ms basic -ss basic " \
-              f"-ssv_c basic -mem_c po -strg_c po -sha3_c trivial "
+    # Check if the bin for forves is present
+    if not Path(paths.project_path).joinpath('bin/forves-checker').exists():
+        return ["missing"] * len(pairs)
+
+    pair_verdicts: Dict[Tuple[str, str], str] = dict()
+    pair_records: Dict[Tuple[str, str], range] = dict()
+    records = []
+    for pair in pairs:
+        previous_block, new_solution = pair
+        # The same sequence is trivially equivalent, so there is no need to call the checker
+        if pair in pair_verdicts or pair in pair_records or previous_block == new_solution:
+            continue
+
+        new_records = forves_records(previous_block, new_solution)
+        if new_records is None:
+            pair_verdicts[pair] = "parsing"
+        else:
+            pair_records[pair] = range(len(records), len(records) + len(new_records))
+            records.extend(new_records)
+
+    shard_size = max(1, -(-len(records) // max(1, shards)))
+    shard_records = [records[i:i + shard_size] for i in range(0, len(records), shard_size)]
+    with ThreadPoolExecutor(max_workers=max(1, len(shard_records))) as executor:
+        record_verdicts = [verdict for verdicts in executor.map(run_forves_records, shard_records,
+                                                                [criteria] * len(shard_records),
+                                                                [timeout] * len(shard_records))
+                           for verdict in verdicts]
+
+    for pair, record_range in pair_records.items():
+        verdicts = [record_verdicts[i] for i in record_range]
+        if "false" in verdicts:
+            pair_verdicts[pair] = "false"
+        elif "parsing" in verdicts:
+            pair_verdicts[pair] = "parsing"
+        elif "timeout" in verdicts:
+            pair_verdicts[pair] = "timeout"
+        else:
+            # If there is a simple JUMP to compare or a block with no opcodes to optimize, then it is true directly
+            pair_verdicts[pair] = "true"
 
-    output = run_command(command)
+    return [pair_verdicts.get(pair, "true") for pair in pairs]
 
-    os.close(fd)
-    os.remove(tmp_file)
 
-    if "false" in output:
-        return "false"
-    elif "parsing error" in output:
-        return "parsing"
-    elif "true" in output:
-        return "true"
-    else:
-        raise ValueError("Not recognized option in output:", output)
+def compare_forves(previous_block: str, new_solution: str, criteria: str = "size", enabled: bool = True):
+    return compare_forves_batch([(previous_block, new_solution)], criteria, enabled)[0]
 
 
 def compare_forves_csv_info(csv_info, criteria: str = "size"):